@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite for Skyrim TTRPG
+
+Times the hot entry points against a synthetic campaign
+(synthetic_campaign.py) so performance changes show up as numbers:
+- DataQueryManager.query_npc_enemy_stats and get_enemies_by_hold
+- StoryManager.generate_wilderness_encounter, trigger_scene_event and
+  advance_clock
+- mid_session_protocol.top_clocks and RepositoryExporter.export_to_zip
+- Each hold's location triggers (travel_graph.HOLD_TRIGGERS), run over
+  every named place in the hold
+
+Each entry point is called once cold (first call, caches empty) and then
+`repeats` more times warm; the cold time and the warm min/median/mean are
+recorded in milliseconds. Output printed by the managers is discarded while
+they are timed.
+
+Results are written as JSON (default: <repo>/bench_results.json). The run
+that was "current" in the file becomes "previous", and "changes" holds the
+percentage change of every warm median against it.
+
+Usage:
+    python3 benchmark.py                       # full scale (10k stat sheets, ...)
+    python3 benchmark.py --scale 0.1 --repeats 3
+    python3 benchmark.py --only advance_clock --only top_clocks
+    python3 benchmark.py --keep /tmp/bench_campaign
+"""
+
+import argparse
+import io
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+from export_repo import RepositoryExporter
+from gazetteer import hold_short_name
+from json_io import load_json
+from mid_session_protocol import top_clocks
+from story_manager import StoryManager
+from synthetic_campaign import DEFAULT_COUNTS, HOLDS, add_count_arguments, generate_campaign, scaled_counts
+from travel_graph import HOLD_TRIGGERS
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+RESULTS_NAME = "bench_results.json"
+DEFAULT_RESULTS = REPO_ROOT / RESULTS_NAME
+DEFAULT_REPEATS = 5
+BENCH_HOLD = "The Rift"
+
+
+def time_call(fn, repeats=DEFAULT_REPEATS):
+    """
+    Time one cold call and `repeats` warm calls of fn.
+
+    Returns:
+        dict: cold_ms, min_ms, median_ms, mean_ms and repeats
+    """
+    timings = []
+    with redirect_stdout(io.StringIO()):
+        for _ in range(repeats + 1):
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) * 1000)
+    cold, warm = timings[0], timings[1:] or timings[:1]
+    return {
+        "cold_ms": round(cold, 3),
+        "min_ms": round(min(warm), 3),
+        "median_ms": round(statistics.median(warm), 3),
+        "mean_ms": round(statistics.fmean(warm), 3),
+        "repeats": len(warm),
+    }
+
+
+def benchmark_cases(root):
+    """
+    The entry points to time against the campaign under root.
+
+    Returns:
+        list: (name, callable) pairs, in run order
+    """
+    root = Path(root)
+    data_dir, state_dir = root / "data", root / "state"
+    with redirect_stdout(io.StringIO()):
+        story = StoryManager(data_dir, state_dir)
+    query = story.query_manager
+    capital = next(hold[1] for hold in HOLDS if hold[0] == BENCH_HOLD)
+    civil_war = load_json(data_dir / "clocks" / "civil_war_clocks.json")["civil_war_clocks"]["clocks"]
+    exporter = RepositoryExporter(root)
+
+    cases = [
+        ("query_npc_enemy_stats", lambda: query.query_npc_enemy_stats(category="Enemy", location=BENCH_HOLD)),
+        ("query_npc_enemy_stats[name]", lambda: query.query_npc_enemy_stats(name="bandit")),
+        ("get_enemies_by_hold", lambda: query.get_enemies_by_hold(BENCH_HOLD)),
+        ("generate_wilderness_encounter",
+         lambda: story.generate_wilderness_encounter(BENCH_HOLD, "Act 1", "moderate")),
+        ("trigger_scene_event", lambda: story.trigger_scene_event({"location": capital, "type": "combat"})),
+        ("advance_clock", lambda: story.advance_clock("civil_war", next(iter(civil_war)), 1)),
+        ("top_clocks", lambda: top_clocks(root)),
+        ("export_to_zip", lambda: exporter.export_to_zip("bench_export.zip", workers=1)),
+    ]
+
+    campaign_state = load_json(state_dir / "campaign_state.json")
+    for hold, capital_name, _, _, districts, settlements in HOLDS:
+        trigger = HOLD_TRIGGERS.get(hold_short_name(hold).lower())
+        if trigger is None:
+            continue
+        places = [capital_name] + districts + settlements
+        cases.append((f"hold_trigger[{hold_short_name(hold).lower()}]",
+                      lambda trigger=trigger, places=places: [trigger(place, campaign_state) for place in places]))
+    return cases
+
+
+def run_benchmarks(root, repeats=DEFAULT_REPEATS, only=None):
+    """
+    Time every case (or those named in `only`) against the campaign under root.
+
+    Returns:
+        dict: {case name: time_call() result}
+    """
+    results = {}
+    for name, fn in benchmark_cases(root):
+        if only and name not in only and name.split("[")[0] not in only:
+            continue
+        results[name] = time_call(fn, repeats)
+    return results
+
+
+def compare(current, previous):
+    """
+    Percentage change of each warm median against a previous run.
+
+    Returns:
+        dict: {case name: change in percent} for cases present in both runs
+    """
+    changes = {}
+    for name, result in (current or {}).get("results", {}).items():
+        before = (previous or {}).get("results", {}).get(name)
+        if before and before.get("median_ms"):
+            changes[name] = round((result["median_ms"] - before["median_ms"]) * 100 / before["median_ms"], 1)
+    return changes
+
+
+def save_results(run, path=DEFAULT_RESULTS):
+    """
+    Write a run as "current", keeping the file's old current run as "previous".
+
+    Returns:
+        dict: The document written ({"current", "previous", "changes"})
+    """
+    path = Path(path)
+    previous = None
+    if path.exists():
+        try:
+            previous = load_json(path).get("current")
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"Warning: Ignoring unreadable benchmark results {path}: {e}")
+    doc = {"current": run, "previous": previous, "changes": compare(run, previous)}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+    return doc
+
+
+def run_suite(counts=None, repeats=DEFAULT_REPEATS, results_path=DEFAULT_RESULTS, workdir=None, only=None, seed=0):
+    """
+    Generate a synthetic campaign, time it and save the results.
+
+    Args:
+        counts: Campaign size (default: DEFAULT_COUNTS)
+        repeats: Warm calls per case
+        results_path: JSON results file (None: do not save)
+        workdir: Directory to generate into and keep (default: a temporary one)
+        only: Case names to run (default: all)
+        seed: Generator seed
+
+    Returns:
+        dict: The saved document, or {"current": run} if not saved
+    """
+    counts = dict(DEFAULT_COUNTS, **(counts or {}))
+    with tempfile.TemporaryDirectory(prefix="skyrim_bench_") as tmp:
+        root = Path(workdir) if workdir else Path(tmp)
+        written = generate_campaign(root, seed=seed, **counts)
+        run = {
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "counts": counts,
+            "seed": seed,
+            "generate_s": written["elapsed_s"],
+            "results": run_benchmarks(root, repeats, only),
+        }
+    if results_path is None:
+        return {"current": run}
+    return save_results(run, results_path)
+
+
+def print_report(doc):
+    """Print a run's timings next to the previous run's."""
+    current, previous = doc["current"], doc.get("previous") or {}
+    changes = doc.get("changes", {})
+    print(f"\nBenchmark ({current['timestamp']}, Python {current['python']}): " +
+          ", ".join(f"{v} {k.replace('_', ' ')}" for k, v in current["counts"].items()))
+    print(f"Campaign generated in {current['generate_s']} s")
+    if previous and previous.get("counts") != current["counts"]:
+        print("Note: the previous run used different counts; changes are not like-for-like")
+    print(f"\n{'Case':<36}{'cold ms':>10}{'median ms':>12}{'previous':>12}{'change':>9}")
+    for name, result in current["results"].items():
+        before = previous.get("results", {}).get(name, {}).get("median_ms")
+        change = f"{changes[name]:+.1f}%" if name in changes else ""
+        before = f"{before:.2f}" if before is not None else "-"
+        print(f"{name:<36}{result['cold_ms']:>10.2f}{result['median_ms']:>12.2f}{before:>12}{change:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the hot entry points against a synthetic campaign.")
+    add_count_arguments(parser)
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="Warm calls per case")
+    parser.add_argument("--out", default=str(DEFAULT_RESULTS), help=f"Results file (default: <repo>/{RESULTS_NAME})")
+    parser.add_argument("--no-save", action="store_true", help="Print results without writing them")
+    parser.add_argument("--keep", default=None, help="Generate the campaign into this directory and keep it")
+    parser.add_argument("--only", action="append", default=None, help="Run only this case (repeatable)")
+    args = parser.parse_args()
+
+    counts = scaled_counts(args.scale, **{key: getattr(args, key) for key in DEFAULT_COUNTS})
+    doc = run_suite(counts, repeats=max(1, args.repeats), results_path=None if args.no_save else args.out,
+                    workdir=args.keep, only=args.only, seed=args.seed)
+    print_report(doc)
+    if not args.no_save:
+        print(f"\nSaved to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
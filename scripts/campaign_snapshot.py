@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Binary Campaign Snapshot for Skyrim TTRPG
+
+Compiles every JSON document under data/ and state/ into one file,
+state/campaign.snap, so tools can start without globbing and parsing
+hundreds of files:
+- Each document is stored as its own marshal segment; an offset table at
+  the end of the file maps repo-relative paths to (offset, length) plus the
+  size and mtime the source file had when the snapshot was built
+- The file is memory-mapped and a document is only decoded when it is
+  read, so opening the snapshot costs one mmap and one table decode
+- Every read checks the source file's size and mtime; documents changed
+  since the build (or missing from it) are read from JSON instead.
+  Directory listings are checked the same way against the directory's mtime
+- A file modified within RACY_WINDOW_NS of the build could be rewritten
+  with the same size and mtime, so its entry also stores a sha1 of the
+  bytes, checked on read (racy directories are always listed from disk).
+  Only a same-size edit whose old mtime is restored by hand goes unnoticed;
+  rebuild after such edits
+- The header records the format, marshal and Python versions; a snapshot
+  written by a different Python is ignored (open_snapshot() returns None)
+
+Event-store history (state/snapshots/) and dotfiles are not included.
+
+Usage:
+    python3 campaign_snapshot.py build
+    python3 campaign_snapshot.py status
+    SKYRIM_TTRPG_STORAGE=snapshot python3 query_data.py
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import marshal
+import mmap
+import os
+import struct
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from data_watcher import RACY_WINDOW_NS
+from json_io import load_json, loads
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SNAPSHOT_NAME = "campaign.snap"
+DEFAULT_PATH = REPO_ROOT / "state" / SNAPSHOT_NAME
+SOURCE_DIRS = ("data", "state")
+EXCLUDED_DIRS = ("state/snapshots",)
+
+MAGIC = b"SKYSNAP\0"
+FORMAT_VERSION = 2
+# magic, format version, marshal version, Python major, Python minor, table offset, table length
+HEADER = struct.Struct("<8sHHBBxxQQ")
+
+
+def _relpath(path, root):
+    """Repo-relative POSIX path for a file, or None if it lies outside root."""
+    try:
+        return Path(os.path.abspath(path)).relative_to(root).as_posix()
+    except ValueError:
+        return None
+
+
+def _source_files(root, sources):
+    """Yield (relpath, path) for every JSON document to snapshot, in sorted order."""
+    for source in sources:
+        base = root / source
+        if not base.is_dir():
+            continue
+        for dirpath, dirnames, filenames in os.walk(base):
+            reldir = Path(dirpath).relative_to(root).as_posix()
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith(".")
+                                 and f"{reldir}/{d}" not in EXCLUDED_DIRS)
+            for name in sorted(filenames):
+                if name.endswith(".json") and not name.startswith("."):
+                    yield f"{reldir}/{name}", Path(dirpath) / name
+
+
+def build_snapshot(root=REPO_ROOT, path=None, sources=SOURCE_DIRS):
+    """
+    Compile the JSON documents under root's source directories into a snapshot.
+
+    Files that cannot be parsed are reported and left out (reads of them go
+    to JSON and raise as usual). The snapshot is written to a temporary file
+    and moved into place, so open readers keep their old copy.
+
+    Args:
+        root: Repository root
+        path: Snapshot file (default: <root>/state/campaign.snap)
+        sources: Directories under root to include
+
+    Returns:
+        dict: {"path", "documents", "skipped", "bytes", "elapsed_ms"}
+    """
+    started = time.perf_counter()
+    root = Path(os.path.abspath(root))
+    path = Path(path) if path else root / "state" / SNAPSHOT_NAME
+    files, dirs, skipped = {}, {}, []
+    tmp = path.with_name(f".{path.name}.tmp")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(tmp, "wb") as f:
+        f.write(b"\0" * HEADER.size)
+        offset = HEADER.size
+        for rel, source in _source_files(root, sources):
+            reldir = rel.rsplit("/", 1)[0]
+            if reldir not in dirs:
+                mtime = os.stat(source.parent).st_mtime_ns
+                # A racy directory could gain a file without its mtime changing
+                dirs[reldir] = [None if time.time_ns() - mtime < RACY_WINDOW_NS else mtime, []]
+            # Stat before reading: an edit made during the build leaves the entry stale
+            st = os.stat(source)
+            try:
+                data = source.read_bytes()
+                segment = marshal.dumps(loads(data, os.fspath(source)))
+            except (OSError, ValueError) as e:
+                skipped.append(rel)
+                print(f"Warning: Skipping {rel}: {e}")
+                continue
+            f.write(segment)
+            racy = time.time_ns() - st.st_mtime_ns < RACY_WINDOW_NS
+            digest = hashlib.sha1(data).hexdigest() if racy else None
+            files[rel] = (offset, len(segment), st.st_mtime_ns, st.st_size, digest)
+            dirs[reldir][1].append(rel.rsplit("/", 1)[1])
+            offset += len(segment)
+        table = marshal.dumps({
+            "built": datetime.now().isoformat(),
+            "files": files,
+            "dirs": {d: (mtime, names) for d, (mtime, names) in dirs.items()},
+        })
+        f.write(table)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, marshal.version,
+                            sys.version_info[0], sys.version_info[1], offset, len(table)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return {
+        "path": str(path),
+        "documents": len(files),
+        "skipped": skipped,
+        "bytes": offset + len(table),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+class CampaignSnapshot:
+    """
+    Read-only, memory-mapped view of a built snapshot.
+
+    load() decodes a fresh copy of a document on every call, so callers
+    may modify what they get back. Counters: hits (served from the
+    snapshot) and fallbacks (read from JSON because the entry was stale).
+    """
+
+    def __init__(self, path=DEFAULT_PATH, root=None):
+        """
+        Open a snapshot.
+
+        Args:
+            path: Snapshot file
+            root: Repository root the snapshot's paths are relative to
+                  (default: the directory above the snapshot's directory)
+
+        Raises:
+            OSError: If the file cannot be opened
+            ValueError: If it is not a snapshot or was written by another Python
+        """
+        self.path = Path(path)
+        self.root = Path(os.path.abspath(root)) if root else Path(os.path.abspath(self.path)).parents[1]
+        self.hits = 0
+        self.fallbacks = 0
+        self._file = open(self.path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, fmt, marshal_version, major, minor, table_offset, table_length = \
+                HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or fmt != FORMAT_VERSION:
+                raise ValueError(f"{self.path} is not a version {FORMAT_VERSION} campaign snapshot")
+            if (marshal_version, major, minor) != (marshal.version, *sys.version_info[:2]):
+                raise ValueError(f"{self.path} was built by Python {major}.{minor}; rebuild it")
+            table = marshal.loads(self._map[table_offset:table_offset + table_length])
+        except (ValueError, EOFError, TypeError, struct.error) as e:
+            self.close()
+            raise ValueError(str(e)) from e
+        self.built = table["built"]
+        self._files = table["files"]
+        self._dirs = table["dirs"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._files)
+
+    def close(self):
+        """Release the mapping and the file handle."""
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _fresh_entry(self, rel, st):
+        entry = self._files.get(rel)
+        if entry is None or (entry[2], entry[3]) != (st.st_mtime_ns, st.st_size):
+            return None
+        # Racy at build time: only the content proves the file unchanged
+        if entry[4] is not None:
+            try:
+                if hashlib.sha1((self.root / rel).read_bytes()).hexdigest() != entry[4]:
+                    return None
+            except OSError:
+                return None
+        return entry
+
+    def load(self, path):
+        """
+        Load a JSON document, from the snapshot when it is up to date.
+
+        Args:
+            path: Path to the JSON file (absolute or relative to the working directory)
+
+        Returns:
+            The document, or None if the file does not exist
+
+        Raises:
+            OSError, json.JSONDecodeError: As load_json() for files read from JSON
+        """
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        rel = _relpath(path, self.root)
+        entry = self._fresh_entry(rel, st) if rel is not None else None
+        if entry is None:
+            self.fallbacks += 1
+            return load_json(path)
+        self.hits += 1
+        offset, length = entry[0], entry[1]
+        return marshal.loads(self._map[offset:offset + length])
+
+    def list_json(self, directory, pattern="*"):
+        """
+        Names of the .json files directly in a directory, sorted.
+
+        Answered from the snapshot while the directory's mtime is unchanged
+        (adding, removing or renaming a file updates it), else from disk.
+        """
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        rel = _relpath(directory, self.root)
+        entry = self._dirs.get(rel) if rel is not None else None
+        if entry is not None and entry[0] == mtime:
+            names = entry[1]
+        else:
+            names = sorted(n for n in os.listdir(directory)
+                           if n.endswith(".json") and not n.startswith(".")
+                           and os.path.isfile(os.path.join(directory, n)))
+        return [n for n in names if fnmatch.fnmatchcase(n, f"{pattern}.json")]
+
+    def stale(self):
+        """Repo-relative paths whose source changed, vanished or appeared since the build."""
+        changed = []
+        for rel in self._files:
+            try:
+                st = os.stat(self.root / rel)
+            except FileNotFoundError:
+                changed.append(rel)
+                continue
+            if self._fresh_entry(rel, st) is None:
+                changed.append(rel)
+        for reldir, (mtime, names) in self._dirs.items():
+            directory = self.root / reldir
+            try:
+                if os.stat(directory).st_mtime_ns == mtime:
+                    continue
+            except FileNotFoundError:
+                continue
+            known = set(names)
+            changed.extend(f"{reldir}/{n}" for n in self.list_json(directory) if n not in known)
+        return sorted(set(changed))
+
+
+def open_snapshot(path=DEFAULT_PATH, root=None):
+    """
+    Open a snapshot if one is usable.
+
+    Returns:
+        CampaignSnapshot, or None if the file is missing or unreadable
+        (callers then read JSON directly)
+    """
+    if not Path(path).exists():
+        return None
+    try:
+        return CampaignSnapshot(path, root)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Ignoring campaign snapshot: {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect the binary campaign snapshot.")
+    parser.add_argument("command", choices=["build", "status"],
+                        help="build: compile data/ and state/ into the snapshot, status: list stale entries")
+    parser.add_argument("--repo", default=str(REPO_ROOT), help="Repository root")
+    parser.add_argument("--out", default=None, help=f"Snapshot path (default: <repo>/state/{SNAPSHOT_NAME})")
+    args = parser.parse_args()
+
+    path = Path(args.out) if args.out else Path(args.repo) / "state" / SNAPSHOT_NAME
+    if args.command == "build":
+        result = build_snapshot(args.repo, path)
+        print(f"Wrote {result['documents']} documents ({result['bytes']:,} bytes) "
+              f"to {result['path']} in {result['elapsed_ms']} ms")
+        return 1 if result["skipped"] else 0
+
+    snapshot = open_snapshot(path, args.repo)
+    if snapshot is None:
+        print(f"No usable snapshot at {path}; run: python3 campaign_snapshot.py build")
+        return 1
+    with snapshot:
+        stale = snapshot.stale()
+        print(f"{path}: {len(snapshot)} documents, built {snapshot.built}")
+        if stale:
+            print(f"{len(stale)} stale (read from JSON until the next build):")
+            for rel in stale:
+                print(f"  {rel}")
+        else:
+            print("Up to date")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
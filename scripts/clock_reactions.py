@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Clock Reactions for Skyrim TTRPG
+
+Subscribes to clock events on an EventBus and applies their knock-on
+effects to the campaign state in one pass per delivery round:
+- Companion loyalty (NPCManager.update_companion_based_on_faction_clock),
+  mirrored into the campaign state's companion entries
+- Rumors when a clock passes its halfway mark or fills
+- Scene flags ("<clock>_clock_half", "<clock>_clock_filled") for location
+  triggers and the GM, cleared again on setbacks
+
+The campaign state and each companion's NPC file are read once and written
+once however many clock events arrive together (for example, several
+advances inside bus.batch()).
+
+Usage:
+    bus = EventBus()
+    ClockReactions(NPCManager(data_dir, state_dir)).connect(bus)
+    story = StoryManager(data_dir, state_dir, bus=bus)
+    story.advance_clock("civil_war", "imperial_military_dominance", 2)
+"""
+
+from event_bus import ClockChanged, CompanionLoyaltyChanged
+from relationship_graph import slug
+
+# First word of a faction or clock key -> faction id used for companion alignment
+FACTION_PREFIXES = {
+    "imperial": "imperial_legion",
+    "stormcloak": "stormcloaks",
+    "thalmor": "thalmor",
+}
+
+
+def clock_faction(event):
+    """
+    Faction id for a clock event: its faction (normalized), else the faction
+    named by the first word of its category or clock key, else "".
+    """
+    if event.faction:
+        key = slug(event.faction.split("(")[0])
+        key = key[4:] if key.startswith("the_") else key
+        return FACTION_PREFIXES.get(key.split("_")[0], key)
+    for source in (getattr(event, "category", ""), event.clock):
+        faction = FACTION_PREFIXES.get(slug(source).split("_")[0])
+        if faction:
+            return faction
+    return ""
+
+
+class ClockReactions:
+    def __init__(self, npc_manager):
+        """
+        Initialize ClockReactions.
+
+        Args:
+            npc_manager: NPCManager whose campaign state and NPCs are updated
+        """
+        self.npc_manager = npc_manager
+        self.bus = None
+
+    def connect(self, bus):
+        """
+        Subscribe to clock events on a bus.
+
+        Returns:
+            callable: Call it to unsubscribe
+        """
+        self.bus = bus
+        return bus.subscribe(ClockChanged, self.on_clocks, batch=True)
+
+    def on_clocks(self, events):
+        """Apply one delivery round of clock events to the campaign state."""
+        changed = [event for event in events if event.new != event.old]
+        if not changed:
+            return
+        state = self.npc_manager.load_campaign_state()
+        if not state:
+            return
+
+        affected = []
+        npcs = {}
+        for event in changed:
+            faction = clock_faction(event)
+            value = round(event.new * 10 / event.total) if event.total else event.new
+            if faction and event.new > event.old:
+                affected += self.npc_manager.update_companion_based_on_faction_clock(
+                    faction, value, state=state, npcs=npcs)
+            self._milestones(event, state)
+
+        for companion in affected:
+            self._mirror_loyalty(state, companion)
+        for npc_id in dict.fromkeys(companion['npc_id'] for companion in affected):
+            self.npc_manager.save_npc(npcs[npc_id])
+        self.npc_manager.save_campaign_state(state)
+
+        if self.bus is not None:
+            for companion in affected:
+                self.bus.publish(CompanionLoyaltyChanged(**companion))
+
+    def _milestones(self, event, state):
+        flags = state.setdefault('scene_flags', {})
+        rumors = state.setdefault('rumors', [])
+        key = slug(event.clock)
+        for flag, threshold, rumor in (
+            (f"{key}_clock_half", event.total / 2, f"Talk in the taverns: {event.name} is gaining ground."),
+            (f"{key}_clock_filled", event.total, f"All of Skyrim is talking: {event.name} has come to pass."),
+        ):
+            if event.old < threshold <= event.new:
+                flags[flag] = True
+                if rumor not in rumors:
+                    rumors.append(rumor)
+            elif event.new < threshold <= event.old and flags.get(flag):
+                flags[flag] = False
+
+    @staticmethod
+    def _mirror_loyalty(state, companion):
+        companions = state.get('companions', {})
+        for group in ('active_companions', 'available_companions', 'dismissed_companions'):
+            for entry in companions.get(group, []):
+                if entry.get('npc_id') == companion['npc_id'] and isinstance(entry.get('loyalty'), (int, float)):
+                    entry['loyalty'] = max(0, min(100, entry['loyalty'] + companion['change']))
+        relationships = companions.get('companion_relationships')
+        if isinstance(relationships, dict) and isinstance(relationships.get(companion['npc_id']), (int, float)):
+            relationships[companion['npc_id']] = max(0, min(100, relationships[companion['npc_id']] + companion['change']))
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Data Validation for Skyrim TTRPG
+
+Checks every data/ file against a JSON schema for its family (stat
+sheets, NPCs, PCs, clocks, quests, holds, factions, sessions, ...):
+- Schemas live in scripts/schemas/*.schema.json; each one lists the files
+  it covers in "x-applies-to" (globs relative to data/)
+- Each schema is compiled once into nested Python closures, so validating
+  a document is a walk over the data with no schema interpretation
+- Results are cached per file (state/.validation_cache.json): a file whose
+  size and mtime are unchanged is skipped outright, and one whose content
+  hash is unchanged is not re-parsed
+- Stale files are validated in parallel worker processes when there are
+  enough of them to be worth it
+
+Supported keywords: type, enum, const, required, properties,
+additionalProperties, items, minItems, minimum, maximum, minLength,
+anyOf, $ref (to "#/definitions/...").
+
+Usage:
+    python3 data_validation.py
+    python3 data_validation.py --no-cache --workers 4
+    python3 data_validation.py --strict    # exit status 1 if anything is invalid
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import json_io
+
+SCHEMA_DIR = Path(__file__).resolve().parent / "schemas"
+CACHE_NAME = ".validation_cache.json"
+CACHE_VERSION = 1
+
+# Below this many stale files, worker start-up costs more than it saves
+PARALLEL_THRESHOLD = 64
+
+# Stop collecting errors for a file after this many
+MAX_ERRORS_PER_FILE = 20
+
+_TYPE_CHECKS = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+
+
+# ----------------------------------------------------------------------
+# Schema compiler
+# ----------------------------------------------------------------------
+
+def compile_schema(schema, root=None, _refs=None):
+    """
+    Compile a JSON schema into a validator function.
+
+    Returns:
+        function(value, path, errors): Appends "path: message" strings to errors
+    """
+    root = schema if root is None else root
+    _refs = {} if _refs is None else _refs
+    checks = []
+
+    if "$ref" in schema:
+        ref = schema["$ref"]
+        if not ref.startswith("#/definitions/"):
+            raise ValueError(f"Unsupported $ref '{ref}'")
+        name = ref.split("/")[-1]
+        if name not in _refs:
+            _refs[name] = None  # placeholder for recursive definitions
+            _refs[name] = compile_schema(root["definitions"][name], root, _refs)
+
+        def check_ref(value, path, errors, name=name):
+            _refs[name](value, path, errors)
+        checks.append(check_ref)
+
+    if "type" in schema:
+        types = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        type_checks = [_TYPE_CHECKS[t] for t in types]
+        expected = " or ".join(types)
+
+        def check_type(value, path, errors):
+            if not any(check(value) for check in type_checks):
+                errors.append(f"{path or '/'}: expected {expected}, got {type(value).__name__}")
+                return False
+            return True
+        checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = schema["enum"]
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.append(f"{path or '/'}: {value!r} is not one of {allowed}")
+        checks.append(check_enum)
+
+    if "const" in schema:
+        const = schema["const"]
+
+        def check_const(value, path, errors):
+            if value != const:
+                errors.append(f"{path or '/'}: expected {const!r}")
+        checks.append(check_const)
+
+    if "minimum" in schema or "maximum" in schema:
+        low, high = schema.get("minimum"), schema.get("maximum")
+
+        def check_range(value, path, errors):
+            if not _TYPE_CHECKS["number"](value):
+                return
+            if low is not None and value < low:
+                errors.append(f"{path or '/'}: {value} is below the minimum {low}")
+            if high is not None and value > high:
+                errors.append(f"{path or '/'}: {value} is above the maximum {high}")
+        checks.append(check_range)
+
+    if "minLength" in schema:
+        min_length = schema["minLength"]
+
+        def check_length(value, path, errors):
+            if isinstance(value, str) and len(value.strip()) < min_length:
+                errors.append(f"{path or '/'}: shorter than {min_length} character(s)")
+        checks.append(check_length)
+
+    if "required" in schema:
+        required = schema["required"]
+
+        def check_required(value, path, errors):
+            if isinstance(value, dict):
+                for key in required:
+                    if key not in value:
+                        errors.append(f"{path or '/'}: missing required field '{key}'")
+        checks.append(check_required)
+
+    properties = {key: compile_schema(sub, root, _refs) for key, sub in schema.get("properties", {}).items()}
+    additional = schema.get("additionalProperties", True)
+    extra = compile_schema(additional, root, _refs) if isinstance(additional, dict) else None
+    if properties or extra or additional is False:
+        def check_properties(value, path, errors):
+            if not isinstance(value, dict):
+                return
+            for key, item in value.items():
+                if key in properties:
+                    properties[key](item, f"{path}/{key}", errors)
+                elif extra is not None:
+                    extra(item, f"{path}/{key}", errors)
+                elif additional is False:
+                    errors.append(f"{path or '/'}: unexpected field '{key}'")
+        checks.append(check_properties)
+
+    if "items" in schema or "minItems" in schema:
+        items = compile_schema(schema["items"], root, _refs) if "items" in schema else None
+        min_items = schema.get("minItems", 0)
+
+        def check_items(value, path, errors):
+            if not isinstance(value, list):
+                return
+            if len(value) < min_items:
+                errors.append(f"{path or '/'}: needs at least {min_items} item(s)")
+            if items is not None:
+                for index, item in enumerate(value):
+                    items(item, f"{path}/{index}", errors)
+        checks.append(check_items)
+
+    if "anyOf" in schema:
+        options = [compile_schema(sub, root, _refs) for sub in schema["anyOf"]]
+
+        def check_any(value, path, errors):
+            for option in options:
+                trial = []
+                option(value, path, trial)
+                if not trial:
+                    return
+            errors.append(f"{path or '/'}: does not match any allowed form")
+        checks.append(check_any)
+
+    def validate(value, path, errors):
+        for check in checks:
+            # A failed type check makes the structural checks meaningless
+            if check(value, path, errors) is False:
+                return
+    return validate
+
+
+_compiled = {}
+
+
+def load_validators(schema_dir=SCHEMA_DIR):
+    """
+    Compile every schema in schema_dir (once per process).
+
+    Returns:
+        list: (family, patterns, validator, schema_hash) tuples
+    """
+    schema_dir = Path(schema_dir)
+    if schema_dir in _compiled:
+        return _compiled[schema_dir]
+    validators = []
+    for path in sorted(schema_dir.glob("*.schema.json")):
+        raw = path.read_bytes()
+        schema = json_io.loads(raw, os.fspath(path))
+        family = path.name[:-len(".schema.json")]
+        validators.append((family, schema.get("x-applies-to", []), compile_schema(schema),
+                           hashlib.sha1(raw).hexdigest()[:12]))
+    _compiled[schema_dir] = validators
+    return validators
+
+
+def validators_for(relpath, schema_dir=SCHEMA_DIR):
+    """Validators whose x-applies-to globs match a data/-relative path."""
+    return [v for v in load_validators(schema_dir)
+            if any(fnmatch.fnmatch(relpath, pattern) for pattern in v[1])]
+
+
+def validate_document(family, doc, schema_dir=SCHEMA_DIR):
+    """
+    Validate one parsed document against a named schema (e.g., "pc").
+
+    Returns:
+        list: Error strings (empty if valid)
+    """
+    for name, _, validator, _ in load_validators(schema_dir):
+        if name == family:
+            errors = []
+            validator(doc, "", errors)
+            return errors[:MAX_ERRORS_PER_FILE]
+    raise ValueError(f"No schema named '{family}'")
+
+
+def _validate_file(args):
+    """Worker: parse and validate one file. Returns (relpath, sha1, errors)."""
+    data_dir, relpath, schema_dir = args
+    raw = (Path(data_dir) / relpath).read_bytes()
+    digest = hashlib.sha1(raw).hexdigest()
+    try:
+        doc = json_io.loads(raw, os.path.join(data_dir, relpath))
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        return relpath, digest, [f"invalid JSON: {e}"]
+    errors = []
+    for family, _, validator, _ in validators_for(relpath, schema_dir):
+        found = []
+        validator(doc, "", found)
+        errors.extend(f"[{family}] {error}" for error in found)
+    return relpath, digest, errors[:MAX_ERRORS_PER_FILE]
+
+
+class DataValidator:
+    def __init__(self, data_dir="../data", schema_dir=SCHEMA_DIR, cache_path=None, workers=None,
+                 parallel_threshold=PARALLEL_THRESHOLD):
+        """
+        Initialize the DataValidator.
+
+        Args:
+            data_dir: Path to the data directory (default: "../data")
+            schema_dir: Directory of *.schema.json files
+            cache_path: Result cache (default: <data_dir>/../state/.validation_cache.json);
+                        False disables caching
+            workers: Worker processes for parallel validation (default: CPU count)
+            parallel_threshold: Minimum number of stale files before workers are used
+        """
+        self.data_dir = Path(data_dir)
+        self.schema_dir = Path(schema_dir)
+        if cache_path is None:
+            cache_path = self.data_dir.parent / "state" / CACHE_NAME
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.workers = workers or os.cpu_count() or 1
+        self.parallel_threshold = parallel_threshold
+
+    def _schema_version(self):
+        return ",".join(v[3] for v in load_validators(self.schema_dir))
+
+    def _load_cache(self):
+        if not self.cache_path or not self.cache_path.exists():
+            return {}
+        try:
+            cache = json_io.load_json(self.cache_path)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if cache.get("version") != CACHE_VERSION or cache.get("schemas") != self._schema_version():
+            return {}
+        return cache.get("files", {})
+
+    def _save_cache(self, files):
+        if not self.cache_path:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_name(self.cache_path.name + ".tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({"version": CACHE_VERSION, "schemas": self._schema_version(), "files": files}, f)
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            print(f"Warning: Could not save validation cache: {e}")
+
+    def covered_files(self):
+        """data/-relative paths of every file some schema applies to."""
+        patterns = [p for v in load_validators(self.schema_dir) for p in v[1]]
+        files = set()
+        for pattern in patterns:
+            files.update(p.relative_to(self.data_dir).as_posix() for p in self.data_dir.glob(pattern)
+                         if p.is_file())
+        return sorted(files)
+
+    def validate_all(self, use_cache=True):
+        """
+        Validate every covered file.
+
+        Returns:
+            dict: "errors" ({relpath: [messages]} for invalid files), "checked"
+                  (files parsed), "cached" (files skipped), "files" and "elapsed_ms"
+        """
+        start = time.perf_counter()
+        cache = self._load_cache() if use_cache else {}
+        results, stale, touched = {}, [], 0
+        for relpath in self.covered_files():
+            stat = (self.data_dir / relpath).stat()
+            entry = cache.get(relpath)
+            if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                results[relpath] = entry
+            elif entry and hashlib.sha1((self.data_dir / relpath).read_bytes()).hexdigest() == entry["sha1"]:
+                # Touched but not changed: keep the result, remember the new mtime
+                results[relpath] = dict(entry, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                touched += 1
+            else:
+                stale.append((relpath, stat, entry))
+
+        if stale:
+            if len(stale) >= self.parallel_threshold and self.workers > 1:
+                jobs = [(str(self.data_dir), relpath, str(self.schema_dir)) for relpath, _, _ in stale]
+                with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                    outcomes = list(pool.map(_validate_file, jobs, chunksize=8))
+            else:
+                outcomes = [_validate_file((self.data_dir, relpath, self.schema_dir)) for relpath, _, _ in stale]
+            for (relpath, stat, _), (_, digest, errors) in zip(stale, outcomes):
+                results[relpath] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                                    "sha1": digest, "errors": errors}
+
+        if use_cache and (stale or touched):
+            self._save_cache(results)
+        return {
+            "errors": {relpath: entry["errors"] for relpath, entry in results.items() if entry["errors"]},
+            "checked": len(stale),
+            "cached": len(results) - len(stale),
+            "files": len(results),
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+
+
+def format_report(report):
+    """Render a validate_all() report as lines."""
+    lines = [f"Validated {report['files']} file(s): {report['checked']} checked, "
+             f"{report['cached']} unchanged ({report['elapsed_ms']} ms)"]
+    if not report["errors"]:
+        lines.append("✓ All data files match their schemas")
+        return lines
+    lines.append(f"✗ {len(report['errors'])} file(s) with problems:")
+    for relpath, errors in sorted(report["errors"].items()):
+        lines.append(f"  {relpath}")
+        for error in errors:
+            lines.append(f"    - {error}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate data/ files against their JSON schemas.")
+    parser.add_argument("--data-dir", default="../data")
+    parser.add_argument("--no-cache", action="store_true", help="Re-validate every file")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--strict", action="store_true", help="Exit with status 1 if any file is invalid")
+    args = parser.parse_args()
+
+    report = DataValidator(args.data_dir, workers=args.workers).validate_all(use_cache=not args.no_cache)
+    for line in format_report(report):
+        print(line)
+    return 1 if args.strict and report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Data Watcher for Skyrim TTRPG
+
+Watches the data/ tree for hand edits and patch-script writes and emits a
+debounced stream of changes, each with the parsed document before and
+after the change:
+- Uses Linux inotify (via ctypes, no extra dependencies) when available
+- Falls back to polling file stats everywhere else
+- Subscribers (DataQueryManager.watch, GMTools.watch, StoryManager.watch)
+  update their caches from the change batch instead of re-globbing
+
+Usage:
+    python3 data_watcher.py --data-dir ../data
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import fnmatch
+import hashlib
+import json
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from json_io import load_json
+
+# inotify constants (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+# Returned by a backend when it lost track of individual paths and a full rescan is needed
+RESCAN_ALL = None
+
+# Filesystems stamp mtimes from a coarse clock (2s on FAT), so a same-size rewrite within one
+# tick keeps its stat. Files modified this recently are compared by content as well.
+RACY_WINDOW_NS = 2_000_000_000
+
+
+@dataclass
+class ChangeEvent:
+    path: str          # path relative to the watched root, with "/" separators
+    kind: str          # "created", "modified" or "deleted"
+    before: Any        # parsed document before the change (None if created)
+    after: Any         # parsed document after the change (None if deleted)
+
+    @property
+    def collection(self) -> str:
+        """Directory of the document relative to the root ("" for top-level files)."""
+        return self.path.rpartition("/")[0]
+
+    @property
+    def doc_id(self) -> str:
+        """File stem of the document (matches storage doc ids)."""
+        return Path(self.path).stem
+
+
+def _scan(root: Path, patterns: Tuple[str, ...]) -> Dict[str, Tuple[int, int]]:
+    """Stat every matching file under root: {relative path: (mtime_ns, size)}."""
+    stats = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d != "__pycache__" and not d.startswith(".")]
+        for name in filenames:
+            if not any(fnmatch.fnmatch(name, p) for p in patterns):
+                continue
+            full = os.path.join(dirpath, name)
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            stats[Path(full).relative_to(root).as_posix()] = (st.st_mtime_ns, st.st_size)
+    return stats
+
+
+def _is_racy(stat: Tuple[int, int], now_ns: int) -> bool:
+    """True if a file's (mtime_ns, size) is too recent to prove it unchanged."""
+    return now_ns - stat[0] < RACY_WINDOW_NS
+
+
+def _digest(path: Path) -> Optional[str]:
+    try:
+        return hashlib.sha1(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+class _PollingBackend:
+    """Detects changes by comparing file stats between scans."""
+
+    name = "polling"
+
+    def __init__(self, root: Path, patterns: Tuple[str, ...], interval: float):
+        self.root = root
+        self.patterns = patterns
+        self.interval = interval
+        self.last = _scan(root, patterns)
+        self.digests = self._racy_digests(self.last)
+
+    def _racy_digests(self, stats: Dict[str, Tuple[int, int]]) -> Dict[str, Optional[str]]:
+        now = time.time_ns()
+        return {p: _digest(self.root / p) for p, stat in stats.items() if _is_racy(stat, now)}
+
+    def wait(self, timeout: float) -> Optional[Set[str]]:
+        time.sleep(min(timeout, self.interval))
+        current = _scan(self.root, self.patterns)
+        changed = {p for p in set(current) | set(self.last) if current.get(p) != self.last.get(p)}
+        digests = self._racy_digests(current)
+        changed |= {p for p, d in digests.items() if p in self.digests and d != self.digests[p]}
+        self.last, self.digests = current, digests
+        return changed
+
+    def close(self):
+        pass
+
+
+class _InotifyBackend:
+    """Linux inotify watches on every directory under the root."""
+
+    name = "inotify"
+
+    def __init__(self, root: Path, patterns: Tuple[str, ...]):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.root = root
+        self.patterns = patterns
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches: Dict[int, Path] = {}
+        self._add_tree(root)
+
+    def _add_tree(self, directory: Path) -> Set[str]:
+        """Watch a directory recursively; return matching files already inside it."""
+        found = set()
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirnames[:] = [d for d in dirnames if d != "__pycache__" and not d.startswith(".")]
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd >= 0:
+                self.watches[wd] = Path(dirpath)
+            for name in filenames:
+                if any(fnmatch.fnmatch(name, p) for p in self.patterns):
+                    found.add(Path(dirpath, name).relative_to(self.root).as_posix())
+        return found
+
+    def wait(self, timeout: float) -> Optional[Set[str]]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed: Set[str] = set()
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(buf):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(buf, offset)
+            name = buf[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += EVENT_HEADER.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                return RESCAN_ALL
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            directory = self.watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    changed |= self._add_tree(path)
+                else:
+                    # A directory moved or deleted away: let the diff sort out which files went with it
+                    return RESCAN_ALL
+                continue
+            if any(fnmatch.fnmatch(path.name, p) for p in self.patterns):
+                changed.add(path.relative_to(self.root).as_posix())
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class DataWatcher:
+    def __init__(self, data_dir="data", patterns=("*.json",), debounce=0.2,
+                 poll_interval=1.0, backend="auto"):
+        """
+        Initialize the DataWatcher.
+
+        Args:
+            data_dir: Directory to watch (default: "data")
+            patterns: Filename glob patterns to track (default: JSON files)
+            debounce: Quiet period in seconds before a batch of changes is emitted
+            poll_interval: Seconds between scans for the polling backend
+            backend: "auto" (inotify if available, else polling), "inotify" or "polling"
+        """
+        self.root = Path(data_dir).resolve()
+        self.patterns = tuple(patterns)
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.backend_name = backend
+        self._subscribers: List[Tuple[str, Callable[[List[ChangeEvent]], None]]] = []
+        self._stats: Dict[str, Tuple[int, int]] = {}
+        self._docs: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._backend = None
+        self._prime()
+
+    def _prime(self):
+        """Record the current stat and parsed document of every tracked file."""
+        self._stats = _scan(self.root, self.patterns)
+        for rel in self._stats:
+            self._docs[rel] = self._parse(rel)
+
+    def _parse(self, rel: str) -> Any:
+        try:
+            return load_json(self.root / rel)
+        except (IOError, OSError, json.JSONDecodeError, UnicodeDecodeError):
+            return None
+
+    def documents(self, prefix=""):
+        """
+        Return the watcher's current parsed documents under a path prefix.
+
+        Returns:
+            dict: {relative path: document}, sorted by path
+        """
+        with self._lock:
+            return {p: d for p, d in sorted(self._docs.items()) if p.startswith(prefix) and d is not None}
+
+    def subscribe(self, callback, prefix=""):
+        """
+        Register a callback for change batches.
+
+        Args:
+            callback: Called with a list of ChangeEvent (only those under prefix)
+            prefix: Relative path prefix to filter on (e.g., "npc_stat_sheets/")
+
+        Returns:
+            callable: Call it to unsubscribe
+        """
+        entry = (prefix, callback)
+        self._subscribers.append(entry)
+        return lambda: self._subscribers.remove(entry) if entry in self._subscribers else None
+
+    def _diff(self, candidates: Optional[Set[str]]) -> List[ChangeEvent]:
+        """
+        Compare candidate paths (or everything) with the last known state.
+
+        Paths a backend reported are always re-read. On a full rescan an
+        unchanged stat is trusted unless the file was modified too recently
+        for its mtime to tell two writes apart.
+        """
+        reported = candidates is not RESCAN_ALL
+        if not reported:
+            current = _scan(self.root, self.patterns)
+            candidates = set(current) | set(self._stats)
+        now = time.time_ns()
+        events = []
+        with self._lock:
+            for rel in sorted(candidates):
+                try:
+                    st = os.stat(self.root / rel)
+                    stat = (st.st_mtime_ns, st.st_size)
+                except OSError:
+                    stat = None
+                previous = self._stats.get(rel)
+                if stat == previous and not reported and not _is_racy(stat, now):
+                    continue
+                before = self._docs.get(rel)
+                if stat is None:
+                    self._stats.pop(rel, None)
+                    self._docs.pop(rel, None)
+                    events.append(ChangeEvent(rel, "deleted", before, None))
+                    continue
+                after = self._parse(rel)
+                if after is None:
+                    # Half-written or malformed: keep the old state and report it on the next write
+                    print(f"Warning: Could not parse {rel}; waiting for the next change", file=sys.stderr)
+                    continue
+                self._stats[rel] = stat
+                self._docs[rel] = after
+                if after == before and previous is not None:
+                    continue  # touched but unchanged
+                events.append(ChangeEvent(rel, "modified" if previous is not None else "created", before, after))
+        return events
+
+    def _dispatch(self, events: List[ChangeEvent]):
+        for prefix, callback in list(self._subscribers):
+            batch = [e for e in events if e.path.startswith(prefix)]
+            if batch:
+                try:
+                    callback(batch)
+                except Exception as e:
+                    print(f"Warning: Watcher subscriber failed: {e}", file=sys.stderr)
+
+    def poll(self):
+        """
+        Check the whole tree once, synchronously, and dispatch any changes.
+
+        Returns:
+            list: ChangeEvent objects that were dispatched
+        """
+        events = self._diff(RESCAN_ALL)
+        if events:
+            self._dispatch(events)
+        return events
+
+    def _open_backend(self):
+        if self.backend_name in ("auto", "inotify") and sys.platform.startswith("linux"):
+            try:
+                return _InotifyBackend(self.root, self.patterns)
+            except (OSError, AttributeError) as e:
+                if self.backend_name == "inotify":
+                    raise
+                print(f"Warning: inotify unavailable ({e}); falling back to polling", file=sys.stderr)
+        elif self.backend_name == "inotify":
+            raise OSError("inotify is only available on Linux")
+        return _PollingBackend(self.root, self.patterns, self.poll_interval)
+
+    def _run(self):
+        pending: Set[str] = set()
+        rescan = False
+        while not self._stop.is_set():
+            changed = self._backend.wait(self.debounce if (pending or rescan) else self.poll_interval)
+            if changed is RESCAN_ALL:
+                rescan = True
+                continue
+            if changed:
+                pending |= changed
+                continue  # still busy; wait for a quiet period
+            if pending or rescan:
+                events = self._diff(RESCAN_ALL if rescan else pending)
+                pending, rescan = set(), False
+                if events:
+                    self._dispatch(events)
+
+    def start(self):
+        """Start watching in a background thread. Returns the backend name in use."""
+        if self._thread is not None:
+            return self._backend.name
+        self._backend = self._open_backend()
+        # Catch anything written between priming and the backend coming up
+        self.poll()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="DataWatcher", daemon=True)
+        self._thread.start()
+        return self._backend.name
+
+    def stop(self):
+        """Stop the background thread and release the backend."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._backend is not None:
+            self._backend.close()
+            self._backend = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print a live, debounced change feed for the data/ tree.")
+    parser.add_argument("--data-dir", default="../data", help="Directory to watch (default: ../data)")
+    parser.add_argument("--backend", default="auto", choices=["auto", "inotify", "polling"])
+    parser.add_argument("--debounce", type=float, default=0.2, help="Quiet period in seconds (default: 0.2)")
+    args = parser.parse_args()
+
+    watcher = DataWatcher(args.data_dir, debounce=args.debounce, backend=args.backend)
+
+    def show(events):
+        for event in events:
+            print(f"[{event.kind}] {event.path}")
+
+    watcher.subscribe(show)
+    backend = watcher.start()
+    print(f"Watching {watcher.root} ({backend}). Press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,8 @@ import os
 from pathlib import Path
 from datetime import datetime
 
+from json_io import load_json
+
 
 class DragonbreakManager:
     def __init__(self, data_dir="../data", state_dir="../state"):
@@ -26,8 +28,7 @@ class DragonbreakManager:
     def load_dragonbreak_state(self):
         """Load current dragonbreak state"""
         if self.dragonbreak_state_path.exists():
-            with open(self.dragonbreak_state_path, 'r') as f:
-                return json.load(f)
+            return load_json(self.dragonbreak_state_path)
         return self._initialize_dragonbreak_state()
     
     def _initialize_dragonbreak_state(self):
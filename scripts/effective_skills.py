@@ -2,6 +2,7 @@
 import json
 import re
 from pathlib import Path
+from json_io import load_json
 
 RANK_TO_VALUE = {
     "Great (+4)": 4,
@@ -62,15 +63,7 @@ def load_standing_stone_bonus(data_dir, stone_name):
         return {}
 
     # Use Unicode-safe loading
-    data = stones_path.read_bytes()
-    for enc in ("utf-8", "utf-8-sig", "cp1252", "latin-1"):
-        try:
-            stones = json.loads(data.decode(enc))
-            break
-        except Exception:
-            continue
-    else:
-        stones = json.loads(data.decode("latin-1", errors="replace"))
+    stones = load_json(stones_path)
     
     for s in stones.get("standing_stones", []):
         if s.get("name") == stone_name:
@@ -110,17 +103,7 @@ if __name__ == "__main__":
     ap.add_argument("--data-dir", default="data", help="Data directory containing standing_stones.json")
     args = ap.parse_args()
 
-    p = Path(args.pc)
-    # Use Unicode-safe loading (matches export_repo.py approach)
-    data = p.read_bytes()
-    for enc in ("utf-8", "utf-8-sig", "cp1252", "latin-1"):
-        try:
-            pc = json.loads(data.decode(enc))
-            break
-        except Exception:
-            continue
-    else:
-        pc = json.loads(data.decode("latin-1", errors="replace"))
+    pc = load_json(Path(args.pc))
     
     out = compute_effective_skills(pc, data_dir=args.data_dir)
     print(json.dumps(out, indent=2, ensure_ascii=False))
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+In-process event bus for Skyrim TTRPG
+
+Typed publish/subscribe between the managers, so one clock change can drive
+companion, rumor and trigger updates without each side reloading its files:
+- Events are frozen dataclasses; subscribers register for an event class
+  (and receive its subclasses)
+- Delivery is ordered: events go out first-in first-out, and each event
+  reaches its subscribers by priority, then subscription order. Events
+  published by a subscriber are queued behind the current one
+- Repeated events are coalesced while queued: three advances of the same
+  clock inside bus.batch() are delivered as one event from the first old
+  value to the last new value
+- Subscribers may be plain functions or coroutine functions; flush() runs
+  the async ones on a private event loop, flush_async() inside yours
+- Batch subscribers receive every matching event of a flush as one list,
+  after the single events have gone out
+
+Usage:
+    bus = EventBus()
+    bus.subscribe(ClockAdvanced, lambda event: print(event.clock, event.new))
+    with bus.batch():
+        StoryManager(bus=bus).advance_clock("civil_war", "imperial_military_dominance", 1)
+"""
+
+import asyncio
+import inspect
+import sys
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from itertools import count
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Event:
+    """Base class for bus events."""
+
+    def coalesce_key(self) -> Optional[Hashable]:
+        """Events sharing a non-None key are merged while queued."""
+        return None
+
+    def merge(self, later: "Event") -> "Event":
+        """Combine this queued event with a later one carrying the same key."""
+        return later
+
+
+@dataclass(frozen=True)
+class ClockChanged(Event):
+    clock: str         # clock key (data/clocks) or name (factions.json)
+    name: str          # display name
+    old: int
+    new: int
+    total: int
+    faction: str = ""  # faction the clock belongs to, if known
+
+    def merge(self, later):
+        return replace(later, old=self.old)
+
+
+@dataclass(frozen=True)
+class ClockAdvanced(ClockChanged):
+    category: str = ""  # data/clocks category ("civil_war", "thalmor", "faction_trust", ...)
+
+    def coalesce_key(self):
+        return ("clock", self.category, self.clock)
+
+
+@dataclass(frozen=True)
+class FactionClockChanged(ClockChanged):
+    def coalesce_key(self):
+        return ("faction_clock", self.faction, self.clock)
+
+
+@dataclass(frozen=True)
+class CompanionLoyaltyChanged(Event):
+    npc_id: str
+    name: str
+    change: int
+    reason: str
+
+
+def _warn(sub, error):
+    name = getattr(sub.handler, "__qualname__", sub.handler)
+    print(f"Warning: Event subscriber {name} failed: {error}", file=sys.stderr)
+
+
+@dataclass
+class _Subscription:
+    event_type: type
+    handler: Callable[[Any], Any]
+    priority: int
+    order: int
+    batch: bool
+
+    @property
+    def is_async(self) -> bool:
+        return inspect.iscoroutinefunction(self.handler)
+
+
+class EventBus:
+    def __init__(self):
+        """Initialize an empty bus."""
+        self._subscriptions: List[_Subscription] = []
+        self._order = count()
+        self._queue: "OrderedDict[Hashable, Event]" = OrderedDict()
+        self._batch_depth = 0
+        self._delivering = False
+
+    def subscribe(self, event_type, handler, priority=0, batch=False):
+        """
+        Register a handler for an event class.
+
+        Args:
+            event_type: Event subclass to receive (subclasses included)
+            handler: Function or coroutine function taking the event
+                     (or, for batch subscribers, a list of events)
+            priority: Lower numbers are called first (ties: subscription order)
+            batch: Receive all matching events of a flush as one list
+
+        Returns:
+            callable: Call it to unsubscribe
+        """
+        if not (isinstance(event_type, type) and issubclass(event_type, Event)):
+            raise TypeError(f"event_type must be an Event subclass, got {event_type!r}")
+        entry = _Subscription(event_type, handler, priority, next(self._order), batch)
+        self._subscriptions.append(entry)
+        self._subscriptions.sort(key=lambda s: (s.priority, s.order))
+        return lambda: self._subscriptions.remove(entry) if entry in self._subscriptions else None
+
+    def _enqueue(self, event):
+        if not isinstance(event, Event):
+            raise TypeError(f"Can only publish Event instances, got {type(event).__name__}")
+        key = event.coalesce_key()
+        if key is None:
+            key = ("event", next(self._order))
+        queued = self._queue.get(key)
+        # Merging keeps the queued event's place in line
+        self._queue[key] = queued.merge(event) if queued is not None else event
+
+    def publish(self, event):
+        """
+        Queue an event and, outside batch() and delivery, deliver it now.
+
+        Returns:
+            list: Events delivered by this call (empty if only queued)
+        """
+        self._enqueue(event)
+        if self._batch_depth or self._delivering:
+            return []
+        return self.flush()
+
+    async def publish_async(self, event):
+        """publish() for use inside a running event loop."""
+        self._enqueue(event)
+        if self._batch_depth or self._delivering:
+            return []
+        return await self.flush_async()
+
+    @contextmanager
+    def batch(self):
+        """Hold delivery until the outermost batch exits, coalescing repeats."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+        if not self._batch_depth and not self._delivering:
+            self.flush()
+
+    def _matching(self, event, batch):
+        return [s for s in self._subscriptions if s.batch == batch and isinstance(event, s.event_type)]
+
+    def flush(self):
+        """
+        Deliver every queued event, including those published during delivery.
+
+        Returns:
+            list: Delivered events, in delivery order
+        """
+        if any(s.is_async for s in self._subscriptions):
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return asyncio.run(self.flush_async())
+            raise RuntimeError("EventBus has async subscribers; use await bus.flush_async() inside an event loop")
+        delivered = []
+        self._delivering = True
+        try:
+            for sub, arg in self._calls(delivered):
+                try:
+                    sub.handler(arg)
+                except Exception as e:
+                    _warn(sub, e)
+        finally:
+            self._delivering = False
+        return delivered
+
+    async def flush_async(self):
+        """flush() for use inside a running event loop."""
+        delivered = []
+        self._delivering = True
+        try:
+            for sub, arg in self._calls(delivered):
+                try:
+                    result = sub.handler(arg)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    _warn(sub, e)
+        finally:
+            self._delivering = False
+        return delivered
+
+    def _calls(self, delivered):
+        """Yield (subscription, event or batch) in delivery order until the queue is empty."""
+        while self._queue:
+            round_events = []
+            while self._queue:
+                _, event = self._queue.popitem(last=False)
+                round_events.append(event)
+                delivered.append(event)
+                for sub in self._matching(event, batch=False):
+                    yield sub, event
+            # Batch subscribers see the round's events together; anything they
+            # publish starts another round
+            yield from self._batches(round_events)
+
+    def _batches(self, events) -> List[Tuple[_Subscription, List[Event]]]:
+        batches: Dict[int, Tuple[_Subscription, List[Event]]] = {}
+        for event in events:
+            for sub in self._matching(event, batch=True):
+                batches.setdefault(sub.order, (sub, []))[1].append(event)
+        return sorted(batches.values(), key=lambda entry: (entry[0].priority, entry[0].order))
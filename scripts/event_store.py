@@ -0,0 +1,549 @@
+#!/usr/bin/env python3
+"""
+Event-Sourced Campaign State for Skyrim TTRPG
+
+Keeps the history of state/campaign_state.json and data/clocks/*.json as
+an ordered event store, so the world can be materialized as it was at any
+session or time:
+- state/events.jsonl: append-only event store (one JSON event per line,
+  numbered by "seq", tagged with the session it happened in)
+- Reducers: one per state file family, turning (document, event) into the
+  next document ("patch" events carry JSON-Patch operations, "clock"
+  events tick a clock with clamping, "reset" events carry a whole document)
+- state/snapshots/: full copies of every tracked file taken at the
+  baseline, at the end of each session and every SNAPSHOT_INTERVAL events;
+  materialize() replays only from the nearest snapshot
+- sync() journals out-of-band edits (patch scripts, hand edits, managers)
+  by diffing the live files against the store's head
+- batch() groups clock ticks: hand edits are journaled once up front and
+  each ticked file is written once at the end
+
+The store starts from a baseline snapshot of the current files (init());
+history before that point lives only in patches/ and logs/.
+
+Usage:
+    python3 event_store.py --init
+    python3 event_store.py --sync
+    python3 event_store.py --end-session 3
+    python3 event_store.py --show --session 2 --file data/clocks/civil_war_clocks.json
+    python3 event_store.py --rollback --session 2 --dry-run
+    python3 event_store.py --history
+"""
+
+import argparse
+import copy
+import fnmatch
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from json_io import load_json, loads, read_text
+from patch_engine import apply_operation, commit_writes, diff_documents, format_json, resolve_pointer
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+EVENTS_PATH = Path("state") / "events.jsonl"
+SNAPSHOT_DIR = Path("state") / "snapshots"
+SNAPSHOT_INTERVAL = 25
+
+# Clock progress/maximum field names used across data/clocks
+PROGRESS_FIELDS = ("current_progress", "current", "current_trust")
+MAXIMUM_FIELDS = ("total_segments", "max_trust", "segments", "max")
+
+
+# ----------------------------------------------------------------------
+# Reducers
+# ----------------------------------------------------------------------
+
+def _reduce_common(doc, event):
+    if event["kind"] == "reset":
+        return copy.deepcopy(event["doc"])
+    if event["kind"] == "patch":
+        for op in event["ops"]:
+            doc = apply_operation(doc, op)
+        return doc
+    raise ValueError(f"Unsupported event kind '{event['kind']}' for {event.get('file')}")
+
+
+def reduce_campaign_state(doc, event):
+    """Reducer for state/campaign_state.json."""
+    return _reduce_common(doc, event)
+
+
+def reduce_clock_file(doc, event):
+    """Reducer for data/clocks/*.json; also handles "clock" tick events."""
+    if event["kind"] != "clock":
+        return _reduce_common(doc, event)
+    clock = resolve_pointer(doc, event["path"])
+    field = next((f for f in PROGRESS_FIELDS if f in clock), PROGRESS_FIELDS[0])
+    maximum = next((clock[f] for f in MAXIMUM_FIELDS if isinstance(clock.get(f), int)), None)
+    value = int(clock.get(field, 0)) + int(event["delta"])
+    clock[field] = max(0, min(maximum, value) if maximum is not None else value)
+    return doc
+
+
+# Tracked file pattern -> reducer
+REDUCERS = (
+    ("state/campaign_state.json", reduce_campaign_state),
+    ("data/clocks/*.json", reduce_clock_file),
+)
+
+
+def reducer_for(file):
+    """Reducer for a repo-relative file path, or None if the file is not tracked."""
+    for pattern, reducer in REDUCERS:
+        if fnmatch.fnmatch(file, pattern):
+            return reducer
+    return None
+
+
+def _end_of_day(timestamp):
+    """Date-only timestamps ("2026-02-01") cover the whole day."""
+    return timestamp + "T23:59:59" if len(timestamp) == 10 else timestamp.replace(" ", "T")
+
+
+class CampaignEventStore:
+    def __init__(self, repo_root=REPO_ROOT, snapshot_interval=SNAPSHOT_INTERVAL):
+        """
+        Initialize the CampaignEventStore.
+
+        Args:
+            repo_root: Repository root (containing state/ and data/)
+            snapshot_interval: Take a snapshot after this many events since the last one
+        """
+        self.repo_root = Path(repo_root)
+        self.events_path = self.repo_root / EVENTS_PATH
+        self.snapshot_dir = self.repo_root / SNAPSHOT_DIR
+        self.snapshot_interval = snapshot_interval
+        self._events = []
+        self._offset = 0
+        self._head = None  # (seq, docs) once materialized
+        self._snapshots = None  # [(seq, path)], listed on first use
+        self._batch = None  # files ticked inside batch(), written when it ends
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+
+    def tracked_files(self):
+        """Repo-relative paths of every live file covered by a reducer."""
+        files = []
+        for pattern, _ in REDUCERS:
+            files.extend(sorted(p.relative_to(self.repo_root).as_posix()
+                                for p in self.repo_root.glob(pattern)))
+        return files
+
+    def _read_live(self, file):
+        try:
+            return load_json(self.repo_root / file)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: Could not read {file}: {e}")
+            return None
+
+    def live_documents(self, files=None):
+        """{file: document} for the current files on disk (all tracked files, or just files)."""
+        docs = {}
+        for file in self.tracked_files() if files is None else files:
+            doc = self._read_live(file)
+            if doc is not None:
+                docs[file] = doc
+        return docs
+
+    # ------------------------------------------------------------------
+    # Event store
+    # ------------------------------------------------------------------
+
+    def events(self):
+        """All events in order (new lines are read incrementally)."""
+        if not self.events_path.exists():
+            return self._events
+        size = self.events_path.stat().st_size
+        if size < self._offset:
+            self._events, self._offset, self._head, self._snapshots = [], 0, None, None
+        if size > self._offset:
+            with open(self.events_path, 'rb') as f:
+                f.seek(self._offset)
+                chunk = f.read()
+            complete = chunk.rfind(b"\n") + 1
+            for line in chunk[:complete].splitlines():
+                try:
+                    self._events.append(loads(line))
+                except json.JSONDecodeError:
+                    # A torn line from a crash mid-write; skip it
+                    continue
+            self._offset += complete
+        return self._events
+
+    def last_seq(self):
+        events = self.events()
+        return events[-1]["seq"] if events else 0
+
+    def current_session(self):
+        """Session number new events are tagged with (campaign_state.session_count)."""
+        state = self._materialize_head()[1].get("state/campaign_state.json") or {}
+        return int(state.get("session_count") or 0)
+
+    def append(self, kind, file=None, session=None, source=None, **payload):
+        """
+        Append one event and advance the head state.
+
+        Args:
+            kind: "patch" (ops=[...]), "clock" (path=..., delta=...), "reset"
+                  (doc=...) or "session_end"
+            file: Tracked file the event applies to (None for session_end)
+            session: Session number (default: the current session)
+            source: Where the change came from (e.g., "patch:2026-02-01_end")
+
+        Returns:
+            dict: The stored event
+        """
+        if file is not None and reducer_for(file) is None:
+            raise ValueError(f"No reducer for '{file}'")
+        self.init()
+        head_seq, docs = self._materialize_head()
+        event = {
+            "seq": head_seq + 1,
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "session": self.current_session() if session is None else int(session),
+            "kind": kind,
+        }
+        if file is not None:
+            event["file"] = file
+        if source:
+            event["source"] = source
+        event.update(payload)
+
+        # Validate against the head before anything is written
+        if file is not None:
+            docs = dict(docs)
+            docs[file] = reducer_for(file)(copy.deepcopy(docs.get(file)), event)
+
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        self.events_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.events_path.exists() and self.events_path.stat().st_size > 0:
+            with open(self.events_path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = "\n" + line
+        with open(self.events_path, 'a', encoding='utf-8') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self.events()
+        self._head = (event["seq"], docs)
+
+        snapshots = self.snapshots()
+        last_snapshot = snapshots[-1][0] if snapshots else 0
+        if kind == "session_end" or event["seq"] - last_snapshot >= self.snapshot_interval:
+            self.take_snapshot()
+        return event
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    def snapshots(self):
+        """[(seq, path)] of every snapshot, oldest first."""
+        if self._snapshots is None:
+            if not self.snapshot_dir.exists():
+                return []
+            self._snapshots = sorted((int(p.stem), p) for p in self.snapshot_dir.glob("*.json")
+                                     if p.stem.isdigit())
+        return self._snapshots
+
+    def _load_snapshot(self, path):
+        return load_json(path)
+
+    def take_snapshot(self, docs=None, session=None):
+        """
+        Write a snapshot of the head state (or of docs) at the latest seq.
+
+        Returns:
+            Path: The snapshot file
+        """
+        seq = self.last_seq()
+        if docs is None:
+            docs = self.materialize()["docs"]
+        if session is None:
+            session = int((docs.get("state/campaign_state.json") or {}).get("session_count") or 0)
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        path = self.snapshot_dir / f"{seq:06d}.json"
+        snapshot = {"seq": seq, "session": session,
+                    "ts": datetime.now().isoformat(timespec="seconds"), "docs": docs}
+        commit_writes({path: json.dumps(snapshot, ensure_ascii=False) + "\n"})
+        self._snapshots = sorted([s for s in self.snapshots() if s[0] != seq] + [(seq, path)])
+        return path
+
+    def init(self):
+        """
+        Take the baseline snapshot of the live files if the store is empty.
+
+        Returns:
+            bool: True if a baseline was taken
+        """
+        if self.snapshots():
+            return False
+        self.take_snapshot(self.live_documents())
+        return True
+
+    # ------------------------------------------------------------------
+    # Materialization
+    # ------------------------------------------------------------------
+
+    def _baseline(self):
+        snapshots = self.snapshots()
+        if not snapshots:
+            raise ValueError("No baseline snapshot - run init() first")
+        return self._load_snapshot(snapshots[0][1])
+
+    def _cutoff(self, session=None, at=None, seq=None):
+        """
+        Sequence number of the last event at a point in history.
+
+        Raises:
+            ValueError: If the point is before tracking began (the baseline snapshot)
+        """
+        events = self.events()
+        last = events[-1]["seq"] if events else 0
+        if seq is not None:
+            snapshots = self.snapshots()
+            if snapshots and int(seq) < snapshots[0][0]:
+                raise ValueError(f"Event {seq} is before tracking began (event {snapshots[0][0]})")
+            return min(int(seq), last)
+        if session is not None:
+            ends = [e["seq"] for e in events if e["kind"] == "session_end" and e["session"] == int(session)]
+            if ends:
+                return ends[-1]
+            within = [e["seq"] for e in events if e["session"] <= int(session)]
+            if within:
+                return within[-1]
+            baseline = self._baseline()
+            if int(session) < baseline["session"]:
+                raise ValueError(f"Session {session} is before tracking began (session {baseline['session']})")
+            return baseline["seq"]
+        if at is not None:
+            limit = _end_of_day(str(at))
+            within = [e["seq"] for e in events if e["ts"] <= limit]
+            if within:
+                return within[-1]
+            baseline = self._baseline()
+            if limit < baseline["ts"]:
+                raise ValueError(f"{at} is before tracking began ({baseline['ts']})")
+            return baseline["seq"]
+        return last
+
+    def _materialize_head(self):
+        seq = self.last_seq()
+        if self._head is None or self._head[0] != seq:
+            self._head = (seq, self._replay_to(seq)[1])
+        return self._head
+
+    def _replay_to(self, cutoff):
+        snapshots = [(s, p) for s, p in self.snapshots() if s <= cutoff]
+        if not snapshots:
+            print("Warning: No snapshot at or before this point - run init() first")
+            return 0, {}
+        snapshot = self._load_snapshot(snapshots[-1][1])
+        docs = snapshot["docs"]
+        for event in self.events():
+            if event["seq"] <= snapshot["seq"]:
+                continue
+            if event["seq"] > cutoff:
+                break
+            if event.get("file"):
+                docs[event["file"]] = reducer_for(event["file"])(docs.get(event["file"]), event)
+        return snapshot["session"], docs
+
+    def materialize(self, session=None, at=None, seq=None):
+        """
+        State as of a session, timestamp or event number (default: head).
+
+        Args:
+            session: Session number (state at that session's end, or its latest event)
+            at: ISO timestamp or date ("2026-02-01" means end of that day)
+            seq: Event sequence number
+
+        Returns:
+            dict: {"seq", "docs": {file: document}}
+
+        Raises:
+            ValueError: If the point is before tracking began
+        """
+        cutoff = self._cutoff(session, at, seq)
+        if cutoff == self.last_seq():
+            head_seq, docs = self._materialize_head()
+            return {"seq": head_seq, "docs": copy.deepcopy(docs)}
+        return {"seq": cutoff, "docs": self._replay_to(cutoff)[1]}
+
+    # ------------------------------------------------------------------
+    # Recording and rollback
+    # ------------------------------------------------------------------
+
+    def sync(self, session=None, source="sync", files=None):
+        """
+        Journal differences between the live files and the head as events.
+
+        Args:
+            files: Only compare these tracked files (default: all of them)
+
+        Returns:
+            list: Appended events
+        """
+        self.init()
+        # append() replaces the head's dict rather than changing it, so this stays the pre-sync head
+        head = self._materialize_head()[1]
+        appended = []
+        for file, doc in self.live_documents(files).items():
+            if file not in head:
+                appended.append(self.append("reset", file, session, source, doc=doc))
+                continue
+            ops = diff_documents(head[file], doc)
+            if ops:
+                appended.append(self.append("patch", file, session, source, ops=ops))
+        return appended
+
+    def end_session(self, session=None):
+        """Journal pending changes, mark the session's end and snapshot it."""
+        session = self.current_session() if session is None else int(session)
+        self.sync(session)
+        return self.append("session_end", session=session)
+
+    def tick_clock(self, file, path, delta, session=None, source=None, write=True):
+        """
+        Record a clock tick and (by default) write the clock file.
+
+        Args:
+            file: Clock file, e.g. "data/clocks/civil_war_clocks.json"
+            path: JSON pointer to the clock ("/civil_war_clocks/clocks/imperial_military_dominance")
+            delta: Segments to add (negative to remove)
+        """
+        if write and self._batch is None:
+            # The tick rewrites the whole file; journal hand edits to it first so they survive
+            self.sync(session, source="tick:pending", files=[file])
+        event = self.append("clock", file, session, source, path=path, delta=int(delta))
+        if write:
+            if self._batch is not None:
+                self._batch.add(file)
+            else:
+                self._write_head([file])
+        return event
+
+    @contextmanager
+    def batch(self, session=None):
+        """
+        Group clock ticks: hand edits are journaled once up front and each
+        ticked file is written once when the block ends.
+
+            with store.batch():
+                store.tick_clock(file, clock_a, 1)
+                store.tick_clock(file, clock_b, -1)
+        """
+        if self._batch is not None:
+            yield self
+            return
+        self.sync(session, source="tick:pending")
+        self._batch = set()
+        try:
+            yield self
+        finally:
+            files, self._batch = self._batch, None
+            self._write_head(sorted(files))
+
+    def _write_head(self, files):
+        """Write the head state of files to disk in one commit."""
+        docs = self._materialize_head()[1]
+        writes = {}
+        for file in files:
+            path = self.repo_root / file
+            writes[path] = format_json(docs[file], read_text(path) if path.exists() else None)
+        if writes:
+            commit_writes(writes)
+
+    def rollback(self, session=None, at=None, seq=None, dry_run=False):
+        """
+        Restore the live files to an earlier point. The rollback itself is
+        journaled as new events, so it can be undone the same way.
+
+        Returns:
+            list: Files that changed (or would change)
+
+        Raises:
+            ValueError: If the point is before tracking began
+        """
+        pending = self.sync(source="rollback:pending")
+        if pending:
+            print(f"Journaled {len(pending)} unrecorded change(s) before rolling back")
+        cutoff = self._cutoff(session, at, seq)
+        target = self.materialize(seq=cutoff)["docs"]
+        head = self.materialize()["docs"]
+        changed = [file for file in target if head.get(file) != target[file]]
+        if dry_run or not changed:
+            return changed
+
+        writes = {}
+        for file in changed:
+            path = self.repo_root / file
+            original = read_text(path) if path.exists() else None
+            writes[path] = format_json(target[file], original)
+        if not commit_writes(writes):
+            return []
+        self.sync(source=f"rollback:{cutoff}")
+        return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event-sourced history of campaign state and clocks.")
+    parser.add_argument("--repo", default=str(REPO_ROOT), help="Repository root")
+    parser.add_argument("--init", action="store_true", help="Take the baseline snapshot")
+    parser.add_argument("--sync", action="store_true", help="Journal changes made to the live files")
+    parser.add_argument("--end-session", type=int, metavar="N", help="Journal changes and close session N")
+    parser.add_argument("--show", action="store_true", help="Print materialized state")
+    parser.add_argument("--rollback", action="store_true", help="Restore live files to an earlier point")
+    parser.add_argument("--history", action="store_true", help="List events")
+    parser.add_argument("--session", type=int)
+    parser.add_argument("--at", help="ISO timestamp or date")
+    parser.add_argument("--seq", type=int)
+    parser.add_argument("--file", help="With --show: only this file")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    store = CampaignEventStore(args.repo)
+    if args.init:
+        print("Baseline snapshot taken" if store.init() else "Store already initialized")
+    elif args.sync:
+        print(f"Journaled {len(store.sync())} change event(s)")
+    elif args.end_session is not None:
+        event = store.end_session(args.end_session)
+        print(f"Session {event['session']} closed at event {event['seq']}")
+    elif args.show:
+        try:
+            state = store.materialize(args.session, args.at, args.seq)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        docs = {args.file: state["docs"].get(args.file)} if args.file else state["docs"]
+        print(json.dumps({"seq": state["seq"], "docs": docs}, indent=2, ensure_ascii=False))
+    elif args.rollback:
+        if args.session is None and args.at is None and args.seq is None:
+            parser.error("--rollback needs --session, --at or --seq")
+        try:
+            changed = store.rollback(args.session, args.at, args.seq, dry_run=args.dry_run)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        verb = "Would restore" if args.dry_run else "Restored"
+        print(f"{verb} {len(changed)} file(s)")
+        for file in changed:
+            print(f"  - {file}")
+    elif args.history:
+        for event in store.events():
+            target = event.get("file", "")
+            detail = f"{len(event['ops'])} op(s)" if event["kind"] == "patch" else event.get("delta", "")
+            print(f"  #{event['seq']:<5} s{event['session']:<3} {event['ts']}  {event['kind']:<12} {target} {detail}")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Context-Budgeted Export Profile for Skyrim TTRPG
+
+This module picks the most relevant subset of the repository for an AI
+assistant session:
+- Builds a focus (active PC, current hold, active quests, scene NPCs) from campaign state
+- Ranks candidate files by relevance using directory weights, the PDF catalog,
+  focus-term hits and the most recent session logs
+- Minifies JSON and packs the best files under a byte or token budget
+- Leaves out backup copies (*.bak, *.bak_*, *.old)
+"""
+
+import json
+import re
+from pathlib import Path
+
+from json_io import load_json
+
+# Rough conversion used for token budgets (English prose + JSON averages ~4 bytes/token)
+BYTES_PER_TOKEN = 4
+
+# Backup copies that should never ship: foo.json.bak, foo.json.bak_20260127_125524, foo.json.old
+BACKUP_FILE_RE = re.compile(r"\.(bak|old)(_[\w-]+)?$", re.IGNORECASE)
+
+DATED_LOG_RE = re.compile(r"^\d{4}-\d{2}-\d{2}_")
+
+# Base relevance by top-level area (first matching prefix wins)
+AREA_WEIGHTS = [
+    ("state/", 40),
+    ("data/pcs/", 25),
+    ("data/clocks/", 20),
+    ("data/holds/", 12),
+    ("data/quests/", 12),
+    ("data/npcs/", 10),
+    ("data/npc_stat_sheets/", 8),
+    ("data/rules/", 8),
+    ("data/", 6),
+    ("logs/", 6),
+    ("patches/", 2),
+    ("docs/", 2),
+    ("source_material/", 2),
+    ("scripts/", 1),
+]
+
+# Files the package is useless without; packed first regardless of score
+PINNED_FILES = ("state/campaign_state.json", "README.md")
+
+FOCUS_HIT_WEIGHT = 6
+RECENT_LOG_WEIGHTS = (30, 18, 10)
+LOG_MENTION_WEIGHT = 8
+CATALOG_WEIGHT = 4
+
+
+def is_backup_file(path):
+    """Return True for backup copies like whiterun_jobs.json.bak_20260127_125524."""
+    return bool(BACKUP_FILE_RE.search(Path(path).name))
+
+
+def minify_json(data):
+    """
+    Minify JSON text, returning the input unchanged if it does not parse.
+
+    Args:
+        data: JSON document as bytes
+
+    Returns:
+        bytes: Compact JSON with no indentation or extra whitespace
+    """
+    try:
+        doc = json.loads(data.decode("utf-8-sig"))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return data
+    return json.dumps(doc, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _area_weight(arcname):
+    for prefix, weight in AREA_WEIGHTS:
+        if arcname.startswith(prefix):
+            return weight
+    return 0
+
+
+def _terms_from(value):
+    """Normalize a focus value into lowercase search phrases."""
+    if not isinstance(value, str) or not value.strip():
+        return set()
+    text = value.lower().strip()
+    terms = {text}
+    # Location strings like "Whiterun — Cloud District (Dragonsreach Approach)" → parts
+    for part in re.split(r"[—\-–(),/]+", text):
+        part = part.strip()
+        if len(part) >= 4:
+            terms.add(part)
+    return terms
+
+
+def build_focus(repo_dir, state=None, pc=None, hold=None, quests=None):
+    """
+    Build the export focus from campaign state, with optional overrides.
+
+    Args:
+        repo_dir: Repository root
+        state: Campaign state dict (default: loaded from state/campaign_state.json)
+        pc: Active PC id override (e.g., "pc_khagar_yal")
+        hold: Current hold override (e.g., "Whiterun")
+        quests: List of active quest names/ids override
+
+    Returns:
+        dict: {"pc_id", "hold", "quests", "npcs", "terms"}
+    """
+    repo_dir = Path(repo_dir)
+    if state is None:
+        state_path = repo_dir / "state" / "campaign_state.json"
+        try:
+            state = load_json(state_path)
+        except (IOError, OSError, json.JSONDecodeError):
+            state = {}
+
+    pc_id = pc or state.get("active_pc_id") or ""
+    hold = hold or state.get("active_hold") or ""
+    npcs = [n for n in (state.get("current_npcs") or []) if isinstance(n, str)]
+
+    if quests is None:
+        quests = []
+        for arc in state.get("active_story_arcs") or []:
+            if isinstance(arc, dict) and arc.get("status") == "active":
+                quests.append(arc.get("arc_name", ""))
+        quests.extend(_active_quest_names(repo_dir / "data" / "quests"))
+
+    terms = set()
+    for value in [pc_id.replace("pc_", "").replace("_", " "), state.get("active_pc"),
+                  hold, state.get("current_location")] + list(quests):
+        terms |= _terms_from(value)
+    for npc in npcs:
+        terms |= _terms_from(npc.replace("_", " "))
+
+    return {"pc_id": pc_id, "hold": hold, "quests": [q for q in quests if q], "npcs": npcs, "terms": terms}
+
+
+def _active_quest_names(quests_dir):
+    """Collect names of quests whose status is active/in progress."""
+    names = []
+    if not quests_dir.exists():
+        return names
+    for quest_file in sorted(quests_dir.glob("*.json")):
+        try:
+            data = load_json(quest_file)
+        except (IOError, OSError, json.JSONDecodeError):
+            continue
+        stack = [data]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                status = str(node.get("status", "")).lower()
+                if status in ("active", "in_progress", "in progress") and node.get("name"):
+                    names.append(str(node["name"]))
+                stack.extend(node.values())
+            elif isinstance(node, list):
+                stack.extend(node)
+    return names
+
+
+def _recent_logs(repo_dir, count=len(RECENT_LOG_WEIGHTS)):
+    """Return the newest session logs (YYYY-MM-DD_ prefixed names sort chronologically)."""
+    logs_dir = Path(repo_dir) / "logs"
+    if not logs_dir.exists():
+        return []
+    logs = [p for p in logs_dir.glob("*.md") if DATED_LOG_RE.match(p.name)]
+    logs.sort(key=lambda p: (p.name[:10], p.stat().st_mtime), reverse=True)
+    return logs[:count]
+
+
+def catalog_files(repo_dir):
+    """Existing files referenced by the PDF topic catalog (data/pdf_index.json)."""
+    index_path = Path(repo_dir) / "data" / "pdf_index.json"
+    try:
+        index = load_json(index_path)
+    except (IOError, OSError, json.JSONDecodeError):
+        return set()
+    files = set()
+    for topic in (index.get("topics") or {}).values():
+        if isinstance(topic, dict):
+            for entry in topic.values():
+                if isinstance(entry, dict) and entry.get("file") and (Path(repo_dir) / entry["file"]).is_file():
+                    files.add(entry["file"])
+    return files
+
+
+def rank_files(repo_dir, files, focus):
+    """
+    Score candidate files for relevance to the focus.
+
+    Args:
+        repo_dir: Repository root
+        files: Iterable of (arcname, path) pairs
+        focus: Focus dict from build_focus()
+
+    Returns:
+        list: Dicts with "arcname", "path", "data", "score", sorted best first
+    """
+    repo_dir = Path(repo_dir)
+    recent = _recent_logs(repo_dir)
+    recent_weights = {p.relative_to(repo_dir).as_posix(): w for p, w in zip(recent, RECENT_LOG_WEIGHTS)}
+    recent_text = " ".join(p.read_text(encoding="utf-8", errors="replace").lower() for p in recent)
+    catalog = catalog_files(repo_dir)
+    pc_slug = focus["pc_id"].replace("pc_", "")
+
+    ranked = []
+    for arcname, path in files:
+        arcname = Path(arcname).as_posix()
+        if is_backup_file(arcname):
+            continue
+        try:
+            data = Path(path).read_bytes()
+        except (IOError, OSError):
+            continue
+        if arcname.endswith(".json"):
+            data = minify_json(data)
+        text = data.decode("utf-8", errors="replace").lower()
+
+        score = _area_weight(arcname)
+        score += FOCUS_HIT_WEIGHT * sum(1 for term in focus["terms"] if term in text)
+        score += recent_weights.get(arcname, 0)
+        if arcname in catalog:
+            score += CATALOG_WEIGHT
+        if pc_slug and pc_slug in Path(arcname).stem:
+            score += 50
+        stem = Path(arcname).stem
+        if stem in focus["npcs"]:
+            score += 30
+        # NPCs and quests named in the most recent logs are likely to come up again
+        if arcname.startswith(("data/npcs/", "data/npc_stat_sheets/")) and stem.replace("_", " ") in recent_text:
+            score += LOG_MENTION_WEIGHT
+
+        ranked.append({"arcname": arcname, "path": path, "data": data, "score": score,
+                       "pinned": arcname in PINNED_FILES})
+
+    ranked.sort(key=lambda f: (not f["pinned"], -f["score"], len(f["data"]), f["arcname"]))
+    return ranked
+
+
+def pack_budget(ranked, budget_bytes):
+    """
+    Greedily pack ranked files under a byte budget.
+
+    Pinned files are always included and count against the budget, even if
+    they alone exceed it; after that, any file that still fits is included
+    in rank order.
+
+    Args:
+        ranked: Output of rank_files()
+        budget_bytes: Maximum total uncompressed bytes
+
+    Returns:
+        tuple: (included, omitted) lists of ranked file dicts
+    """
+    included, omitted = [], []
+    used = 0
+    for item in ranked:
+        size = len(item["data"])
+        if item["pinned"] or used + size <= budget_bytes:
+            included.append(item)
+            used += size
+        else:
+            omitted.append(item)
+    return included, omitted
+
+
+def manifest_bound(ranked, budget_bytes):
+    """
+    Upper bound on the size of the _manifest.json entry for these files.
+
+    Every file is listed as included (an included entry is longer than an
+    omitted one) with the largest possible bytes_used.
+    """
+    worst = {
+        "budget_bytes": budget_bytes,
+        "bytes_used": budget_bytes + sum(len(item["data"]) for item in ranked),
+        "included": [{"file": item["arcname"], "score": item["score"]} for item in ranked],
+        "omitted": [],
+    }
+    return len(json.dumps(worst, separators=(",", ":")).encode("utf-8"))
+
+
+def resolve_budget(budget_bytes=None, budget_tokens=None):
+    """Convert a byte or token budget into bytes (token budgets use BYTES_PER_TOKEN)."""
+    if budget_bytes is not None and budget_tokens is not None:
+        raise ValueError("Specify either budget_bytes or budget_tokens, not both")
+    if budget_tokens is not None:
+        budget_bytes = int(budget_tokens) * BYTES_PER_TOKEN
+    if budget_bytes is None or int(budget_bytes) <= 0:
+        raise ValueError("A positive byte or token budget is required")
+    return int(budget_bytes)
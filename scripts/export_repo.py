@@ -7,19 +7,28 @@ optimized for use with ChatGPT 5.2 for dynamic game simulation
 and narrative integration.
 """
 
+import argparse
 import json
 import os
-import zipfile
+import sys
 from datetime import datetime
 from pathlib import Path
 
+from export_profile import (build_focus, catalog_files, is_backup_file, manifest_bound, pack_budget, rank_files,
+                            resolve_budget)
+from json_io import load_json
+from zip_stream import write_zip_stream
+
+# Directories included in every export, in archive order
+EXPORT_DIRECTORIES = ['data', 'scripts', 'docs', 'state', 'logs', 'patches']
+
 
 def load_json_safely(path):
     """
-    Load JSON with multiple encoding fallback attempts.
+    Load JSON whatever its encoding (see json_io.py).
     
     Windows often defaults to cp1252; repo JSON is intended to be UTF-8.
-    This loader tries UTF-8 variants first, then common fallbacks.
+    The encoding is sniffed once per file and remembered.
     
     Args:
         path: Path object pointing to JSON file
@@ -28,29 +37,15 @@ def load_json_safely(path):
         dict: Parsed JSON data
         
     Raises:
-        json.JSONDecodeError: If JSON parsing fails with all encodings
+        json.JSONDecodeError: If JSON parsing fails
         IOError: If file cannot be read
     """
-    if not isinstance(path, Path):
-        path = Path(path)
-        
-    try:
-        data = path.read_bytes()
-    except (IOError, OSError) as e:
-        raise IOError(f"Cannot read file {path}: {e}")
-    
-    # Try encodings in order of likelihood
-    for encoding in ("utf-8", "utf-8-sig", "cp1252", "latin-1"):
-        try:
-            return json.loads(data.decode(encoding))
-        except (UnicodeDecodeError, json.JSONDecodeError):
-            continue
-    
-    # Last resort with error replacement
     try:
-        return json.loads(data.decode("latin-1", errors="replace"))
+        return load_json(path)
     except json.JSONDecodeError as e:
         raise json.JSONDecodeError(f"Failed to parse JSON from {path}", e.doc, e.pos)
+    except OSError as e:
+        raise IOError(f"Cannot read file {path}: {e}")
 
 
 class RepositoryExporter:
@@ -144,7 +139,8 @@ class RepositoryExporter:
             category_dir = self.data_dir / category
             if category_dir.exists():
                 try:
-                    stats[category] = len(list(category_dir.glob("*.json")))
+                    pattern = "session_*.json" if category == "sessions" else "*.json"
+                    stats[category] = len(list(category_dir.glob(pattern)))
                 except (IOError, OSError) as e:
                     print(f"Warning: Cannot access {category} directory: {e}")
                     stats[category] = 0
@@ -153,12 +149,76 @@ class RepositoryExporter:
         
         return stats
     
-    def export_to_zip(self, output_file="skyrim_ttrpg_export.zip"):
+    def iter_export_files(self):
+        """
+        Yield the repository files that belong in an export.
+        
+        Yields:
+            tuple: (arcname, file_path) in a stable, sorted order
+        """
+        readme_path = self.repo_dir / "README.md"
+        if readme_path.exists():
+            yield Path("README.md"), readme_path
+        
+        for directory in EXPORT_DIRECTORIES:
+            dir_path = self.repo_dir / directory
+            if not dir_path.exists():
+                continue
+            try:
+                for file_path in sorted(dir_path.rglob("*")):
+                    # Skip __pycache__, .pyc files and backup copies (*.bak_*, *.old)
+                    if '__pycache__' in file_path.parts or file_path.suffix == '.pyc':
+                        continue
+                    if is_backup_file(file_path):
+                        continue
+                    if file_path.is_file():
+                        yield file_path.relative_to(self.repo_dir), file_path
+            except (IOError, OSError) as e:
+                print(f"Warning: Error listing files from {directory}: {e}")
+                continue
+    
+    def build_export_entries(self):
+        """
+        Build the ordered list of archive entries for an export.
+        
+        The generated context and statistics entries are serialized in memory,
+        so nothing is written to the working tree.
+        
+        Returns:
+            list: (arcname, source) pairs where source is bytes or a file path
+        """
+        context = self.create_context_file()
+        stats = self.collect_statistics()
+        entries = [
+            ("_chatgpt_context.json", json.dumps(context, indent=2).encode("utf-8")),
+            ("_statistics.json", json.dumps(stats, indent=2).encode("utf-8")),
+        ]
+        entries.extend(self.iter_export_files())
+        return entries
+    
+    def export_to_stream(self, stream, workers=None):
+        """
+        Export the repository as a zip archive written to a binary stream.
+        
+        Entries are compressed in a thread pool and written in order, so the
+        stream does not need to be seekable (stdout works).
+        
+        Args:
+            stream: Writable binary stream
+            workers: Number of compression threads (default: CPU count)
+            
+        Returns:
+            dict: Result from zip_stream.write_zip_stream
+        """
+        return write_zip_stream(stream, self.build_export_entries(), workers=workers)
+    
+    def export_to_zip(self, output_file="skyrim_ttrpg_export.zip", workers=None):
         """
         Export the entire repository to a .zip file.
         
         Args:
             output_file: Name of the output zip file (default: "skyrim_ttrpg_export.zip")
+            workers: Number of compression threads (default: CPU count)
             
         Returns:
             str: Path to the created zip file, or None if export fails
@@ -169,80 +229,25 @@ class RepositoryExporter:
             
         output_path = self.repo_dir / output_file
         
-        # Create context file
-        context = self.create_context_file()
-        context_file = self.repo_dir / "_chatgpt_context.json"
-        try:
-            with open(context_file, 'w', encoding='utf-8') as f:
-                json.dump(context, f, indent=2)
-        except (IOError, OSError) as e:
-            print(f"Error creating context file: {e}")
-            return None
-        
-        # Create statistics file
         stats = self.collect_statistics()
-        stats_file = self.repo_dir / "_statistics.json"
-        try:
-            with open(stats_file, 'w', encoding='utf-8') as f:
-                json.dump(stats, f, indent=2)
-        except (IOError, OSError) as e:
-            print(f"Error creating statistics file: {e}")
-            # Clean up context file before returning
-            if context_file.exists():
-                context_file.unlink()
-            return None
-        
         print(f"Creating export package: {output_file}")
         print(f"Campaign Statistics:")
         for key, value in stats.items():
             print(f"  {key}: {value}")
         
-        # Create zip file
         try:
-            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                # Add context files
-                zipf.write(context_file, "_chatgpt_context.json")
-                zipf.write(stats_file, "_statistics.json")
-                
-                # Add README
-                readme_path = self.repo_dir / "README.md"
-                if readme_path.exists():
-                    try:
-                        zipf.write(readme_path, "README.md")
-                    except (IOError, OSError) as e:
-                        print(f"Warning: Could not add README.md: {e}")
-                
-                # Add all data files
-                for directory in ['data', 'scripts', 'docs', 'state', 'logs', 'patches']:
-                    dir_path = self.repo_dir / directory
-                    if dir_path.exists():
-                        try:
-                            for file_path in dir_path.rglob("*"):
-                                if file_path.is_file():
-                                    # Skip __pycache__ and .pyc files
-                                    if '__pycache__' in file_path.parts or file_path.suffix == '.pyc':
-                                        continue
-                                    arcname = file_path.relative_to(self.repo_dir)
-                                    zipf.write(file_path, arcname)
-                                    print(f"  Added: {arcname}")
-                        except (IOError, OSError) as e:
-                            print(f"Warning: Error adding files from {directory}: {e}")
-                            continue
-        except (IOError, OSError, zipfile.BadZipFile) as e:
+            with open(output_path, 'wb') as f:
+                result = self.export_to_stream(f, workers=workers)
+        except (IOError, OSError, ValueError) as e:
             print(f"Error creating zip file: {e}")
-            # Clean up temporary files
-            if context_file.exists():
-                context_file.unlink()
-            if stats_file.exists():
-                stats_file.unlink()
+            if output_path.exists():
+                output_path.unlink()
             return None
         
-        # Clean up temporary files
-        try:
-            context_file.unlink()
-            stats_file.unlink()
-        except (IOError, OSError) as e:
-            print(f"Warning: Could not clean up temporary files: {e}")
+        for arcname in result["written"]:
+            print(f"  Added: {arcname}")
+        for arcname, error in result["skipped"]:
+            print(f"Warning: Could not add {arcname}: {error}")
         
         try:
             file_size = output_path.stat().st_size / 1024  # KB
@@ -255,6 +260,95 @@ class RepositoryExporter:
         
         return str(output_path)
     
+    def export_budgeted(self, output_file="skyrim_ttrpg_focus.zip", budget_bytes=None,
+                        budget_tokens=None, pc=None, hold=None, quests=None, workers=None):
+        """
+        Export only the files most relevant to the current session, under a budget.
+        
+        Files are ranked against a focus built from campaign state (active PC,
+        current hold, active quests, scene NPCs) and recent logs, JSON is
+        minified, and the best subset that fits is packed. A _manifest.json
+        entry lists what was included and omitted. The context, statistics
+        and manifest entries count against the budget; pinned files
+        (export_profile.PINNED_FILES) are always included, even over budget.
+        
+        Args:
+            output_file: Name of the output zip file (default: "skyrim_ttrpg_focus.zip")
+            budget_bytes: Maximum uncompressed bytes of content
+            budget_tokens: Maximum approximate tokens of content (alternative to bytes)
+            pc: Active PC id override
+            hold: Current hold override
+            quests: Active quest names override
+            workers: Number of compression threads (default: CPU count)
+            
+        Returns:
+            dict: {"path", "included", "omitted", "bytes_used", "budget_bytes"}, or None on failure
+        """
+        try:
+            budget = resolve_budget(budget_bytes, budget_tokens)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return None
+        
+        focus = build_focus(self.repo_dir, pc=pc, hold=hold, quests=quests)
+        context = self.create_context_file()
+        context["export_profile"] = {
+            "mode": "context_budgeted",
+            "budget_bytes": budget,
+            "focus": {"pc_id": focus["pc_id"], "hold": focus["hold"],
+                      "quests": focus["quests"], "npcs": focus["npcs"]}
+        }
+        fixed_entries = [
+            ("_chatgpt_context.json", json.dumps(context, separators=(",", ":")).encode("utf-8")),
+            ("_statistics.json", json.dumps(self.collect_statistics(), separators=(",", ":")).encode("utf-8")),
+        ]
+        reserved = sum(len(data) for _, data in fixed_entries)
+        
+        candidates = list(self.iter_export_files())
+        seen = {Path(arcname).as_posix() for arcname, _ in candidates}
+        for arcname in sorted(catalog_files(self.repo_dir) - seen):
+            candidates.append((Path(arcname), self.repo_dir / arcname))
+        
+        ranked = rank_files(self.repo_dir, candidates, focus)
+        reserved += manifest_bound(ranked, budget)
+        included, omitted = pack_budget(ranked, max(0, budget - reserved))
+        
+        manifest = {
+            "budget_bytes": budget,
+            "bytes_used": 0,
+            "included": [{"file": item["arcname"], "score": item["score"]} for item in included],
+            "omitted": [item["arcname"] for item in omitted]
+        }
+        content = sum(len(data) for _, data in fixed_entries) + sum(len(item["data"]) for item in included)
+        # bytes_used includes the manifest itself (settles once its digit count stops growing)
+        manifest_data = b""
+        while manifest["bytes_used"] != content + len(manifest_data):
+            manifest["bytes_used"] = content + len(manifest_data)
+            manifest_data = json.dumps(manifest, separators=(",", ":")).encode("utf-8")
+        entries = fixed_entries + [("_manifest.json", manifest_data)]
+        entries.extend((item["arcname"], item["data"]) for item in included)
+        
+        output_path = self.repo_dir / output_file
+        try:
+            with open(output_path, 'wb') as f:
+                write_zip_stream(f, entries, workers=workers)
+        except (IOError, OSError, ValueError) as e:
+            print(f"Error creating zip file: {e}")
+            if output_path.exists():
+                output_path.unlink()
+            return None
+        
+        print(f"Focused export: {len(included)} files, {manifest['bytes_used'] / 1024:.2f} KB "
+              f"of {budget / 1024:.2f} KB budget ({len(omitted)} omitted)")
+        print(f"Location: {output_path}")
+        return {
+            "path": str(output_path),
+            "included": [item["arcname"] for item in included],
+            "omitted": manifest["omitted"],
+            "bytes_used": manifest["bytes_used"],
+            "budget_bytes": budget
+        }
+    
     def create_quick_reference(self):
         """
         Create a quick reference guide for the current campaign state.
@@ -338,6 +432,41 @@ class RepositoryExporter:
 
 def main():
     """Main function to export the repository"""
+    parser = argparse.ArgumentParser(description="Export the repository as a .zip for ChatGPT integration.")
+    parser.add_argument("--output", default="skyrim_ttrpg_export.zip",
+                        help="Output zip file, or '-' to stream the archive to stdout")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Compression threads (default: CPU count)")
+    parser.add_argument("--budget-bytes", type=int, default=None,
+                        help="Focused export: pack the most relevant files under this many bytes "
+                             "(the manifest counts; state/campaign_state.json and README.md always go in)")
+    parser.add_argument("--budget-tokens", type=int, default=None,
+                        help="Focused export: pack the most relevant files under roughly this many tokens "
+                             "(same rules as --budget-bytes)")
+    parser.add_argument("--focus-pc", default=None, help="Focused export: active PC id override")
+    parser.add_argument("--focus-hold", default=None, help="Focused export: current hold override")
+    parser.add_argument("--focus-quest", action="append", default=None,
+                        help="Focused export: active quest name (repeatable)")
+    args = parser.parse_args()
+    
+    if args.budget_bytes is not None or args.budget_tokens is not None:
+        exporter = RepositoryExporter()
+        output = args.output if args.output != "skyrim_ttrpg_export.zip" else "skyrim_ttrpg_focus.zip"
+        exporter.export_budgeted(output, budget_bytes=args.budget_bytes,
+                                 budget_tokens=args.budget_tokens, pc=args.focus_pc,
+                                 hold=args.focus_hold, quests=args.focus_quest,
+                                 workers=args.workers)
+        return
+    
+    if args.output == "-":
+        # Keep stdout clean for the archive; report on stderr instead
+        exporter = RepositoryExporter()
+        result = exporter.export_to_stream(sys.stdout.buffer, workers=args.workers)
+        for arcname, error in result["skipped"]:
+            print(f"Warning: Could not add {arcname}: {error}", file=sys.stderr)
+        print(f"Streamed {len(result['written'])} entries ({result['bytes'] / 1024:.2f} KB)", file=sys.stderr)
+        return
+    
     print("=== Skyrim TTRPG Repository Exporter ===\n")
     
     exporter = RepositoryExporter()
@@ -355,7 +484,7 @@ def main():
         print(f"Warning: Could not create quick reference: {e}\n")
     
     # Export to zip
-    export_file = exporter.export_to_zip()
+    export_file = exporter.export_to_zip(args.output, workers=args.workers)
     
     if export_file:
         print("\n" + "="*60)
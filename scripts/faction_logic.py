@@ -9,37 +9,34 @@ This script manages:
 - Faction rewards and consequences
 """
 
-import json
 import os
 from pathlib import Path
 from datetime import datetime
 
+from event_bus import FactionClockChanged
+from storage import open_storage
+
 
 class FactionManager:
-    def __init__(self, data_dir="../data"):
+    def __init__(self, data_dir="../data", storage=None, bus=None):
         self.data_dir = Path(data_dir)
+        self.storage = storage or open_storage(self.data_dir)
+        # Optional EventBus; clock updates are published as FactionClockChanged
+        self.bus = bus
         self.factions_path = self.data_dir / "factions.json"
         self.factions_dir = self.data_dir / "factions"
         
     def load_factions_data(self):
         """Load comprehensive factions data"""
-        if self.factions_path.exists():
-            with open(self.factions_path, 'r') as f:
-                return json.load(f)
-        return None
+        return self.storage.get("", "factions")
     
     def save_factions_data(self, data):
         """Save factions data"""
-        with open(self.factions_path, 'w') as f:
-            json.dump(data, f, indent=2)
+        self.storage.put("", "factions", data)
     
     def load_individual_faction(self, faction_id):
         """Load individual faction file if it exists"""
-        faction_file = self.factions_dir / f"{faction_id}.json"
-        if faction_file.exists():
-            with open(faction_file, 'r') as f:
-                return json.load(f)
-        return None
+        return self.storage.get("factions", faction_id)
     
     def update_faction_clock(self, faction_id, clock_name, progress_change):
         """
@@ -50,21 +47,16 @@ class FactionManager:
             clock_name: Name of the clock to update
             progress_change: Amount to change (+/-)
         """
-        data = self.load_factions_data()
-        if not data:
-            return False
+        # Read just this faction's record, not the whole factions.json
+        faction_pointer = f"/major_factions/{faction_id.replace('~', '~0').replace('/', '~1')}"
+        faction = self.storage.get_record("", "factions", faction_pointer)
         
-        # Find faction
-        faction = None
-        if faction_id in data.get('major_factions', {}):
-            faction = data['major_factions'][faction_id]
-        
-        if not faction or 'clocks' not in faction:
+        if not isinstance(faction, dict) or 'clocks' not in faction:
             print(f"Faction '{faction_id}' or its clocks not found")
             return False
         
         # Update the clock
-        for clock in faction['clocks']:
+        for index, clock in enumerate(faction['clocks']):
             if clock['name'] == clock_name:
                 old_progress = clock['progress']
                 clock['progress'] = max(0, min(clock['segments'], 
@@ -77,7 +69,11 @@ class FactionManager:
                 if clock['progress'] >= clock['segments']:
                     print(f"⚠️  Clock filled! Effect: {clock['effect']}")
                 
-                self.save_factions_data(data)
+                self.storage.put_record("", "factions", f"{faction_pointer}/clocks/{index}", clock)
+                if self.bus is not None:
+                    self.bus.publish(FactionClockChanged(
+                        clock=clock_name, name=clock_name, old=old_progress, new=clock['progress'],
+                        total=clock['segments'], faction=faction_id))
                 return True
         
         print(f"Clock '{clock_name}' not found in faction '{faction_id}'")
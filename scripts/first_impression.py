@@ -1,24 +1,13 @@
 #!/usr/bin/env python3
 import json
+import os
 import random
 from pathlib import Path
 from datetime import datetime
 import argparse
 
-
-def load_json(path):
-    """
-    Unicode-safe JSON loader (matches export_repo.py approach).
-    Tries UTF-8 variants first, then common fallbacks.
-    """
-    path = Path(path)
-    data = path.read_bytes()
-    for enc in ("utf-8", "utf-8-sig", "cp1252", "latin-1"):
-        try:
-            return json.loads(data.decode(enc))
-        except Exception:
-            continue
-    return json.loads(data.decode("latin-1", errors="replace"))
+# Unicode-safe JSON loader shared with the rest of the repo
+from json_io import load_json
 
 
 def save_json(path, data):
@@ -59,25 +48,26 @@ def load_npc_metadata(repo_root: Path, npc_id: str) -> dict:
     return {}
 
 
-def infer_disposition(repo_root: Path, npc_id: str, state: dict) -> str:
-    """
-    Determine default disposition bucket: neutral | positive | negative
-    based on civil war alignment + obvious faction tags.
-    """
-    npc = load_npc_metadata(repo_root, npc_id)
-    player_alliance = (state.get("civil_war_state") or {}).get("player_alliance", "")
-    player_alliance = (player_alliance or "").lower()
+# NPC fields scanned for faction signals
+FACTION_FIELDS = ("faction", "affiliation", "allegiance", "side", "tags", "keywords")
+# Alliance columns of the disposition table; any other player_alliance uses ""
+ALLIANCES = ("stormcloak", "imperial", "")
+
 
-    # gather faction-ish signals from npc
+def faction_blob(npc: dict) -> str:
+    """Lowercase text of every faction-ish field of an NPC."""
     blobs = []
-    for k in ("faction", "affiliation", "allegiance", "side", "tags", "keywords"):
+    for k in FACTION_FIELDS:
         v = npc.get(k)
         if isinstance(v, str):
             blobs.append(v.lower())
         elif isinstance(v, list):
             blobs.append(" ".join([str(x).lower() for x in v]))
-    blob = " ".join(blobs)
+    return " ".join(blobs)
 
+
+def disposition_for(blob: str, player_alliance: str) -> str:
+    """Disposition bucket for an NPC's faction blob under a player alliance."""
     if "thalmor" in blob:
         return "negative"
 
@@ -96,15 +86,149 @@ def infer_disposition(repo_root: Path, npc_id: str, state: dict) -> str:
     return "neutral"
 
 
-def maybe_first_impression(state_path, appearance_path, npc_id, disposition="neutral", force=False):
+def player_alliance_of(state: dict) -> str:
+    player_alliance = (state.get("civil_war_state") or {}).get("player_alliance", "")
+    return (player_alliance or "").lower()
+
+
+class DispositionIndex:
     """
-    Records first impressions so NPCs can comment once, then recognize later.
-    disposition: neutral|positive|negative (GM decides based on context)
-    force: if True, overwrites an existing first impression for this npc->pc
+    Precomputed disposition of every NPC and stat sheet for each alliance.
+    Built once from data/npcs and data/npc_stat_sheets (data/npcs wins, as in
+    load_npc_metadata) and rebuilt by refresh() when a file in either directory
+    is added, removed or changed. Call refresh() once per scene or batch and
+    look NPCs up in between; after watch() a DataWatcher keeps the table
+    current and refresh() no longer scans. The player's alliance only selects
+    a column, so changing civil_war_state.player_alliance needs no rebuild.
     """
-    state = load_json(state_path)
-    appearance = load_json(appearance_path)
 
+    def __init__(self, repo_root):
+        self.repo_root = Path(repo_root)
+        self.table = {alliance: {} for alliance in ALLIANCES}
+        self._signature = None
+        # {directory name: {npc_id: document}}, kept only while a DataWatcher is attached
+        self._watched = None
+
+    def _dirs(self):
+        # Lowest priority first so data/npcs overrides stat sheets
+        return [self.repo_root / "data" / "npc_stat_sheets", self.repo_root / "data" / "npcs"]
+
+    def signature(self):
+        entries = []
+        for directory in self._dirs():
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.name.endswith(".json") and entry.is_file():
+                            st = entry.stat()
+                            entries.append((entry.path, st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                continue
+        return tuple(sorted(entries))
+
+    def refresh(self):
+        """Rebuild the table if any NPC file changed since the last build."""
+        if self._watched is not None:
+            return self
+        signature = self.signature()
+        if signature != self._signature:
+            self._build()
+            self._signature = signature
+        return self
+
+    def _build(self):
+        table = {alliance: {} for alliance in ALLIANCES}
+        for directory in self._dirs():
+            if not directory.is_dir():
+                continue
+            for path in sorted(directory.glob("*.json")):
+                try:
+                    npc = load_json(path)
+                except Exception:
+                    continue
+                if not isinstance(npc, dict):
+                    continue
+                blob = faction_blob(npc)
+                for alliance, dispositions in table.items():
+                    dispositions[path.stem] = disposition_for(blob, alliance)
+        self.table = table
+
+    def watch(self, watcher):
+        """
+        Keep the table current from a DataWatcher instead of scanning.
+
+        Args:
+            watcher: DataWatcher over this repo root's data directory
+        """
+        self._watched = {directory.name: {} for directory in self._dirs()}
+        for name, docs in self._watched.items():
+            for rel, doc in watcher.documents(f"{name}/").items():
+                if rel.count("/") == 1 and rel.endswith(".json"):
+                    docs[Path(rel).stem] = doc
+        table = {alliance: {} for alliance in ALLIANCES}
+        for npc_id in sorted(set().union(*self._watched.values())):
+            self._set_entry(table, npc_id)
+        self.table = table
+        for name in self._watched:
+            watcher.subscribe(self._apply_changes, prefix=f"{name}/")
+
+    def _apply_changes(self, events):
+        for event in events:
+            if event.collection not in self._watched or not event.path.endswith(".json"):
+                continue
+            if event.after is None:
+                self._watched[event.collection].pop(event.doc_id, None)
+            else:
+                self._watched[event.collection][event.doc_id] = event.after
+            self._set_entry(self.table, event.doc_id)
+
+    def _set_entry(self, table, npc_id):
+        # Highest priority first, as in _build
+        for directory in reversed(self._dirs()):
+            npc = self._watched[directory.name].get(npc_id)
+            if isinstance(npc, dict):
+                blob = faction_blob(npc)
+                for alliance, dispositions in table.items():
+                    dispositions[npc_id] = disposition_for(blob, alliance)
+                return
+        for dispositions in table.values():
+            dispositions.pop(npc_id, None)
+
+    def for_alliance(self, player_alliance: str) -> dict:
+        """{npc_id: disposition} for a player alliance (unlisted NPCs are neutral)."""
+        player_alliance = (player_alliance or "").lower()
+        return self.table.get(player_alliance, self.table[""])
+
+    def lookup(self, npc_id: str, player_alliance: str) -> str:
+        return self.for_alliance(player_alliance).get(npc_id, "neutral")
+
+
+_indexes = {}
+
+
+def disposition_index(repo_root, refresh=True) -> DispositionIndex:
+    """Shared DispositionIndex for a repo root, refreshed unless refresh=False."""
+    key = os.path.abspath(repo_root)
+    index = _indexes.get(key)
+    if index is None:
+        index = _indexes[key] = DispositionIndex(key)
+    return index.refresh() if refresh else index
+
+
+def infer_disposition(repo_root: Path, npc_id: str, state: dict, index=None) -> str:
+    """
+    Determine default disposition bucket: neutral | positive | negative
+    based on civil war alignment + obvious faction tags.
+    index: DispositionIndex already refreshed for this scene (optional);
+        without it the shared index is refreshed first
+    """
+    if index is None:
+        index = disposition_index(repo_root)
+    return index.lookup(npc_id, player_alliance_of(state))
+
+
+def _record_impression(state, appearance, npc_id, disposition, force):
+    """Record one impression in an already-loaded state; returns (bark line or None, recorded)."""
     state.setdefault("npc_first_impressions", {})
     state["npc_first_impressions"].setdefault(npc_id, {})
 
@@ -112,7 +236,7 @@ def maybe_first_impression(state_path, appearance_path, npc_id, disposition="neu
 
     # Already recorded? do nothing unless force.
     if (pc_id in state["npc_first_impressions"][npc_id]) and not force:
-        return None
+        return None, False
 
     lines = (appearance.get("first_impression_lines", {}) or {}).get(disposition, [])
     if not lines:
@@ -126,9 +250,47 @@ def maybe_first_impression(state_path, appearance_path, npc_id, disposition="neu
         "line": line,
         "recognition_tags": appearance.get("recognition_tags", [])
     }
+    return line, True
 
-    save_json(state_path, state)
-    return line
+
+def maybe_first_impression(state_path, appearance_path, npc_id, disposition="neutral", force=False):
+    """
+    Records first impressions so NPCs can comment once, then recognize later.
+    disposition: neutral|positive|negative (GM decides based on context)
+    force: if True, overwrites an existing first impression for this npc->pc
+    """
+    return record_first_impressions(state_path, appearance_path, [(npc_id, disposition)], force=force)[npc_id]
+
+
+def record_first_impressions(state_path, appearance_path, impressions, repo_root=None, force=False):
+    """
+    Batch version of maybe_first_impression for a whole scene.
+    Reads the campaign state and PC appearance once, records every impression
+    in memory and writes the state back once (only if something was recorded).
+    impressions: iterable of (npc_id, disposition); a disposition of None is
+        looked up in the DispositionIndex (needs repo_root)
+    Returns {npc_id: bark line or None}; None means already recorded (or no lines).
+    An NPC listed twice is recorded once, like repeated maybe_first_impression calls.
+    """
+    state = load_json(state_path)
+    appearance = load_json(appearance_path)
+
+    barks = {}
+    changed = False
+    dispositions = None
+    for npc_id, disposition in impressions:
+        if disposition is None:
+            if dispositions is None:
+                dispositions = disposition_index(repo_root).for_alliance(player_alliance_of(state))
+            disposition = dispositions.get(npc_id, "neutral")
+        line, recorded = _record_impression(state, appearance, npc_id, disposition, force)
+        if barks.get(npc_id) is None:
+            barks[npc_id] = line
+        changed = changed or recorded
+
+    if changed:
+        save_json(state_path, state)
+    return barks
 
 
 def auto_first_impression(repo_root, npc_id, disposition=None, force=False, quiet=False, trigger=None):
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+In-game calendar and timed-event scheduler for Skyrim TTRPG
+
+The calendar converts Tamrielic dates ("17th of Last Seed, 4E 201") to and
+from a running day number. The scheduler is a priority queue of events
+keyed by the campaign day (in_game_days_passed) they fall due on; advancing
+time pops every due event in day order, re-queueing recurring ones.
+
+Scheduled events are plain dictionaries so they can be stored in the world
+state (under "scheduled_events") and applied by StoryProgressionManager:
+
+    {"id": 3, "day": 21, "kind": "faction_clock", "every": 7,
+     "faction": "whiterun_guard", "progress": 1}
+"""
+
+import heapq
+import re
+
+# Tamrielic months and their lengths (matching the Gregorian calendar)
+MONTHS = (
+    ("Morning Star", 31), ("Sun's Dawn", 28), ("First Seed", 31),
+    ("Rain's Hand", 30), ("Second Seed", 31), ("Midyear", 30),
+    ("Sun's Height", 31), ("Last Seed", 31), ("Hearthfire", 30),
+    ("Frostfall", 31), ("Sun's Dusk", 30), ("Evening Star", 31),
+)
+DAYS_PER_YEAR = sum(days for _, days in MONTHS)
+
+_MONTH_INDEX = {name.lower(): i for i, (name, _) in enumerate(MONTHS)}
+_DATE_RE = re.compile(
+    r"^\s*(\d+)(?:st|nd|rd|th)?\s+of\s+(.+?),\s*(\d+)E\s+(\d+)\s*$", re.IGNORECASE)
+
+
+def _ordinal(n):
+    if 11 <= n % 100 <= 13:
+        return f"{n}th"
+    return f"{n}" + {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')
+
+
+def parse_date(text):
+    """
+    Parse a date such as "17th of Last Seed, 4E 201".
+
+    Returns:
+        tuple: (era, year, month index, day of month), or None if unparsable
+    """
+    match = _DATE_RE.match(text) if isinstance(text, str) else None
+    if not match:
+        return None
+    day, month, era, year = match.groups()
+    month_index = _MONTH_INDEX.get(" ".join(month.lower().split()))
+    if month_index is None or not 1 <= int(day) <= MONTHS[month_index][1]:
+        return None
+    return int(era), int(year), month_index, int(day)
+
+
+def format_date(era, year, month_index, day):
+    """Format a date as "17th of Last Seed, 4E 201"."""
+    return f"{_ordinal(day)} of {MONTHS[month_index][0]}, {era}E {year}"
+
+
+def to_day_number(era, year, month_index, day):
+    """Days since the start of year 0 of the era (eras are not linked)."""
+    return year * DAYS_PER_YEAR + sum(days for _, days in MONTHS[:month_index]) + day - 1
+
+
+def from_day_number(era, number):
+    """Inverse of to_day_number: (era, year, month index, day of month)."""
+    year, day_of_year = divmod(number, DAYS_PER_YEAR)
+    for month_index, (_, days) in enumerate(MONTHS):
+        if day_of_year < days:
+            break
+        day_of_year -= days
+    return era, year, month_index, day_of_year + 1
+
+
+def add_days(text, days):
+    """
+    Move a formatted date forward (or back) by whole days.
+
+    Returns:
+        str: The new date, or the original text if it could not be parsed
+    """
+    parsed = parse_date(text)
+    if parsed is None:
+        return text
+    era = parsed[0]
+    return format_date(*from_day_number(era, to_day_number(*parsed) + int(days)))
+
+
+class EventScheduler:
+    """Priority queue of timed events ordered by due day, then insertion."""
+
+    def __init__(self, events=None):
+        self._heap = []
+        self._next_id = 1
+        for event in events or []:
+            if isinstance(event, dict) and isinstance(event.get('day'), (int, float)):
+                self._push(dict(event))
+
+    def _push(self, event):
+        if not isinstance(event.get('id'), int):
+            event['id'] = self._next_id
+        self._next_id = max(self._next_id, event['id'] + 1)
+        heapq.heappush(self._heap, (event['day'], event['id'], event))
+
+    def __len__(self):
+        return len(self._heap)
+
+    def schedule(self, day, kind, every=None, **payload):
+        """
+        Queue an event for a campaign day.
+
+        Args:
+            day: in_game_days_passed value the event falls due on
+            kind: Event kind (see StoryProgressionManager.EVENT_KINDS)
+            every: Repeat interval in days for recurring events (optional)
+            **payload: Kind-specific fields
+
+        Returns:
+            dict: The queued event (with its assigned id)
+        """
+        if not isinstance(day, (int, float)):
+            raise ValueError(f"day must be a number, got {day!r}")
+        if every is not None and (not isinstance(every, (int, float)) or every <= 0):
+            raise ValueError(f"every must be a positive number, got {every!r}")
+        event = {'day': day, 'kind': kind, **payload}
+        if every is not None:
+            event['every'] = every
+        self._push(event)
+        return event
+
+    def requeue(self, event):
+        """Put a popped event back under its id and day (e.g. if it could not be applied yet)."""
+        self._push(dict(event))
+
+    def cancel(self, event_id):
+        """Remove a queued event by id. Returns True if it was queued."""
+        kept = [entry for entry in self._heap if entry[1] != event_id]
+        if len(kept) == len(self._heap):
+            return False
+        self._heap = kept
+        heapq.heapify(self._heap)
+        return True
+
+    def peek(self):
+        """The next event due, or None."""
+        return self._heap[0][2] if self._heap else None
+
+    def pop_due(self, until_day):
+        """
+        Yield every event due on or before until_day, in order.
+
+        A recurring event is re-queued for its next occurrence before being
+        yielded, so a daily event yields once for each day skipped. Each
+        yielded event is a copy stamped with the day it fell due.
+        """
+        while self._heap and self._heap[0][0] <= until_day:
+            day, event_id, event = heapq.heappop(self._heap)
+            if event.get('every'):
+                heapq.heappush(self._heap, (day + event['every'], event_id,
+                                            {**event, 'day': day + event['every']}))
+            yield dict(event)
+
+    def to_list(self):
+        """Queued events in due order, for storing in the world state."""
+        return [event for _, _, event in sorted(self._heap, key=lambda entry: entry[:2])]
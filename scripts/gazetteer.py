@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Location Gazetteer for Skyrim TTRPG
+
+One index of every place the data knows about, replacing substring
+matching of location strings (utils.location_matches):
+- Places come from data/holds/*.json (the hold, its capital, districts,
+  major_locations and major_settlements) and from the "location" field of
+  every stat sheet ("Ruins, towers, caves" is three places)
+- Each place has a canonical id, a display name and aliases; holds and their
+  capitals form a hierarchy (hold > capital > districts, hold > locations)
+- Names are compared as normalized tokens (case, punctuation, "the"/"of"
+  and plural "s" ignored), looked up through an inverted token index
+- Every stat sheet is tagged with the places its location names, so a
+  location query is a set lookup, not a scan of the stat sheet files
+
+Query matching:
+- A query that names a place matches it and everything inside it
+  ("The Pale" includes Dawnstar and its districts)
+- Places whose names contain all of the query's tokens ("ruins" finds
+  "Ancient Nordic Ruins") match too, as do named places the query contains
+  ("Whiterun Plains District" finds "Whiterun"), without their sub-places;
+  generic stat sheet places are not matched that way ("Forsworn camps"
+  does not find every "camps")
+
+The index is rebuilt when a file in data/holds or data/npc_stat_sheets is
+added, removed or changed.
+
+Usage:
+    python3 gazetteer.py                  # holds and their places
+    python3 gazetteer.py "The Pale"       # places and stat sheets matching a query
+"""
+
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+from storage import open_storage
+
+STOPWORDS = {"the", "of", "a", "an", "in", "at", "near", "across", "any"}
+PART_SEPARATOR = re.compile(r"\s*(?:[,/;()]|\band\b|\bor\b)\s*", re.IGNORECASE)
+PARENTHETICAL = re.compile(r"\s*\(.*?\)\s*")
+MAX_NAME_TOKENS = 5
+
+
+def _token(word):
+    # Crude plural folding so "ruins"/"ruin" and "caves"/"cave" meet
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokens(text):
+    """Normalized name tokens: lowercase words without punctuation, stopwords or plural 's'."""
+    words = re.findall(r"[a-z0-9]+", text.lower().replace("'", ""))
+    return tuple(_token(w) for w in words if w not in STOPWORDS)
+
+
+def hold_short_name(name):
+    """ "Whiterun Hold" -> "Whiterun" (the form stat sheet hold_context lists use)."""
+    return re.sub(r"\s+hold$", "", name.strip(), flags=re.IGNORECASE)
+
+
+def _slug(text):
+    return "_".join(re.findall(r"[a-z0-9]+", text.lower().replace("'", "")))
+
+
+def _names(value):
+    """Names from a list of strings or {"name": ...} records, without "(City)"-style qualifiers."""
+    names = []
+    for item in value if isinstance(value, list) else []:
+        name = item.get("name") if isinstance(item, dict) else item
+        if isinstance(name, str) and name.strip():
+            names.append(PARENTHETICAL.sub(" ", name).strip())
+    return names
+
+
+@dataclass
+class Place:
+    id: str
+    name: str
+    kind: str                   # hold, city, district, location or feature (from stat sheets only)
+    parent: Optional[str] = None
+    aliases: List[tuple] = field(default_factory=list)   # token tuples
+    children: List[str] = field(default_factory=list)
+
+
+class Gazetteer:
+    def __init__(self, data_dir="../data", storage=None):
+        """
+        Initialize the Gazetteer.
+
+        Args:
+            data_dir: Path to the data directory
+            storage: Storage backend (default: open_storage(data_dir))
+        """
+        self.data_dir = Path(data_dir)
+        self.storage = storage or open_storage(self.data_dir)
+        self.places = {}
+        self._aliases = {}          # token tuple -> {place id}
+        self._token_index = {}      # token -> {place id}
+        self._hold_names = {}       # token tuple -> hold id ("Whiterun" and "Whiterun Hold")
+        self._sheets = {}           # place id -> {stat sheet id}
+        self._sheet_places = {}     # stat sheet id -> {place id}
+        self._queries = {}          # token tuple -> {place id}
+        self._sheet_queries = {}    # token tuple -> {stat sheet id}
+        self._signature = None
+        self.version = 0            # bumped on every rebuild, for indexes built on top of this one
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def signature(self):
+        entries = []
+        for directory in (self.data_dir / "holds", self.data_dir / "npc_stat_sheets"):
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.name.endswith(".json") and entry.is_file():
+                            st = entry.stat()
+                            entries.append((entry.path, st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                continue
+        return tuple(sorted(entries))
+
+    def refresh(self):
+        """Rebuild the index if a hold or stat sheet file changed since the last build."""
+        signature = self.signature()
+        if signature != self._signature:
+            self.build()
+            self._signature = signature
+        return self
+
+    def invalidate(self):
+        """Force a rebuild on next use (for writes that do not touch the JSON files)."""
+        self._signature = None
+
+    def _add(self, name, kind, parent=None):
+        """Register a place (or return the one already known by that name under the same parent)."""
+        key = tokens(name)
+        if not key:
+            return None
+        for place_id in sorted(self._aliases.get(key, ())):
+            if self.places[place_id].parent == parent:
+                return place_id
+        place_id = _slug(name)
+        if place_id in self.places:
+            place_id = f"{parent}_{place_id}" if parent else f"{kind}_{place_id}"
+        self.places[place_id] = Place(place_id, name, kind, parent)
+        if parent:
+            self.places[parent].children.append(place_id)
+        self._alias(place_id, name)
+        return place_id
+
+    def _alias(self, place_id, name):
+        key = tokens(name)
+        if key and key not in self.places[place_id].aliases:
+            self.places[place_id].aliases.append(key)
+            self._aliases.setdefault(key, set()).add(place_id)
+            for token in key:
+                self._token_index.setdefault(token, set()).add(place_id)
+
+    def build(self):
+        """(Re)load every hold and stat sheet location."""
+        self.places, self._aliases, self._token_index, self._hold_names = {}, {}, {}, {}
+        self._sheets, self._sheet_places, self._queries, self._sheet_queries = {}, {}, {}, {}
+        self.version += 1
+
+        holds = [doc for _, doc in self.storage.iter_documents("holds") if isinstance(doc, dict)]
+        short_names = []
+        for hold in holds:
+            hold_name = hold.get("hold")
+            if not isinstance(hold_name, str) or not hold_name.strip():
+                continue
+            hold_id = self._add(hold_name, "hold")
+            short = hold_short_name(hold_name)
+            for name in (hold_name, short):
+                self._hold_names.setdefault(tokens(name), hold_id)
+            short_names.append((hold_id, short))
+
+            capital = hold.get("capital")
+            capital_id = self._add(capital, "city", hold_id) if isinstance(capital, str) else None
+            for name in _names(hold.get("major_locations")) + _names(hold.get("major_settlements")):
+                self._add(name, "city" if name == capital else "location", hold_id)
+            for name in _names(hold.get("districts")):
+                self._add(name, "district", capital_id or hold_id)
+        # "Whiterun" names the city; a hold only gets its short name if no place has it
+        for hold_id, short in short_names:
+            if tokens(short) not in self._aliases:
+                self._alias(hold_id, short)
+
+        known = dict(self._aliases)
+        for sheet_id, sheet in self.storage.iter_documents("npc_stat_sheets"):
+            if not isinstance(sheet, dict):
+                continue
+            location = sheet.get("location")
+            if isinstance(location, list):
+                location = ", ".join(l for l in location if isinstance(l, str))
+            if not isinstance(location, str):
+                continue
+            tagged = set()
+            for part in PART_SEPARATOR.split(location):
+                part_tokens = tokens(part)
+                if not part_tokens:
+                    continue
+                if part_tokens in self._aliases:
+                    tagged |= self._aliases[part_tokens]
+                else:
+                    tagged.add(self._add(part, "feature"))
+                # Known places named inside a longer phrase ("Deep wilderness in The Rift")
+                for n in range(1, min(MAX_NAME_TOKENS, len(part_tokens)) + 1):
+                    for i in range(len(part_tokens) - n + 1):
+                        tagged.update(known.get(part_tokens[i:i + n], ()))
+            self._sheet_places[sheet_id] = tagged
+            for place_id in tagged:
+                self._sheets.setdefault(place_id, set()).add(sheet_id)
+        return self
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def get(self, place_id) -> Optional[Place]:
+        return self.places.get(place_id)
+
+    def named(self, name):
+        """Ids of the places called exactly this (after normalization), sorted."""
+        self.refresh()
+        return sorted(self._aliases.get(tokens(name), ())) if isinstance(name, str) else []
+
+    def hold_of(self, place_id):
+        """Id of the hold a place lies in, or None."""
+        while place_id in self.places:
+            if self.places[place_id].kind == "hold":
+                return place_id
+            place_id = self.places[place_id].parent
+        return None
+
+    def capital(self, hold_id):
+        """Id of a hold's capital city, or None."""
+        place = self.places.get(hold_id)
+        for child in place.children if place else ():
+            if self.places[child].kind == "city":
+                return child
+        return None
+
+    def descendants(self, place_id):
+        """A place id and every place inside it."""
+        found, stack = set(), [place_id]
+        while stack:
+            current = stack.pop()
+            if current in found or current not in self.places:
+                continue
+            found.add(current)
+            stack.extend(self.places[current].children)
+        return found
+
+    def resolve(self, query):
+        """
+        Place ids matching a location query.
+
+        Returns:
+            set: Places named by the query (with everything inside them),
+            places whose names contain the query, and named places the query contains
+        """
+        self.refresh()
+        if not isinstance(query, str):
+            return set()
+        key = tokens(query)
+        if not key:
+            return set()
+        if key in self._queries:
+            return set(self._queries[key])
+        matched = set()
+        for place_id in self._aliases.get(key, ()):
+            matched |= self.descendants(place_id)
+        wanted = set(key)
+        candidates = set().union(*(self._token_index.get(t, set()) for t in key))
+        for place_id in candidates - matched:
+            broader_ok = self.places[place_id].kind != "feature"
+            for alias in self.places[place_id].aliases:
+                if wanted <= set(alias) or (broader_ok and set(alias) <= wanted):
+                    matched.add(place_id)
+                    break
+        self._queries[key] = matched
+        return set(matched)
+
+    def hold(self, name):
+        """Hold id for a hold name ("Whiterun", "Whiterun Hold", "The Rift"), or None."""
+        self.refresh()
+        return self._hold_names.get(tokens(name)) if isinstance(name, str) else None
+
+    def sheets_at(self, query):
+        """Ids of the stat sheets whose location matches a query (see resolve())."""
+        places = self.resolve(query)
+        key = tokens(query) if isinstance(query, str) else ()
+        if key not in self._sheet_queries:
+            self._sheet_queries[key] = set().union(*(self._sheets.get(p, set()) for p in places))
+        return set(self._sheet_queries[key])
+
+    def sheets_in_hold(self, name):
+        """Ids of the stat sheets located anywhere in a hold (or matching the name, if not a hold)."""
+        hold_id = self.hold(name)
+        if hold_id is None:
+            return self.sheets_at(name)
+        sheets = set()
+        for place_id in self.descendants(hold_id):
+            sheets |= self._sheets.get(place_id, set())
+        return sheets
+
+    def places_of(self, sheet_id):
+        """Place ids a stat sheet's location names."""
+        self.refresh()
+        return set(self._sheet_places.get(sheet_id, ()))
+
+
+def main():
+    """CLI for the location gazetteer"""
+    data_dir = Path(__file__).resolve().parents[1] / "data"
+    gazetteer = Gazetteer(data_dir).refresh()
+    if len(sys.argv) > 1:
+        query = " ".join(sys.argv[1:])
+        matched = gazetteer.resolve(query)
+        print(f"Places matching '{query}' ({len(matched)}):")
+        for place_id in sorted(matched):
+            place = gazetteer.get(place_id)
+            print(f"  {place_id} - {place.name} ({place.kind})")
+        sheets = sorted(gazetteer.sheets_at(query))
+        print(f"Stat sheets ({len(sheets)}): {', '.join(sheets) or 'none'}")
+        return
+    for place in gazetteer.places.values():
+        if place.kind != "hold":
+            continue
+        print(f"{place.name} [{place.id}]")
+        for child in sorted(gazetteer.descendants(place.id) - {place.id}):
+            print(f"  - {gazetteer.get(child).name} ({gazetteer.get(child).kind})")
+    features = sum(1 for p in gazetteer.places.values() if p.kind == "feature")
+    print(f"\n{len(gazetteer.places)} places ({features} from stat sheet locations only)")
+
+
+if __name__ == "__main__":
+    main()
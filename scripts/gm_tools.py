@@ -8,28 +8,111 @@ This script provides Game Master tools for:
 - Response guidelines for situations
 - Campaign overview and insights
 - Quick reference to important data
+- Pre-session data validation
 """
 
 import json
 import os
 from pathlib import Path
 from datetime import datetime
-from utils import location_matches
+from gazetteer import Gazetteer
+from data_validation import CACHE_NAME, DataValidator, format_report
+from campaign_snapshot import open_snapshot
+from json_io import load_json
 
 
 class GMTools:
-    def __init__(self, data_dir="../data", state_dir="../state"):
+    def __init__(self, data_dir="../data", state_dir="../state", snapshot=None):
         self.data_dir = Path(data_dir)
         self.state_dir = Path(state_dir)
         self.npc_stat_sheets_dir = self.data_dir / "npc_stat_sheets"
+        # Optional CampaignSnapshot; up-to-date documents are read from it instead of JSON
+        self.snapshot = snapshot
+        # Parsed data/ documents by relative path, kept only while a DataWatcher is attached
+        self._watched_docs = None
+        # Location gazetteer, built on first use (see gazetteer())
+        self._gazetteer = None
+        
+    def gazetteer(self):
+        """Location gazetteer over this data directory, kept current."""
+        if self._gazetteer is None:
+            self._gazetteer = Gazetteer(self.data_dir)
+        return self._gazetteer.refresh()
+    
+    def watch(self, watcher):
+        """
+        Serve data/ reads (factions, arcs, stat sheets) from memory,
+        updated incrementally by a DataWatcher.
         
+        Args:
+            watcher: DataWatcher over this instance's data directory
+        """
+        self._watched_docs = watcher.documents()
+        watcher.subscribe(self._apply_changes)
+    
+    def _apply_changes(self, events):
+        for event in events:
+            if event.after is None:
+                self._watched_docs.pop(event.path, None)
+            else:
+                self._watched_docs[event.path] = event.after
+    
+    def _watched_path(self, filepath):
+        """Relative data/ path for a file served from the watch cache, or None."""
+        if self._watched_docs is None:
+            return None
+        try:
+            return Path(filepath).resolve().relative_to(self.data_dir.resolve()).as_posix()
+        except ValueError:
+            return None
+    
     def load_json(self, filepath):
         """Helper to load JSON file"""
+        rel = self._watched_path(filepath)
+        if rel is not None:
+            return self._watched_docs.get(rel)
+        if self.snapshot is not None:
+            return self.snapshot.load(filepath)
         if filepath.exists():
-            with open(filepath, 'r') as f:
-                return json.load(f)
+            return load_json(filepath)
         return None
     
+    def iter_stat_sheets(self, warn=True):
+        """
+        Yield every NPC/enemy stat sheet.
+        
+        Args:
+            warn: Print a warning for stat sheets that cannot be read
+        """
+        if self._watched_docs is not None:
+            for rel, stat_sheet in sorted(self._watched_docs.items()):
+                if rel.startswith("npc_stat_sheets/") and rel.count("/") == 1 and isinstance(stat_sheet, dict):
+                    yield stat_sheet
+            return
+        if self.snapshot is not None:
+            stat_files = [self.npc_stat_sheets_dir / n for n in self.snapshot.list_json(self.npc_stat_sheets_dir)]
+        else:
+            stat_files = self.npc_stat_sheets_dir.glob("*.json")
+        for stat_file in stat_files:
+            try:
+                stat_sheet = self.load_json(stat_file)
+            except (json.JSONDecodeError, IOError) as e:
+                if warn:
+                    print(f"Warning: Error reading {stat_file.name}: {e}")
+                continue
+            yield stat_sheet
+    
+    def pre_session_check(self):
+        """Validate every data file against its schema; returns True if all are valid"""
+        print("\n" + "="*70)
+        print("PRE-SESSION DATA CHECK")
+        print("="*70 + "\n")
+        validator = DataValidator(self.data_dir, cache_path=self.state_dir / CACHE_NAME)
+        report = validator.validate_all()
+        for line in format_report(report):
+            print(line)
+        return not report["errors"]
+
     def view_all_clocks(self):
         """Display all active clocks in the campaign"""
         print("\n" + "="*70)
@@ -412,31 +495,30 @@ NPC attitudes:
             'recommended': []
         }
         
-        # Load all stat sheets
-        for stat_file in self.npc_stat_sheets_dir.glob("*.json"):
-            try:
-                with open(stat_file, 'r') as f:
-                    stat_sheet = json.load(f)
-                
-                # Filter by location if provided (partial match in either direction)
-                if location:
-                    sheet_location = stat_sheet.get('location', '')
-                    if not location_matches(location, sheet_location):
-                        continue
-                
-                suggestions['available'].append(stat_sheet)
-                
-                # Check scene triggers for recommendations
-                scene_triggers = stat_sheet.get('scene_triggers', [])
-                if scene_type:
-                    for trigger in scene_triggers:
-                        if scene_type.lower() in trigger.lower():
-                            suggestions['recommended'].append(stat_sheet)
-                            break
+        # With a location, load only the stat sheets the gazetteer places there
+        if location:
+            stat_sheets = []
+            for sheet_id in sorted(self.gazetteer().sheets_at(location)):
+                try:
+                    stat_sheet = self.load_json(self.npc_stat_sheets_dir / f"{sheet_id}.json")
+                except (json.JSONDecodeError, IOError) as e:
+                    print(f"Warning: Error reading {sheet_id}.json: {e}")
+                    continue
+                if stat_sheet:
+                    stat_sheets.append(stat_sheet)
+        else:
+            stat_sheets = self.iter_stat_sheets()
+        
+        for stat_sheet in stat_sheets:
+            suggestions['available'].append(stat_sheet)
             
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Warning: Error reading {stat_file.name}: {e}")
-                continue
+            # Check scene triggers for recommendations
+            scene_triggers = stat_sheet.get('scene_triggers', [])
+            if scene_type:
+                for trigger in scene_triggers:
+                    if scene_type.lower() in trigger.lower():
+                        suggestions['recommended'].append(stat_sheet)
+                        break
         
         # Display results
         print(f"\nLocation: {location or 'Any'}")
@@ -496,25 +578,17 @@ NPC attitudes:
         encounter_enemies = []
         seen_ids = set()
         
-        for stat_file in self.npc_stat_sheets_dir.glob("*.json"):
-            try:
-                with open(stat_file, 'r') as f:
-                    stat_sheet = json.load(f)
-                
-                stat_id = stat_sheet.get('id')
-                
-                # Check if enemy type matches and not already added
-                if stat_id not in seen_ids:
-                    for enemy_type in enemy_types:
-                        if (enemy_type.lower() in stat_sheet.get('name', '').lower() or
-                            enemy_type.lower() in stat_sheet.get('type', '').lower()):
-                            encounter_enemies.append(stat_sheet)
-                            seen_ids.add(stat_id)
-                            break
+        for stat_sheet in self.iter_stat_sheets():
+            stat_id = stat_sheet.get('id')
             
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Warning: Error reading {stat_file.name}: {e}")
-                continue
+            # Check if enemy type matches and not already added
+            if stat_id not in seen_ids:
+                for enemy_type in enemy_types:
+                    if (enemy_type.lower() in stat_sheet.get('name', '').lower() or
+                        enemy_type.lower() in stat_sheet.get('type', '').lower()):
+                        encounter_enemies.append(stat_sheet)
+                        seen_ids.add(stat_id)
+                        break
         
         # Display encounter
         if encounter_enemies:
@@ -561,16 +635,10 @@ NPC attitudes:
         # Try to find NPC in stat sheets
         npc_data = None
         if self.npc_stat_sheets_dir.exists():
-            for stat_file in self.npc_stat_sheets_dir.glob("*.json"):
-                try:
-                    with open(stat_file, 'r') as f:
-                        stat_sheet = json.load(f)
-                    
-                    if npc_name.lower() in stat_sheet.get('name', '').lower():
-                        npc_data = stat_sheet
-                        break
-                except (json.JSONDecodeError, IOError):
-                    continue
+            for stat_sheet in self.iter_stat_sheets(warn=False):
+                if npc_name.lower() in stat_sheet.get('name', '').lower():
+                    npc_data = stat_sheet
+                    break
         
         if npc_data:
             print(f"\nNPC: {npc_data['name']}")
@@ -671,15 +739,10 @@ NPC attitudes:
             stat = self.load_json(self.npc_stat_sheets_dir / f"{npc_id}.json")
             if not stat and self.npc_stat_sheets_dir.exists():
                 # If file not found by npc_id, search all stat sheets for matching ID
-                for stat_file in self.npc_stat_sheets_dir.glob("*.json"):
-                    try:
-                        with open(stat_file, 'r') as f:
-                            stat_sheet = json.load(f)
-                        if stat_sheet.get('id') == npc_id:
-                            stat = stat_sheet
-                            break
-                    except (json.JSONDecodeError, IOError):
-                        continue
+                for stat_sheet in self.iter_stat_sheets(warn=False):
+                    if stat_sheet.get('id') == npc_id:
+                        stat = stat_sheet
+                        break
             
             threshold_desc = None
             if stat and "companion_mechanics" in stat:
@@ -721,7 +784,8 @@ NPC attitudes:
 
 def main():
     """Main function"""
-    tools = GMTools()
+    # Start from the binary snapshot when one has been built (campaign_snapshot.py build)
+    tools = GMTools(snapshot=open_snapshot())
     
     print("Skyrim GM Tools")
     print("===============\n")
@@ -737,10 +801,11 @@ def main():
     print("9. Get NPC Relationship Advice")
     print("10. Tri-Check System Resolution")
     print("11. Review Companion Loyalty")
-    print("12. Exit")
+    print("12. Pre-Session Data Check")
+    print("13. Exit")
     
     while True:
-        choice = input("\nEnter choice (1-12): ").strip()
+        choice = input("\nEnter choice (1-13): ").strip()
         
         if choice == "1":
             tools.view_all_clocks()
@@ -795,11 +860,14 @@ def main():
             tools.review_companion_loyalty()
         
         elif choice == "12":
+            tools.pre_session_check()
+        
+        elif choice == "13":
             print("Goodbye!")
             break
         
         else:
-            print("Invalid choice. Please enter 1-12.")
+            print("Invalid choice. Please enter 1-13.")
 
 
 if __name__ == "__main__":
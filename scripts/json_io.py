@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Shared JSON Decoding for Skyrim TTRPG
+
+One tolerant, fast way to read the repo's JSON files:
+- The text encoding of each file is sniffed once (BOM, then UTF-8, then
+  cp1252, then latin-1) and remembered per path, so later loads decode
+  directly instead of trying encodings in turn
+- UTF-8 files (almost all of them) are parsed straight from bytes with
+  orjson when it is installed, falling back to the standard json module
+  (also used for anything orjson rejects, such as NaN literals)
+- Errors match the standard library: OSError for unreadable files,
+  json.JSONDecodeError for malformed JSON
+
+Usage:
+    from json_io import load_json
+    data = load_json(path)
+"""
+
+import codecs
+import json
+import os
+import threading
+from pathlib import Path
+
+# orjson is optional; the standard library gives the same results, more slowly
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Encodings tried by sniff_encoding(), in order
+FALLBACK_ENCODINGS = ("cp1252", "latin-1")
+
+_encodings = {}
+_lock = threading.Lock()
+
+
+def sniff_encoding(data):
+    """Best text encoding for raw file bytes."""
+    if data.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if data.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    try:
+        data.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    for encoding in FALLBACK_ENCODINGS:
+        try:
+            data.decode(encoding)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return "latin-1"
+
+
+def encoding_for(path):
+    """Encoding remembered for a path (None if it has not been read yet)."""
+    return _encodings.get(os.fspath(path))
+
+
+def clear_cache():
+    """Forget every remembered encoding."""
+    with _lock:
+        _encodings.clear()
+
+
+def _encoding(data, key=None):
+    """Remembered encoding for key if it still fits the data's BOM, else sniff and remember."""
+    encoding = _encodings.get(key) if key is not None else None
+    # Legacy single-byte encodings decode anything, so those files are re-sniffed in
+    # case they have since been saved as UTF-8 (as the old try-in-order loaders did)
+    if (encoding is not None and encoding not in FALLBACK_ENCODINGS
+            and (encoding == "utf-8-sig") == data.startswith(codecs.BOM_UTF8)):
+        return encoding
+    encoding = sniff_encoding(data)
+    if key is not None:
+        with _lock:
+            _encodings[key] = encoding
+    return encoding
+
+
+def _decode(data, key=None):
+    """Decode bytes with the remembered encoding, re-sniffing if it no longer fits."""
+    try:
+        return data.decode(_encoding(data, key))
+    except UnicodeDecodeError:
+        with _lock:
+            _encodings.pop(key, None)
+        return data.decode(_encoding(data, key), errors="replace")
+
+
+def loads(data, key=None):
+    """
+    Parse JSON from bytes or str.
+
+    Args:
+        data: Raw file bytes (any supported encoding) or text
+        key: Path the bytes came from, used to remember their encoding
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = bytes(data)
+        if ORJSON_AVAILABLE and _encoding(data, key) == "utf-8":
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass  # NaN literals, malformed JSON or no longer UTF-8: let json decide
+        return json.loads(_decode(data, key))
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def read_text(path):
+    """Read a text file, decoding with its (sniffed, remembered) encoding."""
+    return _decode(Path(path).read_bytes(), os.fspath(path))
+
+
+def load_json(path):
+    """
+    Load a JSON file in any of the encodings the repo has seen.
+
+    Raises:
+        OSError: If the file cannot be read
+        json.JSONDecodeError: If the content is not valid JSON
+    """
+    return loads(Path(path).read_bytes(), os.fspath(path))
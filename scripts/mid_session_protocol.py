@@ -5,27 +5,26 @@ import argparse
 import json
 import os
 import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+from json_io import load_json, read_text
+
 # ---------------------------
 # Utilities
 # ---------------------------
 
 def read_text_safely(path: Path) -> str:
-    data = path.read_bytes()
-    for enc in ("utf-8-sig", "utf-8", "cp1252", "latin-1"):
-        try:
-            return data.decode(enc)
-        except Exception:
-            continue
-    return data.decode("latin-1", errors="replace")
+    return read_text(path)
 
 def read_json_safely(path: Path) -> Any:
-    txt = read_text_safely(path)
-    return json.loads(txt)
+    return load_json(path)
 
 def find_repo_root(start: Path) -> Path:
     cur = start.resolve()
@@ -239,7 +238,7 @@ def summarize_relationships(state: Dict[str, Any]) -> List[Tuple[str, Any]]:
         return items[:6]
     return []
 
-def top_clocks(repo: Path) -> List[ClockView]:
+def clock_sources(repo: Path) -> List[Tuple[str, Path]]:
     clock_sources: List[Tuple[str, Path]] = []
 
     for folder in ("clocks",):
@@ -253,15 +252,21 @@ def top_clocks(repo: Path) -> List[ClockView]:
     if d2.exists():
         for p in d2.rglob("*.json"):
             clock_sources.append((str(p.relative_to(repo)), p))
+    return clock_sources
 
+def read_clocks(label: str, path: Path) -> List[ClockView]:
+    try:
+        return extract_clocks(read_json_safely(path), source=label)
+    except Exception:
+        return []
+
+def top_clocks(repo: Path) -> List[ClockView]:
     all_clocks: List[ClockView] = []
-    for label, p in clock_sources:
-        try:
-            obj = read_json_safely(p)
-            all_clocks.extend(extract_clocks(obj, source=label))
-        except Exception:
-            continue
+    for label, p in clock_sources(repo):
+        all_clocks.extend(read_clocks(label, p))
+    return rank_clocks(all_clocks)
 
+def rank_clocks(all_clocks: List[ClockView]) -> List[ClockView]:
     # De-dup loosely by (name, source)
     uniq: Dict[Tuple[str, str], ClockView] = {}
     for c in all_clocks:
@@ -279,11 +284,72 @@ def latest_log(repo: Path) -> Optional[Path]:
         return None
     return newest_file(sorted(logs_dir.glob("*.md")))
 
-def checkpoint_append(log_path: Path, text: str) -> None:
-    stamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    block = f"\n\n---\n## Mid-Session Checkpoint ({stamp})\n{text.strip()}\n"
-    existing = read_text_safely(log_path) if log_path.exists() else ""
-    log_path.write_text(existing + block, encoding="utf-8")
+# ---------------------------
+# Structured session event log
+# ---------------------------
+#
+# Every checkpoint/event is one JSON line in logs/<log>.events.jsonl, opened
+# in append mode. The markdown log gets the rendered block appended (never
+# rewritten), and can be re-rendered from the event log at any time.
+
+EVENT_LOG_SUFFIX = ".events.jsonl"
+
+def event_log_path(log_path: Path) -> Path:
+    return log_path.with_name(log_path.stem + EVENT_LOG_SUFFIX)
+
+def append_event(events_path: Path, kind: str, text: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    record: Dict[str, Any] = {
+        "ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "kind": kind,
+        "text": text.strip(),
+    }
+    if context:
+        record["context"] = context
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    # If a previous write was torn, start on a fresh line so this record stays readable
+    if events_path.exists() and events_path.stat().st_size > 0:
+        with open(events_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                line = "\n" + line
+    with open(events_path, "a", encoding="utf-8") as f:
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+    return record
+
+def read_events(events_path: Path) -> List[Dict[str, Any]]:
+    events: List[Dict[str, Any]] = []
+    if not events_path.exists():
+        return events
+    for line in read_text_safely(events_path).splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            events.append(json.loads(line))
+        except json.JSONDecodeError:
+            # A torn final line from a crash mid-write; everything before it is intact
+            continue
+    return events
+
+def render_event(record: Dict[str, Any]) -> str:
+    if record.get("kind") == "checkpoint":
+        return f"\n\n---\n## Mid-Session Checkpoint ({record.get('ts', '')})\n{record.get('text', '')}\n"
+    return f"\n- [{record.get('ts', '')}] {record.get('text', '')}\n"
+
+def render_events(events_path: Path) -> str:
+    return "".join(render_event(r) for r in read_events(events_path))
+
+def log_event(log_path: Path, kind: str, text: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Record an event and append its markdown rendering; O(1) in log size."""
+    record = append_event(event_log_path(log_path), kind, text, context)
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(render_event(record))
+    return record
+
+def checkpoint_append(log_path: Path, text: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return log_event(log_path, "checkpoint", text, context)
 
 def dragonbreak_heuristic(clocks: List[ClockView], state: Dict[str, Any]) -> str:
     # Simple heuristic: if any clock >= 75% or any 'major_event' flags, suggest DB potential.
@@ -378,159 +444,437 @@ def build_options(state: Dict[str, Any], pc: Dict[str, Any], eff: Dict[str, Any]
         opts.append("5) Wildcard: Spend a Fate Point to declare a helpful detail (a contact, a shortcut, a weakness) and capitalize immediately")
     return opts
 
-def main() -> int:
-    ap = argparse.ArgumentParser(description="Mid-session protocol: recap + clocks + options + checkpoint.")
-    ap.add_argument("--checkpoint", default="", help="If provided, appends a Mid-Session Checkpoint block to the latest log.")
-    args = ap.parse_args()
-
-    repo = find_repo_root(Path.cwd())
-
-    # Load state
+def load_state(repo: Path) -> Tuple[Dict[str, Any], List[str]]:
+    warnings: List[str] = []
     state_path = repo / "state" / "campaign_state.json"
     state: Dict[str, Any] = {}
     if state_path.exists():
         try:
             state = read_json_safely(state_path)
         except Exception as e:
-            print(f"[WARN] Could not parse {state_path}: {e}")
+            warnings.append(f"[WARN] Could not parse {state_path}: {e}")
     else:
-        print("[WARN] state/campaign_state.json not found. Output will be partial.")
+        warnings.append("[WARN] state/campaign_state.json not found. Output will be partial.")
+    return state, warnings
 
-    # Load primary PC
-    pc_path = pick_primary_pc(repo, state)
+def load_pc(pc_path: Optional[Path]) -> Tuple[Dict[str, Any], List[str]]:
+    warnings: List[str] = []
     pc: Dict[str, Any] = {}
     if not pc_path:
-        print("[WARN] No primary PC found. Run Session Zero to create a character in data/pcs/ and set state.active_pc_id.")
+        warnings.append("[WARN] No primary PC found. Run Session Zero to create a character in data/pcs/ and set state.active_pc_id.")
     elif pc_path.exists():
         try:
             pc = read_json_safely(pc_path)
         except Exception as e:
-            print(f"[WARN] Could not parse {pc_path}: {e}")
+            warnings.append(f"[WARN] Could not parse {pc_path}: {e}")
     else:
-        print("[WARN] No PC json found in data/pcs/. Output will be partial.")
-
-    # Compute effective skills
-    eff = compute_effective_skills(repo, pc)
+        warnings.append("[WARN] No PC json found in data/pcs/. Output will be partial.")
+    return pc, warnings
 
-    # Clocks
-    clocks = top_clocks(repo)
-
-    # Latest log
-    log_path = latest_log(repo)
+def scene_context(state: Dict[str, Any], pc: Dict[str, Any], pc_path: Optional[Path]) -> Dict[str, str]:
+    return {
+        "scene_id": state.get("current_scene_id") or state.get("scene_id") or "UNKNOWN",
+        "location": state.get("current_location") or state.get("starting_location") or "UNKNOWN",
+        "objective": state.get("current_objective") or state.get("session_objective") or "(not set)",
+        "pc": pc.get("name") or pc.get("character_name") or (pc_path.stem if pc_path else "PC"),
+    }
 
-    # Output
-    print("=" * 78)
-    print("MID-SESSION PROTOCOL")
-    print("=" * 78)
-    print(f"Repo Root: {repo}")
-    print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+def format_report(repo: Path, state: Dict[str, Any], pc: Dict[str, Any], pc_path: Optional[Path],
+                  eff: Dict[str, Any], clocks: List[ClockView], log_path: Optional[Path]) -> List[str]:
+    out: List[str] = []
+    out.append("=" * 78)
+    out.append("MID-SESSION PROTOCOL")
+    out.append("=" * 78)
+    out.append(f"Repo Root: {repo}")
+    out.append(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     if log_path:
-        print(f"Latest Log: {log_path.relative_to(repo)}")
+        out.append(f"Latest Log: {log_path.relative_to(repo)}")
     else:
-        print("Latest Log: (none found)")
-    print("-" * 78)
+        out.append("Latest Log: (none found)")
+    out.append("-" * 78)
 
-    scene_id = state.get("current_scene_id") or state.get("scene_id") or "UNKNOWN"
-    location = state.get("current_location") or state.get("starting_location") or "UNKNOWN"
-    objective = state.get("current_objective") or state.get("session_objective") or "(not set)"
+    context = scene_context(state, pc, pc_path)
+    scene_id, location, objective, pc_name = context["scene_id"], context["location"], context["objective"], context["pc"]
     active_hold = state.get("active_hold") or "—"
 
-    print(f"Scene ID: {scene_id}")
-    print(f"Location: {location}")
-    print(f"Active Hold: {active_hold}")
-    print(f"Objective: {objective}")
+    out.append(f"Scene ID: {scene_id}")
+    out.append(f"Location: {location}")
+    out.append(f"Active Hold: {active_hold}")
+    out.append(f"Objective: {objective}")
 
     # PC summary
-    pc_name = pc.get("name") or pc.get("character_name") or (pc_path.stem if pc_path else "PC")
     fp = pc.get("fate_points", pc.get("fp", ""))
     refresh = pc.get("refresh", "")
-    print("-" * 78)
-    print(f"PC: {pc_name}  |  Refresh: {refresh}  |  Fate Points: {fp}")
-    print("Effective Skills (quick): " + ", ".join(
+    out.append("-" * 78)
+    out.append(f"PC: {pc_name}  |  Refresh: {refresh}  |  Fate Points: {fp}")
+    out.append("Effective Skills (quick): " + ", ".join(
         [f"{k}={v}" for k, v in sorted(eff.get("effective", {}).items()) if k in ("Fight", "Athletics", "Stealth", "Rapport", "Will", "Lore", "Notice")]
     ))
 
     # PC aspects + compel hooks (GM aid)
     aspects = pc.get("aspects", {})
     if isinstance(aspects, dict):
-        print("-" * 78)
-        print("PC Aspects:")
+        out.append("-" * 78)
+        out.append("PC Aspects:")
         hc = aspects.get("high_concept")
         tr = aspects.get("trouble")
         if hc:
-            print(f" - High Concept: {hc}")
+            out.append(f" - High Concept: {hc}")
         if tr:
-            print(f" - Trouble: {tr}")
+            out.append(f" - Trouble: {tr}")
 
         oa = aspects.get("other_aspects", [])
         if isinstance(oa, list) and oa:
             for a in oa[:6]:
                 if isinstance(a, str):
-                    print(f" - Aspect: {a}")
+                    out.append(f" - Aspect: {a}")
 
         lib = aspects.get("compel_library", {})
         if isinstance(lib, dict):
             ideas = lib.get("ideas", [])
             if isinstance(ideas, list) and ideas:
-                print("-" * 78)
-                print("PC Compel Hooks (Trouble):")
+                out.append("-" * 78)
+                out.append("PC Compel Hooks (Trouble):")
                 for i, idea in enumerate(ideas[:5], start=1):
                     title = idea.get("title") or idea.get("id") or "Compel"
                     when = idea.get("when", "").strip()
                     line = f" {i}) {title}"
                     if when:
                         line += f" — {when}"
-                    print(line)
+                    out.append(line)
 
                 ex = lib.get("exceptions", [])
                 if isinstance(ex, list) and ex:
-                    print(" Exceptions:")
+                    out.append(" Exceptions:")
                     for e in ex[:3]:
                         if isinstance(e, dict):
-                            print(f"  - {e.get('tag','exception')}: {e.get('description','')}")
+                            out.append(f"  - {e.get('tag','exception')}: {e.get('description','')}")
 
     # Trust dynamics
     rels = summarize_relationships(state)
     if rels:
-        print("-" * 78)
-        print("Faction/Trust Snapshot:")
+        out.append("-" * 78)
+        out.append("Faction/Trust Snapshot:")
         for k, v in rels:
-            print(f" - {k}: {v}")
+            out.append(f" - {k}: {v}")
 
     # Top clocks
-    print("-" * 78)
-    print("Top Clocks (by urgency):")
+    out.append("-" * 78)
+    out.append("Top Clocks (by urgency):")
     for c in clocks[:3]:
-        print(f" - {c.name}: {c.current}/{c.maximum} ({int(c.ratio*100)}%)  [{c.source}]")
+        out.append(f" - {c.name}: {c.current}/{c.maximum} ({int(c.ratio*100)}%)  [{c.source}]")
 
     # Dragonbreak heuristic
-    print("-" * 78)
-    print(dragonbreak_heuristic(clocks, state))
+    out.append("-" * 78)
+    out.append(dragonbreak_heuristic(clocks, state))
 
     # Authenticity tri-check
-    print("-" * 78)
-    print("Authenticity Tri-Check:")
+    out.append("-" * 78)
+    out.append("Authenticity Tri-Check:")
     for line in authenticity_tri_check(repo, state, pc):
-        print(f" - {line}")
+        out.append(f" - {line}")
 
     # Options 1-5
-    print("-" * 78)
-    print("PLAYER OPTIONS (1–5):")
+    out.append("-" * 78)
+    out.append("PLAYER OPTIONS (1–5):")
     for opt in build_options(state, pc, eff):
-        print(f" {opt}")
+        out.append(f" {opt}")
+
+    return out
+
+def new_log_path(repo: Path) -> Path:
+    # Create a new log if none exists
+    logs_dir = repo / "logs"
+    logs_dir.mkdir(parents=True, exist_ok=True)
+    return logs_dir / f"{datetime.now().strftime('%Y-%m-%d')}_mid-session.md"
+
+# ---------------------------
+# Checkpoint server (warm state between checkpoints)
+# ---------------------------
+
+class StageTimer:
+    def __init__(self) -> None:
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = round(self.stages.get(name, 0.0) + (time.perf_counter() - t0) * 1000, 3)
+
+    def summary(self) -> str:
+        return ", ".join(f"{k}={v:.1f}ms" for k, v in self.stages.items())
+
+FileSig = Optional[Tuple[int, int]]
 
-    # Optional checkpoint append
-    if args.checkpoint:
+def file_sig(path: Optional[Path]) -> FileSig:
+    if path is None:
+        return None
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+BONUS_DATA_FILES = ("races.json", "racial_traits.json", "standing_stones.json")
+
+class CheckpointServer:
+    """Keeps state, PC, skills and clocks warm; reloads only files whose stat changed."""
+
+    def __init__(self, repo: Path) -> None:
+        self.repo = repo
+        self.state: Dict[str, Any] = {}
+        self.pc: Dict[str, Any] = {}
+        self.pc_path: Optional[Path] = None
+        self.eff: Dict[str, Any] = {}
+        self.clocks: List[ClockView] = []
+        self.log_path: Optional[Path] = None
+        self.state_warnings: List[str] = []
+        self.pc_warnings: List[str] = []
+        self.last_timings: Dict[str, float] = {}
+        self._sigs: Dict[str, FileSig] = {}
+        self._clock_cache: Dict[str, Tuple[FileSig, List[ClockView]]] = {}
+        self.refresh()
+
+    @property
+    def warnings(self) -> List[str]:
+        # Kept per source so reloading one file replaces only its own warnings
+        return self.state_warnings + self.pc_warnings
+
+    def _changed(self, key: str, path: Optional[Path]) -> bool:
+        sig = file_sig(path)
+        if key in self._sigs and self._sigs[key] == sig:
+            return False
+        self._sigs[key] = sig
+        return True
+
+    def refresh(self, timer: Optional[StageTimer] = None) -> StageTimer:
+        timer = timer or StageTimer()
+        repo = self.repo
+
+        with timer.stage("state"):
+            state_changed = self._changed("state", repo / "state" / "campaign_state.json")
+            if state_changed:
+                self.state, self.state_warnings = load_state(repo)
+
+        with timer.stage("pc"):
+            pc_path = pick_primary_pc(repo, self.state) if (state_changed or self.pc_path is None) else self.pc_path
+            pc_changed = self._changed("pc", pc_path) or pc_path != self.pc_path
+            if pc_changed:
+                self.pc_path = pc_path
+                self.pc, self.pc_warnings = load_pc(pc_path)
+
+        with timer.stage("skills"):
+            bonus_changed = [self._changed(name, repo / "data" / name) for name in BONUS_DATA_FILES]
+            if pc_changed or any(bonus_changed):
+                self.eff = compute_effective_skills(repo, self.pc)
+
+        with timer.stage("clocks"):
+            all_clocks: List[ClockView] = []
+            seen = set()
+            for label, p in clock_sources(repo):
+                seen.add(label)
+                sig = file_sig(p)
+                cached = self._clock_cache.get(label)
+                if cached is None or cached[0] != sig:
+                    cached = (sig, read_clocks(label, p))
+                    self._clock_cache[label] = cached
+                all_clocks.extend(cached[1])
+            for label in set(self._clock_cache) - seen:
+                del self._clock_cache[label]
+            self.clocks = rank_clocks(all_clocks)
+
+        with timer.stage("log"):
+            self.log_path = latest_log(repo)
+
+        return timer
+
+    def handle(self, line: str) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        command, _, arg = line.strip().partition(" ")
+        command = command.lower()
+        timer = StageTimer()
+        out: List[str] = []
+        ok = True
+
+        if command in ("report", "checkpoint", "event"):
+            self.refresh(timer)
+
+        if command == "report":
+            with timer.stage("report"):
+                out = self.warnings + format_report(self.repo, self.state, self.pc, self.pc_path,
+                                                    self.eff, self.clocks, self.log_path)
+        elif command in ("checkpoint", "event"):
+            if not arg.strip():
+                ok = False
+                out = [f"[ERROR] {command} needs text"]
+            else:
+                with timer.stage("append"):
+                    log_path = self.log_path or new_log_path(self.repo)
+                    context = scene_context(self.state, self.pc, self.pc_path)
+                    log_event(log_path, command, arg, context)
+                    self.log_path = log_path
+                out = [f"[OK] {command.capitalize()} recorded in: {log_path.relative_to(self.repo)}"]
+        elif command == "timings":
+            out = [", ".join(f"{k}={v:.1f}ms" for k, v in self.last_timings.items()) or "(no requests yet)"]
+        elif command == "ping":
+            out = ["pong"]
+        elif command == "quit":
+            out = ["bye"]
+        else:
+            ok = False
+            out = [f"[ERROR] Unknown command '{command}'. Use: report, checkpoint <text>, event <text>, timings, ping, quit"]
+
+        timer.stages["total"] = round((time.perf_counter() - t0) * 1000, 3)
+        if command not in ("timings", "ping", "quit"):
+            self.last_timings = timer.stages
+        return {"ok": ok, "command": command, "output": "\n".join(out), "timings_ms": timer.stages}
+
+def serve_stdio(server: CheckpointServer, stdin=None, stdout=None) -> None:
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    for line in stdin:
+        if not line.strip():
+            continue
+        response = server.handle(line)
+        stdout.write(json.dumps(response, ensure_ascii=False) + "\n")
+        stdout.flush()
+        if response["command"] == "quit":
+            break
+
+def serve_socket(server: CheckpointServer, socket_path: Path) -> None:
+    import socketserver
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            for raw in self.rfile:
+                line = raw.decode("utf-8", errors="replace")
+                if not line.strip():
+                    continue
+                response = server.handle(line)
+                self.wfile.write((json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8"))
+                self.wfile.flush()
+                if response["command"] == "quit":
+                    # Shut down from another thread; shutdown() blocks until serve_forever returns
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                    return
+
+    if socket_path.exists():
+        socket_path.unlink()
+    with socketserver.UnixStreamServer(str(socket_path), Handler) as srv:
+        print(f"[OK] Checkpoint server listening on {socket_path} (send 'quit' to stop)")
+        try:
+            srv.serve_forever()
+        finally:
+            if socket_path.exists():
+                socket_path.unlink()
+
+def send_command(socket_path: Path, line: str) -> Dict[str, Any]:
+    import socket
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(socket_path))
+        sock.sendall((line.strip() + "\n").encode("utf-8"))
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    return json.loads(data.decode("utf-8"))
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Mid-session protocol: recap + clocks + options + checkpoint.")
+    ap.add_argument("--checkpoint", default="", help="If provided, appends a Mid-Session Checkpoint block to the latest log.")
+    ap.add_argument("--event", default="", help="If provided, records a one-line table event in the latest log.")
+    ap.add_argument("--render-events", action="store_true", help="Print the latest log's checkpoints/events rendered from its event log, then exit.")
+    ap.add_argument("--serve", action="store_true", help="Run as a warm checkpoint server (stdin command loop, or --socket).")
+    ap.add_argument("--socket", default="", help="Unix socket path: with --serve, listen on it; otherwise send this request to a running server.")
+    ap.add_argument("--timings", action="store_true", help="Print per-stage timings.")
+    args = ap.parse_args()
+
+    timer = StageTimer()
+    with timer.stage("repo"):
+        repo = find_repo_root(Path.cwd())
+
+    if args.render_events:
+        log_path = latest_log(repo)
+        if not log_path:
+            print("[WARN] No logs found.")
+            return 1
+        print(render_events(event_log_path(log_path)), end="")
+        return 0
+
+    if args.serve:
+        server = CheckpointServer(repo)
+        if args.socket:
+            serve_socket(server, Path(args.socket))
+        else:
+            serve_stdio(server)
+        return 0
+
+    if args.socket:
+        commands = []
+        if args.event:
+            commands.append(f"event {args.event}")
+        if args.checkpoint:
+            commands.append(f"checkpoint {args.checkpoint}")
+        ok = True
+        for command in commands or ["report"]:
+            response = send_command(Path(args.socket), command)
+            print(response["output"])
+            if args.timings:
+                print("Timings: " + ", ".join(f"{k}={v:.1f}ms" for k, v in response["timings_ms"].items()))
+            ok = ok and response["ok"]
+        return 0 if ok else 1
+
+    with timer.stage("state"):
+        state, warnings = load_state(repo)
+    for w in warnings:
+        print(w)
+
+    with timer.stage("pc"):
+        pc_path = pick_primary_pc(repo, state)
+        pc, warnings = load_pc(pc_path)
+    for w in warnings:
+        print(w)
+
+    with timer.stage("skills"):
+        eff = compute_effective_skills(repo, pc)
+
+    with timer.stage("clocks"):
+        clocks = top_clocks(repo)
+
+    with timer.stage("log"):
+        log_path = latest_log(repo)
+
+    with timer.stage("report"):
+        report = format_report(repo, state, pc, pc_path, eff, clocks, log_path)
+    for line in report:
+        print(line)
+
+    # Optional checkpoint/event append
+    if args.checkpoint or args.event:
         if not log_path:
-            # Create a new log if none exists
-            logs_dir = repo / "logs"
-            logs_dir.mkdir(parents=True, exist_ok=True)
-            new_name = f"{datetime.now().strftime('%Y-%m-%d')}_mid-session.md"
-            log_path = logs_dir / new_name
+            log_path = new_log_path(repo)
 
-        checkpoint_append(log_path, args.checkpoint)
+        context = scene_context(state, pc, pc_path)
+        print("-" * 78)
+        with timer.stage("append"):
+            if args.event:
+                log_event(log_path, "event", args.event, context)
+            if args.checkpoint:
+                checkpoint_append(log_path, args.checkpoint, context)
+        if args.event:
+            print(f"[OK] Event recorded in: {log_path.relative_to(repo)}")
+        if args.checkpoint:
+            print(f"[OK] Checkpoint appended to: {log_path.relative_to(repo)}")
+
+    if args.timings:
         print("-" * 78)
-        print(f"[OK] Checkpoint appended to: {log_path.relative_to(repo)}")
+        print(f"Timings: {timer.summary()}")
 
     print("=" * 78)
     return 0
@@ -15,24 +15,25 @@ from pathlib import Path
 from datetime import datetime
 
 from first_impression import auto_first_impression
+from relationship_graph import RelationshipGraph
+from storage import open_storage
+from json_io import load_json
 
 
 class NPCManager:
-    def __init__(self, data_dir="../data", state_dir="../state"):
+    def __init__(self, data_dir="../data", state_dir="../state", storage=None):
         self.data_dir = Path(data_dir)
         self.state_dir = Path(state_dir)
+        self.storage = storage or open_storage(self.data_dir)
         self.npcs_dir = self.data_dir / "npcs"
         self.relationships_path = self.data_dir / "npc_relationships.json"
         self.campaign_state_path = self.state_dir / "campaign_state.json"
         self.faction_clocks_path = self.data_dir / "civil_war_clocks.json"
+        self._relationship_graph = None
         
     def load_npc(self, npc_id):
         """Load an NPC file"""
-        npc_file = self.npcs_dir / f"{npc_id}.json"
-        if npc_file.exists():
-            with open(npc_file, 'r') as f:
-                return json.load(f)
-        return None
+        return self.storage.get("npcs", npc_id)
     
     def save_npc(self, npc_data):
         """Save NPC data"""
@@ -41,26 +42,18 @@ class NPCManager:
             print("Error: NPC must have an 'id' field")
             return False
         
-        self.npcs_dir.mkdir(exist_ok=True)
-        npc_file = self.npcs_dir / f"{npc_id}.json"
-        
-        with open(npc_file, 'w') as f:
-            json.dump(npc_data, f, indent=2)
+        self.storage.put("npcs", npc_id, npc_data)
         
         print(f"Saved NPC: {npc_data.get('name', npc_id)}")
         return True
     
     def load_relationships(self):
         """Load NPC relationships data"""
-        if self.relationships_path.exists():
-            with open(self.relationships_path, 'r') as f:
-                return json.load(f)
-        return None
+        return self.storage.get("", "npc_relationships")
     
     def save_relationships(self, data):
         """Save relationships data"""
-        with open(self.relationships_path, 'w') as f:
-            json.dump(data, f, indent=2)
+        self.storage.put("", "npc_relationships", data)
     
     def update_loyalty(self, npc_id, change, reason=""):
         """
@@ -76,6 +69,13 @@ class NPCManager:
             print(f"NPC '{npc_id}' not found")
             return False
         
+        self._apply_loyalty(npc, change, reason)
+        self.save_npc(npc)
+        return True
+    
+    @staticmethod
+    def _apply_loyalty(npc, change, reason=""):
+        """Change a loaded NPC's loyalty in memory and record it in its history."""
         # Initialize loyalty if not present
         if 'loyalty' not in npc:
             npc['loyalty'] = 50
@@ -112,35 +112,53 @@ class NPCManager:
             'new_loyalty': npc['loyalty'],
             'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         })
-        
-        self.save_npc(npc)
-        return True
     
-    def update_relationship(self, npc1_id, npc2_id, change, reason=""):
+    @property
+    def relationship_graph(self):
+        """Relationship graph, built on first use"""
+        if self._relationship_graph is None:
+            self._relationship_graph = RelationshipGraph(self.storage)
+        return self._relationship_graph
+    
+    def update_relationship(self, npc1_id, npc2_id, change, reason="", flush=False):
         """
         Update relationship between two NPCs
         
+        The change is made to the in-memory relationship graph (O(1)) and
+        written with the other pending updates by flush_relationships().
+        
         Args:
             npc1_id: ID of first NPC
             npc2_id: ID of second NPC
             change: Amount to change relationship
             reason: Why it changed
+            flush: Also write npc_relationships.json now
         """
-        relationships = self.load_relationships()
-        if not relationships:
-            print("Relationships data not found")
-            return False
+        graph = self.relationship_graph
+        a, b = graph.resolve(npc1_id), graph.resolve(npc2_id)
+        for npc_id, node in ((npc1_id, a), (npc2_id, b)):
+            if node not in graph.index:
+                print(f"NPC '{npc_id}' not found in the relationship graph")
+                return False
+        
+        old, new = graph.update_edge(a, b, change, reason)
         
-        # Find or create relationship entry
-        # This is simplified - real implementation would be more complex
         print(f"\nRelationship Update: {npc1_id} <-> {npc2_id}")
         print(f"Change: {change:+d}")
+        print(f"Relationship: {old if old is not None else 0:.0f} -> {new:.0f}")
         if reason:
             print(f"Reason: {reason}")
         
-        # Would update the relationships.json here
+        if flush:
+            self.flush_relationships()
         return True
     
+    def flush_relationships(self):
+        """Persist pending relationship updates in one write"""
+        if self._relationship_graph is None:
+            return 0
+        return self._relationship_graph.flush()
+    
     def check_companion_status(self, npc_id):
         """
         Check companion's current status and loyalty
@@ -252,24 +270,21 @@ class NPCManager:
     
     def list_npcs(self):
         """List all NPCs in the system"""
-        if not self.npcs_dir.exists():
-            print("No NPCs directory found")
+        npc_ids = self.storage.list_ids("npcs")
+        if not npc_ids:
+            print("No NPCs found")
             return []
         
-        npc_files = list(self.npcs_dir.glob("*.json"))
-        
-        print(f"\n=== NPCs ({len(npc_files)}) ===\n")
+        print(f"\n=== NPCs ({len(npc_ids)}) ===\n")
         
         npcs = []
-        for npc_file in sorted(npc_files):
-            with open(npc_file, 'r') as f:
-                npc = json.load(f)
-                print(f"{npc['id']}: {npc['name']}")
-                print(f"  Role: {npc.get('role', 'Unknown')}")
-                if 'loyalty' in npc:
-                    print(f"  Loyalty: {npc['loyalty']}/100")
-                print()
-                npcs.append((npc['id'], npc['name']))
+        for _, npc in self.storage.iter_documents("npcs"):
+            print(f"{npc['id']}: {npc['name']}")
+            print(f"  Role: {npc.get('role', 'Unknown')}")
+            if 'loyalty' in npc:
+                print(f"  Loyalty: {npc['loyalty']}/100")
+            print()
+            npcs.append((npc['id'], npc['name']))
         
         return npcs
     
@@ -317,8 +332,7 @@ class NPCManager:
     def load_campaign_state(self):
         """Load campaign state data"""
         if self.campaign_state_path.exists():
-            with open(self.campaign_state_path, 'r') as f:
-                return json.load(f)
+            return load_json(self.campaign_state_path)
         return None
     
     def save_campaign_state(self, state):
@@ -454,7 +468,11 @@ class NPCManager:
         npc = self.load_npc(npc_id)
         if not npc:
             return 'unknown'
-        
+        return self._faction_alignment(npc, faction)
+    
+    @staticmethod
+    def _faction_alignment(npc, faction):
+        """Alignment of a loaded NPC with a faction (see check_faction_alignment)."""
         npc_faction = npc.get('faction', '').lower()
         faction = faction.lower()
         
@@ -713,7 +731,7 @@ class NPCManager:
         
         return result
     
-    def update_companion_based_on_faction_clock(self, faction, clock_value):
+    def update_companion_based_on_faction_clock(self, faction, clock_value, state=None, npcs=None):
         """
         Update companion availability and loyalty based on faction clock progress.
         
@@ -736,6 +754,13 @@ class NPCManager:
                 - 0-3: Faction struggling/losing
                 - 4-6: Faction holding steady
                 - 7-10: Faction succeeding/winning
+            state: Campaign state already loaded by the caller (optional; read
+                   from disk when omitted). Used by ClockReactions so several
+                   clock events share one in-memory state.
+            npcs: NPC documents by id, shared across calls (optional). Each
+                  companion is read into it once and changed in memory; the
+                  caller saves the affected ones. When omitted, each changed
+                  companion is saved here, once.
             
         Returns:
             List of affected companions, each as dict containing:
@@ -758,12 +783,16 @@ class NPCManager:
             - Neutral companions: No change
             - Checks all companions (active, available, and dismissed)
         """
-        state = self.load_campaign_state()
+        if state is None:
+            state = self.load_campaign_state()
         if not state or 'companions' not in state:
             return []
         
         affected = []
         companions_data = state['companions']
+        save = npcs is None
+        if save:
+            npcs = {}
         
         # Check all companions (active, available, dismissed)
         all_companions = (
@@ -774,9 +803,12 @@ class NPCManager:
         
         for companion in all_companions:
             npc_id = companion['npc_id']
+            if npc_id not in npcs:
+                npcs[npc_id] = self.load_npc(npc_id)
+            npc = npcs[npc_id]
             
             # Check faction alignment
-            alignment = self.check_faction_alignment(npc_id, faction)
+            alignment = self._faction_alignment(npc, faction) if npc else 'unknown'
             
             # Adjust loyalty based on faction clock and alignment
             if alignment == 'allied':
@@ -784,7 +816,7 @@ class NPCManager:
                 if clock_value >= 7:
                     loyalty_change = 2
                     reason = f"{faction} faction is succeeding"
-                    self.update_loyalty(npc_id, loyalty_change, reason)
+                    self._apply_loyalty(npc, loyalty_change, reason)
                     affected.append({
                         'npc_id': npc_id,
                         'name': companion['name'],
@@ -796,7 +828,7 @@ class NPCManager:
                 if clock_value >= 7:
                     loyalty_change = -3
                     reason = f"Enemy faction {faction} is succeeding"
-                    self.update_loyalty(npc_id, loyalty_change, reason)
+                    self._apply_loyalty(npc, loyalty_change, reason)
                     affected.append({
                         'npc_id': npc_id,
                         'name': companion['name'],
@@ -804,6 +836,10 @@ class NPCManager:
                         'reason': reason
                     })
         
+        if save:
+            for npc_id in dict.fromkeys(comp['npc_id'] for comp in affected):
+                self.save_npc(npcs[npc_id])
+        
         if affected:
             print(f"\n{'='*60}")
             print(f"FACTION CLOCK UPDATE: {faction} at {clock_value}/10")
@@ -842,8 +878,7 @@ class NPCManager:
         # Try loading from npc_stat_sheets directory
         stat_sheet_path = self.data_dir / "npc_stat_sheets" / f"{npc_id}.json"
         if stat_sheet_path.exists():
-            with open(stat_sheet_path, 'r') as f:
-                return json.load(f)
+            return load_json(stat_sheet_path)
         
         # Fallback to npcs directory
         return self.load_npc(npc_id)
@@ -865,8 +900,7 @@ class NPCManager:
             # Try loading from stat sheets
             stat_sheet_path = self.data_dir / "npc_stat_sheets" / f"{npc_id}.json"
             if stat_sheet_path.exists():
-                with open(stat_sheet_path, 'r') as f:
-                    npc = json.load(f)
+                npc = load_json(stat_sheet_path)
             else:
                 print(f"Error: NPC {npc_id} not found")
                 return False
@@ -938,8 +972,7 @@ class NPCManager:
             # Try loading from stat sheets
             stat_sheet_path = self.data_dir / "npc_stat_sheets" / f"{npc_id}.json"
             if stat_sheet_path.exists():
-                with open(stat_sheet_path, 'r') as f:
-                    npc = json.load(f)
+                npc = load_json(stat_sheet_path)
             else:
                 return {"success": False, "error": "NPC not found"}
         
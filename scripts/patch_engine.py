@@ -0,0 +1,636 @@
+#!/usr/bin/env python3
+"""
+Declarative Patch Engine for Skyrim TTRPG
+
+Applies the JSON-Patch (RFC 6902) operations described in patches/*.json
+instead of hand-written patch scripts:
+- Every target file is loaded once, however many patches and operations
+  touch it
+- All operations are applied in memory first; if any operation fails
+  validation (bad pointer, failed "test", placeholder value, missing file)
+  nothing is written
+- Changed files are written to temporary files and then swapped in with
+  os.replace(), so a run commits all of its writes or none of them
+- Each operation has an idempotency key (its "idempotency_key" field, or a
+  hash of patch id, file, position and content) recorded in
+  state/patch_ledger.json, so re-running a patch only applies new operations
+- The first time a file is patched, its pre-patch text is copied to
+  state/patch_baseline/ in the same transaction; replay() applies the whole
+  patch history in memory to those baseline copies (optionally writing the
+  result to another directory) without touching the live tree
+
+Three descriptor layouts are accepted:
+    {"patches": [{"file": "data/...json", "ops": [...]}]}
+    {"files": {"data/...json": [...]}}
+    [ ...ops... ]            (documentation only - no target file)
+Descriptors with neither "patches" nor "files" are documentation only
+and are skipped.
+
+Usage:
+    python3 patch_engine.py --status
+    python3 patch_engine.py ../patches/2026-02-04_session-03_end.json --dry-run
+    python3 patch_engine.py --all --journal
+    python3 patch_engine.py --all --mark-applied
+    python3 patch_engine.py --replay --out /tmp/rebuilt
+    python3 patch_engine.py --replay --baseline /tmp/checkout --out /tmp/rebuilt
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+
+from json_io import load_json, loads, read_text
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+LEDGER_PATH = Path("state") / "patch_ledger.json"
+BASELINE_DIR = Path("state") / "patch_baseline"
+LEDGER_VERSION = 1
+
+OPERATIONS = ("add", "remove", "replace", "move", "copy", "test")
+
+# Values like "(SEE_INLINE_PC_JSON_VALUE)" mark descriptors written as notes
+PLACEHOLDER_PATTERN = re.compile(r"^\(SEE_[A-Z0-9_]+\)$")
+
+
+# ----------------------------------------------------------------------
+# JSON Pointer / JSON Patch
+# ----------------------------------------------------------------------
+
+def parse_pointer(pointer):
+    """Split a JSON Pointer ("/a/b~1c/0") into tokens (["a", "b/c", "0"])."""
+    if pointer == "":
+        return []
+    if not isinstance(pointer, str) or not pointer.startswith("/"):
+        raise ValueError(f"Invalid JSON pointer '{pointer}'")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _list_index(container, token, allow_end=False):
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise ValueError(f"Invalid array index '{token}'")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise ValueError(f"Array index {index} out of range")
+    return index
+
+
+def _child(container, token):
+    if isinstance(container, dict):
+        if token not in container:
+            raise ValueError(f"Missing key '{token}'")
+        return container[token]
+    if isinstance(container, list):
+        return container[_list_index(container, token)]
+    raise ValueError(f"Cannot descend into {type(container).__name__} at '{token}'")
+
+
+def resolve_pointer(doc, pointer):
+    """Value at a JSON Pointer (raises ValueError if it does not exist)."""
+    for token in parse_pointer(pointer):
+        doc = _child(doc, token)
+    return doc
+
+
+def _parent(doc, pointer):
+    tokens = parse_pointer(pointer)
+    if not tokens:
+        return None, None
+    parent = doc
+    for token in tokens[:-1]:
+        parent = _child(parent, token)
+    return parent, tokens[-1]
+
+
+def _add(doc, pointer, value):
+    parent, token = _parent(doc, pointer)
+    if parent is None:
+        return value
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_list_index(parent, token, allow_end=True), value)
+    else:
+        raise ValueError(f"Cannot add to {type(parent).__name__}")
+    return doc
+
+
+def _remove(doc, pointer):
+    parent, token = _parent(doc, pointer)
+    if parent is None:
+        raise ValueError("Cannot remove the whole document")
+    _child(parent, token)
+    if isinstance(parent, dict):
+        return parent.pop(token)
+    return parent.pop(_list_index(parent, token))
+
+
+def apply_operation(doc, op):
+    """
+    Apply one JSON-Patch operation.
+
+    Args:
+        doc: Document to patch (modified in place)
+        op: Operation dict ({"op": "replace", "path": "/a", "value": 1}, ...)
+
+    Returns:
+        The patched document (a new object only when the root is replaced)
+    """
+    kind, path = op["op"], op["path"]
+    if kind == "add":
+        return _add(doc, path, copy.deepcopy(op["value"]))
+    if kind == "remove":
+        _remove(doc, path)
+        return doc
+    if kind == "replace":
+        parent, token = _parent(doc, path)
+        if parent is None:
+            return copy.deepcopy(op["value"])
+        _child(parent, token)
+        if isinstance(parent, dict):
+            parent[token] = copy.deepcopy(op["value"])
+        else:
+            parent[_list_index(parent, token)] = copy.deepcopy(op["value"])
+        return doc
+    if kind == "move":
+        if path.startswith(op["from"] + "/"):
+            raise ValueError(f"Cannot move '{op['from']}' into its own child")
+        value = _remove(doc, op["from"])
+        return _add(doc, path, value)
+    if kind == "copy":
+        return _add(doc, path, copy.deepcopy(resolve_pointer(doc, op["from"])))
+    if kind == "test":
+        if resolve_pointer(doc, path) != op["value"]:
+            raise ValueError(f"Test failed at '{path}'")
+        return doc
+    raise ValueError(f"Unknown operation '{kind}'")
+
+
+def validate_operation(op):
+    """Return a list of problems with one operation's shape (empty if valid)."""
+    if not isinstance(op, dict):
+        return ["operation is not an object"]
+    problems = []
+    if op.get("op") not in OPERATIONS:
+        problems.append(f"unknown op '{op.get('op')}'")
+    if not isinstance(op.get("path"), str):
+        problems.append("missing 'path'")
+    if op.get("op") in ("add", "replace", "test"):
+        if "value" not in op:
+            problems.append("missing 'value'")
+        elif isinstance(op["value"], str) and PLACEHOLDER_PATTERN.match(op["value"]):
+            problems.append(f"placeholder value {op['value']}")
+    if op.get("op") in ("move", "copy") and not isinstance(op.get("from"), str):
+        problems.append("missing 'from'")
+    return problems
+
+
+def _escape(token):
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def diff_documents(old, new, path=""):
+    """
+    JSON-Patch operations that turn old into new.
+
+    Objects are compared key by key; lists and scalars that differ are
+    replaced whole.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": copy.deepcopy(value)})
+            else:
+                ops.extend(diff_documents(old[key], value, child))
+        return ops
+    if old == new and type(old) is type(new):
+        return []
+    return [{"op": "replace", "path": path, "value": copy.deepcopy(new)}]
+
+
+# ----------------------------------------------------------------------
+# Patch descriptors
+# ----------------------------------------------------------------------
+
+def load_patch(path):
+    """
+    Load a patch descriptor and normalize it.
+
+    Returns:
+        dict: {"patch_id", "path", "description", "files": {file: [ops]}};
+              "files" is empty for documentation-only descriptors.
+              None if the file cannot be read.
+    """
+    path = Path(path)
+    try:
+        raw = load_json(path)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Error loading patch {path}: {e}")
+        return None
+
+    files = {}
+    if isinstance(raw, dict):
+        for entry in raw.get("patches") or []:
+            if isinstance(entry, dict) and entry.get("file"):
+                files.setdefault(entry["file"], []).extend(entry.get("ops") or [])
+        for file, ops in (raw.get("files") or {}).items():
+            if isinstance(ops, list):
+                files.setdefault(file, []).extend(ops)
+        meta = raw
+    else:
+        meta = {}
+
+    return {
+        "patch_id": meta.get("patch_id") or path.stem,
+        "path": path,
+        "description": meta.get("description") or meta.get("summary") or "",
+        "files": files,
+    }
+
+
+def operation_key(patch_id, file, op, occurrence=0):
+    """
+    Idempotency key of one operation: its idempotency_key, or a hash of the
+    patch, file and operation. An operation's position is not part of the
+    hash, so inserting operations into a patch leaves the others' keys alone;
+    occurrence tells identical operations in one file's list apart.
+    """
+    if isinstance(op, dict) and op.get("idempotency_key"):
+        return str(op["idempotency_key"])
+    canonical = json.dumps([patch_id, file, op, occurrence], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def operation_keys(patch_id, file, ops):
+    """Idempotency keys of one file's operations, in order."""
+    seen = {}
+    keys = []
+    for op in ops:
+        canonical = json.dumps(op, sort_keys=True, ensure_ascii=False)
+        keys.append(operation_key(patch_id, file, op, seen.get(canonical, 0)))
+        seen[canonical] = seen.get(canonical, 0) + 1
+    return keys
+
+
+def format_json(doc, original_text=None):
+    """Serialize like the file it replaces (escaped or raw unicode, trailing newline)."""
+    ensure_ascii = original_text is not None and "\\u" in original_text
+    text = json.dumps(doc, indent=2, ensure_ascii=ensure_ascii)
+    if original_text is None or original_text.endswith("\n"):
+        text += "\n"
+    return text
+
+
+def commit_writes(writes):
+    """
+    Write {path: text} all-or-nothing: stage every file, then swap them in,
+    restoring the originals if any swap fails.
+
+    Returns:
+        bool: True if every file was written
+    """
+    staged = []
+    try:
+        for path, text in writes.items():
+            tmp = path.with_name(f".{path.name}.patch-tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            staged.append((tmp, path))
+    except OSError as e:
+        for tmp, _ in staged:
+            tmp.unlink(missing_ok=True)
+        print(f"Error staging patch writes: {e}")
+        return False
+
+    originals = {path: path.read_bytes() if path.exists() else None for _, path in staged}
+    done = []
+    try:
+        for tmp, path in staged:
+            os.replace(tmp, path)
+            done.append(path)
+    except OSError as e:
+        print(f"Error committing patch writes: {e} - rolling back")
+        for path in done:
+            if originals[path] is None:
+                path.unlink(missing_ok=True)
+            else:
+                path.write_bytes(originals[path])
+        for tmp, _ in staged:
+            tmp.unlink(missing_ok=True)
+        return False
+    return True
+
+
+class PatchEngine:
+    def __init__(self, repo_root=REPO_ROOT, ledger_path=None, event_store=None):
+        """
+        Initialize the PatchEngine.
+
+        Args:
+            repo_root: Repository root that patch file paths are relative to
+            ledger_path: Applied-operation ledger (default: state/patch_ledger.json)
+            event_store: Optional CampaignEventStore (event_store.py) that
+                         journals every committed change to tracked files
+        """
+        self.repo_root = Path(repo_root).resolve()
+        self.event_store = event_store
+        self.ledger_path = Path(ledger_path) if ledger_path else self.repo_root / LEDGER_PATH
+        self.ledger = self._load_ledger()
+
+    def _load_ledger(self):
+        if self.ledger_path.exists():
+            try:
+                ledger = load_json(self.ledger_path)
+                if ledger.get("version") == LEDGER_VERSION:
+                    return ledger
+            except (OSError, json.JSONDecodeError, AttributeError) as e:
+                print(f"Warning: Could not read patch ledger ({e}); starting a new one")
+        return {"version": LEDGER_VERSION, "applied": {}}
+
+    def patch_paths(self):
+        """All patch descriptors in patches/, oldest first (names start with dates)."""
+        return sorted((self.repo_root / "patches").glob("*.json"))
+
+    def _target(self, file):
+        target = (self.repo_root / file).resolve()
+        if self.repo_root not in target.parents or target.suffix != ".json":
+            raise ValueError(f"Target '{file}' is not a JSON file inside the repository")
+        return target
+
+    def _plan(self, patches, force=False, docs=None, source_root=None):
+        """
+        Apply patches in memory, loading files from source_root (default: the
+        live tree).
+
+        Returns:
+            dict: docs ({file: [doc, original_text]}), changed files, newly
+                  applied keys, skipped operation count and errors
+        """
+        docs = {} if docs is None else docs
+        plan = {"docs": docs, "changed": [], "applied": {}, "skipped": 0, "errors": [], "patches": []}
+        for patch in patches:
+            if not patch["files"]:
+                continue
+            plan["patches"].append(patch["patch_id"])
+            for file, ops in patch["files"].items():
+                try:
+                    target = self._target(file)
+                except ValueError as e:
+                    plan["errors"].append(f"{patch['patch_id']}: {e}")
+                    continue
+                if file not in docs:
+                    source = Path(source_root) / file if source_root else target
+                    if not source.exists():
+                        plan["errors"].append(f"{patch['patch_id']}: {source} does not exist")
+                        continue
+                    try:
+                        text = read_text(source)
+                        docs[file] = [loads(text), text]
+                    except (OSError, json.JSONDecodeError) as e:
+                        plan["errors"].append(f"{patch['patch_id']}: cannot load {file}: {e}")
+                        continue
+                for index, (key, op) in enumerate(zip(operation_keys(patch["patch_id"], file, ops), ops)):
+                    if not force and (key in self.ledger["applied"] or key in plan["applied"]):
+                        plan["skipped"] += 1
+                        continue
+                    problems = validate_operation(op)
+                    if problems:
+                        plan["errors"].append(f"{patch['patch_id']}: {file} op {index}: {', '.join(problems)}")
+                        continue
+                    try:
+                        docs[file][0] = apply_operation(docs[file][0], op)
+                    except (ValueError, KeyError, TypeError) as e:
+                        plan["errors"].append(f"{patch['patch_id']}: {file} op {index} ({op['op']} {op['path']}): {e}")
+                        continue
+                    plan["applied"][key] = {"patch_id": patch["patch_id"], "file": file}
+                    if file not in plan["changed"]:
+                        plan["changed"].append(file)
+        return plan
+
+    def apply(self, patch_paths, dry_run=False, force=False):
+        """
+        Apply patch descriptors as one transaction.
+
+        Args:
+            patch_paths: Descriptor paths, applied in the given order
+            dry_run: Validate and report without writing
+            force: Re-apply operations already recorded in the ledger
+
+        Returns:
+            dict: "ok", "applied" (operation count), "skipped", "files"
+                  (changed files), "errors" and "elapsed_ms"
+        """
+        start = time.perf_counter()
+        patches = [p for p in (load_patch(path) for path in patch_paths) if p]
+        plan = self._plan(patches, force=force)
+        result = {
+            "ok": not plan["errors"],
+            "applied": len(plan["applied"]),
+            "skipped": plan["skipped"],
+            "files": plan["changed"],
+            "errors": plan["errors"],
+        }
+        if plan["errors"] or dry_run or not plan["applied"]:
+            result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            return result
+
+        writes = {}
+        patched = {entry["file"] for entry in self.ledger["applied"].values()}
+        for file in plan["changed"]:
+            doc, text = plan["docs"][file]
+            writes[self._target(file)] = format_json(doc, text)
+            baseline = self.repo_root / BASELINE_DIR / file
+            if file not in patched and not baseline.exists():
+                baseline.parent.mkdir(parents=True, exist_ok=True)
+                writes[baseline] = text
+        ledger = copy.deepcopy(self.ledger)
+        stamp = datetime.now().isoformat(timespec="seconds")
+        for key, entry in plan["applied"].items():
+            ledger["applied"][key] = dict(entry, applied_at=stamp)
+        self.ledger_path.parent.mkdir(parents=True, exist_ok=True)
+        writes[self.ledger_path] = json.dumps(ledger, indent=2, ensure_ascii=False) + "\n"
+
+        if self.event_store is not None:
+            # Journal earlier unrecorded edits first so they are not attributed to this patch
+            self.event_store.sync()
+        if commit_writes(writes):
+            self.ledger = ledger
+            if self.event_store is not None:
+                self.event_store.sync(source="patch:" + ",".join(plan["patches"]))
+        else:
+            result["ok"] = False
+            result["applied"] = 0
+            result["files"] = []
+            result["errors"].append("Write failed; no files were changed")
+        result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return result
+
+    def mark_applied(self, patch_paths):
+        """
+        Record operations as applied without running them (for patches that
+        were already applied by hand or by a patch script).
+
+        Operations the engine could not have applied (invalid ones, or ones
+        on anything but a JSON file inside the repository) are skipped with
+        a warning.
+
+        Returns:
+            int: Number of operations newly recorded
+        """
+        stamp = datetime.now().isoformat(timespec="seconds")
+        added = 0
+        for patch in filter(None, (load_patch(path) for path in patch_paths)):
+            for file, ops in patch["files"].items():
+                try:
+                    self._target(file)
+                except ValueError as e:
+                    print(f"Warning: {patch['patch_id']}: not recording {len(ops)} operation(s): {e}")
+                    continue
+                for index, (key, op) in enumerate(zip(operation_keys(patch["patch_id"], file, ops), ops)):
+                    problems = validate_operation(op)
+                    if problems:
+                        print(f"Warning: {patch['patch_id']}: not recording {file} op {index}: {', '.join(problems)}")
+                        continue
+                    if key not in self.ledger["applied"]:
+                        self.ledger["applied"][key] = {"patch_id": patch["patch_id"], "file": file,
+                                                       "applied_at": stamp, "marked": True}
+                        added += 1
+        if added:
+            self.ledger_path.parent.mkdir(parents=True, exist_ok=True)
+            commit_writes({self.ledger_path: json.dumps(self.ledger, indent=2, ensure_ascii=False) + "\n"})
+        return added
+
+    def replay(self, patch_paths=None, out_dir=None, baseline_dir=None):
+        """
+        Rebuild patched files by applying the full patch history, ignoring
+        the ledger, to their pre-patch baseline copies.
+
+        Files marked applied without being patched here have no baseline
+        copy and are reported as errors; point baseline_dir at a checkout
+        taken before the first patch to rebuild those.
+
+        Args:
+            patch_paths: Descriptors to replay (default: all of patches/)
+            out_dir: If given, write every touched file there (same relative
+                     paths); the live tree is never modified
+            baseline_dir: Tree to start from (default: state/patch_baseline)
+
+        Returns:
+            dict: "docs" ({file: doc}), "applied", "errors" and "elapsed_ms"
+        """
+        start = time.perf_counter()
+        patches = [p for p in (load_patch(path) for path in (patch_paths or self.patch_paths())) if p]
+        plan = self._plan(patches, force=True, source_root=baseline_dir or self.repo_root / BASELINE_DIR)
+        docs = {file: doc for file, (doc, _) in plan["docs"].items()}
+        if out_dir:
+            for file, (doc, text) in plan["docs"].items():
+                target = Path(out_dir) / file
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_text(format_json(doc, text), encoding='utf-8')
+        return {
+            "docs": docs,
+            "applied": len(plan["applied"]),
+            "errors": plan["errors"],
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+
+    def status(self, patch_paths=None):
+        """
+        Per-patch operation counts.
+
+        Returns:
+            list: Dicts with "patch_id", "operations", "applied" and "documentation_only"
+        """
+        rows = []
+        for patch in filter(None, (load_patch(path) for path in (patch_paths or self.patch_paths()))):
+            keys = [key for file, ops in patch["files"].items()
+                    for key in operation_keys(patch["patch_id"], file, ops)]
+            rows.append({
+                "patch_id": patch["patch_id"],
+                "operations": len(keys),
+                "applied": sum(1 for key in keys if key in self.ledger["applied"]),
+                "documentation_only": not patch["files"],
+            })
+        return rows
+
+
+def _print_result(result):
+    if result["errors"]:
+        print("Patch rejected - no files were changed:")
+        for error in result["errors"]:
+            print(f"  ✗ {error}")
+        return
+    print(f"Applied {result['applied']} operation(s), skipped {result['skipped']} already applied "
+          f"({result['elapsed_ms']} ms)")
+    for file in result["files"]:
+        print(f"  ✓ {file}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply declarative JSON patches from patches/*.json.")
+    parser.add_argument("patches", nargs="*", help="Patch descriptor files")
+    parser.add_argument("--repo", default=str(REPO_ROOT), help="Repository root")
+    parser.add_argument("--all", action="store_true", help="Use every descriptor in patches/")
+    parser.add_argument("--dry-run", action="store_true", help="Validate without writing")
+    parser.add_argument("--force", action="store_true", help="Re-apply operations already in the ledger")
+    parser.add_argument("--mark-applied", action="store_true",
+                        help="Record operations as applied without running them")
+    parser.add_argument("--replay", action="store_true", help="Replay the patch history in memory")
+    parser.add_argument("--out", help="With --replay: write rebuilt files to this directory")
+    parser.add_argument("--baseline", help="With --replay: pre-patch tree to start from "
+                                           "(default: state/patch_baseline)")
+    parser.add_argument("--status", action="store_true", help="Show applied/pending operations per patch")
+    parser.add_argument("--journal", action="store_true",
+                        help="Record committed changes in the campaign event store (event_store.py)")
+    args = parser.parse_args()
+
+    event_store = None
+    if args.journal:
+        from event_store import CampaignEventStore
+        event_store = CampaignEventStore(args.repo)
+    engine = PatchEngine(args.repo, event_store=event_store)
+    paths = engine.patch_paths() if args.all or not args.patches else [Path(p) for p in args.patches]
+
+    if args.status:
+        for row in engine.status(paths):
+            if row["documentation_only"]:
+                print(f"  · {row['patch_id']}: documentation only")
+            else:
+                print(f"  {'✓' if row['applied'] == row['operations'] else '○'} {row['patch_id']}: "
+                      f"{row['applied']}/{row['operations']} operations applied")
+    elif args.replay:
+        result = engine.replay(paths, args.out, args.baseline)
+        print(f"Replayed {result['applied']} operation(s) over {len(result['docs'])} file(s) "
+              f"in {result['elapsed_ms']} ms")
+        for error in result["errors"]:
+            print(f"  ✗ {error}")
+        if args.out:
+            print(f"Rebuilt files written to {args.out}")
+    elif args.mark_applied:
+        print(f"Recorded {engine.mark_applied(paths)} operation(s) as applied")
+    elif args.all and not args.dry_run and not engine.ledger_path.exists():
+        # Without a ledger every operation looks new, even those already in the live files
+        print(f"No patch ledger at {engine.ledger_path}. If the live files already contain these patches, "
+              "record them with --all --mark-applied first; otherwise apply patch files by name.")
+    elif args.all or args.patches:
+        _print_result(engine.apply(paths, dry_run=args.dry_run, force=args.force))
+    else:
+        parser.error("Give patch files, --all, --status or --replay")
+
+
+if __name__ == "__main__":
+    main()
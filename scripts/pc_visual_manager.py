@@ -11,14 +11,10 @@ PC Visual Manager (Trigger-based)
 This mirrors the repo pattern where NPC stat sheets contain "scene_triggers".
 """
 
-import json
 import argparse
 from pathlib import Path
 
-
-def load_json(path: Path):
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+from json_io import load_json
 
 
 def auto_pick_single_pc(pcs_dir: Path):
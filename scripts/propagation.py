@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Ripple Propagation for Skyrim TTRPG
+
+Previews the knock-on effects of a single change before the GM commits it.
+A delta on a faction, NPC or clock is spread over one signed affinity graph:
+- NPC <-> NPC/player relationships (relationship_graph.py)
+- Faction <-> faction relationships (factions.json)
+- NPC -> faction membership (each NPC's "faction" field)
+- Clock -> faction ownership (faction clocks in factions.json and data/clocks)
+
+Each hop multiplies by the edge weight and a damping factor, so allies
+move with the change, enemies move against it and the effect fades with
+distance. The first hop uses the raw weights, so a direct ally of the
+changed node moves by delta * weight * damping however many neighbours it
+has; later hops divide each node's outgoing weights by its total
+|weight|, so well-connected hubs do not amplify the spread. The whole spread is a few sparse
+matrix-vector products; NumPy is used when installed, with an equivalent
+pure-Python fallback.
+
+Usage:
+    python3 propagation.py --faction imperial_legion 2
+    python3 propagation.py --npc ulfric_stormcloak -30
+    python3 propagation.py --clock civil_war_clocks.imperial_military_dominance 2
+"""
+
+import argparse
+import re
+
+from relationship_graph import PLAYER_ID, RelationshipGraph, slug
+from storage import open_storage
+
+# NumPy is optional; the pure-Python path gives the same results
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+DEFAULT_DAMPING = 0.5
+DEFAULT_HOPS = 3
+DEFAULT_THRESHOLD = 0.05
+
+# Affinity weights (-1..1) for edges that have no explicit value in the data
+MEMBERSHIP_AFFINITY = 0.6
+CLOCK_AFFINITY = 0.8
+
+# data/clocks files whose clocks are tied to factions
+CLOCK_FILES = ("civil_war_clocks", "thalmor_influence_clocks", "faction_trust_clocks")
+
+
+def _faction_key(name):
+    """Normalize a faction name: "The Companions (Inner Circle)" -> "companions"."""
+    text = re.sub(r"\(.*?\)", "", str(name)).strip()
+    key = slug(text)
+    return key[4:] if key.startswith("the_") else key
+
+
+class PropagationEngine:
+    def __init__(self, data_dir="../data", storage=None, damping=DEFAULT_DAMPING,
+                 max_hops=DEFAULT_HOPS, threshold=DEFAULT_THRESHOLD, use_numpy=None):
+        """
+        Initialize the PropagationEngine and build the affinity graph.
+
+        Args:
+            data_dir: Path to the data directory (default: "../data")
+            storage: Storage backend (default: open_storage(data_dir))
+            damping: Fraction of an effect passed on at each hop (0-1)
+            max_hops: How far effects travel
+            threshold: Smallest |impact| reported
+            use_numpy: Force (True) or disable (False) NumPy; default uses it if installed
+        """
+        self.storage = storage or open_storage(data_dir)
+        self.damping = damping
+        self.max_hops = max_hops
+        self.threshold = threshold
+        self.use_numpy = NUMPY_AVAILABLE if use_numpy is None else (use_numpy and NUMPY_AVAILABLE)
+        self.build()
+
+    # ------------------------------------------------------------------
+    # Graph construction
+    # ------------------------------------------------------------------
+
+    def _node(self, node_id, name=None):
+        if node_id not in self.index:
+            self.index[node_id] = len(self.nodes)
+            self.nodes.append(node_id)
+            self._edges.append({})
+        if name and node_id not in self.names:
+            self.names[node_id] = name
+        return self.index[node_id]
+
+    def _edge(self, a, b, weight):
+        if a == b or not weight:
+            return
+        u, v = self._node(a), self._node(b)
+        weight = max(-1.0, min(1.0, float(weight)))
+        self._edges[u][v] = weight
+        self._edges[v][u] = weight
+
+    def faction_node(self, name):
+        """Node id for a faction name or id (e.g., "Stormcloaks" -> "faction:stormcloaks")."""
+        key = _faction_key(name)
+        return f"faction:{self._faction_aliases.get(key, key)}"
+
+    def build(self):
+        """(Re)build the affinity graph and its sparse matrix from storage."""
+        self.nodes, self.index, self.names, self._edges = [], {}, {}, []
+        self._faction_aliases = {}
+
+        factions_data = self.storage.get("", "factions") or {}
+        major = factions_data.get("major_factions") or {}
+        for fid, faction in major.items():
+            self._faction_aliases[fid] = fid
+            if isinstance(faction, dict) and faction.get("name"):
+                self._faction_aliases.setdefault(_faction_key(faction["name"]), fid)
+        for doc_id, faction in self.storage.iter_documents("factions"):
+            if isinstance(faction, dict):
+                fid = faction.get("id") or doc_id
+                self._faction_aliases.setdefault(fid, fid)
+                if faction.get("name"):
+                    self._faction_aliases.setdefault(_faction_key(faction["name"]), fid)
+
+        # Faction <-> faction and faction clocks
+        for fid, faction in major.items():
+            if not isinstance(faction, dict):
+                continue
+            node = self.faction_node(fid)
+            self._node(node, faction.get("name"))
+            for other, value in (faction.get("relationships") or {}).items():
+                if isinstance(value, (int, float)):
+                    self._edge(node, self.faction_node(other), value / 100.0)
+            for clock in faction.get("clocks") or []:
+                if isinstance(clock, dict) and clock.get("name"):
+                    clock_node = f"clock:factions.{fid}.{slug(clock['name'])}"
+                    self._node(clock_node, clock["name"])
+                    self._edge(clock_node, node, CLOCK_AFFINITY)
+
+        # data/clocks entries, tied to a faction by their "faction" field, by the
+        # file ("thalmor_influence_clocks" -> thalmor) or by the clock key's first word
+        first_words = {}
+        for alias, fid in self._faction_aliases.items():
+            first_words.setdefault(alias.split("_")[0].rstrip("s"), fid)
+        for stem in CLOCK_FILES:
+            file_faction = first_words.get(stem.split("_")[0].rstrip("s"))
+            doc = self.storage.get("clocks", stem) or {}
+            for section in doc.values():
+                clocks = section.get("clocks") if isinstance(section, dict) else None
+                if not isinstance(clocks, dict):
+                    continue
+                for key, clock in clocks.items():
+                    if not isinstance(clock, dict):
+                        continue
+                    clock_node = f"clock:{stem}.{key}"
+                    faction = clock.get("faction")
+                    self._node(clock_node, clock.get("name") or (f"{faction} Trust" if faction else key))
+                    if faction:
+                        owner = self.faction_node(faction)
+                    else:
+                        fid = file_faction or first_words.get(key.split("_")[0].rstrip("s"))
+                        owner = f"faction:{fid}" if fid else None
+                    if owner:
+                        self._edge(clock_node, owner, CLOCK_AFFINITY)
+
+        # NPC relationships and faction membership
+        graph = RelationshipGraph(self.storage)
+        for node_id in graph.ids:
+            if node_id == PLAYER_ID:
+                continue
+            if node_id not in graph.sources and _faction_key(node_id) in self._faction_aliases:
+                continue
+            if node_id in graph.sources:
+                self._node(f"npc:{node_id}", graph.display_name(node_id))
+        self._node(PLAYER_ID, "Player Characters")
+
+        def as_node(node_id):
+            if node_id == PLAYER_ID:
+                return PLAYER_ID
+            if node_id not in graph.sources and _faction_key(node_id) in self._faction_aliases:
+                return self.faction_node(node_id)
+            return f"npc:{node_id}"
+
+        for a in graph.ids:
+            for b, weight in graph.neighbors(a):
+                if a < b:
+                    self._edge(as_node(a), as_node(b), weight / 100.0)
+
+        for node_id, (collection, doc_id) in graph.sources.items():
+            if collection != "npcs":
+                continue
+            npc = self.storage.get(collection, doc_id) or {}
+            if isinstance(npc.get("faction"), str) and npc["faction"].strip():
+                self._edge(f"npc:{node_id}", self.faction_node(npc["faction"]), MEMBERSHIP_AFFINITY)
+
+        self._compile()
+        return self
+
+    def _compile(self):
+        """
+        Freeze adjacency into CSR arrays: raw weights for the first hop and
+        weights normalized by each row's total |weight| for the rest.
+        """
+        indptr, indices, weights, data = [0], [], [], []
+        for row in self._edges:
+            scale = max(1.0, sum(abs(w) for w in row.values()))
+            for v, w in sorted(row.items()):
+                indices.append(v)
+                weights.append(w)
+                data.append(w / scale)
+            indptr.append(len(indices))
+        self.indptr, self.indices, self.weights, self.data = indptr, indices, weights, data
+        if self.use_numpy:
+            self._np_indptr = np.asarray(indptr, dtype=np.int64)
+            self._np_indices = np.asarray(indices, dtype=np.int64)
+            self._np_weights = np.asarray(weights, dtype=np.float64)
+            self._np_data = np.asarray(data, dtype=np.float64)
+            self._np_rows = np.repeat(np.arange(len(self.nodes)), np.diff(self._np_indptr))
+
+    # ------------------------------------------------------------------
+    # Propagation
+    # ------------------------------------------------------------------
+
+    def resolve(self, kind, name):
+        """
+        Node id for a faction, NPC or clock reference.
+
+        Args:
+            kind: "faction", "npc" or "clock"
+            name: Faction id/name, NPC id, or clock as "<file>.<key>" (e.g.,
+                  "civil_war_clocks.imperial_military_dominance")
+        """
+        if kind == "faction":
+            return self.faction_node(name)
+        if kind == "npc":
+            return PLAYER_ID if name == PLAYER_ID else f"npc:{name}"
+        if kind == "clock":
+            if f"clock:{name}" in self.index:
+                return f"clock:{name}"
+            matches = [n for n in self.nodes if n.startswith("clock:") and n.endswith(f".{name}")]
+            return matches[0] if matches else f"clock:{name}"
+        raise ValueError(f"Unknown node kind '{kind}'; expected faction, npc or clock")
+
+    def _spread_numpy(self, x):
+        total = np.zeros_like(x)
+        current = x
+        for hop in range(self.max_hops):
+            # y[v] = sum_u x[u] * W[u, v]  (sparse transpose mat-vec)
+            contrib = current[self._np_rows] * (self._np_weights if hop == 0 else self._np_data)
+            current = np.bincount(self._np_indices, weights=contrib, minlength=len(self.nodes)) * self.damping
+            total += current
+        return total
+
+    def _spread_python(self, x):
+        total = {}
+        current = x
+        for hop in range(self.max_hops):
+            data = self.weights if hop == 0 else self.data
+            nxt = {}
+            for u, value in current.items():
+                for p in range(self.indptr[u], self.indptr[u + 1]):
+                    v = self.indices[p]
+                    nxt[v] = nxt.get(v, 0.0) + value * data[p] * self.damping
+            for v, value in nxt.items():
+                total[v] = total.get(v, 0.0) + value
+            current = nxt
+        return total
+
+    def preview(self, deltas, limit=None):
+        """
+        Spread one or more deltas and rank the resulting changes.
+
+        Args:
+            deltas: {node_id: delta} (see resolve()), e.g. {"faction:stormcloaks": 2}
+            limit: Maximum number of changes to return
+
+        Returns:
+            list: Dicts with "node", "kind", "name", "impact" (in the units of
+                  the delta) and "suggested" (impact rounded), largest |impact| first.
+                  The changed nodes themselves are not listed.
+        """
+        sources = {}
+        for node_id, delta in deltas.items():
+            if node_id not in self.index:
+                print(f"Warning: Unknown node '{node_id}' - nothing to propagate")
+                continue
+            sources[self.index[node_id]] = sources.get(self.index[node_id], 0.0) + float(delta)
+        if not sources:
+            return []
+
+        if self.use_numpy:
+            x = np.zeros(len(self.nodes))
+            for u, delta in sources.items():
+                x[u] = delta
+            spread = self._spread_numpy(x)
+            impacts = {int(i): float(spread[i]) for i in np.nonzero(np.abs(spread) >= self.threshold)[0]}
+        else:
+            impacts = {u: v for u, v in self._spread_python(sources).items() if abs(v) >= self.threshold}
+
+        changes = []
+        for u, impact in impacts.items():
+            if u in sources:
+                continue
+            node_id = self.nodes[u]
+            changes.append({
+                "node": node_id,
+                "kind": node_id.split(":", 1)[0] if ":" in node_id else "npc",
+                "name": self.names.get(node_id, node_id.split(":", 1)[-1].replace("_", " ").title()),
+                "impact": round(impact, 3),
+                "suggested": int(round(impact)),
+            })
+        changes.sort(key=lambda c: (-abs(c["impact"]), c["node"]))
+        return changes[:limit] if limit else changes
+
+
+def format_preview(changes, limit=15):
+    """Render a preview as lines for the GM."""
+    if not changes:
+        return ["No significant ripple effects."]
+    lines = []
+    for change in changes[:limit]:
+        arrow = "▲" if change["impact"] > 0 else "▼"
+        lines.append(f"  {arrow} {change['impact']:+6.2f}  [{change['kind']}] {change['name']}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preview how a change ripples through factions, NPCs and clocks.")
+    parser.add_argument("--data-dir", default="../data")
+    parser.add_argument("--faction", nargs=2, metavar=("FACTION", "DELTA"))
+    parser.add_argument("--npc", nargs=2, metavar=("NPC", "DELTA"))
+    parser.add_argument("--clock", nargs=2, metavar=("CLOCK", "DELTA"))
+    parser.add_argument("--damping", type=float, default=DEFAULT_DAMPING)
+    parser.add_argument("--hops", type=int, default=DEFAULT_HOPS)
+    parser.add_argument("--limit", type=int, default=15)
+    args = parser.parse_args()
+
+    engine = PropagationEngine(args.data_dir, damping=args.damping, max_hops=args.hops)
+    deltas = {}
+    for kind in ("faction", "npc", "clock"):
+        value = getattr(args, kind)
+        if value:
+            deltas[engine.resolve(kind, value[0])] = float(value[1])
+    if not deltas:
+        parser.error("Give at least one of --faction, --npc or --clock")
+
+    print(f"Affinity graph: {len(engine.nodes)} nodes ({'NumPy' if engine.use_numpy else 'pure Python'})")
+    print("Change: " + ", ".join(f"{n} {d:+g}" for n, d in deltas.items()))
+    print("\nProjected ripples:")
+    for line in format_preview(engine.preview(deltas), args.limit):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
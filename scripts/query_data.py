@@ -13,19 +13,29 @@ This script provides querying capabilities for:
 import json
 import os
 from pathlib import Path
-from utils import location_matches
+from gazetteer import Gazetteer
+from relationship_graph import RelationshipGraph
+from storage import CachedStorage, open_storage
+from json_io import load_json
+
+# Collections rescanned by most queries; kept in memory while a DataWatcher is attached
+WATCHED_COLLECTIONS = ("npcs", "pcs", "quests", "sessions", "npc_stat_sheets")
 
 
 class DataQueryManager:
-    def __init__(self, data_dir="data"):
+    def __init__(self, data_dir="data", storage=None):
         """
         Initialize the DataQueryManager.
         
         Args:
             data_dir: Path to the data directory (default: "data")
+            storage: Storage backend (default: open_storage(data_dir), the JSON tree)
         """
         self.data_dir = Path(data_dir)
         self.npc_stat_sheets_dir = self.data_dir / "npc_stat_sheets"
+        self.storage = storage or open_storage(self.data_dir)
+        self._relationship_graph = None
+        self._gazetteer = None
         
         # Ensure directories exist
         (self.data_dir / "npcs").mkdir(parents=True, exist_ok=True)
@@ -35,6 +45,56 @@ class DataQueryManager:
         (self.data_dir / "sessions").mkdir(parents=True, exist_ok=True)
         (self.data_dir / "world_state").mkdir(parents=True, exist_ok=True)
         (self.data_dir / "rules").mkdir(parents=True, exist_ok=True)
+    
+    def relationship_graph(self):
+        """
+        Get the NPC relationship graph, built on first use.
+        
+        Returns:
+            RelationshipGraph: Graph over NPCs, PCs and npc_relationships.json
+        """
+        if self._relationship_graph is None:
+            self._relationship_graph = RelationshipGraph(self.storage)
+        return self._relationship_graph
+    
+    def gazetteer(self):
+        """
+        Get the location gazetteer, built on first use and kept current.
+        
+        Returns:
+            Gazetteer: Places from holds and stat sheets, with stat sheets by place
+        """
+        if self._gazetteer is None:
+            self._gazetteer = Gazetteer(self.data_dir, self.storage)
+        return self._gazetteer.refresh()
+    
+    def watch(self, watcher):
+        """
+        Serve queries from memory, kept current by a DataWatcher.
+        
+        The hot collections are loaded once into a CachedStorage; each change
+        batch from the watcher updates only the documents (and index entries)
+        that changed.
+        
+        Args:
+            watcher: DataWatcher over this manager's data directory
+            
+        Returns:
+            callable: Unsubscribe function
+        """
+        if not isinstance(self.storage, CachedStorage):
+            self.storage = CachedStorage(self.storage, WATCHED_COLLECTIONS)
+            self._relationship_graph = None
+            self._gazetteer = None
+        return watcher.subscribe(self._apply_changes)
+    
+    def _apply_changes(self, events):
+        self.storage.apply_changes(events)
+        # The relationship graph is rebuilt on next use if any of its sources changed
+        if any(e.collection in ("npcs", "pcs") or e.path == "npc_relationships.json" for e in events):
+            self._relationship_graph = None
+        if self._gazetteer is not None and any(e.collection in ("holds", "npc_stat_sheets") for e in events):
+            self._gazetteer.invalidate()
         
     def query_npcs(self, name=None, location=None, faction=None):
         """
@@ -48,20 +108,17 @@ class DataQueryManager:
         Returns:
             list: List of matching NPC dictionaries
         """
-        npcs_dir = self.data_dir / "npcs"
-        if not npcs_dir.exists():
-            return []
-            
         results = []
         
-        for npc_file in npcs_dir.glob("*.json"):
-            try:
-                with open(npc_file, 'r', encoding='utf-8') as f:
-                    npc = json.load(f)
-            except (IOError, json.JSONDecodeError) as e:
-                print(f"Warning: Error reading {npc_file.name}: {e}")
-                continue
-            
+        # Exact-match filters go through the storage index; partial matches are checked below
+        exact = {}
+        if location and isinstance(location, str):
+            exact['location'] = location
+        if faction and isinstance(faction, str):
+            exact['faction'] = faction
+        candidates = self.storage.find("npcs", **exact) if exact else self.storage.iter_documents("npcs")
+        
+        for _, npc in candidates:
             match = True
             if name and isinstance(name, str):
                 npc_name = npc.get('name', '')
@@ -92,20 +149,9 @@ class DataQueryManager:
         Returns:
             list: List of matching PC dictionaries
         """
-        pcs_dir = self.data_dir / "pcs"
-        if not pcs_dir.exists():
-            return []
-            
         results = []
         
-        for pc_file in pcs_dir.glob("*.json"):
-            try:
-                with open(pc_file, 'r', encoding='utf-8') as f:
-                    pc = json.load(f)
-            except (IOError, json.JSONDecodeError) as e:
-                print(f"Warning: Error reading {pc_file.name}: {e}")
-                continue
-            
+        for _, pc in self.storage.iter_documents("pcs"):
             match = True
             if name and isinstance(name, str):
                 pc_name = pc.get('name', '')
@@ -133,20 +179,9 @@ class DataQueryManager:
         Returns:
             list: List of matching quest dictionaries
         """
-        quests_dir = self.data_dir / "quests"
-        if not quests_dir.exists():
-            return []
-            
         results = []
         
-        for quest_file in quests_dir.glob("*.json"):
-            try:
-                with open(quest_file, 'r', encoding='utf-8') as f:
-                    quest = json.load(f)
-            except (IOError, json.JSONDecodeError) as e:
-                print(f"Warning: Error reading {quest_file.name}: {e}")
-                continue
-            
+        for _, quest in self.storage.iter_documents("quests"):
             match = True
             if status and isinstance(status, str):
                 quest_status = quest.get('status', '')
@@ -177,20 +212,9 @@ class DataQueryManager:
         Returns:
             list: List of matching faction dictionaries
         """
-        factions_dir = self.data_dir / "factions"
-        if not factions_dir.exists():
-            return []
-            
         results = []
         
-        for faction_file in factions_dir.glob("*.json"):
-            try:
-                with open(faction_file, 'r', encoding='utf-8') as f:
-                    faction = json.load(f)
-            except (IOError, json.JSONDecodeError) as e:
-                print(f"Warning: Error reading {faction_file.name}: {e}")
-                continue
-            
+        for _, faction in self.storage.iter_documents("factions"):
             match = True
             if name and isinstance(name, str):
                 faction_name = faction.get('name', '')
@@ -218,17 +242,14 @@ class DataQueryManager:
         Returns:
             dict: Faction quest information, or error dict if file not found
         """
-        factions_file = self.data_dir / "factions.json"
-        
-        if not factions_file.exists():
-            return {"error": "Factions file not found"}
-        
         try:
-            with open(factions_file, 'r', encoding='utf-8') as f:
-                factions_data = json.load(f)
+            factions_data = self.storage.get("", "factions")
         except (IOError, json.JSONDecodeError) as e:
             return {"error": f"Error reading factions file: {e}"}
         
+        if factions_data is None:
+            return {"error": "Factions file not found"}
+        
         faction_quests = factions_data.get('faction_quests', {})
         results = {}
         
@@ -271,17 +292,14 @@ class DataQueryManager:
         Returns:
             dict: Trust mechanics data, or error dict if file not found
         """
-        factions_file = self.data_dir / "factions.json"
-        
-        if not factions_file.exists():
-            return {"error": "Factions file not found"}
-        
         try:
-            with open(factions_file, 'r', encoding='utf-8') as f:
-                factions_data = json.load(f)
+            factions_data = self.storage.get("", "factions")
         except (IOError, json.JSONDecodeError) as e:
             return {"error": f"Error reading factions file: {e}"}
         
+        if factions_data is None:
+            return {"error": "Factions file not found"}
+        
         return factions_data.get('trust_mechanics', {})
     
     def get_main_story_integration(self):
@@ -291,17 +309,14 @@ class DataQueryManager:
         Returns:
             dict: Main story integration data, or error dict if file not found
         """
-        factions_file = self.data_dir / "factions.json"
-        
-        if not factions_file.exists():
-            return {"error": "Factions file not found"}
-        
         try:
-            with open(factions_file, 'r', encoding='utf-8') as f:
-                factions_data = json.load(f)
+            factions_data = self.storage.get("", "factions")
         except (IOError, json.JSONDecodeError) as e:
             return {"error": f"Error reading factions file: {e}"}
         
+        if factions_data is None:
+            return {"error": "Factions file not found"}
+        
         return factions_data.get('main_story_integration', {})
     
     def get_world_state(self):
@@ -311,15 +326,11 @@ class DataQueryManager:
         Returns:
             dict: World state data if successful, None otherwise
         """
-        world_state_file = self.data_dir / "world_state" / "current_state.json"
-        if world_state_file.exists():
-            try:
-                with open(world_state_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (IOError, json.JSONDecodeError) as e:
-                print(f"Error reading world state: {e}")
-                return None
-        return None
+        try:
+            return self.storage.get("world_state", "current_state")
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"Error reading world state: {e}")
+            return None
     
     def search_rules(self, keyword):
         """
@@ -377,10 +388,6 @@ class DataQueryManager:
         Returns:
             list: List of session data dictionaries
         """
-        sessions_dir = self.data_dir / "sessions"
-        if not sessions_dir.exists():
-            return []
-            
         results = []
         
         if session_number:
@@ -388,23 +395,17 @@ class DataQueryManager:
                 print("Error: session_number must be a positive integer")
                 return []
                 
-            session_file = sessions_dir / f"session_{session_number:03d}.json"
-            if session_file.exists():
-                try:
-                    with open(session_file, 'r', encoding='utf-8') as f:
-                        return [json.load(f)]
-                except (IOError, json.JSONDecodeError) as e:
-                    print(f"Error reading session file: {e}")
-                    return []
+            try:
+                session = self.storage.get("sessions", f"session_{session_number:03d}")
+            except (IOError, json.JSONDecodeError) as e:
+                print(f"Error reading session file: {e}")
+                return []
+            if session is not None:
+                return [session]
         else:
             # Return all sessions
-            for session_file in sorted(sessions_dir.glob("session_*.json")):
-                try:
-                    with open(session_file, 'r', encoding='utf-8') as f:
-                        results.append(json.load(f))
-                except (IOError, json.JSONDecodeError) as e:
-                    print(f"Warning: Error reading {session_file.name}: {e}")
-                    continue
+            for _, session in self.storage.iter_documents("sessions", "session_*"):
+                results.append(session)
         
         return results
     
@@ -422,21 +423,22 @@ class DataQueryManager:
             print("Error: character_id must be a non-empty string")
             return {}
             
-        # Check NPCs
-        npcs = self.query_npcs()
-        pcs = self.query_pcs()
-        
+        # Files are normally named after their id, so try a direct lookup first
         target = None
-        for npc in npcs:
-            if npc.get('id') == character_id:
-                target = npc
+        for collection in ("npcs", "pcs"):
+            try:
+                doc = self.storage.get(collection, character_id)
+            except (IOError, json.JSONDecodeError):
+                doc = None
+            if isinstance(doc, dict) and doc.get('id') == character_id:
+                target = doc
                 break
         
+        # Fall back to the relationship graph's id -> document map (built once)
         if not target:
-            for pc in pcs:
-                if pc.get('id') == character_id:
-                    target = pc
-                    break
+            source = self.relationship_graph().sources.get(character_id)
+            if source:
+                target = self.storage.get(*source)
         
         if target and 'relationships' in target:
             return target['relationships']
@@ -462,8 +464,7 @@ class DataQueryManager:
             return {"error": "PDF index not found", "files": [], "details": []}
         
         try:
-            with open(pdf_index_file, 'r', encoding='utf-8') as f:
-                pdf_index = json.load(f)
+            pdf_index = load_json(pdf_index_file)
         except (IOError, json.JSONDecodeError) as e:
             return {"error": f"Error reading PDF index: {e}", "files": [], "details": []}
         
@@ -529,14 +530,13 @@ class DataQueryManager:
                 detail_format = detail.get('format', '')
                 try:
                     if detail_format == 'json':
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                            content.append({
-                                'file': str(file_path),
-                                'type': 'json',
-                                'content': data,
-                                'description': detail.get('description', '')
-                            })
+                        data = load_json(file_path)
+                        content.append({
+                            'file': str(file_path),
+                            'type': 'json',
+                            'content': data,
+                            'description': detail.get('description', '')
+                        })
                     elif detail_format == 'markdown':
                         with open(file_path, 'r', encoding='utf-8') as f:
                             text = f.read()
@@ -563,66 +563,79 @@ class DataQueryManager:
             name: Search by name (partial match)
             entity_type: Filter by type (e.g., 'Ally', 'Enemy', 'Dragon', 'Undead')
             category: Filter by category ('Friendly NPC', 'Hostile NPC', 'Enemy')
-            location: Filter by location (partial match, case-insensitive)
+            location: Filter by location (gazetteer match; a hold or city includes the places in it)
         
         Returns:
             List of matching stat sheets
         """
-        if not self.npc_stat_sheets_dir.exists():
-            return []
-        
         results = []
         
-        for stat_file in self.npc_stat_sheets_dir.glob("*.json"):
-            try:
-                with open(stat_file, 'r') as f:
-                    stat_sheet = json.load(f)
-                
-                match = True
-                
-                # Name filter (partial, case-insensitive)
-                if name and name.lower() not in stat_sheet.get('name', '').lower():
-                    match = False
-                
-                # Type filter (exact match, case-insensitive)
-                if entity_type and entity_type.lower() != stat_sheet.get('type', '').lower():
-                    match = False
-                
-                # Category filter (exact match, case-insensitive)
-                if category and category.lower() != stat_sheet.get('category', '').lower():
-                    match = False
-                
-                # Location filter (partial match in either direction, case-insensitive)
-                if location:
-                    sheet_location = stat_sheet.get('location', '')
-                    if not location_matches(location, sheet_location):
-                        match = False
-                
-                if match:
-                    results.append(stat_sheet)
+        # The gazetteer resolves a location to its stat sheets; otherwise category is
+        # an exact match, so let the storage index narrow the candidates
+        if location:
+            candidates = self._stat_sheets(self.gazetteer().sheets_at(location))
+        elif category:
+            candidates = self.storage.find("npc_stat_sheets", category=category)
+        else:
+            candidates = self.storage.iter_documents("npc_stat_sheets")
+        
+        for _, stat_sheet in candidates:
+            match = True
             
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Warning: Error reading {stat_file.name}: {e}")
-                continue
+            # Category filter (exact match, case-insensitive) when candidates came from the gazetteer
+            if location and category and category.lower() != str(stat_sheet.get('category', '')).lower():
+                match = False
+            
+            # Name filter (partial, case-insensitive)
+            if name and name.lower() not in stat_sheet.get('name', '').lower():
+                match = False
+            
+            # Type filter (exact match, case-insensitive)
+            if entity_type and entity_type.lower() != stat_sheet.get('type', '').lower():
+                match = False
+            
+            if match:
+                results.append(stat_sheet)
         
         return results
     
+    def _stat_sheets(self, doc_ids):
+        """(doc_id, stat sheet) pairs for the given ids, sorted by id."""
+        for doc_id in sorted(doc_ids):
+            try:
+                stat_sheet = self.storage.get("npc_stat_sheets", doc_id)
+            except (IOError, json.JSONDecodeError) as e:
+                print(f"Warning: Error reading {doc_id}.json: {e}")
+                continue
+            if isinstance(stat_sheet, dict):
+                yield doc_id, stat_sheet
+    
+    def get_stat_sheets_at(self, location):
+        """
+        Get the stat sheets whose location matches, through the gazetteer.
+        
+        Args:
+            location: Place name (e.g. 'Whiterun', 'The Pale', 'Nordic ruins');
+                     a hold or city includes the places inside it
+        
+        Returns:
+            List of matching stat sheets, sorted by id
+        """
+        return [stat_sheet for _, stat_sheet in self._stat_sheets(self.gazetteer().sheets_at(location))]
+    
     def get_npc_enemy_stat_by_id(self, stat_id):
         """Get a specific NPC/enemy stat sheet by ID"""
-        if not self.npc_stat_sheets_dir.exists():
-            return None
+        # Stat sheet files are normally named after their id
+        try:
+            stat_sheet = self.storage.get("npc_stat_sheets", stat_id)
+        except (IOError, json.JSONDecodeError):
+            stat_sheet = None
+        if isinstance(stat_sheet, dict) and stat_sheet.get('id') == stat_id:
+            return stat_sheet
         
-        for stat_file in self.npc_stat_sheets_dir.glob("*.json"):
-            try:
-                with open(stat_file, 'r') as f:
-                    stat_sheet = json.load(f)
-                
-                if stat_sheet.get('id') == stat_id:
-                    return stat_sheet
-            
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Warning: Error reading {stat_file.name}: {e}")
-                continue
+        for _, stat_sheet in self.storage.iter_documents("npc_stat_sheets"):
+            if stat_sheet.get('id') == stat_id:
+                return stat_sheet
         
         return None
     
@@ -640,44 +653,36 @@ class DataQueryManager:
         Returns:
             Dict with primary, contested, and rare enemies for the hold
         """
-        if not self.npc_stat_sheets_dir.exists():
-            return {"primary": [], "contested": [], "rare": []}
-        
         results = {
             "primary": [],
             "contested": [],
             "rare": []
         }
         
-        for stat_file in self.npc_stat_sheets_dir.glob("*.json"):
-            try:
-                with open(stat_file, 'r') as f:
-                    stat_sheet = json.load(f)
-                
-                # Only consider enemies
-                if stat_sheet.get('category') != 'Enemy':
-                    continue
-                
-                hold_context = stat_sheet.get('hold_context', {})
-                
-                # Check if hold is in primary list
-                if hold_name in hold_context.get('primary', []):
-                    results['primary'].append(stat_sheet)
-                # Check if hold is in contested list
-                elif hold_name in hold_context.get('contested', []):
-                    results['contested'].append(stat_sheet)
-                # Check if hold is in rare list
-                elif hold_name in hold_context.get('rare', []):
-                    results['rare'].append(stat_sheet)
-                # Also check location field for general matches
-                elif location_matches(hold_name, stat_sheet.get('location', '')):
-                    # Add to primary if no hold_context specified
-                    if not hold_context:
-                        results['primary'].append(stat_sheet)
-            
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Warning: Error reading {stat_file.name}: {e}")
+        # Stat sheets whose location lies in the hold (or names it, if it is not a known hold)
+        hold_sheets = self.gazetteer().sheets_in_hold(hold_name)
+        
+        for doc_id, stat_sheet in self.storage.find("npc_stat_sheets", category="Enemy"):
+            # Only consider enemies (the index match is case-insensitive)
+            if stat_sheet.get('category') != 'Enemy':
                 continue
+            
+            hold_context = stat_sheet.get('hold_context', {})
+            
+            # Check if hold is in primary list
+            if hold_name in hold_context.get('primary', []):
+                results['primary'].append(stat_sheet)
+            # Check if hold is in contested list
+            elif hold_name in hold_context.get('contested', []):
+                results['contested'].append(stat_sheet)
+            # Check if hold is in rare list
+            elif hold_name in hold_context.get('rare', []):
+                results['rare'].append(stat_sheet)
+            # Also check location field for general matches
+            elif doc_id in hold_sheets:
+                # Add to primary if no hold_context specified
+                if not hold_context:
+                    results['primary'].append(stat_sheet)
         
         return results
     
@@ -691,27 +696,12 @@ class DataQueryManager:
         Returns:
             List of enemy stat sheets appropriate for the act
         """
-        if not self.npc_stat_sheets_dir.exists():
-            return []
-        
         results = []
         
-        for stat_file in self.npc_stat_sheets_dir.glob("*.json"):
-            try:
-                with open(stat_file, 'r') as f:
-                    stat_sheet = json.load(f)
-                
-                # Only consider enemies
-                if stat_sheet.get('category') != 'Enemy':
-                    continue
-                
-                # Check if act is in act_context
-                if act in stat_sheet.get('act_context', []):
-                    results.append(stat_sheet)
-            
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Warning: Error reading {stat_file.name}: {e}")
-                continue
+        for _, stat_sheet in self.storage.find_member("npc_stat_sheets", "act_context", act):
+            # Only consider enemies
+            if stat_sheet.get('category') == 'Enemy':
+                results.append(stat_sheet)
         
         return results
     
@@ -755,23 +745,15 @@ class DataQueryManager:
     
     def list_all_stat_sheets(self):
         """List all available NPC/enemy stat sheets"""
-        if not self.npc_stat_sheets_dir.exists():
-            return []
-        
         results = []
-        for stat_file in self.npc_stat_sheets_dir.glob("*.json"):
-            try:
-                with open(stat_file, 'r') as f:
-                    stat_sheet = json.load(f)
-                    results.append({
-                        'id': stat_sheet.get('id'),
-                        'name': stat_sheet.get('name'),
-                        'type': stat_sheet.get('type'),
-                        'category': stat_sheet.get('category'),
-                        'location': stat_sheet.get('location')
-                    })
-            except (json.JSONDecodeError, IOError):
-                continue
+        for _, stat_sheet in self.storage.iter_documents("npc_stat_sheets"):
+            results.append({
+                'id': stat_sheet.get('id'),
+                'name': stat_sheet.get('name'),
+                'type': stat_sheet.get('type'),
+                'category': stat_sheet.get('category'),
+                'location': stat_sheet.get('location')
+            })
         
         return results
 
@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Query Service for Skyrim TTRPG
+
+A long-running local JSON-RPC 2.0 service in front of DataQueryManager,
+StoryManager, GMTools and NPCManager, so GM tools, a player display and a
+logger can share one warm process instead of each paying interpreter
+start-up and a cold parse of data/:
+- Listens on a Unix socket (default) or a localhost TCP port. Clients send
+  one JSON-RPC request (or batch) per line; an HTTP POST with a JSON body
+  is answered on the same listener
+- Methods are "<manager>.<method>" (query., story., gm., npc.) with params
+  as a list or object; "rpc.methods" lists them. Anything a method prints
+  is returned in the response's "output" member
+- Reads are answered from memory: the managers are attached to one
+  DataWatcher, which is polled on the event loop, so hand edits and patch
+  scripts are picked up without a restart
+- Writes are serialized through one writer task; caches are refreshed from
+  the watcher before the write's response is sent
+
+Usage:
+    python3 query_service.py serve                                   # ../state/query_service.sock
+    python3 query_service.py serve --port 8765
+    python3 query_service.py call query.query_npcs '{"name": "Lydia"}'
+    python3 query_service.py call story.advance_clock '["civil_war", "imperial_military_dominance", 1]'
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import inspect
+import io
+import json
+import socket
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from clock_reactions import ClockReactions
+from data_watcher import DataWatcher
+from event_bus import EventBus
+from gm_tools import GMTools
+from json_io import loads
+from npc_manager import NPCManager
+from story_manager import StoryManager
+
+DEFAULT_SOCKET = "../state/query_service.sock"
+DEFAULT_POLL_INTERVAL = 1.0
+
+# Exposed operations per manager; writes go through the writer task
+READ_METHODS = {
+    "query": (
+        "query_npcs", "query_pcs", "query_quests", "query_factions", "query_faction_quests",
+        "get_trust_mechanics", "get_main_story_integration", "get_world_state", "search_rules",
+        "get_session_log", "get_character_relationships", "query_pdf_topics", "get_pdf_content",
+        "query_npc_enemy_stats", "get_stat_sheets_at", "get_npc_enemy_stat_by_id",
+        "get_enemies_by_location", "get_enemies_by_hold", "get_enemies_by_act",
+        "get_npcs_for_scene", "list_all_stat_sheets",
+    ),
+    "story": (
+        "load_campaign_state", "load_main_quests", "load_civil_war_quests", "get_available_quests",
+        "check_story_arcs", "generate_story_summary", "get_scene_npcs", "get_faction_status",
+        "get_starting_companion", "get_companion_dialogue_hooks", "get_neutral_faction_quest_hooks",
+        "generate_wilderness_encounter", "get_available_faction_quests", "get_current_act_number",
+        "get_act_appropriate_quests", "load_clocks", "get_story_hooks_for_quest",
+        "get_active_timeline_state", "plan_journey",
+    ),
+    "gm": (
+        "pre_session_check", "view_all_clocks", "get_faction_hooks", "get_campaign_overview",
+        "suggest_session_content", "quick_reference", "generate_random_encounter",
+        "suggest_npc_stats_for_scene", "inject_npc_stats_to_combat", "get_npc_relationship_advice",
+        "tri_check_result", "review_companion_loyalty",
+    ),
+    "npc": (
+        "load_npc", "load_relationships", "check_companion_status", "list_npcs",
+        "companion_loyalty_check", "get_active_companions", "get_available_companions",
+        "check_faction_alignment", "load_faction_leader_npc",
+    ),
+}
+WRITE_METHODS = {
+    "story": (
+        "record_branching_decision", "update_civil_war_state", "update_main_quest_state",
+        "update_thalmor_arc", "advance_quest", "add_world_consequence", "apply_combat_consequences",
+        "trigger_scene_event", "track_faction_quest_progress", "trigger_battle_of_whiterun_encounter",
+        "resolve_hadvar_ralof_choice", "advance_to_next_act", "advance_clock",
+        "advance_whiterun_jobs_clock", "integrate_quest_with_clocks",
+    ),
+    "npc": (
+        "save_npc", "update_loyalty", "update_relationship", "flush_relationships", "create_npc_template",
+        "recruit_companion", "dismiss_companion", "process_decision_point",
+        "handle_dialogue_interaction", "add_companion_to_party", "switch_companion_allegiance",
+    ),
+}
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+class RPCError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _to_json(value):
+    """json.dumps default for the results managers return."""
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    if isinstance(value, Path):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    return str(value)
+
+
+def _dumps(value):
+    return json.dumps(value, default=_to_json, ensure_ascii=False).encode("utf-8")
+
+
+def _error(request_id, code, message):
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+class QueryService:
+    def __init__(self, data_dir="../data", state_dir="../state", poll_interval=DEFAULT_POLL_INTERVAL):
+        """
+        Initialize the QueryService: load the managers and warm their caches.
+
+        Args:
+            data_dir: Path to the data directory (default: "../data")
+            state_dir: Path to the state directory (default: "../state")
+            poll_interval: Seconds between checks of data/ for outside edits
+                           (0 disables; writes made through the service are
+                           always picked up)
+        """
+        self.data_dir = Path(data_dir)
+        self.state_dir = Path(state_dir)
+        self.poll_interval = poll_interval
+        self.watcher = DataWatcher(self.data_dir)
+        # Clock advances reach companion loyalty, rumors and scene flags through the bus
+        self.bus = EventBus()
+        self.story = StoryManager(self.data_dir, self.state_dir, bus=self.bus)
+        self.story.watch(self.watcher)
+        # One warm DataQueryManager and CachedStorage, shared with the NPC manager
+        self.query = self.story.query_manager
+        self.gm = GMTools(self.data_dir, self.state_dir)
+        self.gm.watch(self.watcher)
+        self.npc = NPCManager(self.data_dir, self.state_dir, storage=self.query.storage)
+        ClockReactions(self.npc).connect(self.bus)
+
+        managers = {"query": self.query, "story": self.story, "gm": self.gm, "npc": self.npc}
+        self.methods = {}
+        for table, write in ((READ_METHODS, False), (WRITE_METHODS, True)):
+            for prefix, names in table.items():
+                for name in names:
+                    self.methods[f"{prefix}.{name}"] = (getattr(managers[prefix], name), write)
+        self.stats = {"reads": 0, "writes": 0, "errors": 0}
+        self._writes = None
+        self._tasks = []
+        self._connections = set()
+
+    def _call(self, func, args, kwargs):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            value = func(*args, **kwargs)
+        return value, output.getvalue()
+
+    async def _writer(self):
+        """Apply queued writes one at a time, refreshing caches after each."""
+        while True:
+            func, args, kwargs, future = await self._writes.get()
+            try:
+                outcome = self._call(func, args, kwargs)
+            except Exception as e:
+                outcome = e
+            # Pick up the files the write touched before anyone reads again
+            self.watcher.poll()
+            if not future.cancelled():
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
+
+    async def _refresher(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            self.watcher.poll()
+
+    async def call(self, method, params=None):
+        """
+        Run one operation (reads inline, writes through the writer task).
+
+        Returns:
+            tuple: (return value, printed output)
+
+        Raises:
+            RPCError: Unknown method or parameters that do not fit it
+        """
+        if method == "rpc.methods":
+            return {name: "write" if write else "read" for name, (_, write) in sorted(self.methods.items())}, ""
+        if method == "rpc.stats":
+            return dict(self.stats, pending_writes=self._writes.qsize() if self._writes else 0), ""
+        if method not in self.methods:
+            raise RPCError(METHOD_NOT_FOUND, f"Method not found: {method}")
+        func, write = self.methods[method]
+        if params is None:
+            args, kwargs = [], {}
+        elif isinstance(params, list):
+            args, kwargs = params, {}
+        elif isinstance(params, dict):
+            args, kwargs = [], params
+        else:
+            raise RPCError(INVALID_PARAMS, "params must be an array or an object")
+        try:
+            inspect.signature(func).bind(*args, **kwargs)
+        except TypeError as e:
+            raise RPCError(INVALID_PARAMS, f"Invalid params for {method}: {e}")
+
+        if not write:
+            self.stats["reads"] += 1
+            return self._call(func, args, kwargs)
+        self.stats["writes"] += 1
+        if self._writes is None:
+            # Not serving (e.g., called directly): there is no one to race with
+            outcome = self._call(func, args, kwargs)
+            self.watcher.poll()
+            return outcome
+        future = asyncio.get_running_loop().create_future()
+        await self._writes.put((func, args, kwargs, future))
+        return await future
+
+    async def handle(self, request):
+        """
+        Answer one decoded JSON-RPC request object.
+
+        Returns:
+            dict: The response, or None for a notification
+        """
+        if not isinstance(request, dict) or request.get("jsonrpc") != "2.0" \
+                or not isinstance(request.get("method"), str):
+            self.stats["errors"] += 1
+            return _error(request.get("id") if isinstance(request, dict) else None,
+                          INVALID_REQUEST, "Invalid Request")
+        request_id = request.get("id")
+        try:
+            value, output = await self.call(request["method"], request.get("params"))
+        except RPCError as e:
+            self.stats["errors"] += 1
+            response = _error(request_id, e.code, e.message)
+        except Exception as e:
+            self.stats["errors"] += 1
+            response = _error(request_id, INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+        else:
+            response = {"jsonrpc": "2.0", "id": request_id, "result": value}
+            if output:
+                response["output"] = output
+        return response if "id" in request else None
+
+    async def handle_payload(self, data):
+        """
+        Answer a raw request or batch.
+
+        Returns:
+            bytes: Encoded response, or None if nothing needs answering
+        """
+        try:
+            payload = loads(data)
+        except (ValueError, UnicodeDecodeError) as e:
+            return _dumps(_error(None, PARSE_ERROR, f"Parse error: {e}"))
+        if isinstance(payload, list):
+            if not payload:
+                return _dumps(_error(None, INVALID_REQUEST, "Invalid Request"))
+            responses = [r for r in [await self.handle(item) for item in payload] if r is not None]
+            return _dumps(responses) if responses else None
+        response = await self.handle(payload)
+        return _dumps(response) if response is not None else None
+
+    async def _serve_client(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            line = await reader.readline()
+            if line.startswith((b"POST ", b"GET ", b"HEAD ")):
+                await self._serve_http(line, reader, writer)
+                return
+            while line:
+                if line.strip():
+                    response = await self.handle_payload(line)
+                    if response is not None:
+                        writer.write(response + b"\n")
+                        await writer.drain()
+                line = await reader.readline()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _serve_http(self, request_line, reader, writer):
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            length = -1
+        if not request_line.startswith(b"POST "):
+            status, body = "405 Method Not Allowed", _dumps(_error(None, INVALID_REQUEST, "POST a JSON-RPC request"))
+        elif length < 0:
+            status, body = "400 Bad Request", _dumps(_error(None, INVALID_REQUEST, "Invalid Content-Length"))
+        else:
+            data = await reader.readexactly(length)
+            body = await self.handle_payload(data)
+            status = "200 OK" if body is not None else "204 No Content"
+        body = body or b""
+        writer.write((f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                      f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n").encode("ascii") + body)
+        await writer.drain()
+
+    async def start(self, socket_path=None, host="127.0.0.1", port=None):
+        """
+        Start listening and the writer (and refresher) tasks.
+
+        Args:
+            socket_path: Unix socket to listen on (used when port is None)
+            host: TCP host for port (default: localhost only)
+            port: TCP port to listen on instead of a Unix socket
+
+        Returns:
+            asyncio.base_events.Server: The listening server
+        """
+        self._writes = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._writer())]
+        if self.poll_interval:
+            self._tasks.append(asyncio.create_task(self._refresher()))
+        if port is not None:
+            return await asyncio.start_server(self._serve_client, host, port)
+        path = Path(socket_path or DEFAULT_SOCKET)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.unlink(missing_ok=True)
+        return await asyncio.start_unix_server(self._serve_client, str(path))
+
+    async def stop(self, server):
+        """Stop listening, drop open connections, cancel the service tasks and write pending relationships."""
+        server.close()
+        tasks = self._tasks + list(self._connections)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await server.wait_closed()
+        self._tasks, self._writes = [], None
+        self.npc.flush_relationships()
+
+
+class ServiceClient:
+    """Minimal blocking client for scripts: one connection, one request at a time."""
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, host="127.0.0.1", port=None, timeout=30.0):
+        if port is not None:
+            self._sock = socket.create_connection((host, port), timeout=timeout)
+        else:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(timeout)
+            self._sock.connect(str(socket_path))
+        self._file = self._sock.makefile("rb")
+        self._next_id = 0
+
+    def request(self, method, params=None):
+        """Send one request and return the whole response object."""
+        self._next_id += 1
+        request = {"jsonrpc": "2.0", "id": self._next_id, "method": method}
+        if params is not None:
+            request["params"] = params
+        self._sock.sendall(_dumps(request) + b"\n")
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Query service closed the connection")
+        return loads(line)
+
+    def call(self, method, *args, **kwargs):
+        """
+        Call a method and return its result.
+
+        Raises:
+            RuntimeError: The service answered with an error
+        """
+        response = self.request(method, kwargs if kwargs else list(args))
+        if "error" in response:
+            raise RuntimeError(f"{response['error']['message']} ({response['error']['code']})")
+        return response["result"]
+
+    def close(self):
+        self._file.close()
+        self._sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve campaign queries and updates over JSON-RPC.")
+    parser.add_argument("command", choices=["serve", "call"])
+    parser.add_argument("method", nargs="?", help="call: method name (e.g., query.query_npcs)")
+    parser.add_argument("params", nargs="?", help="call: JSON array or object of parameters")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help=f"Unix socket path (default: {DEFAULT_SOCKET})")
+    parser.add_argument("--port", type=int, default=None, help="Use localhost TCP on this port instead")
+    parser.add_argument("--data-dir", default="../data", help="Data directory (default: ../data)")
+    parser.add_argument("--state-dir", default="../state", help="State directory (default: ../state)")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                        help=f"Seconds between checks for outside edits (default: {DEFAULT_POLL_INTERVAL})")
+    args = parser.parse_args()
+
+    if args.command == "call":
+        if not args.method:
+            parser.error("call needs a method")
+        try:
+            client = ServiceClient(args.socket, port=args.port)
+        except OSError as e:
+            print(f"Error: Could not connect to the query service: {e}")
+            sys.exit(1)
+        try:
+            response = client.request(args.method, json.loads(args.params) if args.params else None)
+        finally:
+            client.close()
+        if response.get("output"):
+            print(response["output"], end="")
+        if "error" in response:
+            print(f"Error: {response['error']['message']}")
+            sys.exit(1)
+        print(json.dumps(response["result"], indent=2, ensure_ascii=False))
+        return
+
+    async def serve():
+        service = QueryService(args.data_dir, args.state_dir, args.poll_interval)
+        server = await service.start(args.socket, port=args.port)
+        where = f"127.0.0.1:{args.port}" if args.port is not None else args.socket
+        print(f"Query service listening on {where} ({len(service.methods)} methods)")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
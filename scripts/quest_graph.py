@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Quest Dependency Graph for Skyrim TTRPG
+
+Builds one graph of every quest record in data/quests/*.json,
+data/daedric_quests.json and data/factions.json (faction_quests):
+- Nodes are looked up by quest id; each remembers the document and JSON
+  Pointer it came from
+- Edges come from "prerequisites" (ids, quest names or "Complete: <name>";
+  "A OR B" needs either), from "next_quest", and from list order in faction
+  questlines (each quest needs the one before it, as in
+  StoryManager.get_available_faction_quests)
+- Status changes update per-status and per-act indexes in place; completing
+  a quest unlocks every locked dependent whose prerequisites are now met
+- commit() writes back only the status fields of changed quests, as
+  single records (storage.put_record), so the rest of each file is left
+  byte for byte as it is
+
+Prerequisites that do not name a quest ("Arrive in Riverwood") are kept as
+conditions for the GM and never block unlocking. Quests without a "status"
+field are "available" once their prerequisites are complete, else "locked".
+
+Usage:
+    python3 quest_graph.py
+    python3 quest_graph.py --quest divided_loyalties
+    python3 quest_graph.py --act "Act II" --questline main_quests
+    python3 quest_graph.py --advance battle_of_whiterun completed
+"""
+
+import argparse
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+from patch_engine import resolve_pointer
+from storage import open_storage
+
+# (collection, doc_id glob, subtree to search, questline order implies prerequisites)
+QUEST_SOURCES = (
+    ("quests", "*", "", False),
+    ("", "daedric_quests", "/daedric_quests", False),
+    ("", "factions", "/faction_quests", True),
+)
+STATUSES = ("locked", "conditional", "available", "active", "completed", "failed")
+ALTERNATIVE_SEPARATOR = re.compile(r"\s+OR\s+|_OR_")
+COMPLETE_PREFIX = re.compile(r"^(complete|completed|finish|finished)\s*:?\s*", re.IGNORECASE)
+ROMAN_NUMERALS = {"i": "1", "ii": "2", "iii": "3", "iv": "4", "v": "5"}
+
+
+@dataclass
+class QuestNode:
+    id: str
+    name: str
+    questline: str     # doc id for data/quests files, "daedric_quests", or the faction id
+    collection: str    # storage address of the document holding the record
+    doc_id: str
+    pointer: str       # JSON Pointer of the record inside that document
+    record: dict
+    order: int         # position in load order, used to sort results
+    requires: List[List[str]] = field(default_factory=list)   # all groups needed, any id per group
+    unlocks: List[str] = field(default_factory=list)
+    conditions: List[str] = field(default_factory=list)       # prerequisites that are not quests
+    status: Optional[str] = None
+
+    @property
+    def explicit(self) -> bool:
+        """True if the record stores its own status."""
+        return "status" in self.record
+
+    @property
+    def acts(self) -> List[str]:
+        acts = self.record.get("act_context") or self.record.get("act") or []
+        return [acts] if isinstance(acts, str) else [a for a in acts if isinstance(a, str)]
+
+
+def act_key(act):
+    """Normalize act labels so "Act II", "act 2" and "Act 2" match."""
+    words = re.split(r"(\W+)", act.strip().lower())
+    return "".join(ROMAN_NUMERALS.get(w, w) for w in words)
+
+
+def _escape(token):
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _is_quest(value):
+    return isinstance(value.get("name"), str) and (
+        "id" in value or "quest_id" in value or "objectives" in value
+    )
+
+
+def _find_quests(value, pointer, key, found):
+    """Collect (id, pointer, record) for quest records; records nested in a quest are not quests."""
+    if isinstance(value, dict):
+        if _is_quest(value):
+            quest_id = value.get("id") or value.get("quest_id") or key
+            if isinstance(quest_id, str):
+                found.append((quest_id, pointer, value))
+            return
+        for k, v in value.items():
+            _find_quests(v, f"{pointer}/{_escape(k)}", k, found)
+    elif isinstance(value, list):
+        for i, v in enumerate(value):
+            _find_quests(v, f"{pointer}/{i}", None, found)
+
+
+def quest_records(value, pointer=""):
+    """(quest id, JSON Pointer, record) for every quest record in a document or subtree."""
+    found = []
+    _find_quests(value, pointer, None, found)
+    return found
+
+
+def _references(value):
+    """Split a prerequisite or next_quest value into groups of alternative references."""
+    items = value if isinstance(value, list) else [value]
+    groups = []
+    for item in items:
+        if isinstance(item, str) and item.strip():
+            groups.append([part.strip() for part in ALTERNATIVE_SEPARATOR.split(item) if part.strip()])
+    return groups
+
+
+class QuestGraph:
+    def __init__(self, data_dir="../data", storage=None):
+        """
+        Initialize the QuestGraph.
+
+        Args:
+            data_dir: Path to the data directory
+            storage: Storage backend (default: open_storage(data_dir))
+        """
+        self.data_dir = Path(data_dir)
+        self.storage = storage or open_storage(self.data_dir)
+        self.nodes = {}
+        self.duplicates = []      # (quest id, questline) of records shadowed by an earlier one
+        self.cycles = []          # quest ids that sit on a prerequisite cycle
+        self._by_name = {}
+        self._by_status = {s: set() for s in STATUSES}
+        self._by_act = {}
+        self._dirty = set()
+        self.build()
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def build(self):
+        """(Re)load every quest source and rebuild edges and indexes."""
+        self.nodes, self.duplicates, self._by_name = {}, [], {}
+        self._by_status = {s: set() for s in STATUSES}
+        self._by_act = {}
+        self._dirty = set()
+        sequences = []
+        for collection, pattern, subtree, sequential in QUEST_SOURCES:
+            for doc_id, doc in self.storage.iter_documents(collection, pattern):
+                try:
+                    root = resolve_pointer(doc, subtree)
+                except ValueError:
+                    continue
+                lists = {}
+                for quest_id, pointer, record in quest_records(root, subtree):
+                    parent, _, key = pointer.rpartition("/")
+                    questline = parent.split("/")[2] if sequential else doc_id
+                    if quest_id in self.nodes:
+                        self.duplicates.append((quest_id, questline))
+                        continue
+                    self.nodes[quest_id] = QuestNode(
+                        id=quest_id, name=record["name"], questline=questline, collection=collection,
+                        doc_id=doc_id, pointer=pointer, record=record, order=len(self.nodes))
+                    self._by_name.setdefault(record["name"].strip().lower(), quest_id)
+                    if sequential and key.isdigit():
+                        lists.setdefault(parent, []).append(quest_id)
+                sequences.extend(lists.values())
+
+        for node in self.nodes.values():
+            for group in _references(node.record.get("prerequisites", [])):
+                resolved = [r for r in (self.resolve(ref) for ref in group) if r and r != node.id]
+                if resolved:
+                    node.requires.append(resolved)
+                else:
+                    node.conditions.append(" OR ".join(group))
+        for ids in sequences:
+            for before, after in zip(ids, ids[1:]):
+                if not self.nodes[after].requires:
+                    self.nodes[after].requires.append([before])
+        for node in self.nodes.values():
+            for group in _references(node.record.get("next_quest", [])):
+                for target in filter(None, (self.resolve(ref) for ref in group)):
+                    # next_quest implies a prerequisite unless the target lists its own
+                    if target != node.id and not self.nodes[target].requires:
+                        self.nodes[target].requires.append([node.id])
+        for node in self.nodes.values():
+            for group in node.requires:
+                for required in group:
+                    if node.id not in self.nodes[required].unlocks:
+                        self.nodes[required].unlocks.append(node.id)
+
+        ordered = self.order()
+        self.cycles = [quest_id for quest_id in self.nodes if quest_id not in set(ordered)]
+        # Stored statuses first, then derived ones in dependency order
+        for node in self.nodes.values():
+            if node.explicit:
+                self._index(node, node.record["status"])
+            for act in node.acts:
+                self._by_act.setdefault(act_key(act), set()).add(node.id)
+        for quest_id in ordered + self.cycles:
+            if not self.nodes[quest_id].explicit:
+                self._index(self.nodes[quest_id], self._effective_status(self.nodes[quest_id]))
+        return self
+
+    def resolve(self, reference):
+        """Quest id for a prerequisite reference (id, name or "Complete: <name>"), or None."""
+        reference = reference.strip()
+        if reference in self.nodes:
+            return reference
+        text = COMPLETE_PREFIX.sub("", reference).strip().lower()
+        if text in self._by_name:
+            return self._by_name[text]
+        slug = re.sub(r"[^a-z0-9]+", "_", text).strip("_")
+        return slug if slug in self.nodes else None
+
+    def order(self):
+        """Quest ids in dependency order (Kahn's algorithm); quests on a cycle are left out."""
+        indegree = {quest_id: 0 for quest_id in self.nodes}
+        for node in self.nodes.values():
+            for dependent in node.unlocks:
+                indegree[dependent] += 1
+        ready = [quest_id for quest_id, n in indegree.items() if n == 0]
+        ordered = []
+        while ready:
+            quest_id = ready.pop(0)
+            ordered.append(quest_id)
+            for dependent in self.nodes[quest_id].unlocks:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    ready.append(dependent)
+        return ordered
+
+    # ------------------------------------------------------------------
+    # Status
+    # ------------------------------------------------------------------
+
+    def _satisfied(self, node):
+        return all(any(self.nodes[r].status == "completed" for r in group) for group in node.requires)
+
+    def _effective_status(self, node):
+        if node.explicit:
+            return node.record["status"]
+        return "available" if self._satisfied(node) else "locked"
+
+    def _index(self, node, status):
+        # Indexed case-insensitively: single-quest files use "Active", "Pending"
+        status = status.lower() if isinstance(status, str) else str(status)
+        if node.status is not None:
+            self._by_status.get(node.status, set()).discard(node.id)
+        node.status = status
+        self._by_status.setdefault(status, set()).add(node.id)
+
+    def get(self, quest_id) -> Optional[QuestNode]:
+        return self.nodes.get(quest_id)
+
+    def set_status(self, quest_id, status):
+        """
+        Change one quest's status and propagate unlocks to its dependents.
+
+        Returns:
+            list: Ids of quests unlocked by this change (locked -> available)
+
+        Raises:
+            KeyError: If the quest does not exist
+        """
+        node = self.nodes[quest_id]
+        node.record["status"] = status
+        self._index(node, status)
+        self._dirty.add(quest_id)
+        unlocked = []
+        for dependent_id in node.unlocks:
+            dependent = self.nodes[dependent_id]
+            if dependent.explicit:
+                if dependent.status == "locked" and self._satisfied(dependent):
+                    dependent.record["status"] = "available"
+                    self._dirty.add(dependent_id)
+                    self._index(dependent, "available")
+                    unlocked.append(dependent_id)
+            else:
+                before = dependent.status
+                self._index(dependent, self._effective_status(dependent))
+                if before == "locked" and dependent.status == "available":
+                    unlocked.append(dependent_id)
+        return unlocked
+
+    def _select(self, ids, questline):
+        nodes = [self.nodes[i] for i in ids]
+        if questline is not None:
+            nodes = [n for n in nodes if n.questline == questline]
+        return sorted(nodes, key=lambda n: n.order)
+
+    def with_status(self, status, questline=None) -> List[QuestNode]:
+        """Quests currently in a status (optionally one questline), in load order."""
+        return self._select(self._by_status.get(status, ()), questline)
+
+    def in_act(self, act, questline=None) -> List[QuestNode]:
+        """Quests tagged with an act ("Act II" matches "Act 2"), in load order."""
+        return self._select(self._by_act.get(act_key(act), ()), questline)
+
+    def counts(self):
+        """{status: number of quests}"""
+        return {status: len(ids) for status, ids in self._by_status.items() if ids}
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def commit(self):
+        """
+        Write the status of every changed quest back to its document.
+
+        Each status is written as its own record (storage.put_record), so
+        the rest of the document is neither re-read nor re-written.
+
+        Returns:
+            int: Number of quest records written
+        """
+        written = 0
+        for quest_id in sorted(self._dirty, key=lambda q: self.nodes[q].order):
+            node = self.nodes[quest_id]
+            current = self.storage.get_record(node.collection, node.doc_id, node.pointer)
+            if not isinstance(current, dict) or (current.get("id") or current.get("quest_id")) not in (None, node.id):
+                print(f"Error: Could not save status of {node.id}: {node.doc_id}.json has changed, rebuild the graph")
+                continue
+            self.storage.put_record(node.collection, node.doc_id, f"{node.pointer}/status", node.record["status"])
+            written += 1
+        self._dirty.clear()
+        return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and advance the quest dependency graph.")
+    parser.add_argument("--data-dir", default="../data", help="Data directory (default: ../data)")
+    parser.add_argument("--quest", help="Show one quest's prerequisites and unlocks")
+    parser.add_argument("--act", help="List quests in an act")
+    parser.add_argument("--questline", help="Limit listings to one questline (e.g. main_quests, companions)")
+    parser.add_argument("--advance", nargs=2, metavar=("QUEST_ID", "STATUS"), help="Set a quest's status and save")
+    args = parser.parse_args()
+
+    graph = QuestGraph(args.data_dir)
+    if args.advance:
+        quest_id, status = args.advance
+        if quest_id not in graph.nodes:
+            print(f"Quest not found: {quest_id}")
+            return
+        for unlocked in graph.set_status(quest_id, status):
+            print(f"Unlocked quest: {graph.get(unlocked).name}")
+        print(f"Saved {graph.commit()} quest record(s)")
+    elif args.quest:
+        node = graph.get(args.quest)
+        if node is None:
+            print(f"Quest not found: {args.quest}")
+            return
+        print(f"{node.name} [{node.id}] ({node.questline}) - {node.status}")
+        for group in node.requires:
+            print(f"  requires: {' OR '.join(group)}")
+        for condition in node.conditions:
+            print(f"  condition: {condition}")
+        for unlock in node.unlocks:
+            print(f"  unlocks: {unlock}")
+    elif args.act:
+        for node in graph.in_act(args.act, args.questline):
+            print(f"- {node.name} [{node.id}] - {node.status}")
+    else:
+        print(f"{len(graph.nodes)} quests: " + ", ".join(f"{s} {n}" for s, n in graph.counts().items()))
+        for status in ("available", "active"):
+            for node in graph.with_status(status, args.questline):
+                print(f"  [{status}] {node.name} ({node.questline})")
+        if graph.cycles:
+            print(f"Prerequisite cycles: {', '.join(graph.cycles)}")
+
+
+if __name__ == "__main__":
+    main()
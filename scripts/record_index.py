@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Record-Level Access to Large JSON Files for Skyrim TTRPG
+
+Files like data/quests/main_quests.json (80 KB), data/factions.json and
+data/clocks/thalmor_influence_clocks.json are single documents, but most
+reads and writes touch one record in them (one quest, one faction, one
+clock). RecordIndex keeps a byte-offset index of such files so a record
+can be handled without the rest of its file:
+- For each container (a JSON Pointer like "/main_questline/quests") the
+  index holds the byte span of every child, found by one scan of the file
+  on first use
+- read() seeks to a record's span and parses only those bytes
+- write() splices the new text (indented to match) over the old span and
+  copies the rest of the file byte for byte, then shifts the spans after
+  it; nothing else is parsed or re-serialized
+- The index for a file is dropped when its size or mtime no longer match
+  the last read or write (someone else edited it) and rebuilt on next use
+- splice_records() does the same splice for several records of a text
+  already in memory, so a batch of record updates is one write per file
+
+The monolithic files stay the source of truth, so every other reader
+(exports, validation, the event store) keeps working unchanged. Storage
+backends expose this as get_record()/put_record() (see storage.py).
+Files that are not UTF-8 are not indexed; callers fall back to whole
+documents for those.
+"""
+
+import json
+import os
+import re
+import threading
+from json.decoder import scanstring
+from pathlib import Path
+
+from json_io import loads
+from patch_engine import commit_writes, parse_pointer
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+def _skip(text, i):
+    return _WHITESPACE.match(text, i).end()
+
+
+def _key(raw_key):
+    """Undo the latin-1 view used for scanning (keys with raw UTF-8 bytes)."""
+    try:
+        return raw_key.encode("latin-1").decode("utf-8")
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return raw_key
+
+
+def _children(text, start):
+    """
+    Byte spans of the children of the object or array starting at text[start].
+
+    Returns:
+        dict: {key or str(index): (start, end)}
+    """
+    spans = {}
+    closing = "}" if text[start] == "{" else "]"
+    i = _skip(text, start + 1)
+    if text[i] == closing:
+        return spans
+    index = 0
+    while True:
+        if closing == "}":
+            raw_key, i = scanstring(text, i + 1)
+            i = _skip(text, i)
+            if text[i] != ":":
+                raise ValueError(f"Expected ':' at byte {i}")
+            i = _skip(text, i + 1)
+            key = _key(raw_key)
+        else:
+            key = str(index)
+            index += 1
+        _, end = _decoder.raw_decode(text, i)
+        spans[key] = (i, end)
+        i = _skip(text, end)
+        if text[i] == ",":
+            i = _skip(text, i + 1)
+        elif text[i] == closing:
+            return spans
+        else:
+            raise ValueError(f"Expected ',' or '{closing}' at byte {i}")
+
+
+def _container(text, containers, container, start):
+    """
+    Spans of a container's children, walking down from the document root at
+    text[start] and filling containers ({pointer: spans}) on the way.
+
+    Raises:
+        ValueError: If the container does not exist or is not an object/array
+    """
+    if container in containers:
+        return containers[container]
+    start = _skip(text, start)
+    pointer = ""
+    for token in parse_pointer(container):
+        if pointer not in containers:
+            if text[start] not in "{[":
+                raise ValueError(f"No container at '{pointer or '/'}'")
+            containers[pointer] = _children(text, start)
+        if token not in containers[pointer]:
+            raise ValueError(f"Missing key '{token}' in '{pointer or '/'}'")
+        start = containers[pointer][token][0]
+        pointer = f"{pointer}/{token.replace('~', '~0').replace('/', '~1')}"
+    if text[start] not in "{[":
+        raise ValueError(f"No container at '{container or '/'}'")
+    containers[container] = _children(text, start)
+    return containers[container]
+
+
+def _record_span(text, containers, pointer, start):
+    tokens = parse_pointer(pointer)
+    if not tokens:
+        raise ValueError("A record pointer cannot be the whole document")
+    container = pointer[:pointer.rfind("/")]
+    spans = _container(text, containers, container, start)
+    if tokens[-1] not in spans:
+        raise ValueError(f"Missing key '{tokens[-1]}' in '{container or '/'}'")
+    return spans[tokens[-1]]
+
+
+def _render(text, start, value, ensure_ascii):
+    """A record's new text, continuation lines indented like the line it starts on."""
+    prefix = text[text.rfind("\n", 0, start) + 1:start]
+    indent = prefix[:len(prefix) - len(prefix.lstrip())]
+    return json.dumps(value, indent=2, ensure_ascii=ensure_ascii).replace("\n", "\n" + indent)
+
+
+def splice_records(text, records):
+    """
+    Replace several existing records of a JSON text in one pass.
+
+    Every byte outside the replaced records is kept, so hand formatting
+    elsewhere in the file survives.
+
+    Args:
+        text: JSON document text
+        records: {JSON Pointer: new value}
+
+    Returns:
+        str: The updated text
+
+    Raises:
+        ValueError: If a record does not exist or one record lies inside another
+    """
+    start = 1 if text.startswith("\ufeff") else 0
+    containers = {}
+    spans = sorted((_record_span(text, containers, pointer, start), pointer) for pointer in records)
+    for (span, _), (next_span, _) in zip(spans, spans[1:]):
+        if next_span[0] < span[1]:
+            raise ValueError("Records to splice overlap")
+    ensure_ascii = "\\u" in text
+    # Splice from the end so earlier spans stay valid
+    for (s, e), pointer in reversed(spans):
+        text = text[:s] + _render(text, s, records[pointer], ensure_ascii) + text[e:]
+    return text
+
+
+def _stamp(st):
+    return st.st_mtime_ns, st.st_size
+
+
+class RecordIndex:
+    def __init__(self):
+        # abspath -> {"stamp": (mtime_ns, size), "ascii": bool, "containers": {pointer: {key: (start, end)}}}
+        self._files = {}
+        self._lock = threading.RLock()
+
+    def _entry(self, path):
+        key = os.path.abspath(path)
+        stamp = _stamp(os.stat(key))
+        entry = self._files.get(key)
+        if entry is None or entry["stamp"] != stamp:
+            entry = self._files[key] = {"stamp": stamp, "ascii": None, "containers": {}}
+        return key, entry
+
+    def _text(self, key):
+        with open(key, "rb") as f:
+            raw = f.read()
+        raw.decode("utf-8")   # UnicodeDecodeError: not indexable
+        # latin-1 maps each byte to one character, so string offsets are byte offsets
+        return raw, raw.decode("latin-1")
+
+    def spans(self, path, container):
+        """
+        {key: (start, end)} byte spans of a container's children, building them on first use.
+
+        Raises:
+            OSError: If the file cannot be read
+            UnicodeDecodeError: If the file is not UTF-8
+            ValueError: If the container does not exist or is not an object/array
+        """
+        with self._lock:
+            key, entry = self._entry(path)
+            containers = entry["containers"]
+            if container in containers:
+                return containers[container]
+            raw, text = self._text(key)
+            entry["ascii"] = b"\\u" in raw
+            return _container(text, containers, container, 3 if raw.startswith(b"\xef\xbb\xbf") else 0)
+
+    def _span(self, path, pointer):
+        tokens = parse_pointer(pointer)
+        if not tokens:
+            raise ValueError("A record pointer cannot be the whole document")
+        container = pointer[:pointer.rfind("/")]
+        spans = self.spans(path, container)
+        if tokens[-1] not in spans:
+            raise ValueError(f"Missing key '{tokens[-1]}' in '{container or '/'}'")
+        return spans[tokens[-1]]
+
+    def read(self, path, pointer):
+        """
+        Parse one record (the value at a JSON Pointer) without reading the rest of the file.
+
+        Raises:
+            OSError, UnicodeDecodeError: As spans()
+            ValueError: If the record does not exist
+        """
+        with self._lock:
+            start, end = self._span(path, pointer)
+            with open(path, "rb") as f:
+                f.seek(start)
+                data = f.read(end - start)
+        return loads(data)
+
+    def write(self, path, pointer, value):
+        """
+        Replace one existing record in place.
+
+        Raises:
+            OSError: If the file cannot be read or written
+            UnicodeDecodeError: If the file is not UTF-8
+            ValueError: If the record does not exist
+        """
+        with self._lock:
+            start, end = self._span(path, pointer)
+            key, entry = self._entry(path)
+            with open(key, "rb") as f:
+                raw = f.read()
+            body = _render(raw.decode("latin-1"), start, value, entry["ascii"]).encode("utf-8")
+            updated = raw[:start] + body + raw[end:]
+            if not commit_writes({Path(key): updated.decode("utf-8")}):
+                raise OSError(f"Could not write {key}")
+            delta = len(body) - (end - start)
+            written = pointer
+            for container, spans in list(entry["containers"].items()):
+                # Spans inside the replaced record are gone; everything after it moves
+                if container == written or container.startswith(written + "/"):
+                    del entry["containers"][container]
+                    continue
+                for child, (s, e) in spans.items():
+                    if s >= end:
+                        spans[child] = (s + delta, e + delta)
+                    elif e >= end:
+                        spans[child] = (s, e + delta)
+            entry["stamp"] = _stamp(os.stat(key))
+
+    def forget(self, path=None):
+        """Drop the index for one file (or all files)."""
+        with self._lock:
+            if path is None:
+                self._files.clear()
+            else:
+                self._files.pop(os.path.abspath(path), None)
+
+
+# Shared by every storage backend in the process
+RECORDS = RecordIndex()
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+NPC Relationship Graph for Skyrim TTRPG
+
+Builds one weighted social graph from:
+- data/npc_relationships.json (npc_to_npc_relationships pairs, and
+  major_npc_relationships.relationship_to_party as edges to "player")
+- The free-text "relationships" field of every NPC and PC file, scored
+  on the -100..100 relationship scale by keyword (e.g., "Trusted
+  advisor" -> positive, "Arch-enemy" -> strongly negative)
+
+Adjacency is kept in compact per-node arrays (neighbor indexes and
+float weights) with an edge-position map, so edge updates are O(1).
+Updates are collected and written back to npc_relationships.json in one
+batch by flush(), under npc_to_npc_relationships.tracked_relationships;
+each entry names its two endpoints in "npcs", so ids containing "_and_"
+round-trip.
+
+Queries: k-hop neighbors, strongest allies/rivals and the shortest
+social path ("who would tell whom") through trusting relationships.
+
+Usage:
+    python3 relationship_graph.py --allies maven_black_briar
+    python3 relationship_graph.py --path thonar_silver_blood madanach
+"""
+
+import argparse
+import heapq
+import re
+from array import array
+from datetime import datetime
+
+from storage import open_storage
+
+PLAYER_ID = "player"
+TRACKED_GROUP = "tracked_relationships"
+MIN_WEIGHT, MAX_WEIGHT = -100, 100
+
+# Default weight for a described relationship with no recognisable sentiment
+NEUTRAL_WEIGHT = 10
+
+# Keyword -> weight on the -100..100 scale; weights of all matches in the lead clause are summed
+SENTIMENT_KEYWORDS = [
+    (r"arch-?enemy|mortal enem", -90),
+    (r"hatred|\bhates?\b|loathe", -80),
+    (r"\benem(y|ies)\b", -70),
+    (r"betray|traitor|murder|killed|torturer|predator|oppressor|executed", -60),
+    (r"adversar|rival|feud", -40),
+    (r"distrust|suspicious|fear", -30),
+    (r"wary|tension|disappointed|resent", -20),
+    (r"\blove|lover|romantic|spouse|wife|husband", 70),
+    (r"absolute loyalty|sworn|devoted", 70),
+    (r"loyal|trusted|trusts", 55),
+    (r"brother|sister|daughter|\bson\b|family|clan|kin\b|aunt|uncle", 50),
+    (r"mentor|prot[eé]g[eé]|friend", 40),
+    (r"\bally\b|allies|allegiance|patron|supports?|grateful|protect", 30),
+    (r"respect|cordial|partner|fellow|colleague", 25),
+]
+_SENTIMENT_RES = [(re.compile(pattern, re.IGNORECASE), weight) for pattern, weight in SENTIMENT_KEYWORDS]
+_LEAD_CLAUSE_RE = re.compile(r"\s+[-–—]\s+")
+
+
+def slug(text):
+    """Lowercase id form of a name: "Maven Black-Briar" -> "maven_black_briar"."""
+    return re.sub(r"[^a-z0-9]+", "_", str(text).lower()).strip("_")
+
+
+def score_relationship(value):
+    """
+    Turn a relationship description or value into a -100..100 weight.
+
+    Numbers (and {"relationship": n} dicts) are used as-is; text is scored
+    from keywords in its lead clause (the part before " - " / " – ").
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(max(MIN_WEIGHT, min(MAX_WEIGHT, value)))
+    if isinstance(value, dict):
+        return score_relationship(value.get("relationship", value.get("description", "")))
+    if not isinstance(value, str) or not value.strip():
+        return None
+    lead = _LEAD_CLAUSE_RE.split(value, 1)[0]
+    total = sum(weight for regex, weight in _SENTIMENT_RES if regex.search(lead))
+    if total == 0:
+        total = NEUTRAL_WEIGHT
+    return float(max(MIN_WEIGHT, min(MAX_WEIGHT, total)))
+
+
+class RelationshipGraph:
+    def __init__(self, storage=None, data_dir="../data"):
+        """
+        Initialize the RelationshipGraph and load it from storage.
+
+        Args:
+            storage: Storage backend (default: open_storage(data_dir))
+            data_dir: Path to the data directory (used when storage is None)
+        """
+        self.storage = storage or open_storage(data_dir)
+        self.load()
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    def _node(self, node_id):
+        idx = self.index.get(node_id)
+        if idx is None:
+            idx = len(self.ids)
+            self.ids.append(node_id)
+            self.index[node_id] = idx
+            self._nbrs.append(array("i"))
+            self._wts.append(array("f"))
+        return idx
+
+    def _set_half(self, u, v, weight):
+        p = self._pos.get((u, v))
+        if p is None:
+            self._pos[(u, v)] = len(self._nbrs[u])
+            self._nbrs[u].append(v)
+            self._wts[u].append(weight)
+        else:
+            self._wts[u][p] = weight
+
+    def set_edge(self, a, b, weight):
+        """Set the (symmetric) weight between two nodes without marking it for persistence."""
+        if a == b:
+            return
+        u, v = self._node(a), self._node(b)
+        weight = float(max(MIN_WEIGHT, min(MAX_WEIGHT, weight)))
+        self._set_half(u, v, weight)
+        self._set_half(v, u, weight)
+
+    def resolve(self, name):
+        """
+        Map a name used in relationship text to a node id.
+
+        Tries, in order: an NPC/PC id, an exact name, a file stem, the name
+        with a leading title removed; otherwise the slug of the name.
+        """
+        text = re.sub(r"\(.*?\)", "", str(name)).strip()
+        if "player" in str(name).lower() or text.lower() in ("thane", "dragonborn"):
+            return PLAYER_ID
+        key = slug(text)
+        if key in self.index and key in self.sources:
+            return key
+        if text.lower() in self._name_index:
+            return self._name_index[text.lower()]
+        if key in self._stem_index:
+            return self._stem_index[key]
+        untitled = re.sub(r"^(jarl|general|high_king|high_queen|brother|sister|legate|housecarl)_", "", key)
+        if untitled in self._stem_index:
+            return self._stem_index[untitled]
+        return key
+
+    def _resolve_all(self, name):
+        """Resolve "Vilkas and Farkas"-style keys to every named node."""
+        parts = re.split(r"\s+and\s+|\s*&\s*", str(name)) if " and " in str(name) or "&" in str(name) else [name]
+        return [self.resolve(p) for p in parts if str(p).strip()]
+
+    def load(self):
+        """(Re)build the graph from npc_relationships.json and NPC/PC files."""
+        self._reset()
+        docs = []
+        for collection in ("npcs", "pcs"):
+            for doc_id, doc in self.storage.iter_documents(collection):
+                if not isinstance(doc, dict):
+                    continue
+                node_id = doc.get("id") or doc_id
+                docs.append((node_id, doc))
+                # Prefer documents stored under their own id when names collide
+                primary = node_id == doc_id
+                if primary or node_id not in self.sources:
+                    self.sources[node_id] = (collection, doc_id)
+                self._node(node_id)
+                if doc.get("name"):
+                    self.names[node_id] = doc["name"]
+                    if primary or doc["name"].lower() not in self._name_index:
+                        self._name_index[doc["name"].lower()] = node_id
+                self._stem_index.setdefault(doc_id, node_id)
+        self._node(PLAYER_ID)
+        self.names.setdefault(PLAYER_ID, "Player Characters")
+
+        # Directional text estimates are averaged per pair
+        estimates = {}
+        for node_id, doc in docs:
+            relationships = doc.get("relationships")
+            if not isinstance(relationships, dict):
+                continue
+            for name, description in relationships.items():
+                weight = score_relationship(description)
+                if weight is None:
+                    continue
+                for other in self._resolve_all(name):
+                    if other != node_id:
+                        estimates.setdefault(tuple(sorted((node_id, other))), []).append(weight)
+        for (a, b), weights in estimates.items():
+            self.set_edge(a, b, sum(weights) / len(weights))
+
+        # Explicit values in npc_relationships.json win over text estimates
+        rel_doc = self.storage.get("", "npc_relationships") or {}
+        for npc_id, entry in (rel_doc.get("major_npc_relationships") or {}).items():
+            if isinstance(entry, dict) and isinstance(entry.get("relationship_to_party"), (int, float)):
+                self.set_edge(self.resolve(npc_id), PLAYER_ID, entry["relationship_to_party"])
+                if entry.get("name"):
+                    self.names.setdefault(self.resolve(npc_id), entry["name"])
+        groups = rel_doc.get("npc_to_npc_relationships") or {}
+        ordered = [g for g in groups if g != TRACKED_GROUP] + ([TRACKED_GROUP] if TRACKED_GROUP in groups else [])
+        for group in ordered:
+            for pair_key, entry in (groups.get(group) or {}).items():
+                if not isinstance(entry, dict):
+                    continue
+                weight = entry.get("relationship")
+                pair = self._pair_endpoints(pair_key, entry)
+                if not isinstance(weight, (int, float)) or pair is None:
+                    continue
+                self.set_edge(self.resolve(pair[0]), self.resolve(pair[1]), weight)
+        return self
+
+    def _pair_endpoints(self, pair_key, entry):
+        """
+        The two ids of a npc_to_npc_relationships entry: its "npcs" list, or
+        for older entries the "<a>_and_<b>" key, split where both sides are
+        known nodes (ids may contain "_and_" themselves).
+        """
+        npcs = entry.get("npcs")
+        if isinstance(npcs, list) and len(npcs) == 2 and all(isinstance(n, str) and n for n in npcs):
+            return npcs[0], npcs[1]
+        parts = pair_key.split("_and_")
+        splits = [("_and_".join(parts[:i]), "_and_".join(parts[i:])) for i in range(1, len(parts))]
+        for a, b in splits:
+            if all(self.resolve(side) in self.sources or self.resolve(side) == PLAYER_ID for side in (a, b)):
+                return a, b
+        return splits[0] if splits else None
+
+    def _reset(self):
+        self.ids, self.index, self.names, self.sources = [], {}, {}, {}
+        self._nbrs, self._wts, self._pos, self._dirty = [], [], {}, {}
+        self._name_index, self._stem_index = {}, {}
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def weight(self, a, b):
+        """Current weight between two nodes, or None if they are not connected."""
+        u, v = self.index.get(a), self.index.get(b)
+        if u is None or v is None:
+            return None
+        p = self._pos.get((u, v))
+        return None if p is None else float(self._wts[u][p])
+
+    def update_edge(self, a, b, change, reason=""):
+        """
+        Adjust the relationship between two nodes (O(1)); persisted by flush().
+
+        Returns:
+            tuple: (old_weight, new_weight)
+        """
+        old = self.weight(a, b)
+        new = max(MIN_WEIGHT, min(MAX_WEIGHT, (old or 0.0) + change))
+        self.set_edge(a, b, new)
+        pair = tuple(sorted((a, b)))
+        self._dirty[pair] = {
+            "relationship": int(round(new)) if float(new).is_integer() else round(new, 2),
+            "notes": reason or self._dirty.get(pair, {}).get("notes", ""),
+            "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        return old, new
+
+    def pending_changes(self):
+        """Number of edge updates not yet written."""
+        return len(self._dirty)
+
+    def flush(self):
+        """
+        Write all pending edge updates to npc_relationships.json in one write.
+
+        Returns:
+            int: Number of relationships written
+        """
+        if not self._dirty:
+            return 0
+        rel_doc = self.storage.get("", "npc_relationships") or {}
+        tracked = rel_doc.setdefault("npc_to_npc_relationships", {}).setdefault(TRACKED_GROUP, {})
+        for (a, b), entry in sorted(self._dirty.items()):
+            tracked[f"{a}_and_{b}"] = {"npcs": [a, b], **entry}
+        self.storage.put("", "npc_relationships", rel_doc)
+        count = len(self._dirty)
+        self._dirty = {}
+        return count
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def neighbors(self, node_id):
+        """List (neighbor_id, weight) pairs for a node."""
+        u = self.index.get(node_id)
+        if u is None:
+            return []
+        return [(self.ids[v], float(w)) for v, w in zip(self._nbrs[u], self._wts[u])]
+
+    def k_hop(self, node_id, k=2, min_weight=None):
+        """
+        Nodes reachable within k hops.
+
+        Args:
+            node_id: Starting node
+            k: Maximum number of hops
+            min_weight: Only follow edges at or above this weight (e.g., 21 for "friendly")
+
+        Returns:
+            dict: {node_id: hops}, excluding the start node
+        """
+        start = self.index.get(node_id)
+        if start is None:
+            return {}
+        hops = {start: 0}
+        frontier = [start]
+        for depth in range(1, k + 1):
+            next_frontier = []
+            for u in frontier:
+                for v, w in zip(self._nbrs[u], self._wts[u]):
+                    if v in hops or (min_weight is not None and w < min_weight):
+                        continue
+                    hops[v] = depth
+                    next_frontier.append(v)
+            frontier = next_frontier
+        return {self.ids[v]: h for v, h in hops.items() if v != start}
+
+    def strongest_allies(self, node_id, limit=5):
+        """Highest positive relationships, strongest first."""
+        ranked = [(n, w) for n, w in self.neighbors(node_id) if w > 0]
+        return sorted(ranked, key=lambda item: (-item[1], item[0]))[:limit]
+
+    def strongest_rivals(self, node_id, limit=5):
+        """Most negative relationships, worst first."""
+        ranked = [(n, w) for n, w in self.neighbors(node_id) if w < 0]
+        return sorted(ranked, key=lambda item: (item[1], item[0]))[:limit]
+
+    def social_path(self, source, target, min_weight=1):
+        """
+        Shortest chain of trusting relationships from source to target.
+
+        Edges below min_weight are not followed; stronger bonds are cheaper,
+        so the path favours people who would actually pass word along.
+
+        Returns:
+            list: Node ids from source to target, or None if unreachable
+        """
+        s, t = self.index.get(source), self.index.get(target)
+        if s is None or t is None:
+            return None
+        dist = {s: 0.0}
+        prev = {}
+        heap = [(0.0, s)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u == t:
+                break
+            if d > dist.get(u, float("inf")):
+                continue
+            for v, w in zip(self._nbrs[u], self._wts[u]):
+                if w < min_weight:
+                    continue
+                nd = d + 1.0 + (MAX_WEIGHT - w) / MAX_WEIGHT
+                if nd < dist.get(v, float("inf")):
+                    dist[v] = nd
+                    prev[v] = u
+                    heapq.heappush(heap, (nd, v))
+        if t not in dist:
+            return None
+        path = [t]
+        while path[-1] != s:
+            path.append(prev[path[-1]])
+        return [self.ids[i] for i in reversed(path)]
+
+    def display_name(self, node_id):
+        return self.names.get(node_id, node_id.replace("_", " ").title())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the NPC relationship graph.")
+    parser.add_argument("--data-dir", default="../data")
+    parser.add_argument("--allies", metavar="NPC", help="Strongest allies of an NPC")
+    parser.add_argument("--rivals", metavar="NPC", help="Strongest rivals of an NPC")
+    parser.add_argument("--hops", nargs=2, metavar=("NPC", "K"), help="NPCs within K hops")
+    parser.add_argument("--path", nargs=2, metavar=("FROM", "TO"), help="Who would tell whom")
+    args = parser.parse_args()
+
+    graph = RelationshipGraph(data_dir=args.data_dir)
+    print(f"Relationship graph: {len(graph.ids)} nodes, {len(graph._pos) // 2} relationships")
+
+    if args.allies:
+        print(f"\nStrongest allies of {graph.display_name(args.allies)}:")
+        for other, weight in graph.strongest_allies(args.allies):
+            print(f"  +{weight:.0f}  {graph.display_name(other)}")
+    if args.rivals:
+        print(f"\nStrongest rivals of {graph.display_name(args.rivals)}:")
+        for other, weight in graph.strongest_rivals(args.rivals):
+            print(f"  {weight:.0f}  {graph.display_name(other)}")
+    if args.hops:
+        npc, k = args.hops[0], int(args.hops[1])
+        print(f"\nWithin {k} hops of {graph.display_name(npc)}:")
+        for other, hops in sorted(graph.k_hop(npc, k).items(), key=lambda item: (item[1], item[0])):
+            print(f"  {hops}  {graph.display_name(other)}")
+    if args.path:
+        path = graph.social_path(*args.path)
+        if path:
+            print("\nWord travels: " + " -> ".join(graph.display_name(n) for n in path))
+        else:
+            print("\nNo chain of trusting relationships connects them.")
+
+
+if __name__ == "__main__":
+    main()
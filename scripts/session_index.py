@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Session Timeline Index for Skyrim TTRPG
+
+Keeps a compact manifest of every session log (data/sessions/_index.json)
+so timeline and history queries never reparse the session files:
+- One entry per session: number, date, title, characters, NPCs,
+  locations, quests touched, key events and a content hash
+- Posting lists (character/NPC/location -> session ids) built from the
+  manifest in memory
+- Updated by SessionContextManager.create_session/update_session; new or
+  removed session files are picked up from a directory listing, and
+  refresh(verify=True) re-hashes every file to catch hand edits
+"""
+
+import hashlib
+import json
+
+INDEX_DOC_ID = "_index"
+INDEX_VERSION = 1
+
+# Manifest field -> session field it is taken from
+POSTING_FIELDS = {
+    "characters": "characters_present",
+    "npcs": "npcs_encountered",
+    "locations": "locations_visited",
+}
+
+
+def session_hash(session):
+    """Stable content hash of a session document."""
+    canonical = json.dumps(session, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def _posting_key(value):
+    return value.strip().lower() if isinstance(value, str) else str(value).lower()
+
+
+def _posting_keys(field, value):
+    """Keys a value is filed under; NPCs like 'Alvor - Blacksmith of Riverwood' also file under 'alvor'."""
+    keys = {_posting_key(value)}
+    if field == "npcs" and isinstance(value, str) and " - " in value:
+        keys.add(_posting_key(value.split(" - ", 1)[0]))
+    return keys
+
+
+def build_entry(session):
+    """Summarize one session document into a manifest entry."""
+    quests = []
+    for quest in session.get("quests_updated") or []:
+        name = quest.get("quest") if isinstance(quest, dict) else quest
+        if name and name not in quests:
+            quests.append(name)
+    entry = {
+        "number": session.get("session_number", 0),
+        "date": session.get("date", "Unknown"),
+        "title": session.get("title", "Untitled"),
+        "quests": quests,
+        "key_events": list(session.get("key_events") or []),
+        "hash": session_hash(session),
+    }
+    for field, source in POSTING_FIELDS.items():
+        entry[field] = [v for v in session.get(source) or [] if isinstance(v, (str, int))]
+    return entry
+
+
+class SessionIndex:
+    def __init__(self, storage):
+        """
+        Initialize the SessionIndex.
+
+        Args:
+            storage: Storage backend holding the "sessions" collection
+        """
+        self.storage = storage
+        self.entries = None
+        self._postings = {}
+        self._dirty = False
+
+    def load(self):
+        """Load the manifest, reconciling it with the session ids on disk."""
+        manifest = None
+        try:
+            manifest = self.storage.get("sessions", INDEX_DOC_ID)
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"Warning: Rebuilding unreadable session index: {e}")
+        if not isinstance(manifest, dict) or manifest.get("version") != INDEX_VERSION:
+            manifest = {"sessions": {}}
+            self._dirty = True
+        self.entries = manifest.get("sessions", {})
+        self._reconcile()
+        self._build_postings()
+        if self._dirty:
+            self.save()
+        return self
+
+    def _ensure_loaded(self):
+        if self.entries is None:
+            self.load()
+
+    def _reconcile(self, verify=False):
+        """Add sessions missing from the manifest and drop ones whose files are gone."""
+        on_disk = set(self.storage.list_ids("sessions", "session_*"))
+        for session_id in set(self.entries) - on_disk:
+            del self.entries[session_id]
+            self._dirty = True
+        for session_id in sorted(on_disk):
+            if session_id in self.entries and not verify:
+                continue
+            try:
+                session = self.storage.get("sessions", session_id)
+            except (IOError, json.JSONDecodeError) as e:
+                print(f"Warning: Error reading {session_id}.json: {e}")
+                continue
+            if not isinstance(session, dict):
+                continue
+            entry = build_entry(session)
+            if self.entries.get(session_id) != entry:
+                self.entries[session_id] = entry
+                self._dirty = True
+
+    def _build_postings(self):
+        self._postings = {field: {} for field in POSTING_FIELDS}
+        for session_id, entry in self.entries.items():
+            self._post(session_id, entry)
+
+    def _post(self, session_id, entry):
+        for field in POSTING_FIELDS:
+            for value in entry.get(field, []):
+                for key in _posting_keys(field, value):
+                    self._postings[field].setdefault(key, set()).add(session_id)
+
+    def _unpost(self, session_id, entry):
+        for field in POSTING_FIELDS:
+            for value in entry.get(field, []):
+                for key in _posting_keys(field, value):
+                    self._postings[field].get(key, set()).discard(session_id)
+
+    def update(self, session_id, session):
+        """Record a created or updated session (call save() to persist)."""
+        self._ensure_loaded()
+        old = self.entries.get(session_id)
+        if old is not None:
+            self._unpost(session_id, old)
+        entry = build_entry(session)
+        self.entries[session_id] = entry
+        self._post(session_id, entry)
+        self._dirty = self._dirty or entry != old
+
+    def remove(self, session_id):
+        """Forget a session (call save() to persist)."""
+        self._ensure_loaded()
+        old = self.entries.pop(session_id, None)
+        if old is not None:
+            self._unpost(session_id, old)
+            self._dirty = True
+
+    def save(self):
+        """Write the manifest if it changed."""
+        if not self._dirty or self.entries is None:
+            return
+        manifest = {"version": INDEX_VERSION, "sessions": dict(sorted(self.entries.items()))}
+        try:
+            self.storage.put("sessions", INDEX_DOC_ID, manifest)
+            self._dirty = False
+        except (IOError, OSError) as e:
+            print(f"Warning: Could not write session index: {e}")
+
+    def refresh(self, verify=False):
+        """
+        Re-sync the manifest with the session files.
+
+        Args:
+            verify: Also re-read and re-hash every session to catch hand edits
+        """
+        self._ensure_loaded()
+        self._reconcile(verify=verify)
+        self._build_postings()
+        self.save()
+
+    def latest_id(self):
+        """Id of the highest-numbered session, or None."""
+        self._ensure_loaded()
+        if not self.entries:
+            return None
+        return max(self.entries, key=lambda sid: (self.entries[sid].get("number", 0), sid))
+
+    def timeline(self):
+        """Manifest entries ordered by session id."""
+        self._ensure_loaded()
+        return [self.entries[sid] for sid in sorted(self.entries)]
+
+    def sessions_with(self, field, value):
+        """
+        Session ids whose characters/npcs/locations include a value (case-insensitive).
+
+        Args:
+            field: "characters", "npcs" or "locations"
+            value: Character id, NPC name or location name
+
+        Returns:
+            list: Sorted session ids
+        """
+        if field not in POSTING_FIELDS:
+            raise ValueError(f"Unknown session index field '{field}'; expected {tuple(POSTING_FIELDS)}")
+        self._ensure_loaded()
+        return sorted(self._postings[field].get(_posting_key(value), ()))
@@ -14,16 +14,22 @@ import os
 from datetime import datetime
 from pathlib import Path
 
+from storage import open_storage
+from session_index import SessionIndex
+
 
 class SessionContextManager:
-    def __init__(self, data_dir="data"):
+    def __init__(self, data_dir="data", storage=None):
         """
         Initialize the SessionContextManager.
         
         Args:
             data_dir: Path to the data directory (default: "data")
+            storage: Storage backend (default: open_storage(data_dir), the JSON tree)
         """
         self.data_dir = Path(data_dir)
+        self.storage = storage or open_storage(self.data_dir)
+        self.session_index = SessionIndex(self.storage)
         self.sessions_dir = self.data_dir / "sessions"
         self.pcs_dir = self.data_dir / "pcs"
         self.npcs_dir = self.data_dir / "npcs"
@@ -79,10 +85,10 @@ class SessionContextManager:
             "next_session_prep": []
         }
         
-        session_file = self.sessions_dir / f"session_{session_number:03d}.json"
         try:
-            with open(session_file, 'w', encoding='utf-8') as f:
-                json.dump(session_data, f, indent=2)
+            self.storage.put("sessions", f"session_{session_number:03d}", session_data)
+            self.session_index.update(f"session_{session_number:03d}", session_data)
+            self.session_index.save()
             print(f"Created session {session_number}: {title}")
             return session_data
         except (IOError, OSError) as e:
@@ -107,19 +113,18 @@ class SessionContextManager:
             print("Error: updates must be a dictionary")
             return False
             
-        session_file = self.sessions_dir / f"session_{session_number:03d}.json"
-        
-        if not session_file.exists():
-            print(f"Session {session_number} not found!")
-            return False
+        session_id = f"session_{session_number:03d}"
         
         try:
-            with open(session_file, 'r', encoding='utf-8') as f:
-                session_data = json.load(f)
+            session_data = self.storage.get("sessions", session_id)
         except (IOError, json.JSONDecodeError) as e:
             print(f"Error reading session file: {e}")
             return False
         
+        if session_data is None:
+            print(f"Session {session_number} not found!")
+            return False
+        
         # Update fields
         for key, value in updates.items():
             if key in session_data:
@@ -131,8 +136,9 @@ class SessionContextManager:
                     session_data[key] = value
         
         try:
-            with open(session_file, 'w', encoding='utf-8') as f:
-                json.dump(session_data, f, indent=2)
+            self.storage.put("sessions", session_id, session_data)
+            self.session_index.update(session_id, session_data)
+            self.session_index.save()
             print(f"Updated session {session_number}")
             return True
         except (IOError, OSError) as e:
@@ -153,16 +159,11 @@ class SessionContextManager:
             print(f"Error: session_number must be a positive integer")
             return None
             
-        session_file = self.sessions_dir / f"session_{session_number:03d}.json"
-        
-        if session_file.exists():
-            try:
-                with open(session_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (IOError, json.JSONDecodeError) as e:
-                print(f"Error reading session {session_number}: {e}")
-                return None
-        return None
+        try:
+            return self.storage.get("sessions", f"session_{session_number:03d}")
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"Error reading session {session_number}: {e}")
+            return None
     
     def get_latest_session(self):
         """
@@ -172,10 +173,9 @@ class SessionContextManager:
             dict: Latest session data if found, None otherwise
         """
         try:
-            session_files = sorted(self.sessions_dir.glob("session_*.json"))
-            if session_files:
-                with open(session_files[-1], 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            session_id = self.session_index.latest_id()
+            if session_id:
+                return self.storage.get("sessions", session_id)
         except (IOError, json.JSONDecodeError) as e:
             print(f"Error reading latest session: {e}")
         return None
@@ -196,15 +196,7 @@ class SessionContextManager:
         
         # Update PCs with experience and fate points
         for char_id in session.get('characters_present', []):
-            pc_files = list(self.pcs_dir.glob("*.json"))
-            for pc_file in pc_files:
-                try:
-                    with open(pc_file, 'r', encoding='utf-8') as f:
-                        pc = json.load(f)
-                except (IOError, json.JSONDecodeError) as e:
-                    print(f"Error reading PC file {pc_file}: {e}")
-                    continue
-                
+            for pc_doc_id, pc in self.storage.iter_documents("pcs"):
                 if pc.get('id') == char_id:
                     # Add experience - use safe dictionary access
                     if 'experience' in pc and 'experience_gained' in session:
@@ -230,11 +222,10 @@ class SessionContextManager:
                             pc['consequences']['mild'] = None
                     
                     try:
-                        with open(pc_file, 'w', encoding='utf-8') as f:
-                            json.dump(pc, f, indent=2)
+                        self.storage.put("pcs", pc_doc_id, pc)
                         print(f"Updated {pc.get('name', 'Unknown')} from session {session_number}")
                     except (IOError, OSError) as e:
-                        print(f"Error writing PC file {pc_file}: {e}")
+                        print(f"Error writing PC file {pc_doc_id}: {e}")
                         continue
         
         return True
@@ -304,19 +295,13 @@ class SessionContextManager:
             list: List of session summaries with key information
         """
         sessions = []
-        for session_file in sorted(self.sessions_dir.glob("session_*.json")):
-            try:
-                with open(session_file, 'r', encoding='utf-8') as f:
-                    session = json.load(f)
-                sessions.append({
-                    'number': session.get('session_number', 0),
-                    'date': session.get('date', 'Unknown'),
-                    'title': session.get('title', 'Untitled'),
-                    'key_events': session.get('key_events', [])
-                })
-            except (IOError, json.JSONDecodeError) as e:
-                print(f"Error reading session file {session_file}: {e}")
-                continue
+        for entry in self.session_index.timeline():
+            sessions.append({
+                'number': entry['number'],
+                'date': entry['date'],
+                'title': entry['title'],
+                'key_events': entry['key_events']
+            })
         return sessions
     
     def get_character_session_history(self, character_id):
@@ -334,16 +319,35 @@ class SessionContextManager:
             return []
             
         sessions = []
-        for session_file in sorted(self.sessions_dir.glob("session_*.json")):
-            try:
-                with open(session_file, 'r', encoding='utf-8') as f:
-                    session = json.load(f)
-                if character_id in session.get('characters_present', []):
-                    sessions.append(session)
-            except (IOError, json.JSONDecodeError) as e:
-                print(f"Error reading session file {session_file}: {e}")
-                continue
+        for session_id in self.session_index.sessions_with("characters", character_id):
+            session = self.storage.get("sessions", session_id)
+            if session is not None:
+                sessions.append(session)
         return sessions
+    
+    def get_npc_session_history(self, npc_name):
+        """
+        Get timeline entries for sessions where an NPC was encountered.
+        
+        Args:
+            npc_name: NPC name as logged (e.g., "Alvor" or "Alvor - Blacksmith of Riverwood")
+            
+        Returns:
+            list: Session index entries (number, date, title, ...) in session order
+        """
+        return [self.session_index.entries[sid] for sid in self.session_index.sessions_with("npcs", npc_name)]
+    
+    def get_location_session_history(self, location):
+        """
+        Get timeline entries for sessions that visited a location.
+        
+        Args:
+            location: Location name as logged (e.g., "Whiterun")
+            
+        Returns:
+            list: Session index entries (number, date, title, ...) in session order
+        """
+        return [self.session_index.entries[sid] for sid in self.session_index.sessions_with("locations", location)]
 
 
 def main():
@@ -15,6 +15,8 @@ import json
 import os
 from pathlib import Path
 from datetime import datetime
+from data_validation import validate_document
+from json_io import load_json
 
 
 # Faction name mapping for consistency
@@ -67,9 +69,8 @@ class SessionZeroManager:
         """Load race data from converted PDFs"""
         races_file = self.source_material_dir / "races.json"
         if races_file.exists():
-            with open(races_file, 'r') as f:
-                data = json.load(f)
-                return data.get('races', [])
+            data = load_json(races_file)
+            return data.get('races', [])
         return []
     
     def load_standing_stones(self):
@@ -717,8 +718,7 @@ class SessionZeroManager:
         
         # Load existing campaign state
         if campaign_state_file.exists():
-            with open(campaign_state_file, 'r') as f:
-                campaign_state = json.load(f)
+            campaign_state = load_json(campaign_state_file)
         else:
             # Create default campaign state if it doesn't exist
             campaign_state = {
@@ -952,6 +952,14 @@ class SessionZeroManager:
             if character['faction_alignment'] not in valid_alignments:
                 errors.append(f"Invalid faction alignment: {character['faction_alignment']}. Must be one of: {', '.join(valid_alignments)}")
         
+        # Field types come from the shared "pc" schema; required fields and the
+        # faction alignment are checked here, with the messages players know
+        for error in validate_document("pc", character):
+            path, _, message = error.partition(": ")
+            if path == "/faction_alignment" or message.startswith("missing required field"):
+                continue
+            errors.append(f"Invalid character data at {error}")
+        
         # Validate neutral subfaction if specified
         if 'neutral_subfaction' in character and character['neutral_subfaction']:
             valid_subfactions = ['companions', 'thieves_guild', 'college', 'dark_brotherhood', 'blades', 'greybeards']
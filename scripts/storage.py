@@ -0,0 +1,779 @@
+#!/usr/bin/env python3
+"""
+Storage Backends for Skyrim TTRPG
+
+Campaign data is a tree of JSON documents under data/. This module puts
+that tree behind one small interface so managers do not need to know how
+documents are stored:
+- JSONTreeStorage (default): one .json file per document, exactly as today
+- SQLiteStorage: documents in a single SQLite database (JSON1 columns),
+  with generated, indexed columns for name, location, faction, category,
+  hold and act, plus an index table for list-valued fields like
+  hold_context and act_context. WAL mode lets many readers share the file.
+- SnapshotStorage: the JSON tree, read through the binary campaign
+  snapshot (see campaign_snapshot.py) while it is up to date
+- CachedStorage: keeps hot collections of either backend in memory and is
+  kept fresh by DataWatcher change events (see data_watcher.py)
+
+Every backend can also read and write a single record inside a document
+(get_record/put_record, addressed by JSON Pointer) without handling the
+rest of it: the JSON tree through a byte-offset index (record_index.py),
+SQLite through json_extract/json_set.
+
+A document is addressed by (collection, doc_id): the collection is the
+directory relative to data/ ("npcs", "npc_stat_sheets", "sessions", or ""
+for top-level files like factions.json) and doc_id is the file stem.
+
+Select a backend with open_storage() or the SKYRIM_TTRPG_STORAGE
+environment variable ("json", "sqlite", "sqlite:<path>", "snapshot" or
+"snapshot:<path>").
+
+Usage:
+    python3 storage.py import --data-dir ../data [--db ../data/campaign.sqlite]
+    python3 storage.py export --data-dir ../data [--db ../data/campaign.sqlite]
+"""
+
+import argparse
+import copy
+import fnmatch
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from campaign_snapshot import SNAPSHOT_NAME, open_snapshot
+from json_io import load_json, loads
+from patch_engine import apply_operation, parse_pointer, resolve_pointer
+from record_index import RECORDS
+
+STORAGE_ENV_VAR = "SKYRIM_TTRPG_STORAGE"
+DEFAULT_SQLITE_NAME = "campaign.sqlite"
+
+# Scalar fields exposed as indexed columns by SQLiteStorage (and filterable in find())
+INDEXED_FIELDS = ("name", "location", "faction", "category", "hold", "act")
+
+# List-valued fields indexed by membership (find_member())
+MEMBER_FIELDS = (
+    "act_context",
+    "hold_context.primary",
+    "hold_context.contested",
+    "hold_context.rare",
+    "characters_present",
+    "npcs_encountered",
+    "locations_visited",
+)
+
+
+def _field_value(doc, dotted):
+    """Resolve a dotted field path (e.g., 'hold_context.primary') in a document."""
+    value = doc
+    for part in dotted.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _normalize(value):
+    """Case-fold scalar values for indexed comparison."""
+    if isinstance(value, str):
+        return value.lower()
+    if value is None:
+        return None
+    return str(value).lower()
+
+
+def _set_pointer(doc, pointer, value):
+    """Set the value at a JSON Pointer (replacing it, or adding it to its parent)."""
+    try:
+        return apply_operation(doc, {"op": "replace", "path": pointer, "value": value})
+    except ValueError:
+        return apply_operation(doc, {"op": "add", "path": pointer, "value": value})
+
+
+def _parent_pointer(pointer):
+    return pointer[:pointer.rfind("/")]
+
+
+class JSONTreeStorage:
+    def __init__(self, data_dir="data"):
+        """
+        Initialize the JSONTreeStorage.
+
+        Args:
+            data_dir: Path to the data directory (default: "data")
+        """
+        self.data_dir = Path(data_dir)
+
+    def _collection_dir(self, collection):
+        return self.data_dir / collection if collection else self.data_dir
+
+    def path_for(self, collection, doc_id):
+        """Return the file path backing a document."""
+        return self._collection_dir(collection) / f"{doc_id}.json"
+
+    def exists(self, collection, doc_id):
+        """Check whether a document exists."""
+        return self.path_for(collection, doc_id).exists()
+
+    def get(self, collection, doc_id):
+        """
+        Load one document.
+
+        Returns:
+            dict: The document, or None if it does not exist
+
+        Raises:
+            IOError, json.JSONDecodeError: If the file exists but cannot be parsed
+        """
+        path = self.path_for(collection, doc_id)
+        if not path.exists():
+            return None
+        return load_json(path)
+
+    def put(self, collection, doc_id, doc):
+        """Write one document (pretty-printed, like the rest of the repo)."""
+        path = self.path_for(collection, doc_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(doc, f, indent=2)
+
+    def get_record(self, collection, doc_id, pointer):
+        """
+        Load one record (the value at a JSON Pointer) of a document.
+
+        Only the record's bytes are read and parsed, using the offset index.
+
+        Returns:
+            The record, or None if the document or record does not exist
+        """
+        path = self.path_for(collection, doc_id)
+        if not path.exists():
+            return None
+        if not pointer:
+            return self.get(collection, doc_id)
+        try:
+            return RECORDS.read(path, pointer)
+        except UnicodeDecodeError:
+            try:
+                return resolve_pointer(self.get(collection, doc_id), pointer)
+            except ValueError:
+                return None
+        except ValueError:
+            return None
+
+    def put_record(self, collection, doc_id, pointer, value):
+        """
+        Write one record of an existing document, leaving the rest of the file as is.
+
+        A record that does not exist yet is added by rewriting its parent
+        record (or, at the top level, the whole document).
+        """
+        if not pointer:
+            self.put(collection, doc_id, value)
+            return
+        path = self.path_for(collection, doc_id)
+        if not path.exists():
+            raise ValueError(f"Document {collection}/{doc_id} does not exist")
+        try:
+            RECORDS.write(path, pointer, value)
+        except UnicodeDecodeError:
+            self.put(collection, doc_id, _set_pointer(self.get(collection, doc_id), pointer, value))
+        except ValueError:
+            parent_pointer = _parent_pointer(pointer)
+            parent = self.get_record(collection, doc_id, parent_pointer)
+            if not isinstance(parent, (dict, list)):
+                raise
+            self.put_record(collection, doc_id, parent_pointer,
+                            _set_pointer(parent, "/" + pointer[len(parent_pointer) + 1:], value))
+
+    def delete(self, collection, doc_id):
+        """Delete one document. Returns True if it existed."""
+        path = self.path_for(collection, doc_id)
+        if path.exists():
+            path.unlink()
+            return True
+        return False
+
+    def list_ids(self, collection, pattern="*"):
+        """List document ids in a collection (sorted), optionally filtered by a glob pattern."""
+        directory = self._collection_dir(collection)
+        if not directory.exists():
+            return []
+        return sorted(p.stem for p in directory.glob(f"{pattern}.json") if p.is_file())
+
+    def iter_documents(self, collection, pattern="*"):
+        """
+        Iterate over (doc_id, doc) pairs in a collection, sorted by id.
+
+        Unreadable documents are reported and skipped.
+        """
+        for doc_id in self.list_ids(collection, pattern):
+            try:
+                doc = self.get(collection, doc_id)
+            except (IOError, json.JSONDecodeError) as e:
+                print(f"Warning: Error reading {doc_id}.json: {e}")
+                continue
+            if doc is not None:
+                yield doc_id, doc
+
+    def find(self, collection, **filters):
+        """
+        Find documents whose indexed fields equal the given values (case-insensitive).
+
+        Args:
+            collection: Collection to search
+            **filters: Any of INDEXED_FIELDS, e.g. category="Enemy"
+
+        Returns:
+            list: (doc_id, doc) pairs sorted by id
+        """
+        _check_filters(filters)
+        wanted = {k: _normalize(v) for k, v in filters.items()}
+        results = []
+        for doc_id, doc in self.iter_documents(collection):
+            if not isinstance(doc, dict):
+                continue
+            if all(_normalize(doc.get(k)) == v for k, v in wanted.items()):
+                results.append((doc_id, doc))
+        return results
+
+    def find_member(self, collection, field, value):
+        """
+        Find documents whose list-valued field contains a value (exact match).
+
+        Args:
+            collection: Collection to search
+            field: One of MEMBER_FIELDS, e.g. "hold_context.primary"
+            value: Value that must appear in the list
+
+        Returns:
+            list: (doc_id, doc) pairs sorted by id
+        """
+        results = []
+        for doc_id, doc in self.iter_documents(collection):
+            members = _field_value(doc, field)
+            if isinstance(members, list) and value in members:
+                results.append((doc_id, doc))
+        return results
+
+    def close(self):
+        """Nothing to release for the file tree."""
+
+
+class SnapshotStorage(JSONTreeStorage):
+    """
+    JSONTreeStorage that reads through a binary campaign snapshot.
+
+    Documents and collection listings come from the memory-mapped snapshot
+    while their files are unchanged since it was built, and from the JSON
+    tree otherwise. Writes go to the JSON tree. Without a usable snapshot
+    this is exactly JSONTreeStorage.
+    """
+
+    def __init__(self, data_dir="data", snapshot_path=None):
+        """
+        Initialize the SnapshotStorage.
+
+        Args:
+            data_dir: Path to the data directory (default: "data")
+            snapshot_path: Snapshot file (default: state/campaign.snap next to data_dir)
+        """
+        super().__init__(data_dir)
+        root = Path(os.path.abspath(self.data_dir)).parent
+        self.snapshot = open_snapshot(snapshot_path or root / "state" / SNAPSHOT_NAME, root)
+
+    def get(self, collection, doc_id):
+        if self.snapshot is None:
+            return super().get(collection, doc_id)
+        return self.snapshot.load(self.path_for(collection, doc_id))
+
+    def list_ids(self, collection, pattern="*"):
+        if self.snapshot is None:
+            return super().list_ids(collection, pattern)
+        return [n[:-5] for n in self.snapshot.list_json(self._collection_dir(collection), pattern)]
+
+    def close(self):
+        """Release the snapshot mapping."""
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
+
+
+class SQLiteStorage:
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS documents (
+            collection TEXT NOT NULL,
+            doc_id TEXT NOT NULL,
+            body TEXT NOT NULL CHECK (json_valid(body)),
+            name TEXT GENERATED ALWAYS AS (lower(json_extract(body, '$.name'))) VIRTUAL,
+            location TEXT GENERATED ALWAYS AS (lower(json_extract(body, '$.location'))) VIRTUAL,
+            faction TEXT GENERATED ALWAYS AS (lower(json_extract(body, '$.faction'))) VIRTUAL,
+            category TEXT GENERATED ALWAYS AS (lower(json_extract(body, '$.category'))) VIRTUAL,
+            hold TEXT GENERATED ALWAYS AS (lower(json_extract(body, '$.hold'))) VIRTUAL,
+            act TEXT GENERATED ALWAYS AS (lower(json_extract(body, '$.act'))) VIRTUAL,
+            PRIMARY KEY (collection, doc_id)
+        );
+        CREATE TABLE IF NOT EXISTS document_members (
+            collection TEXT NOT NULL,
+            doc_id TEXT NOT NULL,
+            field TEXT NOT NULL,
+            value TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_documents_name ON documents (collection, name);
+        CREATE INDEX IF NOT EXISTS idx_documents_location ON documents (collection, location);
+        CREATE INDEX IF NOT EXISTS idx_documents_faction ON documents (collection, faction);
+        CREATE INDEX IF NOT EXISTS idx_documents_category ON documents (collection, category);
+        CREATE INDEX IF NOT EXISTS idx_documents_hold ON documents (collection, hold);
+        CREATE INDEX IF NOT EXISTS idx_documents_act ON documents (collection, act);
+        CREATE INDEX IF NOT EXISTS idx_members_lookup ON document_members (collection, field, value);
+        CREATE INDEX IF NOT EXISTS idx_members_doc ON document_members (collection, doc_id);
+    """
+
+    def __init__(self, db_path):
+        """
+        Initialize the SQLiteStorage.
+
+        Args:
+            db_path: Path to the SQLite database file (created if missing)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _connection(self):
+        """One connection per thread; WAL mode gives readers snapshot isolation."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path))
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def exists(self, collection, doc_id):
+        """Check whether a document exists."""
+        row = self._connection().execute(
+            "SELECT 1 FROM documents WHERE collection = ? AND doc_id = ?", (collection, doc_id)
+        ).fetchone()
+        return row is not None
+
+    def get(self, collection, doc_id):
+        """Load one document, or None if it does not exist."""
+        row = self._connection().execute(
+            "SELECT body FROM documents WHERE collection = ? AND doc_id = ?", (collection, doc_id)
+        ).fetchone()
+        return loads(row[0]) if row else None
+
+    def _json_path(self, conn, collection, doc_id, pointer):
+        """
+        SQLite JSON path ($."a"[0]) for a JSON Pointer (/a/0).
+
+        An all-digit token is an array index only when its parent is an
+        array; under an object (e.g. "10" in factions.json) it stays a key.
+        """
+        path = "$"
+        for token in parse_pointer(pointer):
+            if token.isdigit() and conn.execute(
+                "SELECT json_type(body, ?) FROM documents WHERE collection = ? AND doc_id = ?",
+                (path, collection, doc_id)
+            ).fetchone() == ("array",):
+                path += f"[{token}]"
+            else:
+                path += '."' + token.replace('"', '\\"') + '"'
+        return path
+
+    def get_record(self, collection, doc_id, pointer):
+        """Load one record (the value at a JSON Pointer) of a document, or None."""
+        conn = self._connection()
+        json_path = self._json_path(conn, collection, doc_id, pointer)
+        row = conn.execute(
+            "SELECT json_type(body, ?), json_quote(json_extract(body, ?)) FROM documents "
+            "WHERE collection = ? AND doc_id = ?", (json_path, json_path, collection, doc_id)
+        ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return loads(row[1])
+
+    def put_record(self, collection, doc_id, pointer, value):
+        """Write one record of an existing document in place (json_set)."""
+        if not pointer:
+            self.put(collection, doc_id, value)
+            return
+        tokens = parse_pointer(pointer)
+        try:
+            with self._connection() as conn:
+                cur = conn.execute(
+                    "UPDATE documents SET body = json_set(body, ?, json(?)) WHERE collection = ? AND doc_id = ?",
+                    (self._json_path(conn, collection, doc_id, pointer), json.dumps(value, ensure_ascii=False), collection, doc_id)
+                )
+                if cur.rowcount == 0:
+                    raise ValueError(f"Document {collection}/{doc_id} does not exist")
+                # Member index rows only depend on a few top-level fields
+                if tokens[0] in {field.split(".")[0] for field in MEMBER_FIELDS}:
+                    body = conn.execute(
+                        "SELECT body FROM documents WHERE collection = ? AND doc_id = ?", (collection, doc_id)
+                    ).fetchone()[0]
+                    self._put(conn, collection, doc_id, loads(body))
+        except sqlite3.Error as e:
+            raise IOError(f"Could not write {collection}/{doc_id}{pointer}: {e}") from e
+
+    def put(self, collection, doc_id, doc):
+        """Insert or replace one document and refresh its member index rows."""
+        try:
+            with self._connection() as conn:
+                self._put(conn, collection, doc_id, doc)
+        except sqlite3.Error as e:
+            # Surface as IOError so managers' existing write error handling applies
+            raise IOError(f"Could not write {collection}/{doc_id}: {e}") from e
+
+    def _put(self, conn, collection, doc_id, doc):
+        conn.execute(
+            "INSERT OR REPLACE INTO documents (collection, doc_id, body) VALUES (?, ?, ?)",
+            (collection, doc_id, json.dumps(doc, ensure_ascii=False))
+        )
+        conn.execute("DELETE FROM document_members WHERE collection = ? AND doc_id = ?", (collection, doc_id))
+        rows = []
+        if isinstance(doc, dict):
+            for field in MEMBER_FIELDS:
+                members = _field_value(doc, field)
+                if isinstance(members, list):
+                    rows.extend((collection, doc_id, field, str(m)) for m in members if isinstance(m, (str, int)))
+        if rows:
+            conn.executemany(
+                "INSERT INTO document_members (collection, doc_id, field, value) VALUES (?, ?, ?, ?)", rows
+            )
+
+    def put_many(self, items):
+        """Insert many (collection, doc_id, doc) triples in one transaction."""
+        with self._connection() as conn:
+            for collection, doc_id, doc in items:
+                self._put(conn, collection, doc_id, doc)
+
+    def delete(self, collection, doc_id):
+        """Delete one document. Returns True if it existed."""
+        with self._connection() as conn:
+            cur = conn.execute("DELETE FROM documents WHERE collection = ? AND doc_id = ?", (collection, doc_id))
+            conn.execute("DELETE FROM document_members WHERE collection = ? AND doc_id = ?", (collection, doc_id))
+            return cur.rowcount > 0
+
+    def list_ids(self, collection, pattern="*"):
+        """List document ids in a collection (sorted), optionally filtered by a glob pattern."""
+        rows = self._connection().execute(
+            "SELECT doc_id FROM documents WHERE collection = ? AND doc_id GLOB ? ORDER BY doc_id",
+            (collection, pattern)
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def iter_documents(self, collection, pattern="*"):
+        """Iterate over (doc_id, doc) pairs in a collection, sorted by id."""
+        rows = self._connection().execute(
+            "SELECT doc_id, body FROM documents WHERE collection = ? AND doc_id GLOB ? ORDER BY doc_id",
+            (collection, pattern)
+        ).fetchall()
+        for doc_id, body in rows:
+            yield doc_id, loads(body)
+
+    def find(self, collection, **filters):
+        """Find documents whose indexed fields equal the given values (case-insensitive)."""
+        _check_filters(filters)
+        clauses = ["collection = ?"]
+        params = [collection]
+        for field, value in filters.items():
+            clauses.append(f"{field} = ?")
+            params.append(_normalize(value))
+        rows = self._connection().execute(
+            f"SELECT doc_id, body FROM documents WHERE {' AND '.join(clauses)} ORDER BY doc_id", params
+        ).fetchall()
+        return [(doc_id, loads(body)) for doc_id, body in rows]
+
+    def find_member(self, collection, field, value):
+        """Find documents whose list-valued field contains a value (exact match)."""
+        if field not in MEMBER_FIELDS:
+            raise ValueError(f"Field '{field}' is not a member-indexed field: {MEMBER_FIELDS}")
+        rows = self._connection().execute(
+            """
+            SELECT d.doc_id, d.body FROM documents d
+            WHERE d.collection = ? AND d.doc_id IN (
+                SELECT m.doc_id FROM document_members m
+                WHERE m.collection = ? AND m.field = ? AND m.value = ?
+            )
+            ORDER BY d.doc_id
+            """,
+            (collection, collection, field, str(value))
+        ).fetchall()
+        return [(doc_id, loads(body)) for doc_id, body in rows]
+
+    def import_tree(self, data_dir):
+        """
+        Load every JSON document under a data directory into the database.
+
+        Returns:
+            int: Number of documents imported
+        """
+        data_dir = Path(data_dir)
+        items = []
+        for path in sorted(data_dir.rglob("*.json")):
+            collection = path.parent.relative_to(data_dir).as_posix()
+            collection = "" if collection == "." else collection
+            try:
+                items.append((collection, path.stem, load_json(path)))
+            except (IOError, json.JSONDecodeError, UnicodeDecodeError) as e:
+                print(f"Warning: Skipping {path}: {e}")
+        self.put_many(items)
+        return len(items)
+
+    def export_tree(self, data_dir):
+        """
+        Write every document back out as a JSON file tree.
+
+        Returns:
+            int: Number of documents written
+        """
+        target = JSONTreeStorage(data_dir)
+        count = 0
+        for collection, doc_id, body in self._connection().execute(
+            "SELECT collection, doc_id, body FROM documents ORDER BY collection, doc_id"
+        ):
+            target.put(collection, doc_id, loads(body))
+            count += 1
+        return count
+
+    def close(self):
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class CachedStorage:
+    """
+    In-memory copy of selected collections over another backend.
+
+    Reads of cached collections (get, list_ids, iter_documents, find,
+    find_member) are answered from memory using per-field posting sets;
+    everything else goes to the wrapped backend. Reads return copies, like
+    the backends do, so callers cannot mutate the cache by accident. Writes
+    go through to the backend and update the cache. Call apply_changes() with DataWatcher
+    events to pick up edits made outside this process.
+    """
+
+    def __init__(self, base, collections):
+        """
+        Initialize the CachedStorage.
+
+        Args:
+            base: Backend to wrap (JSONTreeStorage or SQLiteStorage)
+            collections: Collections to keep in memory (e.g., ["npcs", "npc_stat_sheets"])
+        """
+        self.base = base
+        self._lock = threading.RLock()
+        self._docs = {}
+        self._fields = {}
+        self._members = {}
+        for collection in collections:
+            self.reload(collection)
+
+    def __getattr__(self, name):
+        return getattr(self.base, name)
+
+    def reload(self, collection):
+        """(Re)load one collection from the wrapped backend."""
+        with self._lock:
+            self._docs[collection] = {}
+            self._fields[collection] = {f: {} for f in INDEXED_FIELDS}
+            self._members[collection] = {f: {} for f in MEMBER_FIELDS}
+            for doc_id, doc in self.base.iter_documents(collection):
+                self._index(collection, doc_id, doc)
+
+    def _index(self, collection, doc_id, doc):
+        self._docs[collection][doc_id] = doc
+        if not isinstance(doc, dict):
+            return
+        for field, postings in self._fields[collection].items():
+            postings.setdefault(_normalize(doc.get(field)), set()).add(doc_id)
+        for field, postings in self._members[collection].items():
+            members = _field_value(doc, field)
+            if isinstance(members, list):
+                for value in members:
+                    if isinstance(value, (str, int, float)):
+                        postings.setdefault(value, set()).add(doc_id)
+
+    def _unindex(self, collection, doc_id):
+        doc = self._docs[collection].pop(doc_id, None)
+        if not isinstance(doc, dict):
+            return
+        for field, postings in self._fields[collection].items():
+            ids = postings.get(_normalize(doc.get(field)))
+            if ids is not None:
+                ids.discard(doc_id)
+        for field, postings in self._members[collection].items():
+            members = _field_value(doc, field)
+            if isinstance(members, list):
+                for value in members:
+                    if isinstance(value, (str, int, float)) and value in postings:
+                        postings[value].discard(doc_id)
+
+    def _set(self, collection, doc_id, doc):
+        with self._lock:
+            self._unindex(collection, doc_id)
+            if doc is not None:
+                self._index(collection, doc_id, doc)
+
+    def is_cached(self, collection):
+        """Check whether a collection is held in memory."""
+        return collection in self._docs
+
+    def apply_changes(self, events):
+        """
+        Apply a batch of DataWatcher change events to the cache.
+
+        Returns:
+            int: Number of cached documents updated
+        """
+        updated = 0
+        for event in events:
+            if not event.path.endswith(".json") or not self.is_cached(event.collection):
+                continue
+            self._set(event.collection, event.doc_id, event.after)
+            updated += 1
+        return updated
+
+    def exists(self, collection, doc_id):
+        if self.is_cached(collection):
+            return doc_id in self._docs[collection]
+        return self.base.exists(collection, doc_id)
+
+    def get(self, collection, doc_id):
+        if self.is_cached(collection):
+            with self._lock:
+                return copy.deepcopy(self._docs[collection].get(doc_id))
+        return self.base.get(collection, doc_id)
+
+    def put(self, collection, doc_id, doc):
+        self.base.put(collection, doc_id, doc)
+        if self.is_cached(collection):
+            self._set(collection, doc_id, copy.deepcopy(doc))
+
+    def get_record(self, collection, doc_id, pointer):
+        if not self.is_cached(collection):
+            return self.base.get_record(collection, doc_id, pointer)
+        with self._lock:
+            doc = self._docs[collection].get(doc_id)
+            try:
+                return copy.deepcopy(resolve_pointer(doc, pointer)) if doc is not None else None
+            except ValueError:
+                return None
+
+    def put_record(self, collection, doc_id, pointer, value):
+        self.base.put_record(collection, doc_id, pointer, value)
+        if not self.is_cached(collection):
+            return
+        with self._lock:
+            doc = self._docs[collection].get(doc_id)
+            if doc is not None:
+                self._unindex(collection, doc_id)
+                self._index(collection, doc_id, _set_pointer(doc, pointer, copy.deepcopy(value)))
+
+    def delete(self, collection, doc_id):
+        existed = self.base.delete(collection, doc_id)
+        if self.is_cached(collection):
+            self._set(collection, doc_id, None)
+        return existed
+
+    def list_ids(self, collection, pattern="*"):
+        if not self.is_cached(collection):
+            return self.base.list_ids(collection, pattern)
+        with self._lock:
+            return sorted(d for d in self._docs[collection] if fnmatch.fnmatchcase(d, pattern))
+
+    def iter_documents(self, collection, pattern="*"):
+        if not self.is_cached(collection):
+            yield from self.base.iter_documents(collection, pattern)
+            return
+        with self._lock:
+            docs = self._docs[collection]
+            items = [(d, copy.deepcopy(docs[d])) for d in sorted(docs) if fnmatch.fnmatchcase(d, pattern)]
+        yield from items
+
+    def find(self, collection, **filters):
+        if not self.is_cached(collection):
+            return self.base.find(collection, **filters)
+        _check_filters(filters)
+        with self._lock:
+            docs = self._docs[collection]
+            if not filters:
+                return [(d, copy.deepcopy(docs[d])) for d in sorted(docs)]
+            ids = None
+            for field, value in filters.items():
+                postings = self._fields[collection][field].get(_normalize(value), set())
+                ids = set(postings) if ids is None else ids & postings
+            return [(d, copy.deepcopy(docs[d])) for d in sorted(ids)]
+
+    def find_member(self, collection, field, value):
+        if not self.is_cached(collection):
+            return self.base.find_member(collection, field, value)
+        if field not in MEMBER_FIELDS:
+            raise ValueError(f"Field '{field}' is not a member-indexed field: {MEMBER_FIELDS}")
+        with self._lock:
+            docs = self._docs[collection]
+            ids = self._members[collection][field].get(value, set())
+            return [(d, copy.deepcopy(docs[d])) for d in sorted(ids)]
+
+    def close(self):
+        self.base.close()
+
+
+def _check_filters(filters):
+    unknown = set(filters) - set(INDEXED_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown indexed field(s) {sorted(unknown)}; expected {INDEXED_FIELDS}")
+
+
+def open_storage(data_dir="data", backend=None):
+    """
+    Open the storage backend for a data directory.
+
+    Args:
+        data_dir: Path to the data directory
+        backend: "json", "sqlite", "sqlite:<path>", "snapshot" or "snapshot:<path>"
+                 (default: $SKYRIM_TTRPG_STORAGE or "json")
+
+    Returns:
+        JSONTreeStorage, SQLiteStorage or SnapshotStorage
+    """
+    backend = backend or os.environ.get(STORAGE_ENV_VAR) or "json"
+    if backend == "json":
+        return JSONTreeStorage(data_dir)
+    if backend == "sqlite" or backend.startswith("sqlite:"):
+        db_path = backend.split(":", 1)[1] if ":" in backend else Path(data_dir) / DEFAULT_SQLITE_NAME
+        return SQLiteStorage(db_path)
+    if backend == "snapshot" or backend.startswith("snapshot:"):
+        return SnapshotStorage(data_dir, backend.split(":", 1)[1] if ":" in backend else None)
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move campaign data between the JSON tree and SQLite.")
+    parser.add_argument("command", choices=["import", "export"],
+                        help="import: JSON tree -> SQLite, export: SQLite -> JSON tree")
+    parser.add_argument("--data-dir", default="../data", help="Data directory (default: ../data)")
+    parser.add_argument("--db", default=None, help=f"Database path (default: <data-dir>/{DEFAULT_SQLITE_NAME})")
+    args = parser.parse_args()
+
+    db = SQLiteStorage(args.db or Path(args.data_dir) / DEFAULT_SQLITE_NAME)
+    if args.command == "import":
+        count = db.import_tree(args.data_dir)
+        print(f"Imported {count} documents into {db.db_path}")
+    else:
+        count = db.export_tree(args.data_dir)
+        print(f"Exported {count} documents to {args.data_dir}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
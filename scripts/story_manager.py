@@ -16,9 +16,16 @@ import os
 import sys
 from pathlib import Path
 from datetime import datetime
-from utils import location_matches
 from query_data import DataQueryManager
-from first_impression import maybe_first_impression
+from first_impression import disposition_index, record_first_impressions
+from quest_graph import QuestGraph
+from travel_graph import TravelGraph
+from clock_reactions import ClockReactions
+from event_bus import ClockAdvanced, EventBus
+from npc_manager import NPCManager
+from patch_engine import apply_operation
+from storage import JSONTreeStorage
+from json_io import load_json
 
 # Import DragonbreakManager if available
 try:
@@ -32,7 +39,7 @@ except (ImportError, ModuleNotFoundError) as e:
 
 
 class StoryManager:
-    def __init__(self, data_dir="../data", state_dir="../state"):
+    def __init__(self, data_dir="../data", state_dir="../state", bus=None):
         self.data_dir = Path(data_dir)
         self.state_dir = Path(state_dir)
         self.campaign_state_path = self.state_dir / "campaign_state.json"
@@ -41,6 +48,15 @@ class StoryManager:
         self.thalmor_path = self.data_dir / "thalmor_arcs.json"
         self.npc_stat_sheets_dir = self.data_dir / "npc_stat_sheets"
         self.query_manager = DataQueryManager(str(self.data_dir))
+        self.storage = self.query_manager.storage
+        # Parsed clock files by path under data/clocks, kept only while a DataWatcher is attached
+        self._clock_cache = None
+        # Quest dependency graph, built on first use (see quest_graph())
+        self._quest_graph = None
+        # Travel graph over hold locations, built on first use (see travel_graph())
+        self._travel_graph = None
+        # Optional EventBus; clock advances are published as ClockAdvanced
+        self.bus = bus
         
         # Initialize Dragonbreak Manager if available
         if DRAGONBREAK_AVAILABLE:
@@ -48,11 +64,78 @@ class StoryManager:
         else:
             self.dragonbreak_manager = None
         
+    def watch(self, watcher):
+        """
+        Keep quest, NPC and clock reads in memory, updated by a DataWatcher.
+        
+        Args:
+            watcher: DataWatcher over this manager's data directory
+        """
+        self.query_manager.watch(watcher)
+        self.storage = self.query_manager.storage
+        self._clock_cache = {
+            rel[len("clocks/"):]: doc for rel, doc in watcher.documents("clocks/").items()
+        }
+        watcher.subscribe(self._apply_clock_changes, prefix="clocks/")
+        self._quest_graph = None
+        watcher.subscribe(self._apply_quest_changes)
+        # Scene dispositions follow NPC edits without scanning data/ per scene
+        disposition_index(self.data_dir.parent, refresh=False).watch(watcher)
+    
+    def _apply_quest_changes(self, events):
+        # Rebuild the quest graph on next use if any quest source changed
+        for event in events:
+            if event.collection == "quests" or event.path in ("factions.json", "daedric_quests.json"):
+                self._quest_graph = None
+                return
+    
+    def quest_graph(self):
+        """Quest dependency graph over data/quests, daedric quests and faction quests."""
+        if self._quest_graph is None:
+            self._quest_graph = QuestGraph(self.data_dir, storage=self.storage)
+        return self._quest_graph
+    
+    def travel_graph(self):
+        """Travel graph over hold locations and data/travel_routes.json."""
+        if self._travel_graph is None:
+            self._travel_graph = TravelGraph(self.data_dir, query_manager=self.query_manager)
+        return self._travel_graph
+    
+    def plan_journey(self, stops, mode="fastest", seed=None):
+        """
+        Plan a journey through stops, with encounters and location triggers pre-rolled
+        
+        Args:
+            stops: Place names in travel order (a hold means its capital)
+            mode: "fastest" or "safest"
+            seed: Random seed, for repeatable encounter rolls
+        
+        Returns:
+            Dict with path, days, legs (with encounters) and triggers, or None
+        """
+        return self.travel_graph().plan_journey(stops, self.load_campaign_state() or {}, mode=mode, seed=seed)
+    
+    def _apply_clock_changes(self, events):
+        for event in events:
+            rel = event.path[len("clocks/"):]
+            if event.after is None:
+                self._clock_cache.pop(rel, None)
+            else:
+                self._clock_cache[rel] = event.after
+    
+    def _read_clock_file(self, filename):
+        """Load one data/clocks file by its path under data/clocks (from the watch cache when attached)."""
+        if self._clock_cache is not None:
+            return self._clock_cache.get(filename)
+        path = self.data_dir / "clocks" / filename
+        if not path.exists():
+            return None
+        return load_json(path)
+    
     def load_campaign_state(self):
         """Load current campaign state"""
         if self.campaign_state_path.exists():
-            with open(self.campaign_state_path, 'r') as f:
-                return json.load(f)
+            return load_json(self.campaign_state_path)
         return None
     
     def save_campaign_state(self, state):
@@ -64,17 +147,11 @@ class StoryManager:
     
     def load_main_quests(self):
         """Load main quest data"""
-        if self.main_quests_path.exists():
-            with open(self.main_quests_path, 'r') as f:
-                return json.load(f)
-        return None
+        return self.storage.get("quests", "main_quests")
     
     def load_civil_war_quests(self):
         """Load civil war quest data"""
-        if self.civil_war_path.exists():
-            with open(self.civil_war_path, 'r') as f:
-                return json.load(f)
-        return None
+        return self.storage.get("quests", "civil_war_quests")
     
     def record_branching_decision(self, decision_key, choice):
         """
@@ -208,57 +285,38 @@ class StoryManager:
         Get list of currently available quests based on state
         """
         state = self.load_campaign_state()
-        main_quests_data = self.load_main_quests()
-        
-        if not state or not main_quests_data:
+        if not state:
             return []
         
-        available = []
-        
-        # Check main questline
-        for quest in main_quests_data['main_questline']['quests']:
-            if quest['status'] == 'available':
-                available.append({
-                    'type': 'main',
-                    'quest': quest
-                })
-        
-        return available
+        # Main questline, from the quest graph's status index
+        return [
+            {'type': 'main', 'quest': node.record}
+            for node in self.quest_graph().with_status('available', questline='main_quests')
+        ]
     
     def advance_quest(self, quest_id, new_status):
         """
         Advance a quest to a new status
         
+        Completing a quest unlocks every locked quest whose prerequisites are
+        now met. Only the changed quest records are written back.
+        
         Args:
             quest_id: ID of the quest
             new_status: New status ('available', 'active', 'completed', 'failed')
         """
-        main_quests_data = self.load_main_quests()
-        if not main_quests_data:
+        graph = self.quest_graph()
+        quest = graph.get(quest_id)
+        if quest is None:
             return False
         
-        # Find and update quest
-        for quest in main_quests_data['main_questline']['quests']:
-            if quest['id'] == quest_id:
-                old_status = quest['status']
-                quest['status'] = new_status
-                
-                # If completing a quest, unlock next quest
-                if new_status == 'completed' and 'next_quest' in quest:
-                    next_quest_id = quest['next_quest']
-                    for next_quest in main_quests_data['main_questline']['quests']:
-                        if next_quest['id'] == next_quest_id:
-                            next_quest['status'] = 'available'
-                            print(f"Unlocked quest: {next_quest['name']}")
-                
-                # Save updated data
-                with open(self.main_quests_path, 'w') as f:
-                    json.dump(main_quests_data, f, indent=2)
-                
-                print(f"Quest '{quest['name']}' status: {old_status} -> {new_status}")
-                return True
+        old_status = quest.status
+        for unlocked_id in graph.set_status(quest_id, new_status):
+            print(f"Unlocked quest: {graph.get(unlocked_id).name}")
+        graph.commit()
         
-        return False
+        print(f"Quest '{quest.name}' status: {old_status} -> {new_status}")
+        return True
     
     def check_story_arcs(self):
         """
@@ -354,31 +412,17 @@ Schemes Discovered: {len(state['thalmor_arc']['thalmor_schemes_discovered'])}
             'suggestions': []
         }
         
-        if not self.npc_stat_sheets_dir.exists():
-            return result
-        
-        # Load all stat sheets and filter by location
-        for stat_file in self.npc_stat_sheets_dir.glob("*.json"):
-            try:
-                with open(stat_file, 'r') as f:
-                    stat_sheet = json.load(f)
-                
-                # Check if location matches (case-insensitive partial match)
-                sheet_location = stat_sheet.get('location', '')
-                
-                if location_matches(location, sheet_location):
-                    category = stat_sheet.get('category', '')
-                    
-                    if category == "Friendly NPC":
-                        result['friendly'].append(stat_sheet)
-                    elif category == "Hostile NPC":
-                        result['hostile'].append(stat_sheet)
-                    elif category == "Enemy":
-                        result['enemies'].append(stat_sheet)
+        # Load only the stat sheets the gazetteer places at this location
+        # (a hold or city includes the places inside it)
+        for stat_sheet in self.query_manager.get_stat_sheets_at(location):
+            category = stat_sheet.get('category', '')
             
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Warning: Error reading {stat_file.name}: {e}")
-                continue
+            if category == "Friendly NPC":
+                result['friendly'].append(stat_sheet)
+            elif category == "Hostile NPC":
+                result['hostile'].append(stat_sheet)
+            elif category == "Enemy":
+                result['enemies'].append(stat_sheet)
         
         # Add scene-specific suggestions
         if scene_type == "combat":
@@ -446,8 +490,7 @@ Schemes Discovered: {len(state['thalmor_arc']['thalmor_schemes_discovered'])}
                 pc_id = f"pc_{pc_id}"
             pc_path = self.data_dir / "pcs" / f"{pc_id}.json"
             if pc_path.exists():
-                with open(pc_path, "r", encoding="utf-8") as f:
-                    return json.load(f)
+                return load_json(pc_path)
         return None
 
     def _get_pc_compel_hooks(self, max_items=5):
@@ -500,27 +543,29 @@ Schemes Discovered: {len(state['thalmor_arc']['thalmor_schemes_discovered'])}
         
         # Try to determine PC ID from campaign state
         try:
-            with open(self.campaign_state_path, 'r') as f:
-                state = json.load(f)
-                pc_id = state.get("active_pc_id") or state.get("active_pc")
-                if not pc_id and state.get("player_characters"):
-                    # Fallback to first PC in player_characters list
-                    pc_id = state["player_characters"][0].get("id")
-                
-                if pc_id:
-                    # Convert pc_id to appearance file slug
-                    slug = pc_id.replace("pc_", "")
-                    appearance_path = str(self.data_dir / "pcs" / "appearances" / f"{slug}_appearance.json")
+            state = load_json(self.campaign_state_path)
+            pc_id = state.get("active_pc_id") or state.get("active_pc")
+            if not pc_id and state.get("player_characters"):
+                # Fallback to first PC in player_characters list
+                pc_id = state["player_characters"][0].get("id")
+            
+            if pc_id:
+                # Convert pc_id to appearance file slug
+                slug = pc_id.replace("pc_", "")
+                appearance_path = str(self.data_dir / "pcs" / "appearances" / f"{slug}_appearance.json")
         except (FileNotFoundError, json.JSONDecodeError, KeyError):
             pass  # No state or invalid state, skip first impressions
         
         # Only attempt first impressions if appearance file exists
         if appearance_path and Path(appearance_path).exists():
-            # scene_npcs is a dict of buckets -> list[dict]
+            # scene_npcs is a dict of buckets -> list[dict]; collect the whole scene
+            # so state and appearance are read once and the state is written once
+            scene_entries = []
             for bucket_name, bucket_disposition in (
                 ("friendly", "positive"),
                 ("hostile", "negative"),
-                ("enemies", "neutral"),
+                # Enemies take their faction's stance toward the player's alliance
+                ("enemies", None),
             ):
                 for npc in (scene_npcs.get(bucket_name, []) or []):
                     if not isinstance(npc, dict):
@@ -530,22 +575,29 @@ Schemes Discovered: {len(state['thalmor_arc']['thalmor_schemes_discovered'])}
                     npc_id = npc.get("id") or npc.get("npc_id")
                     if not npc_id:
                         continue
+                    scene_entries.append((npc, npc_id, bucket_disposition))
 
-                    try:
-                        line = maybe_first_impression(
-                            state_path,
-                            appearance_path,
-                            npc_id,
-                            disposition=bucket_disposition
-                        )
-                        if line:
-                            npc.setdefault("gm_barks", [])
-                            npc["gm_barks"].append(line)
-                    except Exception as e:
-                        # Log full error for debugging, show simple message to users
-                        print(f"First impression error for {npc_id} in {bucket_name}: {e}", file=sys.stderr)
+            if scene_entries:
+                try:
+                    barks = record_first_impressions(
+                        state_path,
+                        appearance_path,
+                        [(npc_id, disposition) for _, npc_id, disposition in scene_entries],
+                        repo_root=self.data_dir.parent
+                    )
+                except Exception as e:
+                    # Log full error for debugging, show simple message to users
+                    print(f"First impression error for scene at {location}: {e}", file=sys.stderr)
+                    barks = None
+                for npc, npc_id, _ in scene_entries:
+                    if barks is None:
                         npc.setdefault("gm_barks", [])
                         npc["gm_barks"].append("(First impression unavailable)")
+                    elif barks.get(npc_id):
+                        npc.setdefault("gm_barks", [])
+                        npc["gm_barks"].append(barks[npc_id])
+                        # An NPC listed in two buckets gets its bark once, as before
+                        barks[npc_id] = None
         
         # Build scene response
         scene_setup = {
@@ -1308,14 +1360,7 @@ Schemes Discovered: {len(state['thalmor_arc']['thalmor_schemes_discovered'])}
             act_number = self.get_current_act_number()
             act = f"Act {['I', 'II', 'III'][act_number - 1]}"
         
-        main_quests_data = self.load_main_quests()
-        if not main_quests_data:
-            return []
-        
-        quests = main_quests_data.get('main_questline', {}).get('quests', [])
-        act_quests = [q for q in quests if q.get('act') == act]
-        
-        return act_quests
+        return [node.record for node in self.quest_graph().in_act(act, questline='main_quests')]
     
     def load_clocks(self, clock_type="all"):
         """
@@ -1324,26 +1369,15 @@ Schemes Discovered: {len(state['thalmor_arc']['thalmor_schemes_discovered'])}
         Args:
             clock_type: "civil_war", "thalmor", "faction_trust", or "all"
         """
-        clocks_dir = self.data_dir / "clocks"
         clocks = {}
         
-        if clock_type in ["civil_war", "all"]:
-            civil_war_path = clocks_dir / "civil_war_clocks.json"
-            if civil_war_path.exists():
-                with open(civil_war_path, 'r') as f:
-                    clocks['civil_war'] = json.load(f)
-        
-        if clock_type in ["thalmor", "all"]:
-            thalmor_path = clocks_dir / "thalmor_influence_clocks.json"
-            if thalmor_path.exists():
-                with open(thalmor_path, 'r') as f:
-                    clocks['thalmor'] = json.load(f)
-        
-        if clock_type in ["faction_trust", "all"]:
-            trust_path = clocks_dir / "faction_trust_clocks.json"
-            if trust_path.exists():
-                with open(trust_path, 'r') as f:
-                    clocks['faction_trust'] = json.load(f)
+        for key, filename in [("civil_war", "civil_war_clocks.json"),
+                              ("thalmor", "thalmor_influence_clocks.json"),
+                              ("faction_trust", "faction_trust_clocks.json")]:
+            if clock_type in [key, "all"]:
+                data = self._read_clock_file(filename)
+                if data is not None:
+                    clocks[key] = data
         
         return clocks
     
@@ -1374,24 +1408,18 @@ Schemes Discovered: {len(state['thalmor_arc']['thalmor_schemes_discovered'])}
             print(f"Error: Clock file not found: {file_path}")
             return False
         
-        # Load clocks
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        
-        # Find and update the clock
-        if clock_category == "civil_war":
-            clocks = data.get('civil_war_clocks', {}).get('clocks', {})
-        elif clock_category == "thalmor":
-            clocks = data.get('thalmor_influence_clocks', {}).get('clocks', {})
-        elif clock_category == "faction_trust":
-            clocks = data.get('faction_trust_clocks', {}).get('clocks', {})
+        # Read and write just this clock (and last_updated) rather than the whole file
+        files = JSONTreeStorage(self.data_dir)
+        stem = Path(file_map[clock_category]).stem
+        clock_pointer = f"/{stem}/clocks/{clock_name.replace('~', '~0').replace('/', '~1')}"
+        clock = files.get_record("clocks", stem, clock_pointer)
         
-        if clock_name not in clocks:
+        if not isinstance(clock, dict):
+            clocks = files.get_record("clocks", stem, f"/{stem}/clocks") or {}
             print(f"Error: Clock not found: {clock_name}")
             print(f"Available clocks: {', '.join(clocks.keys())}")
             return False
         
-        clock = clocks[clock_name]
         old_progress = clock['current_progress'] if 'current_progress' in clock else clock.get('current_trust', 0)
         max_value = clock['total_segments'] if 'total_segments' in clock else clock.get('max_trust', 10)
         
@@ -1403,13 +1431,23 @@ Schemes Discovered: {len(state['thalmor_arc']['thalmor_schemes_discovered'])}
             clock['current_trust'] = max(0, min(max_value, clock['current_trust'] + segments))
             new_progress = clock['current_trust']
         
-        # Update last_updated timestamp
+        # Save the clock and, for civil war/thalmor, its file's last_updated timestamp
+        files.put_record("clocks", stem, clock_pointer, clock)
+        updates = {clock_pointer: clock}
         if clock_category in ["civil_war", "thalmor"]:
-            data[f'{clock_category}_clocks']['last_updated'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Save updated clocks
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=2)
+            last_updated = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            files.put_record("clocks", stem, f"/{stem}/last_updated", last_updated)
+            updates[f"/{stem}/last_updated"] = last_updated
+        if self._clock_cache is not None and self._clock_cache.get(file_map[clock_category]) is not None:
+            for pointer, value in updates.items():
+                apply_operation(self._clock_cache[file_map[clock_category]],
+                                {"op": "add", "path": pointer, "value": value})
+        
+        if self.bus is not None:
+            self.bus.publish(ClockAdvanced(
+                clock=clock_name, name=clock.get('name', clock_name), old=old_progress,
+                new=new_progress, total=max_value, faction=clock.get('faction', ''),
+                category=clock_category))
         
         print(f"\n{'='*50}")
         print(f"Clock Updated: {clock_name}")
@@ -1436,8 +1474,7 @@ Schemes Discovered: {len(state['thalmor_arc']['thalmor_schemes_discovered'])}
             return False
         
         # Load clocks
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+        data = load_json(file_path)
         
         clocks = data.get('whiterun_jobs', {}).get('clocks', {})
         
@@ -1503,23 +1540,19 @@ Schemes Discovered: {len(state['thalmor_arc']['thalmor_schemes_discovered'])}
     
     def get_story_hooks_for_quest(self, quest_id):
         """Get story hooks and GM notes for a specific quest"""
-        main_quests_data = self.load_main_quests()
-        if not main_quests_data:
+        node = self.quest_graph().get(quest_id)
+        if node is None:
             return None
         
-        quests = main_quests_data.get('main_questline', {}).get('quests', [])
-        for quest in quests:
-            if quest.get('id') == quest_id:
-                return {
-                    'quest_name': quest.get('name'),
-                    'act': quest.get('act'),
-                    'story_hooks': quest.get('story_hooks', []),
-                    'gm_notes': quest.get('gm_notes', ''),
-                    'faction_dynamics': quest.get('faction_dynamics', {}),
-                    'act_transition': quest.get('act_transition')
-                }
-        
-        return None
+        quest = node.record
+        return {
+            'quest_name': quest.get('name'),
+            'act': quest.get('act'),
+            'story_hooks': quest.get('story_hooks', []),
+            'gm_notes': quest.get('gm_notes', ''),
+            'faction_dynamics': quest.get('faction_dynamics', {}),
+            'act_transition': quest.get('act_transition')
+        }
     
     def integrate_quest_with_clocks(self, quest_id):
         """
@@ -1705,7 +1738,9 @@ Schemes Discovered: {len(state['thalmor_arc']['thalmor_schemes_discovered'])}
 
 def main():
     """Main function for testing"""
-    manager = StoryManager()
+    bus = EventBus()
+    ClockReactions(NPCManager()).connect(bus)
+    manager = StoryManager(bus=bus)
     
     print("Skyrim Story Manager")
     print("====================\n")
@@ -10,12 +10,31 @@ This script automates story progression by:
 """
 
 import json
+import math
 import os
 from datetime import datetime
 from pathlib import Path
 
+from game_calendar import EventScheduler, add_days
+from json_io import load_json, loads, read_text
+from patch_engine import commit_writes, format_json, resolve_pointer
+from quest_graph import quest_records
+from record_index import splice_records
+
+
+def _escape(token):
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _quest_key(name):
+    """Normalize a quest name or id for lookup (case and spacing ignored)."""
+    return " ".join(name.lower().split())
+
 
 class StoryProgressionManager:
+    # Timed event kinds understood by schedule_event()/advance_time()
+    EVENT_KINDS = ("faction_clock", "clock_tick", "quest_deadline", "world_event")
+    
     def __init__(self, data_dir="data"):
         """
         Initialize the StoryProgressionManager.
@@ -42,8 +61,7 @@ class StoryProgressionManager:
         """
         if self.world_state_path.exists():
             try:
-                with open(self.world_state_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                return load_json(self.world_state_path)
             except (IOError, json.JSONDecodeError) as e:
                 print(f"Error loading world state: {e}")
                 return None
@@ -75,6 +93,18 @@ class StoryProgressionManager:
         """
         Advance the in-game time by specified days.
         
+        Timed events scheduled with schedule_event() that fall due during
+        the skip are applied in day order (recurring events once per
+        occurrence). Every document they touch is read once and changed in
+        memory, then the changed ones and the world state are written in one
+        commit, so a long skip costs one write per file however many ticks
+        it contains. The changed fields are spliced into each file's text,
+        leaving the rest of it byte for byte as it was.
+        
+        An event whose target is missing (faction file, clock or quest) is
+        reported; a one-time event is kept in the queue and retried on the
+        next advance, a recurring one waits for its next occurrence.
+        
         Args:
             days: Number of days to advance (default: 1, must be positive)
             
@@ -84,15 +114,207 @@ class StoryProgressionManager:
         if not isinstance(days, (int, float)) or days <= 0:
             print(f"Error: days must be a positive number, got {days}")
             return False
+        
+        if not self.world_state_path.exists():
+            return False
+        try:
+            state_text = read_text(self.world_state_path)
+            state = loads(state_text)
+        except (IOError, ValueError) as e:
+            print(f"Error loading world state: {e}")
+            return False
+        if not isinstance(state, dict):
+            return False
+        
+        # Use safe dictionary access with default value
+        current_days = state.get('in_game_days_passed', 0)
+        target_days = current_days + days
+        start_date = state.get('game_date')
+        
+        scheduler = EventScheduler(state.get('scheduled_events'))
+        due = list(scheduler.pop_due(target_days))
+        docs = {}
+        records = {}
+        quest_index = {}
+        if any(event.get('kind') == 'quest_deadline' for event in due):
+            files, quest_index = self.build_quest_index()
+            docs.update(files)
+        
+        applied = []
+        for event in due:
+            if event.get('kind') not in self.EVENT_KINDS:
+                print(f"Skipping scheduled event {event.get('id')}: unknown kind {event.get('kind')!r}")
+                continue
+            handler = getattr(self, f"_apply_{event['kind']}")
+            event_date = add_days(start_date, math.floor(event['day']) - math.floor(current_days))
+            try:
+                message = handler(event, state, docs, records, quest_index, event_date)
+            except ValueError as e:
+                if event.get('every'):
+                    print(f"Skipped scheduled event {event.get('id')} on day {event['day']}: {e}")
+                else:
+                    print(f"Could not apply scheduled event {event.get('id')}: {e} (kept in the queue)")
+                    scheduler.requeue(event)
+                continue
+            if message:
+                applied.append(f"{event_date or 'Day ' + str(event['day'])}: {message}")
+        
+        state['in_game_days_passed'] = target_days
+        if start_date:
+            state['game_date'] = add_days(start_date, math.floor(target_days) - math.floor(current_days))
+        if len(scheduler) or 'scheduled_events' in state:
+            state['scheduled_events'] = scheduler.to_list()
+        
+        # Quest deadlines load every quest file; only the ones a handler changed are rewritten
+        writes = {}
+        for path, (text, doc) in docs.items():
+            if doc == loads(text):
+                continue
+            updated = None
+            try:
+                updated = splice_records(text, records.get(path, {}))
+            except ValueError:
+                pass
+            if updated is None or loads(updated) != doc:
+                # A field the file did not have yet: rewrite the whole file
+                updated = format_json(doc, text)
+            writes[path] = updated
+        writes[self.world_state_path] = format_json(state, state_text)
+        if not commit_writes(writes):
+            print("Error saving advanced world state")
+            return False
+        
+        for line in applied:
+            print(line)
+        print(f"Advanced time by {days} day(s). Total days: {state['in_game_days_passed']}")
+        return True
+    
+    def schedule_event(self, days_from_now, kind, every=None, **payload):
+        """
+        Schedule a timed event to fire when time is advanced past it.
+        
+        Args:
+            days_from_now: Days after the current in-game day the event falls due
+            kind: One of EVENT_KINDS:
+                  faction_clock (faction, progress),
+                  clock_tick (file, clock, segments),
+                  quest_deadline (quest, status - default "Failed"),
+                  world_event (description)
+            every: Repeat interval in days for recurring events (optional)
+            **payload: Kind-specific fields
             
+        Returns:
+            dict: The scheduled event if successful, None otherwise
+        """
+        if kind not in self.EVENT_KINDS:
+            print(f"Error: kind must be one of {', '.join(self.EVENT_KINDS)}, got {kind!r}")
+            return None
+        if not isinstance(days_from_now, (int, float)) or days_from_now < 0:
+            print(f"Error: days_from_now must be a non-negative number, got {days_from_now}")
+            return None
+        
         state = self.load_world_state()
-        if state:
-            # Use safe dictionary access with default value
-            current_days = state.get('in_game_days_passed', 0)
-            state['in_game_days_passed'] = current_days + days
-            print(f"Advanced time by {days} day(s). Total days: {state['in_game_days_passed']}")
-            return self.save_world_state(state)
-        return False
+        if not state:
+            return None
+        scheduler = EventScheduler(state.get('scheduled_events'))
+        try:
+            event = scheduler.schedule(state.get('in_game_days_passed', 0) + days_from_now,
+                                       kind, every=every, **payload)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return None
+        state['scheduled_events'] = scheduler.to_list()
+        if not self.save_world_state(state):
+            return None
+        print(f"Scheduled {kind} event {event['id']} for day {event['day']}")
+        return event
+    
+    def cancel_event(self, event_id):
+        """
+        Remove a scheduled event by id.
+        
+        Returns:
+            bool: True if the event was found and removed, False otherwise
+        """
+        state = self.load_world_state()
+        if not state:
+            return False
+        scheduler = EventScheduler(state.get('scheduled_events'))
+        if not scheduler.cancel(event_id):
+            print(f"Scheduled event {event_id} not found")
+            return False
+        state['scheduled_events'] = scheduler.to_list()
+        return self.save_world_state(state)
+    
+    def _load_doc(self, docs, path):
+        """Read a JSON document into the advance_time batch once."""
+        if path not in docs:
+            if not path.exists():
+                return None
+            try:
+                text = read_text(path)
+                docs[path] = (text, loads(text))
+            except (IOError, ValueError) as e:
+                print(f"Error reading {path}: {e}")
+                return None
+        return docs[path][1]
+    
+    def _apply_faction_clock(self, event, state, docs, records, quest_index, event_date):
+        faction_id = event.get('faction')
+        path = self.factions_dir / f"{faction_id}.json"
+        faction = self._load_doc(docs, path) if faction_id else None
+        if not isinstance(faction, dict) or not isinstance(faction.get('clock'), dict):
+            raise ValueError(f"Faction {faction_id} does not have a valid clock")
+        clock = faction['clock']
+        old_progress = clock.get('progress', 0)
+        segments = clock.get('segments', 8)
+        clock['progress'] = min(segments, max(0, old_progress + event.get('progress', 1)))
+        records.setdefault(path, {})["/clock/progress"] = clock['progress']
+        message = f"{faction.get('name', faction_id)} clock: {old_progress} -> {clock['progress']}/{segments}"
+        if clock['progress'] >= segments > old_progress:
+            message += f" (completed: {clock.get('name', 'goal')})"
+        return message
+    
+    def _apply_clock_tick(self, event, state, docs, records, quest_index, event_date):
+        stem = event.get('file')
+        path = self.data_dir / "clocks" / f"{stem}.json"
+        doc = self._load_doc(docs, path) if stem else None
+        root = doc.get(stem) if isinstance(doc, dict) else None
+        clock = root.get('clocks', {}).get(event.get('clock')) if isinstance(root, dict) else None
+        if not isinstance(clock, dict):
+            raise ValueError(f"Clock not found: {stem}/{event.get('clock')}")
+        field = 'current_progress' if 'current_progress' in clock else 'current_trust'
+        max_value = clock['total_segments'] if 'total_segments' in clock else clock.get('max_trust', 10)
+        old_progress = clock.get(field, 0)
+        clock[field] = max(0, min(max_value, old_progress + event.get('segments', 1)))
+        changed = records.setdefault(path, {})
+        changed[f"/{_escape(stem)}/clocks/{_escape(event['clock'])}/{field}"] = clock[field]
+        if 'last_updated' in root and event_date:
+            root['last_updated'] = event_date
+            changed[f"/{_escape(stem)}/last_updated"] = event_date
+        return f"{clock.get('name', event.get('clock'))}: {old_progress} -> {clock[field]}/{max_value}"
+    
+    def _apply_quest_deadline(self, event, state, docs, records, quest_index, event_date):
+        quest_name = event.get('quest')
+        location = quest_index.get(_quest_key(quest_name)) if isinstance(quest_name, str) else None
+        if location is None:
+            raise ValueError(f"Quest not found: {quest_name}")
+        quest_file, pointer = location
+        record = resolve_pointer(docs[quest_file][1], pointer)
+        if str(record.get('status', '')).lower() in ('completed', 'failed'):
+            return None
+        record['status'] = event.get('status', 'Failed')
+        records.setdefault(quest_file, {})[f"{pointer}/status"] = record['status']
+        return f"Quest '{record.get('name', quest_name)}' deadline passed - status: {record['status']}"
+    
+    def _apply_world_event(self, event, state, docs, records, quest_index, event_date):
+        description = event.get('description')
+        if not description or not isinstance(description, str):
+            return None
+        if not isinstance(state.get('major_events'), list):
+            state['major_events'] = []
+        state['major_events'].append(description)
+        return f"Major event: {description}"
     
     def update_faction_clock(self, faction_id, progress_change):
         """
@@ -115,8 +337,7 @@ class StoryProgressionManager:
         faction_path = self.factions_dir / f"{faction_id}.json"
         if faction_path.exists():
             try:
-                with open(faction_path, 'r', encoding='utf-8') as f:
-                    faction = json.load(f)
+                faction = load_json(faction_path)
             except (IOError, json.JSONDecodeError) as e:
                 print(f"Error reading faction file: {e}")
                 return False
@@ -200,24 +421,65 @@ class StoryProgressionManager:
         
         return events
     
+    def build_quest_index(self):
+        """
+        Index every quest record in data/quests by name, id and alias.
+        
+        Each quest file is read once. Records nested inside a file (such as
+        the quests of a questline) are addressed by JSON Pointer.
+        
+        Returns:
+            tuple: ({quest file: (original text, parsed document)},
+                    {normalized name/id/alias: (quest file, JSON Pointer)})
+        """
+        files, index = {}, {}
+        for quest_file in sorted(self.quests_dir.glob("*.json")):
+            try:
+                text = read_text(quest_file)
+                doc = loads(text)
+            except (IOError, ValueError) as e:
+                print(f"Error reading quest file {quest_file}: {e}")
+                continue
+            files[quest_file] = (text, doc)
+            for quest_id, pointer, record in quest_records(doc):
+                aliases = record.get('aliases')
+                names = [record.get('name'), quest_id, record.get('quest_id')]
+                names += aliases if isinstance(aliases, list) else []
+                for name in names:
+                    if isinstance(name, str) and name.strip():
+                        # The first file (in name order) to claim a name keeps it
+                        index.setdefault(_quest_key(name), (quest_file, pointer))
+        return files, index
+    
     def progress_quests(self, session_data):
         """
         Update quest states based on session data.
         
+        Quests are matched by name, id or alias through one index of
+        data/quests, every update is applied in memory, and each changed
+        quest file is written once. The status fields are spliced into the
+        file's text, so the rest of it is left byte for byte as it was.
+        
         Args:
             session_data: Dictionary containing session information with quest updates
+            
+        Returns:
+            list: Quest names from the updates that matched no quest
         """
         if not isinstance(session_data, dict):
             print("Error: session_data must be a dictionary")
-            return
+            return []
             
         if 'quests_updated' not in session_data:
-            return
+            return []
         
         quests_updated = session_data.get('quests_updated', [])
-        if not isinstance(quests_updated, list):
-            return
-            
+        if not isinstance(quests_updated, list) or not quests_updated:
+            return []
+        
+        files, index = self.build_quest_index()
+        changed = {}
+        unresolved = []
         for quest_update in quests_updated:
             if not isinstance(quest_update, dict):
                 continue
@@ -228,23 +490,32 @@ class StoryProgressionManager:
             if not quest_name or not quest_status:
                 continue
             
-            quest_files = list(self.quests_dir.glob("*.json"))
-            for quest_file in quest_files:
-                try:
-                    with open(quest_file, 'r', encoding='utf-8') as f:
-                        quest = json.load(f)
-                except (IOError, json.JSONDecodeError) as e:
-                    print(f"Error reading quest file {quest_file}: {e}")
-                    continue
-                
-                if quest.get('name') == quest_name:
-                    quest['status'] = quest_status
-                    try:
-                        with open(quest_file, 'w', encoding='utf-8') as f:
-                            json.dump(quest, f, indent=2)
-                        print(f"Updated quest '{quest['name']}' status to: {quest['status']}")
-                    except (IOError, OSError) as e:
-                        print(f"Error writing quest file {quest_file}: {e}")
+            location = index.get(_quest_key(quest_name)) if isinstance(quest_name, str) else None
+            if location is None:
+                unresolved.append(quest_name)
+                continue
+            
+            quest_file, pointer = location
+            record = resolve_pointer(files[quest_file][1], pointer)
+            record['status'] = quest_status
+            changed.setdefault(quest_file, {})[f"{pointer}/status"] = record
+        
+        for quest_file, records in changed.items():
+            text, doc = files[quest_file]
+            try:
+                updated = splice_records(text, {pointer: record['status'] for pointer, record in records.items()})
+            except ValueError:
+                # A quest without a status field yet: rewrite the whole file
+                updated = format_json(doc, text)
+            if not commit_writes({quest_file: updated}):
+                print(f"Error writing quest file {quest_file}")
+                continue
+            for record in records.values():
+                print(f"Updated quest '{record['name']}' status to: {record['status']}")
+        
+        if unresolved:
+            print(f"Quests not found: {', '.join(map(str, unresolved))}")
+        return unresolved
     
     def add_major_event(self, event_description):
         """
@@ -300,8 +571,7 @@ class StoryProgressionManager:
         faction_files = list(self.factions_dir.glob("*.json"))
         for faction_file in faction_files:
             try:
-                with open(faction_file, 'r', encoding='utf-8') as f:
-                    faction = json.load(f)
+                faction = load_json(faction_file)
             except (IOError, json.JSONDecodeError) as e:
                 print(f"Error reading faction file {faction_file}: {e}")
                 continue
@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+Synthetic Campaign Generator for Skyrim TTRPG
+
+Writes a complete, schema-valid campaign (data/, state/, logs/) of any size,
+so the tools can be measured and exercised at scales the real campaign has
+not reached yet:
+- Holds with capitals, districts and settlements, so the gazetteer, hold
+  triggers and travel tools resolve locations as they do for data/holds
+- NPC stat sheets shaped like data/npc_stat_sheets (aspects, skills, stress,
+  category, location, hold_context, act_context), most of them enemies
+- NPCs, session logs, clocks (split across the civil war, Thalmor and
+  faction trust files), factions.json and a player character with an
+  appearance file for first impressions
+- state/campaign_state.json with active companions, and
+  state/dragonbreak_state.json with the requested number of timeline branches
+
+Output is deterministic for a given seed and set of counts.
+
+Usage:
+    python3 synthetic_campaign.py /tmp/campaign --scale 0.1
+    python3 synthetic_campaign.py /tmp/campaign --stat-sheets 500 --npcs 100
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from relationship_graph import slug
+
+# Counts at scale 1.0
+DEFAULT_COUNTS = {
+    "stat_sheets": 10000,
+    "npcs": 2000,
+    "sessions": 500,
+    "clocks": 200,
+    "dragonbreak_branches": 50,
+}
+
+# hold, capital, jarl, allegiance, districts (of the capital), other settlements
+HOLDS = [
+    ("Whiterun Hold", "Whiterun", "Balgruuf the Greater", "Imperial",
+     ["Whiterun Plains District", "Whiterun Wind District", "Whiterun Cloud District"],
+     ["Riverwood", "Rorikstead"]),
+    ("Eastmarch", "Windhelm", "Ulfric Stormcloak", "Stormcloak",
+     ["Windhelm Gray Quarter", "Windhelm Stone Quarter", "Windhelm Docks"],
+     ["Kynesgrove", "Darkwater Crossing"]),
+    ("The Rift", "Riften", "Laila Law-Giver", "Stormcloak",
+     ["Riften Marketplace", "Riften Ratway", "Riften Canals"],
+     ["Ivarstead", "Shor's Stone"]),
+    ("The Reach", "Markarth", "Igmund", "Imperial",
+     ["Markarth Understone Keep", "Markarth Warrens", "Markarth Silver-Blood Inn"],
+     ["Karthwasten", "Old Hroldan"]),
+    ("Hjaalmarch", "Morthal", "Idgrod Ravencrone", "Imperial",
+     ["Morthal Highmoon Hall", "Morthal Moorside Inn", "Morthal Swamp Outskirts"],
+     ["Stonehills"]),
+    ("Haafingar", "Solitude", "Elisif the Fair", "Imperial",
+     ["Solitude Blue Palace", "Solitude Castle Dour", "Solitude Docks"],
+     ["Dragon Bridge"]),
+    ("Falkreath Hold", "Falkreath", "Siddgeir", "Imperial",
+     ["Falkreath Graveyard", "Falkreath Dead Man's Drink"],
+     ["Helgen"]),
+    ("The Pale", "Dawnstar", "Skald the Elder", "Stormcloak",
+     ["Dawnstar Windpeak Inn", "Dawnstar Harbor"],
+     ["Nightgate Inn"]),
+    ("Winterhold", "Winterhold", "Korir", "Stormcloak",
+     ["College of Winterhold", "Winterhold Frozen Hearth"],
+     []),
+]
+
+# Wilderness features that stat sheets name alongside a hold
+FEATURES = ["Nordic ruins", "Roads", "Caves", "Bandit camps", "Forests", "Mountains", "Mines", "Dwemer ruins"]
+
+FACTIONS = [
+    ("imperial_legion", "Imperial Legion"),
+    ("stormcloaks", "Stormcloaks"),
+    ("thalmor", "Thalmor"),
+    ("companions", "The Companions"),
+    ("thieves_guild", "Thieves Guild"),
+    ("dark_brotherhood", "Dark Brotherhood"),
+    ("college_of_winterhold", "College of Winterhold"),
+    ("silver_hand", "Silver Hand"),
+    ("forsworn", "Forsworn"),
+]
+
+CATEGORIES = (("Enemy", 6), ("Hostile NPC", 2), ("Friendly NPC", 2))
+ACTS = ["Act 1", "Act 2", "Act 3"]
+SKILLS = ["Fight", "Shoot", "Athletics", "Physique", "Will", "Notice", "Stealth", "Deceive",
+          "Provoke", "Rapport", "Lore", "Survival", "Burglary", "Empathy", "Resources"]
+SYLLABLES = ["bal", "gru", "ulf", "ric", "hro", "gar", "ing", "vild", "sor", "li", "rald", "mun",
+             "thor", "ald", "brand", "eir", "fen", "grim", "hild", "jorn", "kar", "lok", "ny", "ra"]
+EPITHETS = ["the Bold", "Iron-Hand", "Snow-Strider", "the Quiet", "Black-Briar", "Stone-Fist",
+            "the Elder", "Frost-Eye", "Ash-Born", "the Young"]
+TYPES = ["Bandit", "Draugr", "Mage", "Soldier", "Beast", "Vampire", "Hunter", "Cultist"]
+
+CLOCK_FILES = (
+    ("civil_war", "civil_war_clocks", 0.4),
+    ("thalmor", "thalmor_influence_clocks", 0.3),
+    ("faction_trust", "faction_trust_clocks", 0.3),
+)
+
+START_DATE = date(2026, 1, 1)
+
+
+def scaled_counts(scale=1.0, **overrides):
+    """DEFAULT_COUNTS times scale (at least 1 each), with explicit counts taking precedence."""
+    counts = {key: max(1, int(round(value * scale))) for key, value in DEFAULT_COUNTS.items()}
+    counts.update({key: value for key, value in overrides.items() if value is not None})
+    return counts
+
+
+def _write(path, doc):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+
+
+class SyntheticCampaign:
+    def __init__(self, root, seed=0, **counts):
+        """
+        Initialize the generator.
+
+        Args:
+            root: Repository root to write data/, state/ and logs/ into
+            seed: Random seed (same seed and counts give the same campaign)
+            **counts: Any of DEFAULT_COUNTS' keys; missing ones use scale 1.0
+        """
+        unknown = set(counts) - set(DEFAULT_COUNTS)
+        if unknown:
+            raise ValueError(f"Unknown counts: {', '.join(sorted(unknown))}")
+        self.root = Path(root)
+        self.data_dir = self.root / "data"
+        self.state_dir = self.root / "state"
+        self.counts = dict(DEFAULT_COUNTS, **counts)
+        self.rng = random.Random(seed)
+        self.npc_ids = []
+        self.clock_keys = {}
+        self.pc_id = "pc_synthetic_hero"
+
+    # ------------------------------------------------------------------
+    # Building blocks
+    # ------------------------------------------------------------------
+
+    def _name(self):
+        first = "".join(self.rng.sample(SYLLABLES, self.rng.randint(2, 3))).capitalize()
+        return f"{first} {self.rng.choice(EPITHETS)}"
+
+    def _skills(self):
+        picked = self.rng.sample(SKILLS, 8)
+        return {"Great": picked[:1], "Good": picked[1:3], "Fair": picked[3:5], "Average": picked[5:]}
+
+    def _aspects(self, kind):
+        return {
+            "high_concept": f"{self.rng.choice(['Veteran', 'Cunning', 'Desperate', 'Zealous'])} {kind}",
+            "trouble": self.rng.choice(["Owes the Wrong People", "Old Grudges", "Too Proud to Retreat"]),
+            "other_aspects": [self.rng.choice(["Knows the Land", "Scarred", "Loyal to a Fault", "Hungry"])],
+        }
+
+    def _place(self, hold):
+        """A place in a hold, phrased the way stat sheet locations are."""
+        _, capital, _, _, districts, settlements = hold
+        roll = self.rng.random()
+        if roll < 0.4:
+            return f"{self.rng.choice(FEATURES)} in {hold[0]}"
+        if roll < 0.7:
+            return self.rng.choice(settlements or [capital])
+        return self.rng.choice(districts + [capital])
+
+    # ------------------------------------------------------------------
+    # Families
+    # ------------------------------------------------------------------
+
+    def write_holds(self):
+        for hold, capital, jarl, allegiance, districts, settlements in HOLDS:
+            _write(self.data_dir / "holds" / f"{slug(hold)}.json", {
+                "hold": hold,
+                "capital": capital,
+                "jarl": jarl,
+                "allegiance": allegiance,
+                "districts": [{"name": name, "description": f"A district of {capital}."} for name in districts],
+                "major_settlements": [f"{capital} (City)"] + settlements,
+                "factions_present": [name for _, name in self.rng.sample(FACTIONS, 3)],
+            })
+        return len(HOLDS)
+
+    def write_stat_sheets(self):
+        categories, weights = zip(*CATEGORIES)
+        hold_names = [hold[0] for hold in HOLDS]
+        for i in range(self.counts["stat_sheets"]):
+            kind = self.rng.choice(TYPES)
+            category = self.rng.choices(categories, weights)[0]
+            hold = self.rng.choice(HOLDS)
+            name = f"{self._name()} ({kind})" if category != "Enemy" else f"{kind} {self.rng.choice(EPITHETS)}"
+            stat_id = f"npc_stat_{slug(kind)}_{i:05d}"
+            sheet = {
+                "name": name,
+                "id": stat_id,
+                "type": kind,
+                "category": category,
+                "location": ", ".join(dict.fromkeys([self._place(hold), self._place(hold)])),
+                "faction": self.rng.choice(FACTIONS)[1],
+                "aspects": self._aspects(kind),
+                "skills": self._skills(),
+                "stunts": [f"{kind} Training: +2 to {self.rng.choice(SKILLS)} in familiar ground"],
+                "stress": {"physical": [False] * self.rng.randint(2, 4), "mental": [False] * 2},
+                "consequences": {"mild": None, "moderate": None},
+                "refresh": self.rng.randint(1, 3),
+                "armor": self.rng.randint(0, 2),
+                "scene_triggers": [f"Ambush near {hold[1]}"],
+                "act_context": sorted(self.rng.sample(ACTS, self.rng.randint(1, 3))),
+            }
+            if category == "Enemy" and self.rng.random() < 0.7:
+                others = self.rng.sample([h for h in hold_names if h != hold[0]], 4)
+                sheet["hold_context"] = {"primary": [hold[0]], "contested": others[:2], "rare": others[2:]}
+            _write(self.data_dir / "npc_stat_sheets" / f"{stat_id}.json", sheet)
+        return self.counts["stat_sheets"]
+
+    def write_npcs(self):
+        for i in range(self.counts["npcs"]):
+            name = self._name()
+            self.npc_ids.append((f"{slug(name)}_{i:04d}", name))
+        for npc_id, name in self.npc_ids:
+            hold = self.rng.choice(HOLDS)
+            relationships = {other: self.rng.choice(["Friend", "Rival", "Sworn enemy", "Kin"])
+                             for other, _ in self.rng.sample(self.npc_ids, min(3, len(self.npc_ids)))
+                             if other != npc_id}
+            relationships[self.rng.choice(FACTIONS)[0]] = self.rng.choice(["Loyal", "Distrustful"])
+            _write(self.data_dir / "npcs" / f"{npc_id}.json", {
+                "name": name,
+                "id": npc_id,
+                "type": self.rng.choice(TYPES),
+                "location": f"{self.rng.choice(hold[4] or [hold[1]])}, {hold[1]}",
+                "faction": self.rng.choice(FACTIONS)[1],
+                "aspects": self._aspects("of " + hold[1]),
+                "skills": self._skills(),
+                "stunts": [],
+                "stress": {"physical": [False, False, False], "mental": [False, False]},
+                "consequences": {"mild": None, "moderate": None, "severe": None},
+                "refresh": 3,
+                "fate_points": 3,
+                "act_context": sorted(self.rng.sample(ACTS, 2)),
+                "relationships": relationships,
+                "loyalty": self.rng.randint(20, 90),
+            })
+        return len(self.npc_ids)
+
+    def write_sessions(self):
+        for number in range(1, self.counts["sessions"] + 1):
+            hold = self.rng.choice(HOLDS)
+            _write(self.data_dir / "sessions" / f"session_{number:03d}.json", {
+                "session_number": number,
+                "date": (START_DATE + timedelta(days=7 * (number - 1))).isoformat(),
+                "title": f"Session {number}: Trouble in {hold[1]}",
+                "characters_present": [self.pc_id],
+                "npcs_encountered": [npc_id for npc_id, _ in self.rng.sample(self.npc_ids, min(4, len(self.npc_ids)))],
+                "locations_visited": [hold[1], self._place(hold)],
+                "key_events": [f"Arrived in {hold[1]}", f"Clashed with {self.rng.choice(FACTIONS)[1]} agents"],
+                "quests_updated": [],
+                "experience_gained": self.rng.randint(1, 4),
+                "fate_points_awarded": self.rng.randint(0, 2),
+            })
+        return self.counts["sessions"]
+
+    def write_clocks(self):
+        total = self.counts["clocks"]
+        shares = [max(1, int(total * share)) for _, _, share in CLOCK_FILES]
+        shares[0] += max(0, total - sum(shares))
+        for (category, stem, _), count in zip(CLOCK_FILES, shares):
+            clocks = {}
+            for i in range(count):
+                key, faction = f"{category}_clock_{i:03d}", self.rng.choice(FACTIONS)
+                if category == "faction_trust":
+                    clocks[key] = {"faction": faction[1], "current_trust": self.rng.randint(0, 9), "max_trust": 10}
+                else:
+                    segments = self.rng.choice([4, 6, 8, 10])
+                    clocks[key] = {"name": f"{faction[1]} Scheme {i}", "faction": faction[1],
+                                   "current_progress": self.rng.randint(0, segments - 1), "total_segments": segments,
+                                   "completion_effect": f"{faction[1]} gain the upper hand",
+                                   "advancement_triggers": ["Party ignores the threat"],
+                                   "setback_triggers": ["Party intervenes"]}
+            self.clock_keys[category] = list(clocks)
+            _write(self.data_dir / "clocks" / f"{stem}.json", {stem: {
+                "description": f"Synthetic {category.replace('_', ' ')} clocks",
+                "last_updated": START_DATE.isoformat(),
+                "clocks": clocks,
+            }})
+        return total
+
+    def write_factions(self):
+        _write(self.data_dir / "factions.json", {"major_factions": {
+            faction_id: {
+                "name": name,
+                "relationships": {other: self.rng.randint(-100, 100) for other, _ in FACTIONS if other != faction_id},
+                "clocks": [{"name": f"{name} Ambition", "progress": self.rng.randint(0, 5), "segments": 8,
+                            "effect": f"{name} reshape Skyrim"}],
+            } for faction_id, name in FACTIONS}})
+        return len(FACTIONS)
+
+    def write_pc(self):
+        _write(self.data_dir / "pcs" / f"{self.pc_id}.json", {
+            "id": self.pc_id,
+            "name": "Synthetic Hero",
+            "player": "Benchmark",
+            "race": "Nord",
+            "faction_alignment": "stormcloak",
+            "aspects": {"high_concept": "Dragonborn of the Benchmark", "trouble": "Everyone Wants Something"},
+            "skills": self._skills(),
+            "stress": {"physical": [False, False, False], "mental": [False, False, False]},
+            "refresh": 3,
+            "fate_points": 3,
+        })
+        _write(self.data_dir / "pcs" / "appearances" / f"{self.pc_id[3:]}_appearance.json", {
+            "pc_id": self.pc_id,
+            "name": "Synthetic Hero",
+            "race": "Nord",
+            "recognition_tags": ["tall_nord", "stormcloak_blue_cloth"],
+            "visual_profile": {"silhouette": "A broad Nord in travel-worn mail."},
+            "first_impression_lines": {
+                "neutral": ["A Nord in Stormcloak blue, watching the room."],
+                "positive": ["A Nord you would want at your side."],
+                "negative": ["Another rebel, armed and unwelcome."],
+            },
+        })
+        return 1
+
+    def write_state(self):
+        companions = [{"npc_id": npc_id, "name": name, "status": "active", "loyalty": 60 + i * 5}
+                      for i, (npc_id, name) in enumerate(self.npc_ids[:3])]
+        _write(self.state_dir / "campaign_state.json", {
+            "campaign_id": "synthetic",
+            "campaign_name": "Synthetic Campaign",
+            "current_act": 1,
+            "active_pc_id": self.pc_id,
+            "session_count": self.counts["sessions"],
+            "current_location": "Riften",
+            "active_hold": "The Rift",
+            "time_of_day": "night",
+            "scene_flags": {},
+            "quests": {"active": ["laid_to_rest"], "completed": []},
+            "civil_war_state": {"player_alliance": "stormcloak"},
+            "companions": {
+                "active_companions": companions,
+                "companion_relationships": {c["npc_id"]: c["loyalty"] for c in companions},
+            },
+            "player_characters": [{"id": self.pc_id, "name": "Synthetic Hero", "faction_alignment": "stormcloak"}],
+            "npc_first_impressions": {},
+        })
+        _write(self.data_dir / "world_state" / "current_state.json", {
+            "current_act": 1, "in_game_days_passed": 7 * self.counts["sessions"]})
+
+        branches = {"primary": self._branch("primary", "Primary Timeline", None)}
+        parents = ["primary"]
+        for i in range(1, self.counts["dragonbreak_branches"] + 1):
+            parent = self.rng.choice(parents)
+            branches[f"branch_{i}"] = self._branch(f"branch_{i}", f"Fracture {i}", parent)
+            parents.append(f"branch_{i}")
+        _write(self.state_dir / "dragonbreak_state.json", {
+            "active_dragonbreaks": [{"id": f"dragonbreak_{i}", "name": branches[f"branch_{i}"]["name"],
+                                     "branch_ids": [branches[f"branch_{i}"]["parent_timeline"], f"branch_{i}"],
+                                     "status": "active", "created": branches[f"branch_{i}"]["created"]}
+                                    for i in range(1, self.counts["dragonbreak_branches"] + 1)],
+            "timeline_branches": branches,
+            "current_timeline": "primary",
+            "fracture_points": [{"fracture_id": branch_id, "name": branch["name"],
+                                 "parent_timeline": branch["parent_timeline"]}
+                                for branch_id, branch in branches.items() if branch_id != "primary"],
+            "consequences": [],
+        })
+        return 2
+
+    def _branch(self, branch_id, name, parent):
+        npcs = self.rng.sample(self.npc_ids, min(20, len(self.npc_ids)))
+        branch = {
+            "id": branch_id,
+            "name": name,
+            "created": START_DATE.isoformat(),
+            "npcs": {npc_id: {"name": npc_name, "state": self.rng.choice(["alive", "dead", "missing"])}
+                     for npc_id, npc_name in npcs},
+            "factions": {faction_id: {"name": faction, "state": self.rng.choice(["rising", "waning"])}
+                         for faction_id, faction in FACTIONS},
+            "quests": {},
+            "world_state": {"civil_war_victor": self.rng.choice(["imperial", "stormcloak", "undecided"])},
+        }
+        if parent:
+            branch["parent_timeline"] = parent
+        return branch
+
+    def generate(self):
+        """
+        Write the whole campaign.
+
+        Returns:
+            dict: Documents written per family, plus elapsed_s
+        """
+        start = time.perf_counter()
+        written = {
+            "holds": self.write_holds(),
+            "npc_stat_sheets": self.write_stat_sheets(),
+            "npcs": self.write_npcs(),
+            "sessions": self.write_sessions(),
+            "clocks": self.write_clocks(),
+            "factions": self.write_factions(),
+            "pcs": self.write_pc(),
+            "state": self.write_state(),
+        }
+        (self.root / "logs").mkdir(parents=True, exist_ok=True)
+        written["elapsed_s"] = round(time.perf_counter() - start, 3)
+        return written
+
+
+def generate_campaign(root, seed=0, **counts):
+    """Write a synthetic campaign under root; see SyntheticCampaign.generate()."""
+    return SyntheticCampaign(root, seed=seed, **counts).generate()
+
+
+def add_count_arguments(parser):
+    """--scale plus one --<family> flag per entry of DEFAULT_COUNTS."""
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Multiplier for the default counts (1.0 = " +
+                             ", ".join(f"{v} {k.replace('_', ' ')}" for k, v in DEFAULT_COUNTS.items()) + ")")
+    for key in DEFAULT_COUNTS:
+        parser.add_argument(f"--{key.replace('_', '-')}", dest=key, type=int, default=None,
+                            help=f"Exact number of {key.replace('_', ' ')} (overrides --scale)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic Skyrim TTRPG campaign.")
+    parser.add_argument("root", help="Directory to write data/, state/ and logs/ into")
+    add_count_arguments(parser)
+    args = parser.parse_args()
+
+    counts = scaled_counts(args.scale, **{key: getattr(args, key) for key in DEFAULT_COUNTS})
+    written = generate_campaign(args.root, seed=args.seed, **counts)
+    print(f"Wrote synthetic campaign to {args.root} in {written.pop('elapsed_s')} s:")
+    for family, count in written.items():
+        print(f"  {family}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Travel Graph and Route Planner for Skyrim TTRPG
+
+Models travel between the places in data/holds as a weighted graph:
+- Nodes are gazetteer places (capitals, settlements, major locations and
+  districts); districts are joined to their city at no cost
+- Edges are the roads in data/travel_routes.json, each with travel days,
+  danger (0-5) and terrain
+- Routes come from all-pairs tables (Dijkstra from every node), built on
+  first use and kept until a hold or route file changes, so a lookup only
+  walks the stored predecessors. Routes are "fastest" (days) or "safest"
+  (days weighted by danger)
+- plan_journey() routes through any number of stops in one call and
+  pre-rolls each leg's encounters and the location triggers of every place
+  the party arrives at
+
+A leg's expected encounter count is days x danger x encounter_rate. Its
+enemies are drawn from the enemy pools of the holds at both ends
+(hold_context primary, contested and rare, via get_enemies_by_hold) and
+from enemies whose location matches the road's terrain. Triggers run on a
+copy of the campaign state, so one-time events fire once per journey and
+nothing is saved.
+
+Usage:
+    python3 travel_graph.py Whiterun                 # travel days to everywhere
+    python3 travel_graph.py Whiterun Riften
+    python3 travel_graph.py Whiterun "The Pale" Windhelm --safest --seed 7
+"""
+
+import argparse
+import copy
+import heapq
+import math
+import os
+import random
+from pathlib import Path
+
+from gazetteer import hold_short_name
+from json_io import load_json
+from query_data import DataQueryManager
+from triggers.hjaalmarch_triggers import hjaalmarch_location_triggers
+from triggers.markarth_triggers import markarth_location_triggers
+from triggers.rift_triggers import rift_location_triggers
+from triggers.whiterun_triggers import whiterun_location_triggers
+from triggers.windhelm_triggers import windhelm_location_triggers
+
+ROUTES_FILE = "travel_routes.json"
+MODES = ("fastest", "safest")
+DEFAULT_ENCOUNTER_RATE = 0.2
+SAFETY_WEIGHT = 0.5          # safest routes cost days x (1 + SAFETY_WEIGHT x danger)
+POOL_WEIGHTS = (("primary", 3), ("contested", 2), ("rare", 1))
+TERRAIN_WEIGHT = 2
+# Location trigger functions by hold (short name, lowercase)
+HOLD_TRIGGERS = {
+    "whiterun": whiterun_location_triggers,
+    "eastmarch": windhelm_location_triggers,
+    "the reach": markarth_location_triggers,
+    "hjaalmarch": hjaalmarch_location_triggers,
+    "the rift": rift_location_triggers,
+}
+
+
+def _poisson(rng, expected):
+    """Number of encounters on a leg (Knuth's method; legs expect only a few)."""
+    if expected <= 0:
+        return 0
+    limit, count, product = math.exp(-expected), 0, rng.random()
+    while product > limit:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+class TravelGraph:
+    def __init__(self, data_dir="../data", storage=None, query_manager=None):
+        """
+        Initialize the TravelGraph.
+
+        Args:
+            data_dir: Path to the data directory
+            storage: Storage backend for a new DataQueryManager (default: open_storage(data_dir))
+            query_manager: Existing DataQueryManager to share (gazetteer and enemy queries)
+        """
+        self.data_dir = Path(data_dir)
+        self.query_manager = query_manager or DataQueryManager(str(self.data_dir), storage=storage)
+        self.routes_path = self.data_dir / ROUTES_FILE
+        self.edges = {}           # place id -> {neighbour id: {"days", "danger", "terrain"}}
+        self.unresolved = []      # road endpoints that name no known place
+        self.encounter_rate = DEFAULT_ENCOUNTER_RATE
+        self._tables = {}         # mode -> {source: (cost by target, predecessor by target)}
+        self._pools = {}          # hold id or terrain -> [(stat sheet, weight)]
+        self._signature = None
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    @property
+    def gazetteer(self):
+        return self.query_manager.gazetteer()
+
+    def refresh(self):
+        """Rebuild the graph (and drop cached tables) if the holds, stat sheets or routes changed."""
+        gazetteer = self.gazetteer
+        try:
+            st = os.stat(self.routes_path)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            stamp = None
+        signature = (id(gazetteer), gazetteer.version, stamp)
+        if signature != self._signature:
+            self.build()
+            self._signature = signature
+        return self
+
+    def build(self):
+        """(Re)load the nodes from the gazetteer and the roads from travel_routes.json."""
+        gazetteer = self.gazetteer
+        self.edges, self.unresolved = {}, []
+        self._tables, self._pools = {}, {}
+        for place in gazetteer.places.values():
+            if place.kind not in ("hold", "feature"):
+                self.edges.setdefault(place.id, {})
+        for place in gazetteer.places.values():
+            if place.kind == "district" and place.parent in self.edges:
+                self._connect(place.id, place.parent, {"days": 0.0, "danger": 0, "terrain": []})
+
+        routes = load_json(self.routes_path) if self.routes_path.exists() else {}
+        self.encounter_rate = routes.get("encounter_rate", DEFAULT_ENCOUNTER_RATE)
+        for road in routes.get("roads", []):
+            ends = [self.resolve(road.get("from")), self.resolve(road.get("to"))]
+            for name, place_id in zip((road.get("from"), road.get("to")), ends):
+                if place_id is None:
+                    self.unresolved.append(name)
+            if None in ends or ends[0] == ends[1]:
+                continue
+            self._connect(ends[0], ends[1], {
+                "days": float(road.get("days", 1)),
+                "danger": int(road.get("danger", 0)),
+                "terrain": list(road.get("terrain", [])),
+            })
+        return self
+
+    def _connect(self, a, b, leg):
+        # Parallel roads: keep the faster one
+        if b not in self.edges[a] or leg["days"] < self.edges[a][b]["days"]:
+            self.edges[a][b] = self.edges[b][a] = leg
+
+    def resolve(self, name):
+        """
+        Node id for a stop: a place id or name; a hold means its capital.
+
+        Returns:
+            str: Place id, or None if the name is not a known place
+        """
+        gazetteer = self.gazetteer
+        if not isinstance(name, str):
+            return None
+        candidates = [name] if name in gazetteer.places else gazetteer.named(name)
+        for place_id in candidates:
+            place = gazetteer.get(place_id)
+            if place.kind == "hold":
+                return gazetteer.capital(place_id)
+            if place.kind != "feature":
+                return place_id
+        return None
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+
+    def _cost(self, leg, mode):
+        if mode == "safest":
+            return leg["days"] * (1 + SAFETY_WEIGHT * leg["danger"])
+        return leg["days"]
+
+    def _dijkstra(self, source, mode):
+        cost, previous = {source: 0.0}, {}
+        heap = [(0.0, source)]
+        while heap:
+            here_cost, here = heapq.heappop(heap)
+            if here_cost > cost[here]:
+                continue
+            for neighbour, leg in self.edges[here].items():
+                new_cost = here_cost + self._cost(leg, mode)
+                if new_cost < cost.get(neighbour, math.inf):
+                    cost[neighbour] = new_cost
+                    previous[neighbour] = here
+                    heapq.heappush(heap, (new_cost, neighbour))
+        return cost, previous
+
+    def tables(self, mode="fastest"):
+        """All-pairs {source: (cost by target, predecessor by target)}, computed once per mode."""
+        if mode not in MODES:
+            raise ValueError(f"Unknown route mode '{mode}' (expected one of {', '.join(MODES)})")
+        self.refresh()
+        if mode not in self._tables:
+            self._tables[mode] = {source: self._dijkstra(source, mode) for source in self.edges}
+        return self._tables[mode]
+
+    def route(self, start, end, mode="fastest"):
+        """
+        Best route between two places.
+
+        Returns:
+            dict: {"path": [place ids], "days", "danger" (worst leg), "cost"}, or None if
+            either place is unknown or unreachable
+        """
+        tables = self.tables(mode)
+        start, end = self.resolve(start), self.resolve(end)
+        if start is None or end is None or end not in tables[start][0]:
+            return None
+        cost, previous = tables[start]
+        path = [end]
+        while path[-1] != start:
+            path.append(previous[path[-1]])
+        path.reverse()
+        legs = [self.edges[a][b] for a, b in zip(path, path[1:])]
+        return {
+            "path": path,
+            "days": sum(leg["days"] for leg in legs),
+            "danger": max((leg["danger"] for leg in legs), default=0),
+            "cost": cost[end],
+        }
+
+    def travel_days(self, start, end):
+        """Days along the fastest route, or None if unreachable."""
+        found = self.route(start, end)
+        return found["days"] if found else None
+
+    # ------------------------------------------------------------------
+    # Encounters and triggers
+    # ------------------------------------------------------------------
+
+    def _hold_pool(self, hold_id):
+        if hold_id not in self._pools:
+            pool = {}
+            place = self.gazetteer.get(hold_id)
+            if place is not None:
+                tiers = self.query_manager.get_enemies_by_hold(hold_short_name(place.name))
+                for tier, weight in POOL_WEIGHTS:
+                    for sheet in tiers.get(tier, []):
+                        key = sheet.get("id") or sheet.get("name")
+                        if weight > pool.get(key, (None, 0))[1]:
+                            pool[key] = (sheet, weight)
+            self._pools[hold_id] = list(pool.values())
+        return self._pools[hold_id]
+
+    def _terrain_pool(self, terrain):
+        key = ("terrain", terrain)
+        if key not in self._pools:
+            self._pools[key] = [(sheet, TERRAIN_WEIGHT)
+                                for sheet in self.query_manager.get_enemies_by_location(terrain)]
+        return self._pools[key]
+
+    def enemy_pool(self, a, b, leg):
+        """[(stat sheet, weight)] for a leg: both ends' holds plus its terrain."""
+        pool = {}
+        sources = [self._hold_pool(h) for h in {self.gazetteer.hold_of(a), self.gazetteer.hold_of(b)} if h]
+        sources += [self._terrain_pool(t) for t in leg["terrain"]]
+        for sheet, weight in (entry for source in sources for entry in source):
+            key = sheet.get("id") or sheet.get("name")
+            if weight > pool.get(key, (None, 0))[1]:
+                pool[key] = (sheet, weight)
+        return [pool[key] for key in sorted(pool)]
+
+    def roll_encounters(self, a, b, rng):
+        """Pre-roll the encounters on the road from a to b."""
+        leg = self.edges[a][b]
+        expected = leg["days"] * leg["danger"] * self.encounter_rate
+        count = _poisson(rng, expected)
+        pool = self.enemy_pool(a, b, leg) if count else []
+        if not pool:
+            return expected, []
+        sheets = rng.choices([s for s, _ in pool], weights=[w for _, w in pool], k=count)
+        return expected, [{"id": s.get("id"), "name": s.get("name"), "type": s.get("type")} for s in sheets]
+
+    def location_key(self, place_id):
+        """Location string for the trigger modules ("whiterun_plains_district")."""
+        chain = []
+        while place_id is not None and self.gazetteer.get(place_id).kind != "hold":
+            chain.append(place_id)
+            place_id = self.gazetteer.get(place_id).parent
+        return "_".join(reversed(chain))
+
+    def triggers_at(self, place_id, campaign_state):
+        """Events from the hold's location triggers for arriving at a place."""
+        hold_id = self.gazetteer.hold_of(place_id)
+        if hold_id is None:
+            return []
+        trigger = HOLD_TRIGGERS.get(hold_short_name(self.gazetteer.get(hold_id).name).lower())
+        return trigger(self.location_key(place_id), campaign_state) if trigger else []
+
+    def plan_journey(self, stops, campaign_state=None, mode="fastest", seed=None):
+        """
+        Route a journey through stops, pre-rolling encounters and triggers.
+
+        Args:
+            stops: Place names or ids in travel order (a hold means its capital)
+            campaign_state: Campaign state for the triggers (copied, never modified)
+            mode: "fastest" or "safest"
+            seed: Random seed, for repeatable encounter rolls
+
+        Returns:
+            dict: {"stops", "path", "days", "legs", "encounters", "triggers"}, or None
+            if a stop is unknown or unreachable
+        """
+        if len(stops) < 2:
+            print("Error: A journey needs at least two stops")
+            return None
+        ids = [self.resolve(stop) for stop in stops]
+        unknown = [stop for stop, place_id in zip(stops, ids) if place_id is None]
+        if unknown:
+            print(f"Error: Unknown places: {', '.join(map(str, unknown))}")
+            return None
+
+        rng = random.Random(seed)
+        state = copy.deepcopy(campaign_state or {})
+        path, legs, triggers = [ids[0]], [], {}
+        for start, end in zip(ids, ids[1:]):
+            found = self.route(start, end, mode)
+            if found is None:
+                print(f"Error: No route from {start} to {end}")
+                return None
+            for a, b in zip(found["path"], found["path"][1:]):
+                expected, encounters = self.roll_encounters(a, b, rng)
+                leg = self.edges[a][b]
+                legs.append({
+                    "from": a, "to": b, "days": leg["days"], "danger": leg["danger"],
+                    "terrain": leg["terrain"], "expected_encounters": round(expected, 2),
+                    "encounters": encounters,
+                })
+                events = self.triggers_at(b, state)
+                if events:
+                    triggers.setdefault(b, []).extend(events)
+            path.extend(found["path"][1:])
+        return {
+            "stops": ids,
+            "path": path,
+            "days": sum(leg["days"] for leg in legs),
+            "legs": legs,
+            "encounters": sum(len(leg["encounters"]) for leg in legs),
+            "triggers": triggers,
+        }
+
+
+def main():
+    """CLI for route planning"""
+    parser = argparse.ArgumentParser(description="Plan travel between Skyrim locations")
+    parser.add_argument("stops", nargs="+", help="Places in travel order (one place: days to everywhere)")
+    parser.add_argument("--safest", action="store_true", help="Prefer less dangerous roads")
+    parser.add_argument("--seed", type=int, help="Random seed for encounter rolls")
+    args = parser.parse_args()
+
+    graph = TravelGraph(Path(__file__).resolve().parents[1] / "data").refresh()
+    if graph.unresolved:
+        print(f"Warning: Unknown places in {ROUTES_FILE}: {', '.join(graph.unresolved)}")
+
+    if len(args.stops) == 1:
+        start = graph.resolve(args.stops[0])
+        if start is None:
+            print(f"Unknown place: {args.stops[0]}")
+            return
+        cost, _ = graph.tables()[start]
+        print(f"Travel days from {graph.gazetteer.get(start).name}:")
+        for place_id, days in sorted(cost.items(), key=lambda item: (item[1], item[0])):
+            if place_id != start and graph.gazetteer.get(place_id).kind != "district":
+                print(f"  {days:>5.2f}  {graph.gazetteer.get(place_id).name}")
+        return
+
+    journey = graph.plan_journey(args.stops, mode="safest" if args.safest else "fastest", seed=args.seed)
+    if journey is None:
+        return
+    name = lambda place_id: graph.gazetteer.get(place_id).name
+    print(f"Journey: {' -> '.join(name(p) for p in journey['stops'])}")
+    print(f"Total: {journey['days']:.2f} days, {journey['encounters']} encounter(s)\n")
+    for leg in journey["legs"]:
+        print(f"{name(leg['from'])} -> {name(leg['to'])}: {leg['days']:.2f} days, "
+              f"danger {leg['danger']}, expected encounters {leg['expected_encounters']}")
+        for encounter in leg["encounters"]:
+            print(f"  ☠ {encounter['name']}")
+        for event in journey["triggers"].get(leg["to"], []):
+            print(f"  ✦ {event}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,9 @@ def location_matches(search_location, sheet_location):
     """
     Check if a search location matches a stat sheet location.
     
+    Stat sheet queries now go through gazetteer.Gazetteer, which matches
+    by place and hold hierarchy instead of substrings.
+    
     Uses bidirectional partial matching:
     - Returns True if search term is in sheet location
     - Returns True if sheet location is in search term
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Streaming Zip Writer for Skyrim TTRPG
+
+This module writes .zip archives for repository exports:
+- Compresses entries in a thread pool (zlib releases the GIL, so this scales with cores)
+- Writes entries in their original order to any binary stream (file or stdout)
+- Never seeks, so non-seekable outputs like pipes work
+- Accepts in-memory entries, so generated files never touch the working tree
+"""
+
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Zip record signatures and constants (PKWARE APPNOTE 4.3)
+LOCAL_HEADER_SIG = 0x04034B50
+CENTRAL_HEADER_SIG = 0x02014B50
+END_OF_CENTRAL_DIR_SIG = 0x06054B50
+ZIP_VERSION = 20
+FLAG_UTF8 = 0x0800
+METHOD_STORED = 0
+METHOD_DEFLATED = 8
+ZIP32_LIMIT = 0xFFFFFFFF
+MAX_ENTRIES = 0xFFFF
+
+
+def _dos_datetime(mtime):
+    """Convert a POSIX timestamp into the (time, date) pair used by zip headers."""
+    t = time.localtime(mtime)
+    year = max(t.tm_year, 1980)
+    dos_date = ((year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+    dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    return dos_time, dos_date
+
+
+def compress_entry(data, level=6):
+    """
+    Compress a single entry as a raw deflate stream.
+
+    Falls back to storing the data when deflate would not make it smaller.
+
+    Args:
+        data: Entry contents as bytes
+        level: zlib compression level (default: 6)
+
+    Returns:
+        tuple: (method, crc32, compressed_bytes)
+    """
+    crc = zlib.crc32(data) & 0xFFFFFFFF
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    compressed = compressor.compress(data) + compressor.flush()
+    if len(compressed) >= len(data):
+        return METHOD_STORED, crc, data
+    return METHOD_DEFLATED, crc, compressed
+
+
+class StreamingZipWriter:
+    def __init__(self, stream):
+        """
+        Initialize the StreamingZipWriter.
+
+        Args:
+            stream: Writable binary stream (does not need to be seekable)
+        """
+        self.stream = stream
+        self.offset = 0
+        self.central_directory = []
+
+    def _write(self, data):
+        self.stream.write(data)
+        self.offset += len(data)
+
+    def write_entry(self, arcname, method, crc, compressed, size, mtime=None):
+        """
+        Write one pre-compressed entry.
+
+        Args:
+            arcname: Path of the entry inside the archive
+            method: METHOD_STORED or METHOD_DEFLATED
+            crc: CRC-32 of the uncompressed data
+            compressed: Compressed entry bytes
+            size: Uncompressed size in bytes
+            mtime: Modification timestamp (default: now)
+
+        Raises:
+            ValueError: If the archive would need Zip64 extensions
+        """
+        if len(self.central_directory) >= MAX_ENTRIES:
+            raise ValueError("Too many entries for a zip32 archive")
+        if size > ZIP32_LIMIT or len(compressed) > ZIP32_LIMIT or self.offset > ZIP32_LIMIT:
+            raise ValueError(f"Entry {arcname} is too large for a zip32 archive")
+
+        name = str(arcname).replace(os.sep, "/").encode("utf-8")
+        dos_time, dos_date = _dos_datetime(mtime if mtime is not None else time.time())
+        header_offset = self.offset
+
+        self._write(struct.pack(
+            "<IHHHHHIIIHH",
+            LOCAL_HEADER_SIG, ZIP_VERSION, FLAG_UTF8, method, dos_time, dos_date,
+            crc, len(compressed), size, len(name), 0
+        ))
+        self._write(name)
+        self._write(compressed)
+
+        self.central_directory.append(struct.pack(
+            "<IHHHHHHIIIHHHHHII",
+            CENTRAL_HEADER_SIG, ZIP_VERSION, ZIP_VERSION, FLAG_UTF8, method, dos_time, dos_date,
+            crc, len(compressed), size, len(name), 0, 0, 0, 0, 0o100644 << 16, header_offset
+        ) + name)
+
+    def close(self):
+        """Write the central directory and end record, then flush the stream."""
+        cd_offset = self.offset
+        for record in self.central_directory:
+            self._write(record)
+        cd_size = self.offset - cd_offset
+        count = len(self.central_directory)
+        self._write(struct.pack(
+            "<IHHHHIIH",
+            END_OF_CENTRAL_DIR_SIG, 0, 0, count, count, cd_size, cd_offset, 0
+        ))
+        self.stream.flush()
+
+
+def _load_and_compress(arcname, source, level):
+    """Worker task: read a source (bytes or Path) and compress it."""
+    if isinstance(source, (bytes, bytearray)):
+        data = bytes(source)
+        mtime = None
+    else:
+        path = Path(source)
+        data = path.read_bytes()
+        mtime = path.stat().st_mtime
+    method, crc, compressed = compress_entry(data, level)
+    return arcname, method, crc, compressed, len(data), mtime
+
+
+def write_zip_stream(stream, entries, workers=None, level=6):
+    """
+    Compress entries in parallel and write them in order to a stream.
+
+    Args:
+        stream: Writable binary stream
+        entries: Iterable of (arcname, source) where source is bytes or a file path
+        workers: Number of compression threads (default: os.cpu_count())
+        level: zlib compression level (default: 6)
+
+    Returns:
+        dict: {"written": [arcnames], "skipped": [(arcname, error)], "bytes": archive_size}
+    """
+    workers = max(1, workers or os.cpu_count() or 1)
+    window = workers * 4  # bound how many compressed entries sit in memory
+    writer = StreamingZipWriter(stream)
+    result = {"written": [], "skipped": [], "bytes": 0}
+    pending = deque()
+
+    def drain_one():
+        arcname, future = pending.popleft()
+        try:
+            name, method, crc, compressed, size, mtime = future.result()
+        except (IOError, OSError) as e:
+            result["skipped"].append((str(arcname), str(e)))
+            return
+        writer.write_entry(name, method, crc, compressed, size, mtime)
+        result["written"].append(str(name))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for arcname, source in entries:
+            pending.append((arcname, pool.submit(_load_and_compress, arcname, source, level)))
+            if len(pending) >= window:
+                drain_one()
+        while pending:
+            drain_one()
+
+    writer.close()
+    result["bytes"] = writer.offset
+    return result
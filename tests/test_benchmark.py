@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the synthetic campaign generator and benchmark suite
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from benchmark import run_suite
+from data_validation import DataValidator
+from query_data import DataQueryManager
+from synthetic_campaign import DEFAULT_COUNTS, generate_campaign, scaled_counts
+
+SMALL = {"stat_sheets": 60, "npcs": 12, "sessions": 3, "clocks": 7, "dragonbreak_branches": 3}
+
+
+def test_synthetic_campaign():
+    """Generated campaigns are schema-valid, sized as asked and deterministic"""
+    assert scaled_counts(0.1, npcs=5) == {"stat_sheets": 1000, "npcs": 5, "sessions": 50, "clocks": 20,
+                                          "dragonbreak_branches": 5}
+    assert scaled_counts() == DEFAULT_COUNTS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        first, second = Path(tmp) / "a", Path(tmp) / "b"
+        written = generate_campaign(first, seed=7, **SMALL)
+        generate_campaign(second, seed=7, **SMALL)
+        assert written["npc_stat_sheets"] == 60 and written["clocks"] == 7
+
+        report = DataValidator(first / "data", cache_path=False).validate_all(use_cache=False)
+        assert report["errors"] == {} and report["files"] == 89
+        assert len(list((first / "data" / "npc_stat_sheets").glob("*.json"))) == 60
+        assert len(list((first / "data" / "sessions").glob("session_*.json"))) == 3
+        clocks = [json.loads(p.read_text(encoding="utf-8")) for p in (first / "data" / "clocks").glob("*.json")]
+        assert sum(len(next(iter(doc.values()))["clocks"]) for doc in clocks) == 7
+        dragonbreak = json.loads((first / "state" / "dragonbreak_state.json").read_text(encoding="utf-8"))
+        assert len(dragonbreak["timeline_branches"]) == 4 and len(dragonbreak["active_dragonbreaks"]) == 3
+
+        for rel in ("data/npcs", "data/npc_stat_sheets", "state"):
+            for path in sorted((first / rel).glob("*.json")):
+                assert path.read_bytes() == (second / rel / path.name).read_bytes(), path
+
+        # Locations resolve through the generated holds
+        enemies = DataQueryManager(first / "data").get_enemies_by_hold("The Rift")
+        assert sum(len(pool) for pool in enemies.values()) > 0
+    print("✓ Test passed: synthetic campaign")
+
+
+def test_benchmark_keeps_previous_run():
+    """Each run records every case and keeps the last run for comparison"""
+    with tempfile.TemporaryDirectory() as tmp:
+        results = Path(tmp) / "bench_results.json"
+        first = run_suite(SMALL, repeats=1, results_path=results)
+        assert first["previous"] is None and first["changes"] == {}
+        names = list(first["current"]["results"])
+        assert names[:8] == ["query_npc_enemy_stats", "query_npc_enemy_stats[name]", "get_enemies_by_hold",
+                             "generate_wilderness_encounter", "trigger_scene_event", "advance_clock",
+                             "top_clocks", "export_to_zip"]
+        assert "hold_trigger[the rift]" in names and len(names) == 13
+        for result in first["current"]["results"].values():
+            assert result["repeats"] == 1 and result["cold_ms"] >= 0 and result["min_ms"] <= result["mean_ms"]
+
+        second = run_suite(SMALL, repeats=2, results_path=results, only=["advance_clock", "hold_trigger"])
+        saved = json.loads(results.read_text(encoding="utf-8"))
+        assert saved == second
+        assert saved["previous"] == first["current"]
+        assert sorted(saved["current"]["results"]) == sorted(["advance_clock"] + [n for n in names
+                                                                                 if n.startswith("hold_trigger")])
+        assert set(saved["changes"]) == set(saved["current"]["results"])
+    print("✓ Test passed: benchmark keeps previous run")
+
+
+if __name__ == "__main__":
+    test_synthetic_campaign()
+    test_benchmark_keeps_previous_run()
+    print("\nAll benchmark tests passed!")
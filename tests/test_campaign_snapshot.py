@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the binary campaign snapshot
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from campaign_snapshot import HEADER, build_snapshot, open_snapshot
+from gm_tools import GMTools
+from storage import SnapshotStorage, open_storage
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def make_repo(root):
+    root = Path(root)
+    write_json(root / "data" / "npc_stat_sheets" / "hadvar.json",
+               {"id": "hadvar", "name": "Hadvar", "faction": "Imperial Legion"})
+    write_json(root / "data" / "npc_stat_sheets" / "ralof.json",
+               {"id": "ralof", "name": "Ralof", "faction": "Stormcloaks"})
+    write_json(root / "data" / "factions.json", {"major_factions": {"thalmor": {"name": "Thalmor"}}})
+    write_json(root / "state" / "campaign_state.json", {"current_session": 3, "active_pc_id": "pc_khagar"})
+    write_json(root / "state" / "snapshots" / "000001.json", {"seq": 1})
+    write_json(root / "state" / ".validation_cache.json", {"files": {}})
+    return root
+
+
+def test_build_and_lazy_load():
+    """Documents come back identical and straight from the snapshot"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_repo(tmp)
+        result = build_snapshot(root)
+        assert result["documents"] == 4  # event-store history is left out
+        with open_snapshot(root / "state" / "campaign.snap") as snap:
+            state = snap.load(root / "state" / "campaign_state.json")
+            assert state == {"current_session": 3, "active_pc_id": "pc_khagar"}
+            state["current_session"] = 99  # callers get their own copy
+            assert snap.load(root / "state" / "campaign_state.json")["current_session"] == 3
+            assert snap.list_json(root / "data" / "npc_stat_sheets") == ["hadvar.json", "ralof.json"]
+            assert snap.load(root / "data" / "missing.json") is None
+            assert (snap.hits, snap.fallbacks) == (2, 0)
+            assert snap.stale() == []
+    print("✓ Test passed: build and lazy load")
+
+
+def test_stale_entries_fall_back_to_json():
+    """Edited, added and unreadable snapshots fall back to the JSON files"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_repo(tmp)
+        build_snapshot(root)
+        snap_path = root / "state" / "campaign.snap"
+        with open_snapshot(snap_path) as snap:
+            write_json(root / "data" / "npc_stat_sheets" / "hadvar.json",
+                       {"id": "hadvar", "name": "Hadvar", "faction": "Imperial Legion", "refresh": 3})
+            write_json(root / "data" / "npc_stat_sheets" / "ulfric.json", {"id": "ulfric", "name": "Ulfric"})
+            assert snap.load(root / "data" / "npc_stat_sheets" / "hadvar.json")["refresh"] == 3
+            assert snap.fallbacks == 1
+            assert snap.list_json(root / "data" / "npc_stat_sheets", "u*") == ["ulfric.json"]
+            assert snap.stale() == ["data/npc_stat_sheets/hadvar.json", "data/npc_stat_sheets/ulfric.json"]
+
+        # A same-size rewrite within the build's mtime tick is caught by the content hash
+        ralof = root / "data" / "npc_stat_sheets" / "ralof.json"
+        st = os.stat(ralof)
+        ralof.write_text(ralof.read_text(encoding="utf-8").replace("Ralof", "Rolaf"), encoding="utf-8")
+        os.utime(ralof, ns=(st.st_atime_ns, st.st_mtime_ns))
+        with open_snapshot(snap_path) as snap:
+            assert snap.load(ralof)["name"] == "Rolaf"
+            assert "data/npc_stat_sheets/ralof.json" in snap.stale()
+
+        # A snapshot from another Python version (or not a snapshot at all) is ignored
+        raw = bytearray(snap_path.read_bytes())
+        raw[12] ^= 0xFF
+        snap_path.write_bytes(bytes(raw))
+        assert open_snapshot(snap_path) is None
+        snap_path.write_bytes(b"{}" + b"\0" * HEADER.size)
+        assert open_snapshot(snap_path) is None
+    print("✓ Test passed: stale entries fall back to JSON")
+
+
+def test_storage_and_gm_tools():
+    """SnapshotStorage and GMTools read through the snapshot"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_repo(tmp)
+        build_snapshot(root)
+        storage = open_storage(root / "data", "snapshot")
+        assert isinstance(storage, SnapshotStorage)
+        assert storage.list_ids("npc_stat_sheets") == ["hadvar", "ralof"]
+        assert [d for d, _ in storage.find("npc_stat_sheets", faction="stormcloaks")] == ["ralof"]
+        assert storage.get("", "factions")["major_factions"]["thalmor"]["name"] == "Thalmor"
+        storage.put("npc_stat_sheets", "ralof", {"id": "ralof", "name": "Ralof", "faction": "Imperial Legion"})
+        assert storage.find("npc_stat_sheets", faction="stormcloaks") == []
+        assert storage.snapshot.fallbacks == 1
+        storage.close()
+
+        snap = open_snapshot(root / "state" / "campaign.snap")
+        tools = GMTools(root / "data", root / "state", snapshot=snap)
+        assert tools.load_json(root / "state" / "campaign_state.json")["current_session"] == 3
+        assert sorted(s["name"] for s in tools.iter_stat_sheets()) == ["Hadvar", "Ralof"]
+        snap.close()
+
+        # Without a built snapshot the backend is the plain JSON tree
+        assert SnapshotStorage(Path(tmp) / "elsewhere" / "data").snapshot is None
+    print("✓ Test passed: storage and GM tools read through the snapshot")
+
+
+if __name__ == "__main__":
+    test_build_and_lazy_load()
+    test_stale_entries_fall_back_to_json()
+    test_storage_and_gm_tools()
+    print("\nAll campaign snapshot tests passed!")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests for schema-based data validation
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from data_validation import DataValidator, compile_schema, validate_document
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def make_data(root):
+    data = Path(root) / "data"
+    write_json(data / "npc_stat_sheets" / "hadvar.json", {
+        "id": "hadvar", "name": "Hadvar", "aspects": {"high_concept": "Pragmatic Imperial Soldier"},
+        "skills": {"Great": ["Fight"]}, "stress": {"physical": [False, False]}, "refresh": 2
+    })
+    write_json(data / "clocks" / "civil_war_clocks.json", {"civil_war_clocks": {"clocks": {
+        "imperial_military_dominance": {"current_progress": 3, "total_segments": 8}
+    }}})
+    write_json(data / "factions.json", {"major_factions": {"thalmor": {
+        "name": "Thalmor", "clocks": [{"name": "Purge", "progress": 2, "segments": 8, "effect": "Talos worship ends"}]
+    }}})
+    return data
+
+
+def test_compiled_validator():
+    """Types, required fields, enums, ranges, anyOf and $ref"""
+    validate = compile_schema({
+        "type": "object",
+        "required": ["clock"],
+        "properties": {"clock": {"$ref": "#/definitions/clock"}, "side": {"enum": ["imperial", "stormcloak"]}},
+        "definitions": {"clock": {"type": "object", "anyOf": [{"required": ["current"]}, {"required": ["progress"]}],
+                                  "properties": {"current": {"type": "integer", "minimum": 0}}}}
+    })
+    errors = []
+    validate({"clock": {"current": 2}, "side": "imperial"}, "", errors)
+    assert errors == []
+    validate({"clock": {"current": -1}, "side": "thalmor"}, "", errors)
+    assert errors == ["/clock/current: -1 is below the minimum 0",
+                      "/side: 'thalmor' is not one of ['imperial', 'stormcloak']"]
+    errors = []
+    validate({"clock": {"segments": True}}, "", errors)
+    assert errors == ["/clock: does not match any allowed form"]
+    errors = []
+    validate([], "", errors)
+    assert errors == ["/: expected object, got list"]
+    print("✓ Test passed: compiled validator")
+
+
+def test_repository_data_is_valid():
+    """Every file in data/ matches its schema"""
+    data_dir = Path(__file__).resolve().parent.parent / "data"
+    report = DataValidator(data_dir, cache_path=False).validate_all()
+    assert report["files"] > 50
+    assert report["errors"] == {}, report["errors"]
+    print("✓ Test passed: repository data is valid")
+
+
+def test_errors_and_result_cache():
+    """Malformed files are reported; unchanged files are skipped on the next run"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data = make_data(tmp)
+        cache = Path(tmp) / "state" / ".validation_cache.json"
+        validator = DataValidator(data, cache_path=cache)
+
+        first = validator.validate_all()
+        assert first["errors"] == {} and first["checked"] == 3
+
+        write_json(data / "factions.json", {"major_factions": {"thalmor": {
+            "name": "Thalmor", "clocks": [{"name": "Purge", "progress": "two", "segments": 8}]
+        }}})
+        (data / "npc_stat_sheets" / "broken.json").write_text("{", encoding="utf-8")
+        second = validator.validate_all()
+        assert second["checked"] == 2 and second["cached"] == 2
+        assert "[factions] /major_factions/thalmor/clocks/0: missing required field 'effect'" in second["errors"]["factions.json"]
+        assert second["errors"]["npc_stat_sheets/broken.json"][0].startswith("invalid JSON")
+
+        # Touching a file without changing it does not re-validate it
+        os.utime(data / "npc_stat_sheets" / "hadvar.json")
+        third = validator.validate_all()
+        assert third["checked"] == 0 and len(third["errors"]) == 2
+    print("✓ Test passed: errors and result cache")
+
+
+def test_parallel_matches_serial():
+    """Worker processes give the same results as in-process validation"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data = make_data(tmp)
+        for i in range(6):
+            write_json(data / "npc_stat_sheets" / f"guard_{i}.json",
+                       {"id": f"guard_{i}", "name": "Guard", "aspects": {}, "skills": {}, "stress": {}})
+        serial = DataValidator(data, cache_path=False).validate_all()
+        parallel = DataValidator(data, cache_path=False, workers=2, parallel_threshold=1).validate_all()
+        assert serial["errors"] == parallel["errors"]
+        assert len(parallel["errors"]) == 6
+    print("✓ Test passed: parallel matches serial")
+
+
+def test_validate_document():
+    """Single documents can be checked against a named schema"""
+    assert validate_document("pc", {"name": "Khagar Yal", "aspects": {"high_concept": "Werebear Warchief"},
+                                     "skills": {}, "faction_alignment": "stormcloak"}) == []
+    errors = validate_document("pc", {"name": "Khagar Yal", "faction_alignment": "thalmor"})
+    assert len(errors) == 3
+    print("✓ Test passed: validate single document")
+
+
+if __name__ == "__main__":
+    test_compiled_validator()
+    test_repository_data_is_valid()
+    test_errors_and_result_cache()
+    test_parallel_matches_serial()
+    test_validate_document()
+    print("\nAll data validation tests passed!")
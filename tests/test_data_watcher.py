@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Tests for the data/ change feed and watch-backed caches
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from data_watcher import DataWatcher, _PollingBackend
+from gm_tools import GMTools
+from query_data import DataQueryManager
+from story_manager import StoryManager
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def make_data(root):
+    data = Path(root) / "data"
+    write_json(data / "npc_stat_sheets" / "bandit.json", {
+        "id": "bandit", "name": "Bandit", "type": "Human", "category": "Enemy",
+        "location": "Whiterun", "act_context": [1]
+    })
+    write_json(data / "npcs" / "lydia.json", {"id": "lydia", "name": "Lydia", "location": "Whiterun"})
+    write_json(data / "clocks" / "civil_war_clocks.json", {"civil_war_clocks": {"clocks": {}}})
+    return data
+
+
+def test_poll_reports_before_and_after():
+    """Polling emits created/modified/deleted events with parsed documents"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data = make_data(tmp)
+        watcher = DataWatcher(data, backend="polling")
+        batches = []
+        watcher.subscribe(batches.append, prefix="npcs/")
+
+        assert watcher.poll() == []
+
+        write_json(data / "npcs" / "lydia.json", {"id": "lydia", "name": "Lydia", "location": "Solitude"})
+        write_json(data / "npcs" / "ralof.json", {"id": "ralof", "name": "Ralof"})
+        (data / "npc_stat_sheets" / "bandit.json").unlink()
+        events = {e.path: e for e in watcher.poll()}
+
+        assert events["npcs/lydia.json"].kind == "modified"
+        assert events["npcs/lydia.json"].before["location"] == "Whiterun"
+        assert events["npcs/lydia.json"].after["location"] == "Solitude"
+        assert events["npcs/ralof.json"].kind == "created"
+        assert events["npc_stat_sheets/bandit.json"].kind == "deleted"
+        assert events["npc_stat_sheets/bandit.json"].before["id"] == "bandit"
+        # Prefix filter only delivers npcs/ changes to this subscriber
+        assert sorted(e.path for e in batches[0]) == ["npcs/lydia.json", "npcs/ralof.json"]
+    print("✓ Test passed: poll reports before/after documents")
+
+
+def test_same_tick_rewrite_detected():
+    """A same-size rewrite that keeps the old mtime is still picked up"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data = make_data(tmp)
+        lydia = data / "npcs" / "lydia.json"
+        watcher = DataWatcher(data, backend="polling")
+        backend = _PollingBackend(data, ("*.json",), interval=0)
+
+        before = lydia.stat()
+        write_json(lydia, {"id": "lydia", "name": "Lydia", "location": "Markarth"})
+        # Land the rewrite in the same mtime tick as the original write
+        os.utime(lydia, ns=(before.st_atime_ns, before.st_mtime_ns))
+        assert lydia.stat().st_size == before.st_size
+
+        assert backend.wait(0) == {"npcs/lydia.json"}
+        events = watcher.poll()
+        assert [(e.path, e.after["location"]) for e in events] == [("npcs/lydia.json", "Markarth")]
+        assert watcher.documents("npcs/")["npcs/lydia.json"]["location"] == "Markarth"
+        assert backend.wait(0) == set() and watcher.poll() == []
+    print("✓ Test passed: same-tick rewrite detected")
+
+
+def test_query_manager_cache_follows_changes():
+    """Watched DataQueryManager answers from memory and picks up edits"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data = make_data(tmp)
+        watcher = DataWatcher(data, backend="polling")
+        qm = DataQueryManager(data)
+        qm.watch(watcher)
+
+        assert [s["id"] for s in qm.get_enemies_by_act(1)] == ["bandit"]
+
+        write_json(data / "npc_stat_sheets" / "draugr.json", {
+            "id": "draugr", "name": "Draugr", "type": "Undead", "category": "Enemy", "act_context": [1, 2]
+        })
+        write_json(data / "npc_stat_sheets" / "bandit.json", {
+            "id": "bandit", "name": "Bandit", "type": "Human", "category": "Enemy", "act_context": [3]
+        })
+        watcher.poll()
+
+        assert [s["id"] for s in qm.get_enemies_by_act(1)] == ["draugr"]
+        assert [s["id"] for s in qm.get_enemies_by_act(3)] == ["bandit"]
+        assert qm.get_npc_enemy_stat_by_id("draugr")["name"] == "Draugr"
+    print("✓ Test passed: query cache follows file changes")
+
+
+def test_story_and_gm_tools_watch():
+    """StoryManager clocks and GMTools stat sheets update from the watcher"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data = make_data(tmp)
+        watcher = DataWatcher(data, backend="polling")
+        story = StoryManager(data_dir=str(data), state_dir=str(Path(tmp) / "state"))
+        gm = GMTools(data_dir=str(data), state_dir=str(Path(tmp) / "state"))
+        story.watch(watcher)
+        gm.watch(watcher)
+
+        write_json(data / "clocks" / "civil_war_clocks.json", {"civil_war_clocks": {"clocks": {"siege": {}}}})
+        # Same file name in a subdirectory does not shadow the top-level clock file
+        write_json(data / "clocks" / "old" / "civil_war_clocks.json", {"civil_war_clocks": {"clocks": {}}})
+        write_json(data / "npc_stat_sheets" / "wolf.json", {"id": "wolf", "name": "Wolf", "type": "Beast"})
+        watcher.poll()
+
+        assert "siege" in story.load_clocks("civil_war")["civil_war"]["civil_war_clocks"]["clocks"]
+        assert sorted(s["id"] for s in gm.iter_stat_sheets()) == ["bandit", "wolf"]
+    print("✓ Test passed: story manager and GM tools follow changes")
+
+
+def test_background_watcher_debounces():
+    """The background thread delivers a burst of writes as one batch"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data = make_data(tmp)
+        watcher = DataWatcher(data, debounce=0.2, poll_interval=0.05)
+        batches = []
+        watcher.subscribe(batches.append)
+        watcher.start()
+        try:
+            time.sleep(0.1)
+            for i in range(3):
+                write_json(data / "npcs" / "lydia.json", {"id": "lydia", "name": "Lydia", "visits": i})
+            deadline = time.time() + 5
+            while not batches and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            watcher.stop()
+
+        assert len(batches) == 1
+        assert [e.path for e in batches[0]] == ["npcs/lydia.json"]
+        assert batches[0][0].after["visits"] == 2
+    print("✓ Test passed: background watcher debounces bursts")
+
+
+if __name__ == "__main__":
+    test_poll_reports_before_and_after()
+    test_same_tick_rewrite_detected()
+    test_query_manager_cache_follows_changes()
+    test_story_and_gm_tools_watch()
+    test_background_watcher_debounces()
+    print("\nAll data watcher tests passed!")
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Tests for the event bus and clock reactions
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from clock_reactions import ClockReactions, clock_faction
+from event_bus import (ClockAdvanced, ClockChanged, CompanionLoyaltyChanged, Event, EventBus,
+                       FactionClockChanged)
+from faction_logic import FactionManager
+from npc_manager import NPCManager
+from story_manager import StoryManager
+
+
+@dataclass(frozen=True)
+class Ping(Event):
+    n: int
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def read_json(path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def test_ordering_and_coalescing():
+    """Priority then subscription order; FIFO events; repeats merge while queued"""
+    bus = EventBus()
+    seen = []
+    bus.subscribe(Ping, lambda e: seen.append(("late", e.n)), priority=5)
+    bus.subscribe(Ping, lambda e: seen.append(("first", e.n)))
+    bus.subscribe(Ping, lambda e: e.n == 1 and bus.publish(Ping(3)))
+    bus.subscribe(Event, lambda e: seen.append(("any", type(e).__name__)), priority=9)
+    bus.subscribe(ClockChanged, lambda events: seen.append(("batch", [e.new for e in events])), batch=True)
+    unsubscribe = bus.subscribe(Ping, lambda e: 1 / 0)
+
+    assert bus.publish(Ping(1)) == [Ping(1), Ping(3)]
+    assert seen == [("first", 1), ("late", 1), ("any", "Ping"), ("first", 3), ("late", 3), ("any", "Ping")]
+    unsubscribe()
+
+    seen.clear()
+    with bus.batch():
+        for new in (5, 6, 7):
+            bus.publish(ClockAdvanced("momentum", "Momentum", new - 1, new, 10, category="civil_war"))
+        bus.publish(Ping(2))
+        bus.publish(ClockAdvanced("dominance", "Dominance", 2, 1, 10, category="civil_war"))
+        assert seen == []
+    assert seen == [("any", "ClockAdvanced"), ("first", 2), ("late", 2), ("any", "Ping"),
+                    ("any", "ClockAdvanced"), ("batch", [7, 1])]
+    try:
+        bus.publish({"clock": "momentum"})
+        assert False
+    except TypeError:
+        pass
+    print("✓ Test passed: ordering and coalescing")
+
+
+def test_async_subscribers():
+    """Coroutine subscribers run in order, with or without a running loop"""
+    bus = EventBus()
+    seen = []
+
+    async def slow(event):
+        await asyncio.sleep(0)
+        seen.append(("async", event.n))
+
+    bus.subscribe(Ping, slow)
+    bus.subscribe(Ping, lambda e: seen.append(("sync", e.n)))
+    bus.publish(Ping(1))
+
+    async def main():
+        await bus.publish_async(Ping(2))
+        try:
+            bus.publish(Ping(3))
+            assert False
+        except RuntimeError:
+            await bus.flush_async()
+
+    asyncio.run(main())
+    assert seen == [("async", 1), ("sync", 1), ("async", 2), ("sync", 2), ("async", 3), ("sync", 3)]
+    print("✓ Test passed: async subscribers")
+
+
+def make_campaign(root):
+    data, state = Path(root) / "data", Path(root) / "state"
+    write_json(data / "clocks" / "civil_war_clocks.json", {"civil_war_clocks": {
+        "last_updated": "", "clocks": {
+            "stormcloak_rebellion_momentum": {"name": "Stormcloak Rebellion Momentum",
+                                              "current_progress": 4, "total_segments": 10}}}})
+    write_json(data / "factions.json", {"major_factions": {"imperial_legion": {
+        "name": "Imperial Legion",
+        "clocks": [{"name": "Victory", "progress": 6, "segments": 8, "effect": "Legion wins"}]}}})
+    write_json(data / "npcs" / "ralof.json", {
+        "id": "ralof", "name": "Ralof", "faction": "Stormcloaks", "loyalty": 80,
+        "relationships": {"imperial_legion": "Sworn enemy"}})
+    write_json(state / "campaign_state.json", {"current_act": 1, "scene_flags": {}, "companions": {
+        "active_companions": [{"npc_id": "ralof", "name": "Ralof", "loyalty": 80}],
+        "companion_relationships": {"ralof": 80}}})
+    return data, state
+
+
+def test_clock_reactions():
+    """Clock advances update loyalty, rumors and flags from one loaded state"""
+    assert clock_faction(ClockAdvanced("x", "X", 0, 1, 10, faction="The Stormcloak Rebellion")) == "stormcloaks"
+    assert clock_faction(ClockAdvanced("thalmor_influence_skyrim", "T", 0, 1, 10)) == "thalmor"
+    assert clock_faction(FactionClockChanged("Victory", "Victory", 0, 1, 8, faction="companions")) == "companions"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data, state_dir = make_campaign(tmp)
+        bus = EventBus()
+        npcs = NPCManager(data, state_dir)
+        loads = []
+        load = npcs.load_campaign_state
+        npcs.load_campaign_state = lambda: loads.append(1) or load()
+        npc_io = []
+        get, put = npcs.storage.get, npcs.storage.put
+        npcs.storage.get = lambda collection, doc_id: npc_io.append(("get", doc_id)) or get(collection, doc_id)
+        npcs.storage.put = lambda collection, doc_id, doc: npc_io.append(("put", doc_id)) or put(collection, doc_id, doc)
+        ClockReactions(npcs).connect(bus)
+        loyalty_events = []
+        bus.subscribe(CompanionLoyaltyChanged, loyalty_events.append)
+
+        story = StoryManager(data, state_dir, bus=bus)
+        factions = FactionManager(data, bus=bus)
+        with bus.batch():
+            for _ in range(3):
+                assert story.advance_clock("civil_war", "stormcloak_rebellion_momentum", 1)
+            assert factions.update_faction_clock("imperial_legion", "Victory", 2)
+
+        assert len(loads) == 1
+        assert npc_io == [("get", "ralof"), ("put", "ralof")]
+        assert [(e.name, e.change) for e in loyalty_events] == [("Ralof", 2), ("Ralof", -3)]
+        assert read_json(data / "npcs" / "ralof.json")["loyalty"] == 79
+        state = read_json(state_dir / "campaign_state.json")
+        assert state["companions"]["active_companions"][0]["loyalty"] == 79
+        assert state["companions"]["companion_relationships"]["ralof"] == 79
+        # Coalesced 4 -> 7 crosses halfway; Victory was already past halfway at 6/8
+        assert state["scene_flags"] == {"stormcloak_rebellion_momentum_clock_half": True,
+                                        "victory_clock_filled": True}
+        assert state["rumors"] == [
+            "Talk in the taverns: Stormcloak Rebellion Momentum is gaining ground.",
+            "All of Skyrim is talking: Victory has come to pass."]
+
+        # A setback below halfway clears the flag; no loyalty change on the way down
+        assert story.advance_clock("civil_war", "stormcloak_rebellion_momentum", -3)
+        state = read_json(state_dir / "campaign_state.json")
+        assert state["scene_flags"]["stormcloak_rebellion_momentum_clock_half"] is False
+        assert len(loyalty_events) == 2 and len(loads) == 2
+    print("✓ Test passed: clock reactions")
+
+
+if __name__ == "__main__":
+    test_ordering_and_coalescing()
+    test_async_subscribers()
+    test_clock_reactions()
+    print("\nAll event bus tests passed!")
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Tests for the event-sourced campaign state store
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from event_store import CampaignEventStore
+from patch_engine import PatchEngine, apply_operation, diff_documents
+
+CLOCK_FILE = "data/clocks/civil_war_clocks.json"
+DOMINANCE = "/civil_war_clocks/clocks/imperial_military_dominance"
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+
+
+def read_json(path):
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def make_repo(root):
+    root = Path(root)
+    write_json(root / "state" / "campaign_state.json", {"session_count": 1, "current_location": "Helgen"})
+    write_json(root / CLOCK_FILE, {"civil_war_clocks": {"clocks": {
+        "imperial_military_dominance": {"current_progress": 3, "total_segments": 8}
+    }}})
+    return root
+
+
+def play_two_sessions(root, store):
+    """Session 1 ends in Riverwood; session 2 moves to Whiterun and ticks a clock"""
+    state_path = root / "state" / "campaign_state.json"
+    write_json(state_path, {"session_count": 1, "current_location": "Riverwood"})
+    store.end_session(1)
+    write_json(state_path, {"session_count": 2, "current_location": "Whiterun"})
+    store.tick_clock(CLOCK_FILE, DOMINANCE, -1, session=2)
+    store.tick_clock(CLOCK_FILE, DOMINANCE, 20, session=2)
+    store.end_session(2)
+
+
+def test_diff_round_trip():
+    """diff_documents produces operations that rebuild the new document"""
+    old = {"a": 1, "b": {"c": [1, 2], "d": "x"}, "gone": True}
+    new = {"a": 2, "b": {"c": [1, 2, 3], "d": "x"}, "e/f": None}
+    ops = diff_documents(old, new)
+    assert {op["op"] for op in ops} == {"remove", "add", "replace"}
+    doc = json.loads(json.dumps(old))
+    for op in ops:
+        doc = apply_operation(doc, op)
+    assert doc == new
+    assert diff_documents(new, new) == []
+    print("✓ Test passed: diff round trip")
+
+
+def test_materialize_by_session_and_clamping():
+    """State at the end of each session is rebuilt from snapshot plus events"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_repo(tmp)
+        store = CampaignEventStore(root)
+        assert store.init() and not store.init()
+        play_two_sessions(root, store)
+
+        session_1 = store.materialize(session=1)["docs"]
+        assert session_1["state/campaign_state.json"]["current_location"] == "Riverwood"
+        assert session_1[CLOCK_FILE]["civil_war_clocks"]["clocks"]["imperial_military_dominance"]["current_progress"] == 3
+
+        head = store.materialize()["docs"]
+        assert head["state/campaign_state.json"]["current_location"] == "Whiterun"
+        # The +20 tick clamps at total_segments
+        assert head[CLOCK_FILE]["civil_war_clocks"]["clocks"]["imperial_military_dominance"]["current_progress"] == 8
+        assert read_json(root / CLOCK_FILE) == head[CLOCK_FILE]
+
+        # A fresh store (reading the JSONL from disk) agrees, and session ends were snapshotted
+        fresh = CampaignEventStore(root)
+        assert fresh.materialize(session=1)["docs"] == session_1
+        assert len(fresh.snapshots()) == 3
+        # Points before the baseline snapshot are refused rather than answered with the baseline
+        for point in ({"at": "2000-01-01"}, {"session": 0}, {"seq": -1}):
+            try:
+                fresh.materialize(**point)
+                assert False, point
+            except ValueError as e:
+                assert "before tracking began" in str(e)
+        assert fresh.materialize(seq=0)["docs"]["state/campaign_state.json"]["current_location"] == "Helgen"
+    print("✓ Test passed: materialize by session, with clamping")
+
+
+def test_tick_keeps_hand_edits():
+    """A tick journals unrecorded edits to its file instead of overwriting them"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_repo(tmp)
+        store = CampaignEventStore(root)
+        store.init()
+        doc = read_json(root / CLOCK_FILE)
+        doc["civil_war_clocks"]["clocks"]["stormcloak_momentum"] = {"current_progress": 3, "total_segments": 8}
+        write_json(root / CLOCK_FILE, doc)
+
+        store.tick_clock(CLOCK_FILE, DOMINANCE, 1)
+        clocks = read_json(root / CLOCK_FILE)["civil_war_clocks"]["clocks"]
+        assert clocks["stormcloak_momentum"]["current_progress"] == 3
+        assert clocks["imperial_military_dominance"]["current_progress"] == 4
+        assert store.materialize()["docs"][CLOCK_FILE] == read_json(root / CLOCK_FILE)
+    print("✓ Test passed: tick keeps hand edits")
+
+
+def test_batched_ticks():
+    """A batch journals hand edits once and writes each ticked file once"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_repo(tmp)
+        store = CampaignEventStore(root)
+        store.init()
+        write_json(root / "state" / "campaign_state.json", {"session_count": 1, "current_location": "Riverwood"})
+
+        reads, writes = [], []
+        read_live, write_head = store._read_live, store._write_head
+        store._read_live = lambda file: reads.append(file) or read_live(file)
+        store._write_head = lambda files: writes.append(list(files)) or write_head(files)
+        with store.batch():
+            for _ in range(3):
+                store.tick_clock(CLOCK_FILE, DOMINANCE, 1)
+            assert read_json(root / CLOCK_FILE)["civil_war_clocks"]["clocks"][
+                "imperial_military_dominance"]["current_progress"] == 3
+        assert sorted(reads) == [CLOCK_FILE, "state/campaign_state.json"]
+        assert writes == [[CLOCK_FILE]]
+        assert read_json(root / CLOCK_FILE) == store.materialize()["docs"][CLOCK_FILE]
+        assert store.materialize()["docs"]["state/campaign_state.json"]["current_location"] == "Riverwood"
+
+        # A lone tick only looks at the file it rewrites
+        reads.clear()
+        store.tick_clock(CLOCK_FILE, DOMINANCE, -1)
+        assert reads == [CLOCK_FILE]
+    print("✓ Test passed: batched ticks")
+
+
+def test_snapshot_interval_limits_replay():
+    """Periodic snapshots keep replay short"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_repo(tmp)
+        store = CampaignEventStore(root, snapshot_interval=5)
+        store.init()
+        for _ in range(12):
+            store.tick_clock(CLOCK_FILE, DOMINANCE, 0, write=False)
+        assert [seq for seq, _ in store.snapshots()] == [0, 5, 10]
+        assert store.materialize(seq=7)["seq"] == 7
+    print("✓ Test passed: snapshot interval")
+
+
+def test_rollback_is_journaled():
+    """Rollback restores live files and can itself be rolled back"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_repo(tmp)
+        store = CampaignEventStore(root)
+        store.init()
+        play_two_sessions(root, store)
+        before_rollback = store.last_seq()
+
+        assert store.rollback(session=1, dry_run=True) == ["state/campaign_state.json", CLOCK_FILE]
+        assert read_json(root / "state" / "campaign_state.json")["current_location"] == "Whiterun"
+
+        store.rollback(session=1)
+        assert read_json(root / "state" / "campaign_state.json")["current_location"] == "Riverwood"
+        assert store.materialize()["docs"]["state/campaign_state.json"]["current_location"] == "Riverwood"
+
+        store.rollback(seq=before_rollback)
+        assert read_json(root / "state" / "campaign_state.json")["current_location"] == "Whiterun"
+    print("✓ Test passed: rollback is journaled")
+
+
+def test_patch_engine_journals_changes():
+    """Committed patches are recorded as events"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_repo(tmp)
+        write_json(root / "patches" / "2026-02-02_tick.json", {"files": {CLOCK_FILE: [
+            {"op": "replace", "path": DOMINANCE + "/current_progress", "value": 5}
+        ]}})
+        store = CampaignEventStore(root)
+        engine = PatchEngine(root, event_store=store)
+        assert engine.apply(engine.patch_paths())["ok"]
+        event = store.events()[-1]
+        assert event["source"] == "patch:2026-02-02_tick"
+        assert event["ops"] == [{"op": "replace", "path": DOMINANCE + "/current_progress", "value": 5}]
+        assert store.materialize(seq=0)["docs"][CLOCK_FILE]["civil_war_clocks"]["clocks"][
+            "imperial_military_dominance"]["current_progress"] == 3
+    print("✓ Test passed: patch engine journals changes")
+
+
+if __name__ == "__main__":
+    test_diff_round_trip()
+    test_materialize_by_session_and_clamping()
+    test_tick_keeps_hand_edits()
+    test_batched_ticks()
+    test_snapshot_interval_limits_replay()
+    test_rollback_is_journaled()
+    test_patch_engine_journals_changes()
+    print("\nAll event store tests passed!")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for the context-budgeted export profile
+"""
+
+import json
+import os
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from export_profile import build_focus, is_backup_file, minify_json, resolve_budget
+from export_repo import RepositoryExporter
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def make_repo(root):
+    """Create a small campaign focused on Whiterun"""
+    root = Path(root)
+    write_json(root / "state" / "campaign_state.json", {
+        "active_pc_id": "pc_khagar_yal",
+        "active_hold": "Whiterun",
+        "current_npcs": ["hadvar"],
+        "active_story_arcs": [{"arc_name": "Civil War", "status": "active"}]
+    })
+    write_json(root / "data" / "pcs" / "pc_khagar_yal.json", {"id": "pc_khagar_yal", "name": "Khagar Yal"})
+    write_json(root / "data" / "npcs" / "hadvar.json", {"id": "hadvar", "location": "Whiterun"})
+    write_json(root / "data" / "npcs" / "maven.json", {"id": "maven", "location": "Riften", "notes": "x" * 8000})
+    write_json(root / "data" / "clocks" / "whiterun_jobs.json", {"clocks": {}})
+    (root / "data" / "clocks" / "whiterun_jobs.json.bak_20260127_125524").write_text("{}", encoding="utf-8")
+    (root / "data" / "quests").mkdir(parents=True)
+    (root / "data" / "quests" / "main_quests.json.old").write_text("{}", encoding="utf-8")
+    (root / "logs").mkdir()
+    (root / "logs" / "2026-02-01_session-02.md").write_text("Hadvar held at Dragonsreach.", encoding="utf-8")
+    (root / "README.md").write_text("# Campaign\n", encoding="utf-8")
+    return root
+
+
+def test_backup_files_detected():
+    """Backup copies are recognised by name"""
+    assert is_backup_file("data/clocks/whiterun_jobs.json.bak_20260127_125524")
+    assert is_backup_file("data/quests/main_quests.json.old")
+    assert is_backup_file("scripts/export_repo.py.bak_20260127_125524")
+    assert not is_backup_file("data/clocks/whiterun_jobs.json")
+    print("✓ Test passed: backup files detected")
+
+
+def test_minify_and_budget_helpers():
+    """JSON is minified and token budgets convert to bytes"""
+    assert minify_json(b'{\n  "a": [1, 2]\n}') == b'{"a":[1,2]}'
+    assert minify_json(b"not json") == b"not json"
+    assert resolve_budget(budget_tokens=100) == 400
+    try:
+        resolve_budget(budget_bytes=10, budget_tokens=10)
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+    print("✓ Test passed: minify and budget helpers")
+
+
+def test_focus_from_campaign_state():
+    """Focus picks up PC, hold, scene NPCs and active arcs"""
+    with tempfile.TemporaryDirectory() as tmp:
+        focus = build_focus(make_repo(tmp))
+        assert focus["pc_id"] == "pc_khagar_yal"
+        assert focus["hold"] == "Whiterun"
+        assert "Civil War" in focus["quests"]
+        assert "whiterun" in focus["terms"]
+    print("✓ Test passed: focus built from campaign state")
+
+
+def test_budgeted_export_prefers_focus():
+    """A tight budget keeps focused files and drops unrelated and backup files"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_repo(tmp)
+        result = RepositoryExporter(root).export_budgeted("focus.zip", budget_bytes=6000)
+
+        assert result is not None
+        assert result["bytes_used"] <= 6000
+        assert "state/campaign_state.json" in result["included"]
+        assert "data/pcs/pc_khagar_yal.json" in result["included"]
+        assert "data/npcs/hadvar.json" in result["included"]
+        assert "data/npcs/maven.json" in result["omitted"]
+
+        with zipfile.ZipFile(result["path"]) as zf:
+            names = zf.namelist()
+            assert "_manifest.json" in names
+            assert not any(".bak" in n or n.endswith(".old") for n in names)
+            # JSON content is minified
+            assert b"\n" not in zf.read("data/npcs/hadvar.json")
+            # Every entry, the manifest included, counts against the budget
+            assert sum(info.file_size for info in zf.infolist()) == result["bytes_used"]
+
+        # Pinned files go in even when the budget cannot hold them
+        result = RepositoryExporter(root).export_budgeted("tiny.zip", budget_bytes=100)
+        assert result["included"][0] == "state/campaign_state.json"
+        assert "data/pcs/pc_khagar_yal.json" in result["omitted"]
+    print("✓ Test passed: budgeted export prefers focused files")
+
+
+if __name__ == "__main__":
+    test_backup_files_detected()
+    test_minify_and_budget_helpers()
+    test_focus_from_campaign_state()
+    test_budgeted_export_prefers_focus()
+    print("\nAll export profile tests passed!")
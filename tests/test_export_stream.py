@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming, parallel-compressed repository export
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from export_repo import RepositoryExporter
+from zip_stream import write_zip_stream
+
+
+def make_repo(root):
+    """Create a small repository tree to export"""
+    root = Path(root)
+    (root / "data" / "npcs").mkdir(parents=True)
+    (root / "scripts" / "__pycache__").mkdir(parents=True)
+    (root / "logs").mkdir()
+    (root / "README.md").write_text("# Test Campaign\n", encoding="utf-8")
+    (root / "data" / "npcs" / "lydia.json").write_text(json.dumps({"id": "lydia", "name": "Lydia"}), encoding="utf-8")
+    (root / "scripts" / "tool.py").write_text("print('hi')\n" * 200, encoding="utf-8")
+    (root / "scripts" / "__pycache__" / "tool.cpython-311.pyc").write_bytes(b"\x00" * 16)
+    (root / "logs" / "session.md").write_text("Dovahkiin, Dovahkiin — naal ok zin los vahriin\n", encoding="utf-8")
+    return root
+
+
+def test_stream_archive_is_valid_and_ordered():
+    """write_zip_stream produces a readable archive with entries in input order"""
+    entries = [
+        ("b.txt", b"second" * 100),
+        ("a.txt", b"first"),
+        ("nested/c.json", json.dumps({"k": list(range(50))}).encode("utf-8")),
+    ]
+    buf = io.BytesIO()
+    result = write_zip_stream(buf, entries, workers=3)
+
+    assert result["written"] == ["b.txt", "a.txt", "nested/c.json"]
+    assert result["bytes"] == len(buf.getvalue())
+    with zipfile.ZipFile(io.BytesIO(buf.getvalue())) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == ["b.txt", "a.txt", "nested/c.json"]
+        assert zf.read("b.txt") == b"second" * 100
+    print("✓ Test passed: streamed archive is valid and ordered")
+
+
+def test_export_does_not_touch_working_tree():
+    """Generated context/statistics entries are written from memory"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_repo(tmp)
+        exporter = RepositoryExporter(root)
+        output = exporter.export_to_zip("export.zip", workers=2)
+
+        assert output is not None
+        assert not (root / "_chatgpt_context.json").exists()
+        assert not (root / "_statistics.json").exists()
+
+        with zipfile.ZipFile(output) as zf:
+            names = zf.namelist()
+            assert names[:3] == ["_chatgpt_context.json", "_statistics.json", "README.md"]
+            assert "data/npcs/lydia.json" in names
+            assert "logs/session.md" in names
+            assert not any("__pycache__" in n for n in names)
+            stats = json.loads(zf.read("_statistics.json"))
+            assert stats["npcs"] == 1
+    print("✓ Test passed: export leaves the working tree untouched")
+
+
+def test_worker_count_does_not_change_output():
+    """Parallel compression produces the same bytes as serial compression"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_repo(tmp)
+        exporter = RepositoryExporter(root)
+        entries = list(exporter.iter_export_files())
+
+        serial, parallel = io.BytesIO(), io.BytesIO()
+        write_zip_stream(serial, entries, workers=1)
+        write_zip_stream(parallel, entries, workers=8)
+        assert serial.getvalue() == parallel.getvalue()
+    print("✓ Test passed: output is independent of worker count")
+
+
+def test_unreadable_entry_is_skipped():
+    """Entries that cannot be read are reported, not fatal"""
+    buf = io.BytesIO()
+    result = write_zip_stream(buf, [("ok.txt", b"ok"), ("gone.txt", Path("/nonexistent/gone.txt"))])
+    assert result["written"] == ["ok.txt"]
+    assert result["skipped"][0][0] == "gone.txt"
+    with zipfile.ZipFile(io.BytesIO(buf.getvalue())) as zf:
+        assert zf.namelist() == ["ok.txt"]
+    print("✓ Test passed: unreadable entries are skipped")
+
+
+if __name__ == "__main__":
+    test_stream_archive_is_valid_and_ordered()
+    test_export_does_not_touch_working_tree()
+    test_worker_count_does_not_change_output()
+    test_unreadable_entry_is_skipped()
+    print("\nAll export stream tests passed!")
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Tests for batched NPC first-impression recording
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+import first_impression
+from first_impression import (
+    ALLIANCES, DispositionIndex, disposition_for, faction_blob, infer_disposition, load_npc_metadata,
+    maybe_first_impression, record_first_impressions,
+)
+from data_watcher import DataWatcher
+from story_manager import StoryManager
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def make_repo(root):
+    root = Path(root)
+    write_json(root / "state" / "campaign_state.json", {
+        "active_pc_id": "pc_khagar_yal",
+        "civil_war_state": {"player_alliance": "stormcloak"},
+    })
+    write_json(root / "data" / "pcs" / "appearances" / "khagar_yal_appearance.json", {
+        "pc_id": "pc_khagar_yal",
+        "recognition_tags": ["towering_orsimer"],
+        "first_impression_lines": {
+            "positive": ["Ha! Now there's a warrior."],
+            "negative": ["Keep your hands where I can see them, orc."],
+            "neutral": ["Big one, isn't he?"],
+        },
+    })
+    write_json(root / "data" / "npcs" / "ralof.json", {"id": "ralof", "faction": "Stormcloaks"})
+    write_json(root / "data" / "npcs" / "hadvar.json", {"id": "hadvar", "faction": "Imperial Legion"})
+    write_json(root / "data" / "npcs" / "elenwen.json", {"id": "elenwen", "faction": "Thalmor"})
+    return root
+
+
+def counting_saves():
+    """Wrap first_impression.save_json to count state writes."""
+    calls = []
+    original = first_impression.save_json
+
+    def save_json(path, data):
+        calls.append(path)
+        original(path, data)
+    first_impression.save_json = save_json
+    return calls, original
+
+
+def test_batch_reads_and_writes_once():
+    """A whole scene is recorded with one state write and a per-NPC bark map"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_repo(tmp)
+        state_path = root / "state" / "campaign_state.json"
+        appearance_path = root / "data" / "pcs" / "appearances" / "khagar_yal_appearance.json"
+        calls, original = counting_saves()
+        try:
+            barks = record_first_impressions(
+                state_path, appearance_path,
+                [("ralof", None), ("hadvar", None), ("elenwen", None), ("lydia", "neutral"), ("ralof", "negative")],
+                repo_root=root,
+            )
+            assert len(calls) == 1
+            assert barks == {
+                "ralof": "Ha! Now there's a warrior.",
+                "hadvar": "Keep your hands where I can see them, orc.",
+                "elenwen": "Keep your hands where I can see them, orc.",
+                "lydia": "Big one, isn't he?",
+            }
+            state = json.loads(state_path.read_text(encoding="utf-8"))
+            assert state["npc_first_impressions"]["ralof"]["pc_khagar_yal"]["disposition"] == "positive"
+
+            # Nothing new to record: no write at all
+            again = record_first_impressions(state_path, appearance_path, [("ralof", None)], repo_root=root)
+            assert again == {"ralof": None}
+            assert len(calls) == 1
+            assert maybe_first_impression(state_path, appearance_path, "lydia", force=True) == "Big one, isn't he?"
+            assert len(calls) == 2
+        finally:
+            first_impression.save_json = original
+    print("✓ Test passed: batch reads and writes state once")
+
+
+def test_scene_event_uses_batch():
+    """trigger_scene_event records every NPC in one write and attaches barks"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_repo(tmp)
+        manager = StoryManager(root / "data", root / "state")
+        scene = {
+            "friendly": [{"id": "ralof"}, {"id": "lydia"}],
+            "hostile": [{"id": "hadvar"}, {"id": "ralof"}],
+            "enemies": [{"name": "Bandit"}, "not an npc", {"id": "elenwen"}],
+        }
+        manager.get_scene_npcs = lambda location, scene_type="general": scene
+        calls, original = counting_saves()
+        try:
+            setup = manager.trigger_scene_event({"location": "Whiterun", "type": "combat"})
+        finally:
+            first_impression.save_json = original
+        assert len(calls) == 1
+        npcs = setup["npcs"]
+        assert npcs["friendly"][0]["gm_barks"] == ["Ha! Now there's a warrior."]
+        assert npcs["friendly"][1]["gm_barks"] == ["Ha! Now there's a warrior."]
+        assert npcs["hostile"][0]["gm_barks"] == ["Keep your hands where I can see them, orc."]
+        assert "gm_barks" not in npcs["hostile"][1]
+        assert "gm_barks" not in npcs["enemies"][0]
+        # Enemies get their inferred disposition (Thalmor are always hostile)
+        assert npcs["enemies"][2]["gm_barks"] == ["Keep your hands where I can see them, orc."]
+    print("✓ Test passed: scene event records impressions in one batch")
+
+
+def test_disposition_index_matches_metadata_scan():
+    """The precomputed table agrees with scanning each NPC's metadata"""
+    repo_root = Path(__file__).resolve().parents[1]
+    index = DispositionIndex(repo_root).refresh()
+    npc_ids = {p.stem for d in ("npcs", "npc_stat_sheets") for p in (repo_root / "data" / d).glob("*.json")}
+    assert npc_ids
+    for alliance in ALLIANCES + ("neutral",):
+        for npc_id in npc_ids:
+            expected = disposition_for(faction_blob(load_npc_metadata(repo_root, npc_id)), alliance)
+            assert index.lookup(npc_id, alliance) == expected, (npc_id, alliance)
+    assert index.lookup("nobody_at_all", "stormcloak") == "neutral"
+    print("✓ Test passed: disposition index matches metadata scan")
+
+
+def test_disposition_index_invalidation():
+    """Alliance changes are a column switch; NPC file edits rebuild the table"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_repo(tmp)
+        assert infer_disposition(root, "hadvar", {"civil_war_state": {"player_alliance": "stormcloak"}}) == "negative"
+        assert infer_disposition(root, "hadvar", {"civil_war_state": {"player_alliance": "Imperial"}}) == "positive"
+        assert infer_disposition(root, "hadvar", {}) == "neutral"
+
+        write_json(root / "data" / "npcs" / "hadvar.json", {"id": "hadvar", "faction": "Stormcloaks (defected)"})
+        write_json(root / "data" / "npc_stat_sheets" / "ondolemar.json", {"id": "ondolemar", "tags": ["Thalmor"]})
+        assert infer_disposition(root, "hadvar", {"civil_war_state": {"player_alliance": "stormcloak"}}) == "positive"
+        assert infer_disposition(root, "ondolemar", {}) == "negative"
+    print("✓ Test passed: disposition index invalidation")
+
+
+def test_disposition_index_follows_watcher():
+    """A watched index is updated by change events and never rescans data/"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_repo(tmp)
+        watcher = DataWatcher(root / "data")
+        index = DispositionIndex(root)
+        index.watch(watcher)
+        scans = []
+        index.signature = lambda: scans.append(1) or ()
+        stormcloak = {"civil_war_state": {"player_alliance": "stormcloak"}}
+        assert infer_disposition(root, "hadvar", stormcloak, index=index.refresh()) == "negative"
+
+        write_json(root / "data" / "npcs" / "hadvar.json", {"id": "hadvar", "faction": "Stormcloaks (defected)"})
+        write_json(root / "data" / "npc_stat_sheets" / "ralof.json", {"id": "ralof", "faction": "Imperial Legion"})
+        watcher.poll()
+        assert index.refresh().lookup("hadvar", "stormcloak") == "positive"
+        # data/npcs still wins over a stat sheet, until it is removed
+        assert index.lookup("ralof", "stormcloak") == "positive"
+        (root / "data" / "npcs" / "ralof.json").unlink()
+        (root / "data" / "npcs" / "elenwen.json").unlink()
+        watcher.poll()
+        assert index.lookup("ralof", "stormcloak") == "negative"
+        assert "elenwen" not in index.for_alliance("stormcloak")
+        assert scans == []
+    print("✓ Test passed: disposition index follows a DataWatcher")
+
+
+if __name__ == "__main__":
+    test_batch_reads_and_writes_once()
+    test_scene_event_uses_batch()
+    test_disposition_index_matches_metadata_scan()
+    test_disposition_index_invalidation()
+    test_disposition_index_follows_watcher()
+    print("\nAll first impression tests passed!")
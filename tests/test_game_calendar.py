@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-game calendar and timed-event scheduler
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+import story_progression
+from game_calendar import EventScheduler, add_days, format_date, parse_date
+from story_progression import StoryProgressionManager
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def read_json(path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def make_data(root):
+    data = Path(root) / "data"
+    write_json(data / "world_state" / "current_state.json", {
+        "game_date": "17th of Last Seed, 4E 201", "in_game_days_passed": 7,
+        "major_events": ["Battle of Whiterun approaches"],
+    })
+    write_json(data / "factions" / "whiterun_guard.json", {
+        "name": "Whiterun Guard", "clock": {"name": "Defenses", "progress": 0, "segments": 500},
+    })
+    write_json(data / "clocks" / "civil_war_clocks.json", {"civil_war_clocks": {
+        "last_updated": "4E 201, 17th of Last Seed",
+        "clocks": {"momentum": {"name": "Momentum", "current_progress": 2, "total_segments": 10}},
+    }})
+    write_json(data / "quests" / "main.json", {"quests": [
+        {"id": "q1", "name": "Rescue Mission", "status": "Active"},
+        {"id": "q2", "name": "Old Business", "status": "Completed"},
+    ]})
+    # Compact on disk, so a needless rewrite would show up as a diff
+    (data / "quests" / "side.json").write_text('{"quests": [{"id": "q3", "name": "Lost Heirloom"}]}',
+                                               encoding="utf-8")
+    return data
+
+
+def test_calendar_and_scheduler():
+    """Dates round-trip through day numbers; events pop in due order"""
+    assert parse_date("17th of Last Seed, 4E 201") == (4, 201, 7, 17)
+    assert parse_date("32nd of Last Seed, 4E 201") is None and parse_date(None) is None
+    assert format_date(4, 201, 0, 1) == "1st of Morning Star, 4E 201"
+    assert add_days("17th of Last Seed, 4E 201", 14) == "31st of Last Seed, 4E 201"
+    assert add_days("31st of Evening Star, 4E 201", 1) == "1st of Morning Star, 4E 202"
+    assert add_days("12th of Sun's Dawn, 4E 201", -12) == "31st of Morning Star, 4E 201"
+    assert add_days("the day after tomorrow", 3) == "the day after tomorrow"
+
+    scheduler = EventScheduler()
+    scheduler.schedule(5, "world_event", description="late")
+    scheduler.schedule(2, "world_event", every=2, description="tick")
+    scheduler.schedule(2, "world_event", description="first")
+    assert [(e['day'], e['description']) for e in scheduler.pop_due(6)] == [
+        (2, "tick"), (2, "first"), (4, "tick"), (5, "late"), (6, "tick")]
+    assert scheduler.peek()['day'] == 8 and len(scheduler) == 1
+    # Persisted events keep their ids, so new ones never collide
+    tick = scheduler.peek()
+    restored = EventScheduler(scheduler.to_list())
+    assert restored.schedule(9, "world_event")['id'] > tick['id']
+    assert restored.cancel(tick['id']) and not restored.cancel(tick['id'])
+    try:
+        scheduler.schedule(1, "world_event", every=0)
+        assert False
+    except ValueError:
+        pass
+    print("✓ Test passed: calendar and scheduler")
+
+
+def test_advance_time_batches_writes():
+    """A two-week skip applies hundreds of ticks with one write per file"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data = make_data(tmp)
+        manager = StoryProgressionManager(data)
+        for _ in range(24):
+            assert manager.schedule_event(1, "faction_clock", every=1, faction="whiterun_guard", progress=1)
+        assert manager.schedule_event(3, "clock_tick", every=3, file="civil_war_clocks",
+                                      clock="momentum", segments=1)
+        assert manager.schedule_event(10, "quest_deadline", quest="rescue mission")
+        assert manager.schedule_event(10, "quest_deadline", quest="Old Business")
+        assert manager.schedule_event(30, "world_event", description="Winter arrives")
+        assert manager.schedule_event(1, "dragon_attack") is None
+
+        calls = []
+        original = story_progression.commit_writes
+        story_progression.commit_writes = lambda writes: calls.append(sorted(writes)) or original(writes)
+        try:
+            assert manager.advance_time(14)
+        finally:
+            story_progression.commit_writes = original
+
+        assert calls == [sorted([
+            data / "world_state" / "current_state.json", data / "factions" / "whiterun_guard.json",
+            data / "clocks" / "civil_war_clocks.json", data / "quests" / "main.json"])]
+        assert (data / "quests" / "side.json").read_text(encoding="utf-8").startswith('{"quests": [{"id"')
+        assert read_json(data / "factions" / "whiterun_guard.json")["clock"]["progress"] == 24 * 14
+        clocks = read_json(data / "clocks" / "civil_war_clocks.json")["civil_war_clocks"]
+        assert clocks["clocks"]["momentum"]["current_progress"] == 2 + 4
+        assert clocks["last_updated"] == "29th of Last Seed, 4E 201"
+        quests = read_json(data / "quests" / "main.json")["quests"]
+        assert [q["status"] for q in quests] == ["Failed", "Completed"]
+
+        state = read_json(data / "world_state" / "current_state.json")
+        assert state["in_game_days_passed"] == 21
+        assert state["game_date"] == "31st of Last Seed, 4E 201"
+        # Recurring events stay queued at their next occurrence; one-offs are gone
+        pending = state["scheduled_events"]
+        assert len(pending) == 26 and pending[0]["day"] == 22 and pending[-1]["day"] == 37
+        assert manager.cancel_event(pending[-1]["id"])
+
+        assert manager.advance_time(1)
+        assert read_json(data / "factions" / "whiterun_guard.json")["clock"]["progress"] == 24 * 15
+        assert read_json(data / "world_state" / "current_state.json")["game_date"] == "1st of Hearthfire, 4E 201"
+        assert not manager.advance_time(0)
+    print("✓ Test passed: advance time batches writes")
+
+
+def test_advance_time_keeps_failed_events():
+    """Events whose target is missing stay queued; changes are spliced into the text"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data = make_data(tmp)
+        main = data / "quests" / "main.json"
+        text = ('{"quests": [\n  {"id": "q1", "name": "Rescue Mission", "status": "Active"},\n'
+                '  {"id": "q2", "name": "Old Business", "status": "Completed"}\n]}\n')
+        main.write_text(text, encoding="utf-8")
+        manager = StoryProgressionManager(data)
+        missing = manager.schedule_event(1, "faction_clock", faction="thalmor", progress=2)
+        assert manager.schedule_event(1, "clock_tick", every=1, file="civil_war_clocks", clock="dragons")
+        assert manager.schedule_event(1, "quest_deadline", quest="Rescue Mission")
+
+        assert manager.advance_time(2)
+        assert main.read_text(encoding="utf-8") == text.replace('"Active"', '"Failed"')
+        pending = read_json(data / "world_state" / "current_state.json")["scheduled_events"]
+        assert [(e["id"], e["day"]) for e in pending] == [(missing["id"], 8), (2, 10)]
+
+        write_json(data / "factions" / "thalmor.json", {"name": "Thalmor", "clock": {"progress": 1, "segments": 8}})
+        assert manager.advance_time(1)
+        assert read_json(data / "factions" / "thalmor.json")["clock"]["progress"] == 3
+        pending = read_json(data / "world_state" / "current_state.json")["scheduled_events"]
+        assert [e["kind"] for e in pending] == ["clock_tick"]
+    print("✓ Test passed: advance time keeps failed events")
+
+
+if __name__ == "__main__":
+    test_calendar_and_scheduler()
+    test_advance_time_batches_writes()
+    test_advance_time_keeps_failed_events()
+    print("\nAll game calendar tests passed!")
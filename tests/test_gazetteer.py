@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for the location gazetteer
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from gazetteer import Gazetteer, tokens
+from gm_tools import GMTools
+from query_data import DataQueryManager
+from story_manager import StoryManager
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def make_data(root):
+    data = Path(root) / "data"
+    write_json(data / "holds" / "pale.json", {
+        "hold": "The Pale", "capital": "Dawnstar",
+        "districts": [{"name": "Dawnstar Harbor"}, {"name": "Jarl's Longhouse"}],
+        "major_locations": [{"name": "Dawnstar", "type": "City"}, {"name": "Fort Dunstad"}],
+    })
+    write_json(data / "holds" / "whiterun.json", {
+        "hold": "Whiterun Hold", "capital": "Whiterun",
+        "districts": [{"name": "Plains District"}],
+        "major_settlements": ["Whiterun (City)", "Riverwood"],
+    })
+    sheets = {
+        "harbor_smuggler": ("Dawnstar Harbor", "Hostile NPC"),
+        "fort_bandit": ("Fort Dunstad, roads", "Enemy"),
+        "whiterun_guard": ("Whiterun", "Friendly NPC"),
+        "delphine": ("Riverwood (Sleeping Giant Inn)", "Friendly NPC"),
+        "draugr": ("Ancient Nordic Ruins", "Enemy"),
+        "skeever": ("Caves, sewers, ruins", "Enemy"),
+        "bandit": ("Roads, camps, abandoned forts", "Enemy"),
+        "forsworn": ("Forsworn camps, wilderness", "Enemy"),
+        "spriggan": ("Deep wilderness in The Pale", "Enemy"),
+    }
+    for sheet_id, (location, category) in sheets.items():
+        write_json(data / "npc_stat_sheets" / f"{sheet_id}.json", {
+            "id": sheet_id, "name": sheet_id.replace("_", " ").title(), "type": "Test",
+            "category": category, "location": location, "aspects": {"high_concept": "Test"},
+        })
+    return data
+
+
+def test_places_and_hierarchy():
+    """Holds, capitals and districts become one hierarchy with canonical ids"""
+    with tempfile.TemporaryDirectory() as tmp:
+        gazetteer = Gazetteer(make_data(tmp)).refresh()
+        assert tokens("The Jarl's Longhouse") == ("jarl", "longhouse")
+        assert gazetteer.get("the_pale").kind == "hold"
+        assert gazetteer.get("dawnstar").parent == "the_pale"
+        assert gazetteer.get("dawnstar_harbor").parent == "dawnstar"
+        assert gazetteer.get("riverwood").parent == "whiterun_hold"
+        assert gazetteer.hold("Whiterun") == gazetteer.hold("whiterun hold") == "whiterun_hold"
+        assert gazetteer.hold("Pale") == "the_pale"
+        assert gazetteer.hold("Riverwood") is None
+        # "Whiterun" names the city, not the hold
+        assert "whiterun" in gazetteer.resolve("Whiterun") and "riverwood" not in gazetteer.resolve("Whiterun")
+        assert gazetteer.resolve("The Pale") >= {"the_pale", "dawnstar", "dawnstar_harbor", "fort_dunstad"}
+        assert gazetteer.places_of("spriggan") == {"the_pale", "deep_wilderness_in_the_pale"}
+    print("✓ Test passed: places and hierarchy")
+
+
+def test_queries():
+    """Hierarchy-aware, token-based matching of stat sheet locations"""
+    with tempfile.TemporaryDirectory() as tmp:
+        gazetteer = Gazetteer(make_data(tmp))
+        assert gazetteer.sheets_at("The Pale") == {"harbor_smuggler", "fort_bandit", "spriggan"}
+        assert gazetteer.sheets_at("Dawnstar") == {"harbor_smuggler"}
+        assert gazetteer.sheets_at("whiterun") == {"whiterun_guard"}
+        assert gazetteer.sheets_in_hold("Whiterun") == {"whiterun_guard", "delphine"}
+        assert gazetteer.sheets_at("ruins") == {"draugr", "skeever"}
+        assert gazetteer.sheets_at("Nordic ruins") == {"draugr"}
+        assert gazetteer.sheets_at("Whiterun Plains District") == {"whiterun_guard"}
+        # Generic words no longer match everything that shares a substring
+        assert gazetteer.sheets_at("Forsworn camps") == {"forsworn"}
+        assert gazetteer.sheets_at("camp") == {"bandit", "forsworn"}
+        assert gazetteer.sheets_at("Solitude") == set()
+        assert gazetteer.sheets_at(None) == set() and gazetteer.sheets_at("") == set()
+    print("✓ Test passed: location queries")
+
+
+def test_rebuild_and_callers():
+    """Edits rebuild the index; query, story and GM tools use it"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data = make_data(tmp)
+        write_json(Path(tmp) / "state" / "campaign_state.json", {"current_act": 1})
+        manager = DataQueryManager(str(data))
+        assert [s["id"] for s in manager.query_npc_enemy_stats(location="The Pale")] == [
+            "fort_bandit", "harbor_smuggler", "spriggan"]
+        assert [s["id"] for s in manager.get_enemies_by_location("The Pale")] == ["fort_bandit", "spriggan"]
+        assert [s["id"] for s in manager.get_enemies_by_hold("The Pale")["primary"]] == ["fort_bandit", "spriggan"]
+
+        write_json(data / "npc_stat_sheets" / "whiterun_guard.json", {
+            "id": "whiterun_guard", "name": "Guard", "category": "Enemy", "location": "Dawnstar"})
+        assert [s["id"] for s in manager.get_enemies_by_location("Dawnstar")] == ["whiterun_guard"]
+
+        scene = StoryManager(data, Path(tmp) / "state").get_scene_npcs("The Pale")
+        assert [s["id"] for s in scene["hostile"]] == ["harbor_smuggler"]
+        assert [s["id"] for s in scene["enemies"]] == ["fort_bandit", "spriggan", "whiterun_guard"]
+
+        tools = GMTools(data, Path(tmp) / "state")
+        tools.suggest_npc_stats_for_scene("Riverwood", "dialogue")
+        assert tools.gazetteer().sheets_at("Riverwood") == {"delphine"}
+    print("✓ Test passed: rebuild and callers")
+
+
+if __name__ == "__main__":
+    test_places_and_hierarchy()
+    test_queries()
+    test_rebuild_and_callers()
+    print("\nAll gazetteer tests passed!")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared tolerant JSON loader
+"""
+
+import codecs
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+import json_io
+from json_io import encoding_for, load_json, read_text, sniff_encoding
+from export_repo import load_json_safely
+
+
+DOC = {"name": "Jarl Balgruuf the Greater", "hold": "Whiterun", "greeting": "Hail, Dragonborn — welcome"}
+
+
+def test_encodings():
+    """UTF-8, BOM, UTF-16 and cp1252 files all load to the same document"""
+    json_io.clear_cache()
+    text = json.dumps(DOC, ensure_ascii=False)
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = {
+            "plain.json": (text.encode("utf-8"), "utf-8"),
+            "bom.json": (codecs.BOM_UTF8 + text.encode("utf-8"), "utf-8-sig"),
+            "wide.json": (text.encode("utf-16"), "utf-16"),
+            "legacy.json": (text.encode("cp1252"), "cp1252"),
+        }
+        for name, (raw, encoding) in cases.items():
+            path = Path(tmp) / name
+            path.write_bytes(raw)
+            assert sniff_encoding(raw) == encoding
+            assert load_json(path) == DOC, name
+            assert encoding_for(path) == encoding
+            assert json.loads(read_text(path)) == DOC
+    print("✓ Test passed: load every supported encoding")
+
+
+def test_cached_encoding_follows_file():
+    """A remembered encoding is dropped when the file is re-saved differently"""
+    json_io.clear_cache()
+    text = json.dumps(DOC, ensure_ascii=False)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "jarl.json"
+        path.write_bytes(codecs.BOM_UTF8 + text.encode("utf-8"))
+        assert load_json(path) == DOC
+        path.write_bytes(text.encode("cp1252"))
+        assert load_json(path) == DOC
+        assert encoding_for(path) == "cp1252"
+        path.write_bytes(text.encode("utf-8"))
+        assert load_json(path) == DOC
+        assert encoding_for(path) == "utf-8"
+    print("✓ Test passed: cached encoding follows the file")
+
+
+def test_errors():
+    """Missing files raise OSError and bad JSON raises JSONDecodeError"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "broken.json"
+        try:
+            load_json(path)
+            assert False, "expected OSError"
+        except OSError:
+            pass
+        path.write_text('{"name": "Hadvar",}', encoding="utf-8")
+        try:
+            load_json(path)
+            assert False, "expected JSONDecodeError"
+        except json.JSONDecodeError:
+            pass
+        try:
+            load_json_safely(path)
+            assert False, "expected JSONDecodeError"
+        except json.JSONDecodeError:
+            pass
+        path.write_text('{"bounty": NaN}', encoding="utf-8")
+        assert load_json(path)["bounty"] != load_json(path)["bounty"]
+    print("✓ Test passed: errors match the json module")
+
+
+if __name__ == "__main__":
+    test_encodings()
+    test_cached_encoding_follows_file()
+    test_errors()
+    print("\nAll JSON loader tests passed!")
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests for the append-only mid-session event log and checkpoint server
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from mid_session_protocol import (CheckpointServer, checkpoint_append, event_log_path, log_event,
+                                  read_events, render_events, send_command, serve_socket, serve_stdio)
+
+
+def test_checkpoint_appends_without_rewriting():
+    """Checkpoints append to both the event log and the markdown log"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = Path(tmp) / "2026-02-01_session-02.md"
+        narrative = "# Session 2\n\nThe party reached Whiterun.\n"
+        log_path.write_text(narrative, encoding="utf-8")
+
+        checkpoint_append(log_path, "Hadvar agreed to help.", {"location": "Whiterun"})
+        log_event(log_path, "event", "Lydia joined the party.")
+
+        text = log_path.read_text(encoding="utf-8")
+        assert text.startswith(narrative)
+        assert "## Mid-Session Checkpoint (" in text
+        assert text.rstrip().endswith("Lydia joined the party.")
+
+        lines = event_log_path(log_path).read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["kind"] for line in lines] == ["checkpoint", "event"]
+        assert json.loads(lines[0])["context"] == {"location": "Whiterun"}
+    print("✓ Test passed: checkpoints append without rewriting the log")
+
+
+def test_render_events_matches_appended_blocks():
+    """Rendering the event log reproduces what was appended to markdown"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = Path(tmp) / "2026-02-01_mid-session.md"
+        checkpoint_append(log_path, "First checkpoint")
+        checkpoint_append(log_path, "Second checkpoint")
+        assert render_events(event_log_path(log_path)) == log_path.read_text(encoding="utf-8")
+    print("✓ Test passed: rendered events match the markdown log")
+
+
+def test_torn_final_line_is_ignored():
+    """A partially written last record does not hide earlier events"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = Path(tmp) / "2026-02-01_mid-session.md"
+        checkpoint_append(log_path, "Intact")
+        with open(event_log_path(log_path), "a", encoding="utf-8") as f:
+            f.write('{"ts": "2026-02-01 20:00:00", "kind": "check')
+        assert [e["text"] for e in read_events(event_log_path(log_path))] == ["Intact"]
+        checkpoint_append(log_path, "After crash")
+        assert [e["text"] for e in read_events(event_log_path(log_path))] == ["Intact", "After crash"]
+    print("✓ Test passed: torn final line ignored")
+
+
+def make_repo(root):
+    """Minimal campaign with state, one PC and one clock file"""
+    root = Path(root)
+    (root / "state").mkdir()
+    (root / "data" / "pcs").mkdir(parents=True)
+    (root / "data" / "clocks").mkdir(parents=True)
+    (root / "logs").mkdir()
+    (root / "state" / "campaign_state.json").write_text(json.dumps({
+        "active_pc_id": "pc_test", "current_location": "Whiterun", "current_objective": "Find the Dragonstone"
+    }))
+    (root / "data" / "pcs" / "pc_test.json").write_text(json.dumps({
+        "name": "Test Hero", "skills": {"Great (+4)": ["Fight"], "Good (+3)": ["Stealth"]}
+    }))
+    (root / "data" / "clocks" / "war.json").write_text(json.dumps({
+        "clocks": {"siege": {"name": "Siege of Whiterun", "current_progress": 3, "total_segments": 4}}
+    }))
+    return root
+
+
+def test_checkpoint_server_reloads_only_changed_files():
+    """The warm server answers from memory and picks up edited files"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_repo(tmp)
+        server = CheckpointServer(root)
+
+        response = server.handle("report")
+        assert response["ok"]
+        assert "Siege of Whiterun: 3/4" in response["output"]
+        assert {"state", "pc", "skills", "clocks", "report", "total"} <= set(response["timings_ms"])
+
+        clock_file = root / "data" / "clocks" / "war.json"
+        clock_file.write_text(json.dumps({
+            "clocks": {"siege": {"name": "Siege of Whiterun", "current_progress": 4, "total_segments": 4}}
+        }))
+        stamp = time.time_ns() + 1_000_000
+        os.utime(clock_file, ns=(stamp, stamp))
+        assert "Siege of Whiterun: 4/4" in server.handle("report")["output"]
+
+        response = server.handle("checkpoint Reached Dragonsreach")
+        assert response["ok"]
+        events = read_events(event_log_path(server.log_path))
+        assert events[-1]["text"] == "Reached Dragonsreach"
+        assert events[-1]["context"]["pc"] == "Test Hero"
+        assert not server.handle("checkpoint")["ok"]
+
+        # Reloading the PC replaces its own warnings, whatever their wording
+        pc_file = root / "data" / "pcs" / "pc_test.json"
+        for n in range(2):
+            pc_file.write_text("{broken" + "!" * n)
+            stamp = time.time_ns() + (n + 2) * 1_000_000
+            os.utime(pc_file, ns=(stamp, stamp))
+            server.handle("report")
+            assert len(server.warnings) == 1 and "Could not parse" in server.warnings[0]
+    print("✓ Test passed: checkpoint server reloads only changed files")
+
+
+def test_stdio_and_socket_loops():
+    """Both transports answer one JSON line per command"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_repo(tmp)
+        server = CheckpointServer(root)
+
+        out = io.StringIO()
+        serve_stdio(server, io.StringIO("ping\nevent Lydia joined\nquit\nping\n"), out)
+        responses = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert [r["command"] for r in responses] == ["ping", "event", "quit"]
+
+        socket_path = Path(tmp) / "checkpoint.sock"
+        thread = threading.Thread(target=serve_socket, args=(server, socket_path), daemon=True)
+        thread.start()
+        deadline = time.time() + 5
+        while not socket_path.exists() and time.time() < deadline:
+            time.sleep(0.01)
+        assert send_command(socket_path, "ping")["output"] == "pong"
+        assert send_command(socket_path, "quit")["ok"]
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+    print("✓ Test passed: stdio and socket loops")
+
+
+if __name__ == "__main__":
+    test_checkpoint_appends_without_rewriting()
+    test_render_events_matches_appended_blocks()
+    test_torn_final_line_is_ignored()
+    test_checkpoint_server_reloads_only_changed_files()
+    test_stdio_and_socket_loops()
+    print("\nAll mid-session log and server tests passed!")
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Tests for the declarative JSON patch engine
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+import patch_engine
+from patch_engine import PatchEngine, apply_operation, parse_pointer
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+
+
+def read_json(path):
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def make_repo(root):
+    """Campaign state, one clock file and one PC"""
+    root = Path(root)
+    write_json(root / "state" / "campaign_state.json", {"session_count": 1, "scene_flags": {}})
+    write_json(root / "data" / "clocks" / "civil_war_clocks.json", {
+        "civil_war_clocks": {"clocks": {"imperial_military_dominance": {"current_progress": 3}}}
+    })
+    write_json(root / "data" / "pcs" / "pc_test.json", {"fate_points": 3, "fate_point_ledger": []})
+    write_json(root / "patches" / "2026-02-01_session_end.json", {
+        "patch_id": "2026-02-01_session_end",
+        "patches": [
+            {"file": "state/campaign_state.json", "ops": [
+                {"op": "replace", "path": "/session_count", "value": 2},
+                {"op": "add", "path": "/scene_flags/hadvar_duel_concluded", "value": True}
+            ]},
+            {"file": "data/clocks/civil_war_clocks.json", "ops": [
+                {"op": "replace", "path": "/civil_war_clocks/clocks/imperial_military_dominance/current_progress",
+                 "value": 2}
+            ]}
+        ]
+    })
+    write_json(root / "patches" / "2026-02-02_fate_points.json", {
+        "files": {"data/pcs/pc_test.json": [
+            {"op": "test", "path": "/fate_points", "value": 3},
+            {"op": "replace", "path": "/fate_points", "value": 1},
+            {"op": "add", "path": "/fate_point_ledger/-", "value": {"delta": -2},
+             "idempotency_key": "spend-stag-of-eastmarch"}
+        ]}
+    })
+    return root
+
+
+def test_json_patch_operations():
+    """RFC 6902 operations and pointer escaping"""
+    assert parse_pointer("/a~1b/m~0n/0") == ["a/b", "m~n", "0"]
+    doc = {"a": {"b": [1, 2]}, "c": 1}
+    doc = apply_operation(doc, {"op": "add", "path": "/a/b/1", "value": 9})
+    doc = apply_operation(doc, {"op": "move", "from": "/c", "path": "/a/c"})
+    doc = apply_operation(doc, {"op": "copy", "from": "/a/b", "path": "/d"})
+    doc = apply_operation(doc, {"op": "remove", "path": "/a/b/0"})
+    assert doc == {"a": {"b": [9, 2], "c": 1}, "d": [1, 9, 2]}
+    for bad in ({"op": "replace", "path": "/missing", "value": 1},
+                {"op": "test", "path": "/d/0", "value": 2},
+                {"op": "add", "path": "/a/b/7", "value": 1}):
+        try:
+            apply_operation(doc, bad)
+            assert False, f"expected failure for {bad}"
+        except ValueError:
+            pass
+    print("✓ Test passed: JSON patch operations")
+
+
+def test_transaction_and_idempotency():
+    """Patches apply across files once; a second run only skips"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_repo(tmp)
+        # Descriptors and targets saved with a BOM load like any other JSON
+        for path in (root / "patches" / "2026-02-01_session_end.json", root / "data" / "pcs" / "pc_test.json"):
+            path.write_bytes(b"\xef\xbb\xbf" + path.read_bytes())
+        engine = PatchEngine(root)
+
+        result = engine.apply(engine.patch_paths())
+        assert result["ok"] and result["applied"] == 6
+        assert sorted(result["files"]) == ["data/clocks/civil_war_clocks.json", "data/pcs/pc_test.json",
+                                           "state/campaign_state.json"]
+        assert read_json(root / "state" / "campaign_state.json")["scene_flags"]["hadvar_duel_concluded"]
+        assert read_json(root / "data" / "pcs" / "pc_test.json") == {"fate_points": 1,
+                                                                    "fate_point_ledger": [{"delta": -2}]}
+
+        again = PatchEngine(root).apply(engine.patch_paths())
+        assert again["ok"] and again["applied"] == 0 and again["skipped"] == 6
+        assert len(read_json(root / "data" / "pcs" / "pc_test.json")["fate_point_ledger"]) == 1
+        assert "spend-stag-of-eastmarch" in read_json(root / "state" / "patch_ledger.json")["applied"]
+
+        # Inserting an operation into a patch leaves the keys of the others alone
+        path = root / "patches" / "2026-02-01_session_end.json"
+        patch = json.loads(path.read_text(encoding="utf-8-sig"))
+        patch["patches"][0]["ops"].insert(0, {"op": "add", "path": "/scene_flags/met_ralof", "value": True})
+        write_json(path, patch)
+        edited = PatchEngine(root).apply(engine.patch_paths())
+        assert edited["applied"] == 1 and edited["skipped"] == 6
+        assert read_json(root / "state" / "campaign_state.json")["session_count"] == 2
+    print("✓ Test passed: transactional, idempotent application")
+
+
+def test_failed_validation_writes_nothing():
+    """One bad operation rejects the whole run"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_repo(tmp)
+        write_json(root / "patches" / "2026-02-03_bad.json", {"files": {
+            "data/pcs/pc_test.json": [{"op": "add", "path": "/aspects/compel_library",
+                                       "value": "(SEE_INLINE_PC_JSON_VALUE)"}],
+            "scripts/story_manager.py": [{"op": "replace", "path": "/block", "value": 1}]
+        }})
+        before = {p: p.read_text() for p in root.rglob("*.json")}
+
+        engine = PatchEngine(root)
+        result = engine.apply(engine.patch_paths())
+        assert not result["ok"] and len(result["errors"]) == 2
+        assert {p: p.read_text() for p in root.rglob("*.json")} == before
+        assert not (root / "state" / "patch_ledger.json").exists()
+
+        assert engine.apply(engine.patch_paths()[:2], dry_run=True)["applied"] == 6
+        assert {p: p.read_text() for p in root.rglob("*.json")} == before
+    print("✓ Test passed: failed validation writes nothing")
+
+
+def test_replay_and_mark_applied():
+    """Replay rebuilds patched files from their baseline; mark_applied records history"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_repo(Path(tmp) / "repo")
+        engine = PatchEngine(root)
+        out = Path(tmp) / "rebuilt"
+
+        # Nothing has been patched here yet, so there is no baseline to start from
+        assert engine.replay()["errors"]
+        assert engine.replay(baseline_dir=root)["applied"] == 6
+
+        assert engine.apply(engine.patch_paths())["applied"] == 6
+        assert read_json(root / "state" / "patch_baseline" / "state" / "campaign_state.json")["session_count"] == 1
+        live = {p: p.read_text() for p in root.rglob("*.json")}
+        result = engine.replay(out_dir=out)
+        assert result["applied"] == 6 and not result["errors"]
+        for file in result["docs"]:
+            assert read_json(out / file) == read_json(root / file)
+        assert {p: p.read_text() for p in root.rglob("*.json")} == live
+
+        fresh = make_repo(Path(tmp) / "fresh")
+        engine = PatchEngine(fresh)
+        assert engine.mark_applied(engine.patch_paths()) == 6
+        assert engine.apply(engine.patch_paths())["applied"] == 0
+        assert [row["applied"] for row in engine.status()] == [3, 3]
+        # Operations the engine could never apply are not recorded as applied
+        write_json(fresh / "patches" / "2026-02-03_notes.json", {"files": {
+            "data/pcs/pc_test.json": [{"op": "verify", "path": "/fate_points"},
+                                      {"op": "add", "path": "/aspects", "value": []}],
+            "scripts/story_manager.py": [{"op": "replace", "path": "/block", "value": 1}]
+        }})
+        assert engine.mark_applied(engine.patch_paths()) == 1
+        assert [row["applied"] for row in engine.status()] == [3, 3, 1]
+    print("✓ Test passed: replay and mark_applied")
+
+
+def test_all_requires_ledger():
+    """--all will not re-apply history over a tree that has no ledger"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = make_repo(tmp)
+        before = {p: p.read_text() for p in root.rglob("*.json")}
+        argv = sys.argv
+        try:
+            sys.argv = ["patch_engine.py", "--repo", str(root), "--all"]
+            patch_engine.main()
+            assert {p: p.read_text() for p in root.rglob("*.json")} == before
+            sys.argv = ["patch_engine.py", "--repo", str(root), "--all", "--mark-applied"]
+            patch_engine.main()
+            sys.argv = ["patch_engine.py", "--repo", str(root), "--all"]
+            patch_engine.main()
+        finally:
+            sys.argv = argv
+        assert read_json(root / "state" / "campaign_state.json")["session_count"] == 1
+        assert (root / "state" / "patch_ledger.json").exists()
+    print("✓ Test passed: --all requires a ledger")
+
+
+if __name__ == "__main__":
+    test_json_patch_operations()
+    test_transaction_and_idempotency()
+    test_failed_validation_writes_nothing()
+    test_replay_and_mark_applied()
+    test_all_requires_ledger()
+    print("\nAll patch engine tests passed!")
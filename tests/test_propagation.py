@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for ripple propagation over factions, NPCs and clocks
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from propagation import NUMPY_AVAILABLE, PropagationEngine, format_preview
+from storage import JSONTreeStorage
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def make_data(root):
+    """Two warring factions, a shared enemy and a few members"""
+    data = Path(root) / "data"
+    write_json(data / "factions.json", {"major_factions": {
+        "imperial_legion": {"name": "Imperial Legion",
+                            "relationships": {"stormcloaks": -90, "thalmor": 40}},
+        "stormcloaks": {"name": "Stormcloaks", "relationships": {"imperial_legion": -90, "thalmor": -100},
+                        "clocks": [{"name": "Rebellion Momentum", "current_progress": 2, "total_segments": 8}]},
+        "thalmor": {"name": "Thalmor (Aldmeri Dominion)", "relationships": {}}
+    }})
+    write_json(data / "clocks" / "civil_war_clocks.json", {"civil_war_progression": {"clocks": {
+        "imperial_military_dominance": {"name": "Imperial Military Dominance", "current_progress": 3}
+    }}})
+    write_json(data / "clocks" / "thalmor_influence_clocks.json", {"thalmor_operations": {"clocks": {
+        "blades_elimination": {"name": "Blades Elimination", "current_progress": 5}
+    }}})
+    write_json(data / "npcs" / "ulfric.json", {
+        "id": "ulfric_stormcloak", "name": "Ulfric Stormcloak", "faction": "Stormcloaks",
+        "relationships": {"Galmar Stone-Fist": "Loyal right hand"}
+    })
+    write_json(data / "npcs" / "galmar.json", {"id": "galmar_stone_fist", "name": "Galmar Stone-Fist"})
+    write_json(data / "npcs" / "tullius.json", {
+        "id": "general_tullius", "name": "General Tullius", "faction": "Imperial Legion"
+    })
+    return data
+
+
+def test_allies_follow_and_enemies_oppose():
+    """A faction gain lifts its members and clocks and pushes its enemies down"""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = PropagationEngine(storage=JSONTreeStorage(make_data(tmp)), threshold=0.001)
+        impacts = {c["node"]: c["impact"] for c in engine.preview({engine.resolve("faction", "stormcloaks"): 10})}
+
+        assert impacts["npc:ulfric_stormcloak"] > 0
+        assert impacts["clock:factions.stormcloaks.rebellion_momentum"] > 0
+        assert impacts["faction:imperial_legion"] < 0
+        assert impacts["npc:general_tullius"] < 0
+        assert "faction:stormcloaks" not in impacts
+        # Effects fade with distance: Galmar is one hop further out than Ulfric
+        assert impacts["npc:ulfric_stormcloak"] > impacts["npc:galmar_stone_fist"] > 0
+
+        # Direct neighbours feel a small change at full edge weight, so it still suggests a step
+        suggested = {c["node"]: c["suggested"] for c in engine.preview({"faction:stormcloaks": 2})}
+        assert suggested["faction:imperial_legion"] == -1 and suggested["npc:ulfric_stormcloak"] == 1
+    print("✓ Test passed: allies follow and enemies oppose")
+
+
+def test_clocks_link_to_factions():
+    """data/clocks entries attach to the faction named by their file or key"""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = PropagationEngine(storage=JSONTreeStorage(make_data(tmp)))
+        node = engine.resolve("clock", "imperial_military_dominance")
+        assert node == "clock:civil_war_clocks.imperial_military_dominance"
+        changes = engine.preview({node: 2})
+        assert changes[0]["node"] == "faction:imperial_legion"
+        assert changes[0]["suggested"] == 1
+
+        # Thalmor influence clocks belong to the Thalmor, not to the Blades they target
+        blades = "clock:thalmor_influence_clocks.blades_elimination"
+        assert [c["node"] for c in engine.preview({blades: 2})][0] == "faction:thalmor"
+    print("✓ Test passed: clocks link to factions")
+
+
+def test_ranking_threshold_and_unknown_nodes():
+    """Changes are ranked by size, filtered by threshold and unknown nodes are ignored"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data = make_data(tmp)
+        engine = PropagationEngine(storage=JSONTreeStorage(data), threshold=0.001)
+        changes = engine.preview({"faction:imperial_legion": -5})
+        sizes = [abs(c["impact"]) for c in changes]
+        assert sizes == sorted(sizes, reverse=True)
+
+        strict = PropagationEngine(storage=JSONTreeStorage(data), threshold=1.0)
+        assert all(abs(c["impact"]) >= 1.0 for c in strict.preview({"faction:imperial_legion": -5}))
+        assert len(engine.preview({"faction:imperial_legion": -5}, limit=2)) == 2
+
+        assert engine.preview({"npc:nobody": 5}) == []
+        assert format_preview([]) == ["No significant ripple effects."]
+    print("✓ Test passed: ranking, threshold and unknown nodes")
+
+
+def test_numpy_matches_pure_python():
+    """Both spread implementations give the same impacts on the same graph"""
+    pytest.importorskip("numpy")
+    with tempfile.TemporaryDirectory() as tmp:
+        data = make_data(tmp)
+        fast = PropagationEngine(storage=JSONTreeStorage(data), threshold=0.001, use_numpy=True)
+        slow = PropagationEngine(storage=JSONTreeStorage(data), threshold=0.001, use_numpy=False)
+        assert fast.use_numpy and not slow.use_numpy
+        for deltas in ({"faction:stormcloaks": 2}, {"npc:galmar_stone_fist": -30, "faction:thalmor": 1}):
+            expected = {c["node"]: c["impact"] for c in slow.preview(deltas)}
+            actual = {c["node"]: c["impact"] for c in fast.preview(deltas)}
+            assert actual.keys() == expected.keys()
+            assert all(actual[n] == pytest.approx(expected[n], abs=1e-3) for n in expected)
+    print("✓ Test passed: NumPy matches pure Python")
+
+
+if __name__ == "__main__":
+    test_allies_follow_and_enemies_oppose()
+    test_clocks_link_to_factions()
+    test_ranking_threshold_and_unknown_nodes()
+    if NUMPY_AVAILABLE:
+        test_numpy_matches_pure_python()
+    print("\nAll propagation tests passed!")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Tests for the JSON-RPC query service
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from query_service import (INVALID_PARAMS, INVALID_REQUEST, METHOD_NOT_FOUND, PARSE_ERROR, QueryService,
+                           ServiceClient)
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def make_campaign(root):
+    data, state = Path(root) / "data", Path(root) / "state"
+    write_json(data / "npcs" / "lydia.json", {"id": "lydia", "name": "Lydia", "faction": "Whiterun Guard",
+                                              "location": "Whiterun", "loyalty": 60})
+    write_json(data / "npcs" / "ralof.json", {"id": "ralof", "name": "Ralof", "faction": "Stormcloaks",
+                                              "location": "Riverwood"})
+    write_json(data / "clocks" / "civil_war_clocks.json", {"civil_war_clocks": {
+        "last_updated": "", "clocks": {"momentum": {"name": "Momentum", "current_progress": 2,
+                                                    "total_segments": 10}}}})
+    write_json(state / "campaign_state.json", {"current_act": 1})
+    return data, state
+
+
+async def rpc(reader, writer, request):
+    writer.write(json.dumps(request).encode() + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+def test_reads_writes_and_errors():
+    """Concurrent clients, serialized writes, warm caches and JSON-RPC errors"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data, state = make_campaign(tmp)
+        service = QueryService(data, state, poll_interval=0)
+        sock = str(Path(tmp) / "service.sock")
+
+        async def main():
+            server = await service.start(sock)
+            clients = [await asyncio.open_unix_connection(sock) for _ in range(3)]
+
+            async def client(i, reader, writer):
+                results = []
+                for n in range(5):
+                    response = await rpc(reader, writer, {"jsonrpc": "2.0", "id": n, "method": "query.query_npcs",
+                                                          "params": {"name": "Lydia"}})
+                    results.append([npc["id"] for npc in response["result"]])
+                    await rpc(reader, writer, {"jsonrpc": "2.0", "id": n, "method": "npc.update_loyalty",
+                                               "params": ["lydia", 1, f"client {i}"]})
+                return results
+
+            results = await asyncio.gather(*(client(i, *pair) for i, pair in enumerate(clients)))
+            assert all(r == [["lydia"]] * 5 for r in results)
+            reader, writer = clients[0]
+            npc = await rpc(reader, writer, {"jsonrpc": "2.0", "id": 1, "method": "npc.load_npc", "params": ["lydia"]})
+            assert npc["result"]["loyalty"] == 75 and len(npc["result"]["loyalty_history"]) == 15
+
+            # Writes refresh the warm caches before answering
+            response = await rpc(reader, writer, {"jsonrpc": "2.0", "id": 2, "method": "story.advance_clock",
+                                                  "params": ["civil_war", "momentum", 3]})
+            assert response["result"] is True and "Progress: 2 -> 5 / 10" in response["output"]
+            clocks = await rpc(reader, writer, {"jsonrpc": "2.0", "id": 3, "method": "story.load_clocks",
+                                                "params": ["civil_war"]})
+            assert clocks["result"]["civil_war"]["civil_war_clocks"]["clocks"]["momentum"]["current_progress"] == 5
+            # The service's event bus carries the advance to the clock reactions
+            flags = json.loads((state / "campaign_state.json").read_text(encoding="utf-8"))["scene_flags"]
+            assert flags == {"momentum_clock_half": True}
+
+            # Outside edits are picked up by the next poll
+            write_json(data / "npcs" / "ralof.json", {"id": "ralof", "name": "Ralof", "faction": "Imperial Legion"})
+            service.watcher.poll()
+            npcs = await rpc(reader, writer, {"jsonrpc": "2.0", "id": 4, "method": "query.query_npcs",
+                                              "params": {"faction": "Imperial Legion"}})
+            assert [n["id"] for n in npcs["result"]] == ["ralof"]
+
+            errors = [await rpc(reader, writer, request) for request in (
+                {"jsonrpc": "2.0", "id": 5, "method": "npc.delete_everything"},
+                {"jsonrpc": "2.0", "id": 6, "method": "npc.load_npc", "params": {"npc": "lydia"}},
+            )]
+            assert [e["error"]["code"] for e in errors] == [METHOD_NOT_FOUND, INVALID_PARAMS]
+            writer.write(b"{not json\n")
+            assert json.loads(await reader.readline())["error"]["code"] == PARSE_ERROR
+
+            # Batches answer every request that has an id; notifications get nothing back
+            writer.write(json.dumps([{"jsonrpc": "2.0", "method": "npc.list_npcs"},
+                                     {"jsonrpc": "2.0", "id": 7, "method": "rpc.stats"}]).encode() + b"\n")
+            batch = json.loads(await reader.readline())
+            assert [r["id"] for r in batch] == [7] and batch[0]["result"]["writes"] == 16
+
+            for _, writer in clients:
+                writer.close()
+            await service.stop(server)
+
+        asyncio.run(main())
+    print("✓ Test passed: reads, writes and errors")
+
+
+def test_http_and_blocking_client():
+    """HTTP POST and the blocking client reach the same methods over TCP"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data, state = make_campaign(tmp)
+        service = QueryService(data, state, poll_interval=0.05)
+        assert service.methods["story.advance_clock"][1] and not service.methods["gm.view_all_clocks"][1]
+
+        async def main():
+            server = await service.start(port=0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "npc.list_npcs"}).encode()
+            writer.write(b"POST / HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                         + f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+            response = (await reader.read()).decode()
+            assert response.startswith("HTTP/1.1 200 OK")
+            assert json.loads(response.split("\r\n\r\n", 1)[1])["result"] == [["lydia", "Lydia"], ["ralof", "Ralof"]]
+            writer.close()
+
+            # A malformed Content-Length gets a 400 with a JSON-RPC error, not a dropped connection
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"POST / HTTP/1.1\r\nHost: localhost\r\nContent-Length: lots\r\n\r\n{}")
+            response = (await reader.read()).decode()
+            assert response.startswith("HTTP/1.1 400 Bad Request")
+            assert json.loads(response.split("\r\n\r\n", 1)[1])["error"]["code"] == INVALID_REQUEST
+            writer.close()
+
+            def blocking():
+                client = ServiceClient(port=port)
+                try:
+                    assert client.call("npc.check_faction_alignment", "ralof", "stormcloaks") == "allied"
+                    assert "query.query_npcs" in client.call("rpc.methods")
+                    try:
+                        client.call("query.query_npcs", nickname="Lyd")
+                        assert False
+                    except RuntimeError as e:
+                        assert str(INVALID_PARAMS) in str(e)
+                finally:
+                    client.close()
+
+            await asyncio.get_running_loop().run_in_executor(None, blocking)
+            await service.stop(server)
+
+        asyncio.run(main())
+    print("✓ Test passed: HTTP and blocking client")
+
+
+if __name__ == "__main__":
+    test_reads_writes_and_errors()
+    test_http_and_blocking_client()
+    print("\nAll query service tests passed!")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Tests for the quest dependency graph
+"""
+
+import json
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+import story_progression
+from quest_graph import QuestGraph, act_key
+from story_manager import StoryManager
+from story_progression import StoryProgressionManager
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def read_json(path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def make_data(root):
+    data = Path(root) / "data"
+    write_json(data / "quests" / "main_quests.json", {"main_questline": {"name": "Main", "quests": {
+        "battle_of_whiterun": {"id": "battle_of_whiterun", "name": "Battle of Whiterun", "act": "Act I",
+                               "status": "available", "next_quest": "divided_loyalties", "objectives": []},
+        "divided_loyalties": {"id": "divided_loyalties", "name": "Divided Loyalties", "act": "Act I",
+                              "status": "locked", "prerequisites": ["battle_of_whiterun"], "objectives": []},
+        "season_unending": {"id": "season_unending", "name": "Season Unending", "act": "Act III",
+                            "status": "locked", "prerequisites": ["divided_loyalties"], "objectives": []},
+        "siege": {"id": "siege", "name": "Siege of Windhelm", "act": "Act III",
+                  "status": "conditional", "prerequisites": ["divided_loyalties"], "objectives": []},
+        "thalmor_endgame": {"id": "thalmor_endgame", "name": "Thalmor Endgame", "act": "Act III",
+                            "status": "locked", "prerequisites": ["season_unending OR siege"], "objectives": []},
+    }}})
+    write_json(data / "quests" / "before_the_storm.json", {
+        "quest_id": "quest_001", "name": "Before the Storm", "status": "Active",
+        "prerequisites": ["Arrive in Riverwood"], "objectives": []})
+    write_json(data / "quests" / "bleak_falls_barrow.json", {
+        "quest_id": "quest_002", "name": "Bleak Falls Barrow", "status": "Pending",
+        "prerequisites": ["Complete: Before the Storm"], "objectives": []})
+    write_json(data / "daedric_quests.json", {"daedric_quests": [
+        {"id": "azuras_star", "name": "The Black Star", "objectives": []}]})
+    write_json(data / "factions.json", {
+        "major_factions": {"companions": {"name": "The Companions", "description": "Not a quest"}},
+        "faction_quests": {"companions": {"questline": "Glory of the Dead", "quests": [
+            {"id": "companions_01", "name": "Take Up Arms", "act_context": ["Act 1"]},
+            {"id": "companions_02", "name": "The Silver Hand", "act_context": ["Act 1", "Act 2"]},
+        ]}},
+    })
+    return data
+
+
+def test_graph_structure():
+    """Nodes, prerequisites, OR groups, name references and indexes"""
+    with tempfile.TemporaryDirectory() as tmp:
+        graph = QuestGraph(make_data(tmp))
+        assert len(graph.nodes) == 10
+        assert graph.get("thalmor_endgame").requires == [["season_unending", "siege"]]
+        assert graph.get("quest_002").requires == [["quest_001"]]
+        assert graph.get("quest_001").conditions == ["Arrive in Riverwood"]
+        assert graph.get("companions_02").requires == [["companions_01"]]
+        assert graph.get("companions_02").questline == "companions"
+        assert graph.order().index("battle_of_whiterun") < graph.order().index("thalmor_endgame")
+        assert graph.cycles == []
+
+        assert [n.id for n in graph.with_status("available")] == ["battle_of_whiterun", "azuras_star", "companions_01"]
+        assert [n.id for n in graph.with_status("active")] == ["quest_001"]
+        assert [n.id for n in graph.in_act("Act 1", questline="main_quests")] == ["battle_of_whiterun", "divided_loyalties"]
+        assert [n.id for n in graph.in_act("Act II")] == ["companions_02"]
+        assert act_key("Act I-II Transition") == "act 1-2 transition"
+    print("✓ Test passed: graph structure and indexes")
+
+
+def test_status_changes_and_commit():
+    """Unlocks propagate and only changed status fields are written"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data = make_data(tmp)
+        graph = QuestGraph(data)
+        assert graph.set_status("battle_of_whiterun", "completed") == ["divided_loyalties"]
+        assert graph.set_status("divided_loyalties", "completed") == ["season_unending"]
+        assert graph.get("siege").status == "conditional"   # conditional quests wait for the GM
+        assert graph.set_status("season_unending", "completed") == ["thalmor_endgame"]
+        assert graph.set_status("companions_01", "completed") == ["companions_02"]
+        assert graph.get("companions_02").status == "available"
+        assert [n.id for n in graph.with_status("completed")] == [
+            "battle_of_whiterun", "divided_loyalties", "season_unending", "companions_01"]
+
+        # Someone else edits the same file in the meantime; their change survives
+        main_path = data / "quests" / "main_quests.json"
+        edited = read_json(main_path)
+        edited["main_questline"]["quests"]["siege"]["gm_notes"] = "Windhelm burns"
+        write_json(main_path, edited)
+        before_the_storm = (data / "quests" / "before_the_storm.json").read_text(encoding="utf-8")
+
+        assert graph.commit() == 5
+        quests = read_json(main_path)["main_questline"]["quests"]
+        assert quests["thalmor_endgame"]["status"] == "available"
+        assert quests["season_unending"]["status"] == "completed"
+        assert quests["siege"]["gm_notes"] == "Windhelm burns"
+        factions = read_json(data / "factions.json")["faction_quests"]["companions"]["quests"]
+        assert factions[0]["status"] == "completed" and "status" not in factions[1]
+        assert (data / "quests" / "before_the_storm.json").read_text(encoding="utf-8") == before_the_storm
+        assert graph.commit() == 0
+    print("✓ Test passed: status changes and commit")
+
+
+def test_story_manager_uses_graph():
+    """advance_quest, get_available_quests and act queries go through the graph"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data = make_data(tmp)
+        write_json(Path(tmp) / "state" / "campaign_state.json", {"current_act": 1})
+        manager = StoryManager(data, Path(tmp) / "state")
+        assert [q["quest"]["id"] for q in manager.get_available_quests()] == ["battle_of_whiterun"]
+        assert manager.advance_quest("battle_of_whiterun", "completed")
+        assert not manager.advance_quest("no_such_quest", "completed")
+        assert [q["quest"]["id"] for q in manager.get_available_quests()] == ["divided_loyalties"]
+        assert read_json(data / "quests" / "main_quests.json")["main_questline"]["quests"][
+            "divided_loyalties"]["status"] == "available"
+        assert [q["id"] for q in manager.get_act_appropriate_quests("Act III")] == [
+            "season_unending", "siege", "thalmor_endgame"]
+        assert manager.get_story_hooks_for_quest("siege")["quest_name"] == "Siege of Windhelm"
+    print("✓ Test passed: StoryManager uses the quest graph")
+
+
+def test_progress_quests_batch():
+    """Session quest updates resolve by name/id/alias and write each file once, status fields only"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data = make_data(tmp)
+        main_path = data / "quests" / "main_quests.json"
+        edited = read_json(main_path)
+        edited["main_questline"]["quests"]["siege"]["aliases"] = ["The Siege"]
+        write_json(main_path, edited)
+        # Hand formatting that a re-dump of the whole file would not keep
+        text = main_path.read_text(encoding="utf-8")
+        main_path.write_text(re.sub(r'\[\s*"The Siege"\s*\]', '["The Siege"]', text), encoding="utf-8")
+        untouched = (data / "quests" / "bleak_falls_barrow.json").read_text(encoding="utf-8")
+
+        manager = StoryProgressionManager(data)
+        files, index = manager.build_quest_index()
+        assert len(files) == 3
+        assert index["battle of whiterun"] == (main_path, "/main_questline/quests/battle_of_whiterun")
+        assert index["quest_001"] == (data / "quests" / "before_the_storm.json", "")
+
+        before = main_path.read_text(encoding="utf-8").splitlines()
+        writes = []
+        original = story_progression.commit_writes
+        story_progression.commit_writes = lambda w: writes.append(list(w)) or original(w)
+        try:
+            unresolved = manager.progress_quests({"quests_updated": [
+                {"quest": "Battle of Whiterun", "status": "completed"},
+                {"quest": "divided_loyalties", "status": "active"},
+                {"quest": "the  siege", "status": "available"},
+                {"quest": "Before the Storm", "status": "Completed"},
+                {"quest": "Battle of Whiterun", "status": "failed"},
+                {"quest": "No Such Quest", "status": "completed"},
+                {"quest": "", "status": "completed"},
+            ]})
+        finally:
+            story_progression.commit_writes = original
+        assert unresolved == ["No Such Quest"]
+        assert sorted(path.name for batch in writes for path in batch) == ["before_the_storm.json", "main_quests.json"]
+        after = main_path.read_text(encoding="utf-8").splitlines()
+        assert len(after) == len(before)
+        assert [b for a, b in zip(before, after) if a != b] == [
+            '        "status": "failed",', '        "status": "active",', '        "status": "available",']
+        quests = read_json(main_path)["main_questline"]["quests"]
+        assert [quests[q]["status"] for q in ("battle_of_whiterun", "divided_loyalties", "siege")] == [
+            "failed", "active", "available"]
+        assert read_json(data / "quests" / "before_the_storm.json")["status"] == "Completed"
+        assert (data / "quests" / "bleak_falls_barrow.json").read_text(encoding="utf-8") == untouched
+        assert manager.progress_quests({"quests_updated": []}) == []
+    print("✓ Test passed: progress_quests batches updates per file")
+
+
+if __name__ == "__main__":
+    test_graph_structure()
+    test_status_changes_and_commit()
+    test_story_manager_uses_graph()
+    test_progress_quests_batch()
+    print("\nAll quest graph tests passed!")
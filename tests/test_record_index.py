@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Tests for record-level reads and writes of large JSON files
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from faction_logic import FactionManager
+from record_index import RecordIndex, splice_records
+from storage import JSONTreeStorage, SQLiteStorage
+from story_manager import StoryManager
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+def read_json(path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+QUESTS = {"main_questline": {"name": "Main", "quests": {
+    "battle_of_whiterun": {"id": "battle_of_whiterun", "name": "Battle of Whiterun", "status": "available"},
+    "season_unending": {"id": "season_unending", "name": "Season Unending", "status": "locked",
+                        "notes": ["Höfn", "Ulfric"]},
+    "thalmor_endgame": {"id": "thalmor_endgame", "name": "Thalmor Endgame", "status": "locked"},
+}}}
+
+FACTIONS = {"major_factions": {
+    "companions": {"name": "The Companions", "clocks": [
+        {"name": "Silver Hand Threat", "segments": 4, "progress": 1, "effect": "Jorrvaskr attacked"}]},
+    "thalmor": {"name": "Thalmor", "clocks": []},
+}}
+
+
+def test_read_and_write_in_place():
+    """One record is read and spliced without touching the rest of the file"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "main_quests.json"
+        write_json(path, QUESTS)
+        index = RecordIndex()
+        pointer = "/main_questline/quests/season_unending"
+        assert index.read(path, pointer) == QUESTS["main_questline"]["quests"]["season_unending"]
+        assert index.read(path, "/main_questline/quests/season_unending/notes/0") == "Höfn"
+
+        before = path.read_text(encoding="utf-8")
+        index.write(path, pointer + "/status", "completed")
+        index.write(path, "/main_questline/quests/battle_of_whiterun", {"id": "battle_of_whiterun", "status": "done"})
+        expected = json.loads(json.dumps(QUESTS))
+        expected["main_questline"]["quests"]["season_unending"]["status"] = "completed"
+        expected["main_questline"]["quests"]["battle_of_whiterun"] = {"id": "battle_of_whiterun", "status": "done"}
+        # Byte-identical to dumping the whole document again, and the later spans moved with the edit
+        assert path.read_text(encoding="utf-8") == json.dumps(expected, indent=2, ensure_ascii=False)
+        assert path.read_text(encoding="utf-8") != before
+        assert index.read(path, "/main_questline/quests/thalmor_endgame/name") == "Thalmor Endgame"
+
+        # Someone else rewrites the file: the stale index is dropped
+        expected["main_questline"]["quests"]["thalmor_endgame"]["name"] = "The Thalmor Endgame Begins"
+        write_json(path, expected)
+        assert index.read(path, "/main_questline/quests/thalmor_endgame/name") == "The Thalmor Endgame Begins"
+        for bad in ("/main_questline/quests/missing", "/main_questline/name/0", ""):
+            try:
+                index.read(path, bad)
+                assert False, bad
+            except ValueError:
+                pass
+    print("✓ Test passed: read and write records in place")
+
+
+def test_splice_several_records():
+    """Several records of one text are replaced in one pass"""
+    text = json.dumps(QUESTS, indent=2, ensure_ascii=False)
+    quests = "/main_questline/quests"
+    updated = splice_records(text, {f"{quests}/thalmor_endgame/status": "active",
+                                    f"{quests}/battle_of_whiterun/status": "completed"})
+    expected = json.loads(text)
+    expected["main_questline"]["quests"]["thalmor_endgame"]["status"] = "active"
+    expected["main_questline"]["quests"]["battle_of_whiterun"]["status"] = "completed"
+    assert updated == json.dumps(expected, indent=2, ensure_ascii=False)
+    for bad in ({f"{quests}/missing/status": 1}, {quests: {}, f"{quests}/battle_of_whiterun": {}}, {"": {}}):
+        try:
+            splice_records(text, bad)
+            assert False, bad
+        except ValueError:
+            pass
+    print("✓ Test passed: splice several records")
+
+
+def test_storage_records():
+    """get_record/put_record behave the same on the JSON tree and SQLite backends"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data = Path(tmp) / "data"
+        write_json(data / "quests" / "main_quests.json", QUESTS)
+        write_json(data / "factions.json", FACTIONS)
+        db = SQLiteStorage(Path(tmp) / "campaign.sqlite")
+        db.import_tree(data)
+        for storage in (JSONTreeStorage(data), db):
+            pointer = "/main_questline/quests/thalmor_endgame/status"
+            assert storage.get_record("quests", "main_quests", pointer) == "locked"
+            storage.put_record("quests", "main_quests", pointer, "available")
+            assert storage.get_record("quests", "main_quests", pointer) == "available"
+            # New keys are added to their parent record
+            storage.put_record("quests", "main_quests", "/main_questline/quests/thalmor_endgame/gm_notes", "soon")
+            quest = storage.get("quests", "main_quests")["main_questline"]["quests"]["thalmor_endgame"]
+            assert quest == {"id": "thalmor_endgame", "name": "Thalmor Endgame", "status": "available",
+                             "gm_notes": "soon"}
+            assert storage.get_record("quests", "main_quests", "/main_questline/quests/nope") is None
+            assert storage.get_record("quests", "missing", "/main_questline") is None
+            assert storage.get_record("", "factions", "/major_factions/companions/clocks/0/progress") == 1
+            try:
+                storage.put_record("quests", "missing", "/main_questline/name", "x")
+                assert False
+            except ValueError:
+                pass
+            if hasattr(storage, "close"):
+                storage.close()
+    print("✓ Test passed: storage get_record/put_record")
+
+
+def test_managers_write_single_records():
+    """Faction and story clocks are updated record by record"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data = Path(tmp) / "data"
+        write_json(data / "factions.json", FACTIONS)
+        write_json(data / "clocks" / "thalmor_influence_clocks.json", {"thalmor_influence_clocks": {
+            "last_updated": "never",
+            "clocks": {"Embassy Party": {"total_segments": 6, "current_progress": 2}},
+        }})
+        write_json(data / "clocks" / "faction_trust_clocks.json", {"faction_trust_clocks": {
+            "clocks": {"Companions Trust": {"max_trust": 5, "current_trust": 4}},
+        }})
+        write_json(Path(tmp) / "state" / "campaign_state.json", {"current_act": 1})
+
+        manager = FactionManager(data, storage=JSONTreeStorage(data))
+        assert manager.update_faction_clock("companions", "Silver Hand Threat", 5)
+        assert not manager.update_faction_clock("companions", "No Such Clock", 1)
+        assert not manager.update_faction_clock("no_such_faction", "Silver Hand Threat", 1)
+        factions = read_json(data / "factions.json")
+        assert factions["major_factions"]["companions"]["clocks"][0]["progress"] == 4
+        assert factions["major_factions"]["thalmor"] == FACTIONS["major_factions"]["thalmor"]
+
+        story = StoryManager(data, Path(tmp) / "state")
+        assert story.advance_clock("thalmor", "Embassy Party", 1)
+        assert story.advance_clock("faction_trust", "Companions Trust", 3)
+        assert not story.advance_clock("thalmor", "Unknown Clock", 1)
+        thalmor = read_json(data / "clocks" / "thalmor_influence_clocks.json")["thalmor_influence_clocks"]
+        assert thalmor["clocks"]["Embassy Party"]["current_progress"] == 3
+        assert thalmor["last_updated"] != "never"
+        trust = read_json(data / "clocks" / "faction_trust_clocks.json")["faction_trust_clocks"]
+        assert trust["clocks"]["Companions Trust"]["current_trust"] == 5
+    print("✓ Test passed: managers write single records")
+
+
+if __name__ == "__main__":
+    test_read_and_write_in_place()
+    test_splice_several_records()
+    test_storage_records()
+    test_managers_write_single_records()
+    print("\nAll record index tests passed!")
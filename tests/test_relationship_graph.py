@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Tests for the NPC relationship graph
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from npc_manager import NPCManager
+from query_data import DataQueryManager
+from relationship_graph import RelationshipGraph, score_relationship
+from storage import JSONTreeStorage
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def make_data(root):
+    """A small Markarth intrigue web"""
+    data = Path(root) / "data"
+    write_json(data / "npcs" / "thonar_silver_blood.json", {
+        "id": "thonar_silver_blood", "name": "Thonar Silver-Blood",
+        "relationships": {"Thongvor Silver-Blood": "Older brother and co-conspirator",
+                          "Madanach": "Former partner, now hated enemy"}
+    })
+    write_json(data / "npcs" / "thongvor_silver_blood.json", {
+        "id": "thongvor_silver_blood", "name": "Thongvor Silver-Blood",
+        "relationships": {"Jarl Igmund": "Nominal liege - secretly controls him"}
+    })
+    write_json(data / "npcs" / "jarl_igmund.json", {
+        "id": "jarl_igmund", "name": "Jarl Igmund",
+        "relationships": {"Brother Verulus": "Trusted priest"}
+    })
+    write_json(data / "npcs" / "verulus.json", {"id": "brother_verulus", "name": "Brother Verulus"})
+    write_json(data / "npcs" / "madanach.json", {"id": "madanach", "name": "Madanach"})
+    write_json(data / "npc_relationships.json", {
+        "major_npc_relationships": {"jarl_igmund": {"name": "Jarl Igmund", "relationship_to_party": 15}},
+        "npc_to_npc_relationships": {
+            "intrigue": {"jarl_igmund_and_madanach": {"relationship": -80, "notes": "Jailer and prisoner"}}
+        }
+    })
+    return data
+
+
+def test_text_scoring():
+    """Relationship descriptions map onto the -100..100 scale"""
+    assert score_relationship("Arch-enemy - Ulfric ended his reign") <= -90
+    assert score_relationship("Trusted advisor") > 0
+    assert score_relationship("Suspicious rival") < 0
+    assert score_relationship("Commands as Jarl") == 10
+    assert score_relationship({"relationship": 70}) == 70
+    print("✓ Test passed: relationship text scoring")
+
+
+def test_graph_queries():
+    """Allies, rivals, k-hop neighbours and social paths"""
+    with tempfile.TemporaryDirectory() as tmp:
+        graph = RelationshipGraph(JSONTreeStorage(make_data(tmp)))
+
+        assert graph.strongest_allies("thonar_silver_blood")[0][0] == "thongvor_silver_blood"
+        assert graph.strongest_rivals("jarl_igmund")[0] == ("madanach", -80.0)
+        assert graph.weight("jarl_igmund", "player") == 15
+        # "Brother Verulus" resolves to the NPC whose file is verulus.json
+        assert graph.weight("jarl_igmund", "brother_verulus") > 0
+
+        hops = graph.k_hop("thonar_silver_blood", k=2)
+        assert hops["thongvor_silver_blood"] == 1 and hops["jarl_igmund"] == 2
+
+        # Word does not travel over hostile edges
+        assert graph.social_path("thonar_silver_blood", "brother_verulus") == [
+            "thonar_silver_blood", "thongvor_silver_blood", "jarl_igmund", "brother_verulus"]
+        assert graph.social_path("brother_verulus", "madanach") is None
+    print("✓ Test passed: graph queries")
+
+
+def test_batched_updates_persist():
+    """Edge updates are O(1) in memory and written once on flush"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data = make_data(tmp)
+        manager = NPCManager(data_dir=str(data), state_dir=str(Path(tmp) / "state"))
+
+        graph = manager.relationship_graph  # built, reading every file once
+        reads = []
+        get = manager.storage.get
+        manager.storage.get = lambda collection, doc_id: reads.append(doc_id) or get(collection, doc_id)
+        assert manager.update_relationship("jarl_igmund", "madanach", 30, "Released from Cidhna Mine")
+        assert manager.update_relationship("jarl_igmund", "madanach", 10)
+        assert not manager.update_relationship("jarl_igmund", "no_such_npc", 10)
+        # Updates stay in memory: no file is read or written until the flush
+        assert reads == [] and graph.pending_changes() == 1
+        stored = json.loads((data / "npc_relationships.json").read_text())
+        assert "tracked_relationships" not in stored["npc_to_npc_relationships"]
+        assert manager.flush_relationships() == 1
+
+        stored = json.loads((data / "npc_relationships.json").read_text())
+        tracked = stored["npc_to_npc_relationships"]["tracked_relationships"]["jarl_igmund_and_madanach"]
+        assert tracked["relationship"] == -40
+        assert tracked["notes"] == "Released from Cidhna Mine"
+
+        # A fresh graph applies the tracked value over the original pair entry
+        assert RelationshipGraph(JSONTreeStorage(data)).weight("madanach", "jarl_igmund") == -40
+    print("✓ Test passed: batched relationship updates persist")
+
+
+def test_ids_containing_and():
+    """Pair endpoints survive ids with "_and_" in them, old and new entries alike"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data = make_data(tmp)
+        write_json(data / "npcs" / "salt_and_sand.json", {"id": "salt_and_sand_trader", "name": "Salt-and-Sand"})
+        rel = json.loads((data / "npc_relationships.json").read_text())
+        rel["npc_to_npc_relationships"]["intrigue"]["madanach_and_salt_and_sand_trader"] = {"relationship": 35}
+        write_json(data / "npc_relationships.json", rel)
+
+        graph = RelationshipGraph(JSONTreeStorage(data))
+        assert graph.weight("madanach", "salt_and_sand_trader") == 35
+        graph.update_edge("salt_and_sand_trader", "thonar_silver_blood", -20)
+        graph.flush()
+        tracked = json.loads((data / "npc_relationships.json").read_text())["npc_to_npc_relationships"][
+            "tracked_relationships"]["salt_and_sand_trader_and_thonar_silver_blood"]
+        assert tracked["npcs"] == ["salt_and_sand_trader", "thonar_silver_blood"]
+
+        graph = RelationshipGraph(JSONTreeStorage(data))
+        assert graph.weight("thonar_silver_blood", "salt_and_sand_trader") == -20
+        assert graph.weight("madanach", "salt_and_sand_trader") == 35
+        assert "salt" not in graph.index and "sand_trader" not in graph.index
+    print("✓ Test passed: ids containing _and_")
+
+
+def test_relationship_lookup_by_id():
+    """get_character_relationships finds documents stored under another file name"""
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = DataQueryManager(make_data(tmp))
+        assert manager.get_character_relationships("thonar_silver_blood")["Madanach"].startswith("Former")
+        assert manager.get_character_relationships("brother_verulus") == {}
+        write_json(Path(tmp) / "data" / "npcs" / "verulus.json", {
+            "id": "brother_verulus", "name": "Brother Verulus", "relationships": {"Eola": "Betrayer"}
+        })
+        assert manager.get_character_relationships("brother_verulus") == {"Eola": "Betrayer"}
+    print("✓ Test passed: relationship lookup by id")
+
+
+if __name__ == "__main__":
+    test_text_scoring()
+    test_graph_queries()
+    test_batched_updates_persist()
+    test_ids_containing_and()
+    test_relationship_lookup_by_id()
+    print("\nAll relationship graph tests passed!")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for the session timeline manifest
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from session_index import SessionIndex
+from session_manager import SessionContextManager
+
+
+def make_manager(root):
+    manager = SessionContextManager(str(Path(root) / "data"))
+    manager.create_session(1, "Unbound", "GM", ["Alice"])
+    manager.create_session(2, "Riverwood", "GM", ["Alice"])
+    manager.update_session(2, {
+        "characters_present": ["pc_khagar_yal"],
+        "npcs_encountered": ["Alvor - Blacksmith of Riverwood"],
+        "locations_visited": ["Riverwood"],
+        "quests_updated": [{"quest": "Before the Storm", "status": "Completed"}],
+    })
+    return manager
+
+
+def test_manifest_written_on_create_and_update():
+    """create_session/update_session keep the manifest current"""
+    with tempfile.TemporaryDirectory() as tmp:
+        make_manager(tmp)
+        manifest = json.loads((Path(tmp) / "data" / "sessions" / "_index.json").read_text())
+        entry = manifest["sessions"]["session_002"]
+        assert entry["title"] == "Riverwood"
+        assert entry["characters"] == ["pc_khagar_yal"]
+        assert entry["quests"] == ["Before the Storm"]
+        assert len(entry["hash"]) == 40
+    print("✓ Test passed: manifest written on create/update")
+
+
+def test_history_queries_skip_session_files():
+    """Timeline and latest-session lookups are answered from the manifest"""
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = make_manager(tmp)
+        reads = []
+        original_get = manager.storage.get
+
+        def counting_get(collection, doc_id):
+            reads.append(doc_id)
+            return original_get(collection, doc_id)
+
+        manager.storage.get = counting_get
+        assert [t["number"] for t in manager.get_campaign_timeline()] == [1, 2]
+        assert [e["number"] for e in manager.get_npc_session_history("Alvor")] == [2]
+        assert [e["number"] for e in manager.get_location_session_history("riverwood")] == [2]
+        assert reads == []
+
+        assert manager.get_latest_session()["title"] == "Riverwood"
+        assert reads == ["session_002"]
+        history = manager.get_character_session_history("pc_khagar_yal")
+        assert [s["session_number"] for s in history] == [2]
+    print("✓ Test passed: history queries read only the manifest")
+
+
+def test_manifest_reconciles_with_disk():
+    """Sessions added or removed outside the manager are picked up on load"""
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = make_manager(tmp)
+        sessions_dir = Path(tmp) / "data" / "sessions"
+        (sessions_dir / "session_001.json").unlink()
+        (sessions_dir / "session_003.json").write_text(json.dumps({
+            "session_number": 3, "title": "Bleak Falls", "characters_present": ["pc_khagar_yal"]
+        }))
+
+        index = SessionIndex(manager.storage).load()
+        assert [e["number"] for e in index.timeline()] == [2, 3]
+        assert index.sessions_with("characters", "pc_khagar_yal") == ["session_002", "session_003"]
+        assert index.latest_id() == "session_003"
+
+        # Hand edits to an indexed file are caught by a verifying refresh
+        session = json.loads((sessions_dir / "session_002.json").read_text())
+        session["title"] = "Riverwood Revisited"
+        (sessions_dir / "session_002.json").write_text(json.dumps(session))
+        index.refresh(verify=True)
+        assert index.entries["session_002"]["title"] == "Riverwood Revisited"
+    print("✓ Test passed: manifest reconciles with session files")
+
+
+if __name__ == "__main__":
+    test_manifest_written_on_create_and_update()
+    test_history_queries_skip_session_files()
+    test_manifest_reconciles_with_disk()
+    print("\nAll session index tests passed!")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Tests for the pluggable storage backends (JSON tree and SQLite)
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from storage import CachedStorage, JSONTreeStorage, SQLiteStorage, open_storage
+from query_data import DataQueryManager
+from session_manager import SessionContextManager
+from faction_logic import FactionManager
+
+REPO_DATA = Path(__file__).resolve().parent.parent / "data"
+
+
+def test_sqlite_matches_json_tree():
+    """DataQueryManager returns the same results on both backends"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SQLiteStorage(Path(tmp) / "campaign.sqlite")
+        imported = db.import_tree(REPO_DATA)
+        assert imported > 50
+
+        json_q = DataQueryManager(str(REPO_DATA), storage=JSONTreeStorage(REPO_DATA))
+        sql_q = DataQueryManager(str(REPO_DATA), storage=db)
+
+        def ids(docs):
+            return sorted(d.get('id') or d.get('name') for d in docs)
+
+        assert ids(json_q.query_npc_enemy_stats(category="Enemy")) == ids(sql_q.query_npc_enemy_stats(category="Enemy"))
+        assert ids(json_q.get_enemies_by_act("Act 1")) == ids(sql_q.get_enemies_by_act("Act 1"))
+        for hold in ("Eastmarch", "Whiterun", "The Rift"):
+            j, s = json_q.get_enemies_by_hold(hold), sql_q.get_enemies_by_hold(hold)
+            for tier in ("primary", "contested", "rare"):
+                assert ids(j[tier]) == ids(s[tier])
+        assert ids(json_q.query_npcs(faction="Thieves Guild")) == ids(sql_q.query_npcs(faction="Thieves Guild"))
+        assert json_q.get_trust_mechanics() == sql_q.get_trust_mechanics()
+        assert json_q.get_character_relationships("maven_black_briar") == sql_q.get_character_relationships("maven_black_briar")
+        db.close()
+    print("✓ Test passed: SQLite backend matches JSON tree")
+
+
+def test_sqlite_indexes_and_wal():
+    """SQLite uses WAL mode and indexed lookups for generated columns"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SQLiteStorage(Path(tmp) / "campaign.sqlite")
+        db.put("npc_stat_sheets", "wolf", {"id": "wolf", "name": "Wolf", "category": "Enemy",
+                                           "act_context": ["Act 1"], "hold_context": {"primary": ["Whiterun"]}})
+        conn = db._connection()
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        plan = " ".join(row[-1] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT doc_id FROM documents WHERE collection = ? AND category = ?",
+            ("npc_stat_sheets", "enemy")))
+        assert "idx_documents_category" in plan
+        assert [d for d, _ in db.find("npc_stat_sheets", category="ENEMY")] == ["wolf"]
+        assert [d for d, _ in db.find_member("npc_stat_sheets", "hold_context.primary", "Whiterun")] == ["wolf"]
+
+        # Replacing a document refreshes its member index
+        db.put("npc_stat_sheets", "wolf", {"id": "wolf", "category": "Enemy", "act_context": ["Act 2"]})
+        assert db.find_member("npc_stat_sheets", "act_context", "Act 1") == []
+        assert db.delete("npc_stat_sheets", "wolf")
+        assert db.get("npc_stat_sheets", "wolf") is None
+        db.close()
+    print("✓ Test passed: SQLite indexes and WAL mode")
+
+
+def test_managers_on_sqlite_backend():
+    """Session and faction managers read and write through the SQLite backend"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp) / "data"
+        storage = open_storage(data_dir, backend=f"sqlite:{Path(tmp) / 'c.sqlite'}")
+
+        sessions = SessionContextManager(str(data_dir), storage=storage)
+        sessions.create_session(1, "Unbound", "GM", ["Alice"])
+        sessions.create_session(2, "Riverwood", "GM", ["Alice"])
+        sessions.update_session(2, {"characters_present": ["pc_test"]})
+        assert sessions.get_latest_session()["title"] == "Riverwood"
+        assert [s["session_number"] for s in sessions.get_character_session_history("pc_test")] == [2]
+        assert [t["number"] for t in sessions.get_campaign_timeline()] == [1, 2]
+        assert not list(data_dir.glob("sessions/*.json"))
+
+        factions = FactionManager(str(data_dir), storage=storage)
+        factions.save_factions_data({"major_factions": {}})
+        assert factions.load_factions_data() == {"major_factions": {}}
+        storage.close()
+    print("✓ Test passed: managers work on the SQLite backend")
+
+
+def test_export_round_trip():
+    """SQLite export writes the same documents back as a JSON tree"""
+    with tempfile.TemporaryDirectory() as tmp:
+        src = JSONTreeStorage(Path(tmp) / "src")
+        src.put("npcs", "lydia", {"id": "lydia", "name": "Lydia"})
+        src.put("", "factions", {"major_factions": {"companions": {"name": "The Companions"}}})
+
+        db = SQLiteStorage(Path(tmp) / "c.sqlite")
+        assert db.import_tree(Path(tmp) / "src") == 2
+        assert db.export_tree(Path(tmp) / "out") == 2
+        out = JSONTreeStorage(Path(tmp) / "out")
+        assert out.get("npcs", "lydia") == {"id": "lydia", "name": "Lydia"}
+        assert out.get("", "factions") == src.get("", "factions")
+        db.close()
+    print("✓ Test passed: SQLite export round trip")
+
+
+def test_digit_keys_and_cached_copies():
+    """Digit keys under objects stay keys; cached reads are copies"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SQLiteStorage(Path(tmp) / "c.sqlite")
+        db.put("", "factions", {"ranks": {"3": "Allies", "10": "Harbinger"}, "members": ["a", "b"]})
+        assert db.get_record("", "factions", "/ranks/10") == "Harbinger"
+        db.put_record("", "factions", "/ranks/10", "Circle")
+        db.put_record("", "factions", "/members/1", "c")
+        assert db.get("", "factions") == {"ranks": {"3": "Allies", "10": "Circle"}, "members": ["a", "c"]}
+
+        cached = CachedStorage(db, ["npcs"])
+        cached.put("npcs", "lydia", {"id": "lydia", "faction": "Whiterun"})
+        cached.get("npcs", "lydia")["faction"] = "Stormcloaks"
+        for _, doc in cached.find("npcs", faction="Whiterun"):
+            doc["faction"] = "Thalmor"
+        assert cached.get("npcs", "lydia")["faction"] == "Whiterun"
+        assert [d for d, _ in cached.find("npcs", faction="Whiterun")] == ["lydia"]
+        db.close()
+    print("✓ Test passed: digit keys and cached copies")
+
+
+if __name__ == "__main__":
+    test_sqlite_matches_json_tree()
+    test_sqlite_indexes_and_wal()
+    test_managers_on_sqlite_backend()
+    test_export_round_trip()
+    test_digit_keys_and_cached_copies()
+    print("\nAll storage tests passed!")
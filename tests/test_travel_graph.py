@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for the travel graph and route planner
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from story_manager import StoryManager
+from travel_graph import TravelGraph
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def make_data(root):
+    data = Path(root) / "data"
+    write_json(data / "holds" / "whiterun.json", {
+        "hold": "Whiterun Hold", "capital": "Whiterun",
+        "districts": [{"name": "Plains District"}, {"name": "Cloud District"}],
+        "major_settlements": ["Whiterun (City)", "Riverwood", "Rorikstead"],
+    })
+    write_json(data / "holds" / "rift.json", {
+        "hold": "The Rift", "capital": "Riften",
+        "districts": [{"name": "Riften Marketplace"}],
+        "major_settlements": ["Riften (City)", "Ivarstead"],
+    })
+    write_json(data / "travel_routes.json", {"encounter_rate": 1.0, "roads": [
+        {"from": "Whiterun", "to": "Riverwood", "days": 0.5, "danger": 1, "terrain": ["roads"]},
+        {"from": "Riverwood", "to": "Ivarstead", "days": 1.5, "danger": 4, "terrain": ["mountains"]},
+        {"from": "Ivarstead", "to": "Riften", "days": 1.0, "danger": 2, "terrain": ["forests"]},
+        {"from": "Whiterun", "to": "Riften", "days": 3.5, "danger": 1, "terrain": ["roads"]},
+        {"from": "Whiterun", "to": "Rorikstead", "days": 1.5, "danger": 2, "terrain": ["roads"]},
+        {"from": "Whiterun", "to": "Solitude", "days": 4, "danger": 2},
+    ]})
+    enemies = {
+        "bandit": ("Roads, camps", {}),
+        "sabre_cat": ("Mountains, caves", {}),
+        "stormcloak_soldier": ("Eastmarch", {"primary": ["The Rift"], "contested": ["Whiterun"]}),
+        "skeever": ("Riften sewers", {}),
+    }
+    for sheet_id, (location, hold_context) in enemies.items():
+        write_json(data / "npc_stat_sheets" / f"{sheet_id}.json", {
+            "id": sheet_id, "name": sheet_id.replace("_", " ").title(), "type": "Test",
+            "category": "Enemy", "location": location, "hold_context": hold_context,
+        })
+    return data
+
+
+def test_routes_and_tables():
+    """Dijkstra tables give fastest and safest routes; districts join their city"""
+    with tempfile.TemporaryDirectory() as tmp:
+        graph = TravelGraph(make_data(tmp)).refresh()
+        assert graph.unresolved == ["Solitude"]
+        assert graph.resolve("The Rift") == "riften"
+        assert graph.resolve("Plains District") == "plains_district"
+        fastest = graph.route("Whiterun", "Riften")
+        assert fastest["path"] == ["whiterun", "riverwood", "ivarstead", "riften"]
+        assert fastest["days"] == 3.0 and fastest["danger"] == 4
+        assert graph.route("Whiterun", "Riften", mode="safest")["path"] == ["whiterun", "riften"]
+        assert graph.route("Plains District", "Riften Marketplace")["path"] == [
+            "plains_district", "whiterun", "riverwood", "ivarstead", "riften", "riften_marketplace"]
+        assert graph.travel_days("Rorikstead", "Ivarstead") == 3.5
+        assert graph.route("Whiterun", "Solitude") is None
+        # Tables are computed once and reused until a source file changes
+        tables = graph.tables()
+        assert graph.tables() is tables
+        routes = Path(tmp) / "data" / "travel_routes.json"
+        doc = json.loads(routes.read_text(encoding="utf-8"))
+        doc["roads"].append({"from": "Rorikstead", "to": "Ivarstead", "days": 0.5, "danger": 5})
+        write_json(routes, doc)
+        assert graph.travel_days("Rorikstead", "Ivarstead") == 0.5
+        try:
+            graph.route("Whiterun", "Riften", mode="scenic")
+            assert False
+        except ValueError:
+            pass
+    print("✓ Test passed: routes and all-pairs tables")
+
+
+def test_plan_journey():
+    """One call routes every stop and pre-rolls encounters and triggers"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data = make_data(tmp)
+        graph = TravelGraph(data)
+        pool = {sheet["id"]: weight for sheet, weight in graph.refresh().enemy_pool(
+            "riverwood", "ivarstead", graph.edges["riverwood"]["ivarstead"])}
+        # Hold pools (hold_context tiers, or a location inside the hold) plus terrain matches
+        assert pool == {"sabre_cat": 2, "skeever": 3, "stormcloak_soldier": 3}
+
+        state = {"companions": {"active_companions": []}}
+        journey = graph.plan_journey(["Cloud District", "The Rift"], state, seed=11)
+        assert journey["stops"] == ["cloud_district", "riften"]
+        assert journey["path"] == ["cloud_district", "whiterun", "riverwood", "ivarstead", "riften"]
+        assert journey["days"] == 3.0
+        assert [leg["expected_encounters"] for leg in journey["legs"]] == [0.0, 0.5, 6.0, 2.0]
+        assert journey["encounters"] == sum(len(leg["encounters"]) for leg in journey["legs"]) > 0
+        assert journey["legs"][0]["encounters"] == []
+        assert "riften" in journey["triggers"] and "whiterun" in journey["triggers"]
+        assert state == {"companions": {"active_companions": []}}
+        assert graph.plan_journey(["Cloud District", "The Rift"], state, seed=11) == journey
+        assert graph.plan_journey(["Whiterun", "Solitude"]) is None
+        assert graph.plan_journey(["Whiterun"]) is None
+
+        write_json(Path(tmp) / "state" / "campaign_state.json", {"current_act": 1})
+        manager = StoryManager(data, Path(tmp) / "state")
+        assert manager.plan_journey(["Riverwood", "Rorikstead"], seed=1)["path"] == [
+            "riverwood", "whiterun", "rorikstead"]
+    print("✓ Test passed: plan journey")
+
+
+if __name__ == "__main__":
+    test_routes_and_tables()
+    test_plan_journey()
+    print("\nAll travel graph tests passed!")